@@ -6,17 +6,28 @@ Executive performance tracker with brand-aligned design.
 import html
 import json
 import logging
+import os
+import time
 from datetime import datetime
 from typing import Optional, Tuple
 
 import streamlit as st
 import streamlit.components.v1 as st_components
-import plotly.graph_objects as go
+
+from data.fiscal import FISCAL_YEAR
+from data.lazy_import import LazyModule, import_timings
+
+# Charts are only drawn on some pages; plotly is imported on first use
+go = LazyModule("plotly.graph_objects")
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
+# Set KPI_PROFILE_STARTUP=1 to log how long each script run takes and which
+# modules were imported on first use (see `python -m data.import_profile`)
+PROFILE_STARTUP_ENV = "KPI_PROFILE_STARTUP"
+
 # =============================================================================
 # CONSTANTS
 # =============================================================================
@@ -29,9 +40,6 @@ THRESHOLD_AT_RISK = 0.85
 MILLION = 1_000_000
 THOUSAND = 1_000
 
-# Fiscal year (configurable)
-FISCAL_YEAR = 2026
-
 # Input validation limits
 MAX_REVENUE_TARGET = 1_000_000_000  # $1B cap
 MAX_CUSTOMER_COUNT = 10_000
@@ -47,6 +55,7 @@ from data.data_layer import (
     format_value,
     get_metric_tooltip,
     get_data_source_status,
+    get_query_telemetry,
     get_metric_verification,
     get_coo_metrics,
     get_demand_sales_metrics,
@@ -58,6 +67,8 @@ from data.data_layer import (
     get_yoy_metrics,
     get_quarterly_revenue,
     get_revenue_time_horizons,
+    page_scope,
+    refresh_scope,
 )
 from data.targets_manager import (
     load_targets,
@@ -66,6 +77,11 @@ from data.targets_manager import (
     get_metric_target,
 )
 
+# Start of this script run's render timing (KPI_PROFILE_STARTUP). Streamlit
+# re-executes the script on every rerun with its modules already imported,
+# so imports are not timed here; `python -m data.import_profile` reports them.
+_RUN_STARTED = time.perf_counter()
+
 # Page config - wide layout for sidebar
 st.set_page_config(
     page_title="Recess — KPI Dashboard",
@@ -1545,6 +1561,8 @@ def render_page_header(title, subtitle=""):
     source = get_data_source_status()
     badge_class = "live" if source.get("is_live") else "mock"
     badge_text = "Live" if source.get("is_live") else "Mock Data"
+    if source.get("is_live") and source.get("source", "").startswith("offline replica"):
+        badge_text = "Offline Replica"
 
     header_html = (
         f'<div class="page-header">'
@@ -2091,8 +2109,6 @@ def render_ceo_dashboard():
     st.markdown('<div class="section-header">Key Metrics</div>', unsafe_allow_html=True)
     render_metric_grid(metrics, columns=4)
 
-    render_overview_revenue_trend()
-
 
 def render_coo_dashboard():
     """Render the COO / Ops dashboard."""
@@ -3436,6 +3452,7 @@ def render_data_source_indicator():
     source = status.get("source", "unknown")
     last_updated = status.get("last_updated", "Never")
     error = status.get("error")
+    snapshot_age = status.get("snapshot_age_seconds")
 
     # Format last updated time
     if last_updated and last_updated != "Never":
@@ -3449,12 +3466,31 @@ def render_data_source_indicator():
     if is_live:
         indicator_class = "live"
         icon = "✅"
-        label = "Live Data"
-        cached_note = " (cached)" if "cached" in source else ""
+        offline = source.startswith("offline replica")
+        label = "Offline Replica" if offline else "Live Data"
+        cached_note = " (cached)" if "cached" in source else " (stale)" if "stale" in source else ""
+        if snapshot_age is None:
+            age_str = "N/A"
+        elif snapshot_age < 60:
+            age_str = f"{snapshot_age}s ago"
+        else:
+            age_str = f"{snapshot_age // 60}m ago"
+        refresh_note = (
+            f'<div style="font-size: 0.6875rem; color: #f59e0b;">Last refresh failed: {html.escape(error)}</div>'
+            if error else ""
+        )
+        stale_metrics = status.get("stale_metrics") or []
+        if stale_metrics:
+            refresh_note += (
+                f'<div style="font-size: 0.6875rem; color: #f59e0b;">'
+                f'Previous values (refresh too slow): {html.escape(", ".join(stale_metrics))}</div>'
+            )
         tooltip_content = f'''
             <div style="font-size: 0.6875rem; text-transform: uppercase; letter-spacing: 0.05em; color: #10b981; margin-bottom: 0.25rem;">Connected</div>
-            <div style="margin-bottom: 0.5rem;">BigQuery data is live{cached_note}</div>
+            <div style="margin-bottom: 0.5rem;">{"Local snapshot data" if offline else "BigQuery data is live"}{cached_note}</div>
             <div style="font-size: 0.6875rem; color: #94a3b8;">Updated: {updated_str}</div>
+            <div style="font-size: 0.6875rem; color: #94a3b8;">Snapshot: {age_str}</div>
+            {refresh_note}
         '''
     else:
         indicator_class = "mock"
@@ -3475,6 +3511,29 @@ def render_data_source_indicator():
     </div>
     ''', unsafe_allow_html=True)
 
+    # Per-metric query latency, to see which metrics dominate refresh time
+    telemetry = get_query_telemetry()
+    if telemetry:
+        with st.sidebar.expander("Query telemetry", expanded=False):
+            st.caption("Recent queries in this server process, slowest p95 first")
+            st.dataframe(
+                [
+                    {
+                        "Metric": metric,
+                        "Queries": stats["count"],
+                        "p50 (ms)": round(stats["p50_ms"]),
+                        "p95 (ms)": round(stats["p95_ms"]),
+                        "Cache hits": stats["cache_hits"],
+                        "Errors": stats["errors"],
+                        "MB processed": round(stats["bytes_processed"] / 1024 ** 2, 1),
+                        "Slot ms": stats["slot_millis"],
+                    }
+                    for metric, stats in telemetry.items()
+                ],
+                hide_index=True,
+                use_container_width=True,
+            )
+
 
 def render_settings_page():
     """Render the settings/admin page for editing targets."""
@@ -3843,47 +3902,56 @@ def main():
     # Get current page
     page = st.session_state.get('current_page', 'overview')
 
-    if page == 'overview':
-        render_page_header("Company Overview", "Real-time performance across all departments")
-        render_revenue_overview()
-        render_health_metrics()
-        render_team_scorecard()
-    elif page == 'settings':
-        render_settings_page()
-    elif page == 'ceo':
-        render_page_header("CEO / Biz Dev", "Jack's dashboard — revenue and growth")
-        render_ceo_dashboard()
-    elif page == 'coo':
-        render_page_header("COO / Ops", "Deuce's dashboard — operations and finance")
-        render_coo_dashboard()
-    elif page == 'demand_sales':
-        render_page_header("Demand Sales", "Sales team pipeline and coverage")
-        render_demand_sales_dashboard()
-    elif page == 'demand_am':
-        render_page_header("Demand AM", "Account management performance")
-        render_demand_am_dashboard()
-    elif page == 'marketing':
-        render_page_header("Marketing", "Demand generation performance")
-        render_marketing_dashboard()
-    elif page == 'accounting':
-        render_page_header("Accounting", "AR/AP operations and cash health")
-        render_accounting_dashboard()
-    elif page == 'engineering':
-        render_page_header("Engineering", "Product & engineering delivery (Phase 5)")
-        render_engineering_dashboard()
-    elif page == 'supply':
-        # Custom Supply dashboard with capacity data
-        render_page_header("Supply", "Venue/event acquisition and capacity tracking")
-        render_supply_dashboard()
-    elif page == 'supply_am':
-        # Custom Supply AM dashboard with Core Action State tiles
-        render_page_header("Supply AM", "Supplier relationship management and NPR tracking")
-        render_supply_am_dashboard()
-    else:
-        # Department detail page
-        dept_name = NAV_TO_DEPT.get(page, page)
-        render_page_header(dept_name, DEPARTMENT_DETAILS.get(dept_name, {}).get("summary", "Department metrics and performance"))
-        render_department_detail(dept_name)
+    # One script run = one refresh: identical BigQuery calls made by the
+    # page's sections share a single query, and the company metrics snapshot
+    # only fetches the parts this page renders
+    with refresh_scope(), page_scope(page):
+        if page == 'overview':
+            render_page_header("Company Overview", "Real-time performance across all departments")
+            render_revenue_overview()
+            render_health_metrics()
+            render_team_scorecard()
+        elif page == 'settings':
+            render_settings_page()
+        elif page == 'ceo':
+            render_page_header("CEO / Biz Dev", "Jack's dashboard — revenue and growth")
+            render_ceo_dashboard()
+        elif page == 'coo':
+            render_page_header("COO / Ops", "Deuce's dashboard — operations and finance")
+            render_coo_dashboard()
+        elif page == 'demand_sales':
+            render_page_header("Demand Sales", "Sales team pipeline and coverage")
+            render_demand_sales_dashboard()
+        elif page == 'demand_am':
+            render_page_header("Demand AM", "Account management performance")
+            render_demand_am_dashboard()
+        elif page == 'marketing':
+            render_page_header("Marketing", "Demand generation performance")
+            render_marketing_dashboard()
+        elif page == 'accounting':
+            render_page_header("Accounting", "AR/AP operations and cash health")
+            render_accounting_dashboard()
+        elif page == 'engineering':
+            render_page_header("Engineering", "Product & engineering delivery (Phase 5)")
+            render_engineering_dashboard()
+        elif page == 'supply':
+            # Custom Supply dashboard with capacity data
+            render_page_header("Supply", "Venue/event acquisition and capacity tracking")
+            render_supply_dashboard()
+        elif page == 'supply_am':
+            # Custom Supply AM dashboard with Core Action State tiles
+            render_page_header("Supply AM", "Supplier relationship management and NPR tracking")
+            render_supply_am_dashboard()
+        else:
+            # Department detail page
+            dept_name = NAV_TO_DEPT.get(page, page)
+            render_page_header(dept_name, DEPARTMENT_DETAILS.get(dept_name, {}).get("summary", "Department metrics and performance"))
+            render_department_detail(dept_name)
+
+    if os.environ.get(PROFILE_STARTUP_ENV):
+        deferred = ", ".join(f"{name} {seconds * 1000:.0f} ms" for name, seconds in import_timings().items())
+        logger.info("Rendered %s in %.0f ms (deferred imports so far: %s)",
+                    page, (time.perf_counter() - _RUN_STARTED) * 1000, deferred or "none")
 
 
 if __name__ == "__main__":
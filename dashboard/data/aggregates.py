@@ -0,0 +1,321 @@
+"""
+Aggregates - Deploy and incrementally refresh the dashboard's aggregate tables.
+
+Without these tables, the revenue ledger and the supplier payout metrics
+recompute from the raw Fivetran QBO tables on every cache miss. This tool
+maintains two small tables in App_KPI_Dashboard instead:
+
+- agg_qbo_ledger_monthly: ledger amounts by month, source document and account
+- agg_supplier_year_payouts: net supplier payouts by supplier org and year
+
+A refresh looks up the partitions (months / years) whose source documents
+Fivetran synced since the table was last refreshed. It then MERGEs
+recomputed rows over just those partitions. The rows come from the same SQL
+builders bigquery_client runs against the raw tables, so the aggregate and
+the live query cannot disagree. A chart-of-accounts change rebuilds
+everything.
+
+The aggregates sum documents away, so a third table, agg_document_dates,
+remembers each document's transaction date as of the last refresh. A
+re-dated document then rewrites its previous partition too, instead of
+leaving its amount behind in the old month / year. If a refresh fails after
+its MERGE, run it again with --full.
+
+Set KPI_USE_AGGREGATES=1 for the dashboard to read the tables.
+
+Usage (from the dashboard/ directory):
+    python -m data.aggregates deploy
+    python -m data.aggregates refresh
+    python -m data.aggregates refresh --full --table agg_qbo_ledger_monthly
+
+Exits with status 1 if any statement fails.
+"""
+
+import argparse
+import logging
+import sys
+from datetime import date, datetime, timezone
+from typing import Any, Dict, List, Optional, Tuple
+
+from google.cloud import bigquery
+from google.cloud.exceptions import GoogleCloudError
+
+from . import bigquery_client as bq
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Refresh watermark used for a full rebuild (every source row counts as changed)
+FULL_REBUILD_SINCE = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+# Side table of each document's transaction date as of the last refresh
+DOCUMENT_DATES = "agg_document_dates"
+DOCUMENT_DATES_DDL = "create_agg_document_dates.sql"
+
+# QBO documents as (header table, line table, line -> header foreign key)
+LEDGER_DOCUMENTS = (
+    ("invoice", "invoice_line", "invoice_id"),
+    ("credit_memo", "credit_memo_line", "credit_memo_id"),
+    ("bill", "bill_line", "bill_id"),
+    ("vendor_credit", "vendor_credit_line", "vendor_credit_id"),
+)
+PAYOUT_DOCUMENTS = LEDGER_DOCUMENTS[2:]
+
+
+def _qbo_table(table: str) -> str:
+    return f"`{bq.PROJECT_ID}.src_fivetran_qbo.{table}`"
+
+
+def _table_ref(table: str) -> str:
+    return f"`{bq.PROJECT_ID}.{bq.DATASET}.{table}`"
+
+
+def _changed_dates_sql(documents: Tuple[Tuple[str, str, str], ...]) -> str:
+    """Transaction dates of documents whose header or lines synced after @since.
+
+    A synced header also contributes the date the document had at the last
+    refresh of @aggregate, so a re-dated document's old partition counts as
+    changed along with its new one.
+    """
+    selects = []
+    for header, lines, foreign_key in documents:
+        selects.append(
+            f"SELECT transaction_date FROM {_qbo_table(header)} WHERE _fivetran_synced > @since"
+        )
+        selects.append(
+            f"SELECT h.transaction_date FROM {_qbo_table(lines)} l "
+            f"JOIN {_qbo_table(header)} h ON l.{foreign_key} = h.id "
+            f"WHERE l._fivetran_synced > @since"
+        )
+        selects.append(
+            f"SELECT d.transaction_date FROM {_table_ref(DOCUMENT_DATES)} d "
+            f"JOIN {_qbo_table(header)} h ON d.document_id = CAST(h.id AS STRING) "
+            f"WHERE d.aggregate = @aggregate AND d.source = '{header}' AND h._fivetran_synced > @since"
+        )
+    return "\n        UNION ALL\n        ".join(selects)
+
+
+def _document_dates_sql(documents: Tuple[Tuple[str, str, str], ...]) -> str:
+    """MERGE the dates of documents synced in (@since, @refreshed_at] into DOCUMENT_DATES.
+
+    Documents synced after @refreshed_at are left for the next refresh,
+    which detects them as changed and still needs their previous date.
+    """
+    sources = "\n        UNION ALL\n        ".join(
+        f"SELECT '{header}' AS source, CAST(id AS STRING) AS document_id, transaction_date "
+        f"FROM {_qbo_table(header)} WHERE _fivetran_synced > @since AND _fivetran_synced <= @refreshed_at"
+        for header, _, _ in documents
+    )
+    return f"""
+    MERGE {_table_ref(DOCUMENT_DATES)} T
+    USING (
+        {sources}
+    ) S
+    ON T.aggregate = @aggregate AND T.source = S.source AND T.document_id = S.document_id
+    WHEN MATCHED THEN UPDATE SET transaction_date = S.transaction_date, refreshed_at = @refreshed_at
+    WHEN NOT MATCHED THEN INSERT (aggregate, source, document_id, transaction_date, refreshed_at)
+        VALUES (@aggregate, S.source, S.document_id, S.transaction_date, @refreshed_at)
+    """
+
+
+def _changed_partitions_sql(partition_expr: str, documents: Tuple[Tuple[str, str, str], ...]) -> str:
+    """One-row query: changed partitions, chart-of-accounts change flag, BigQuery's clock."""
+    return f"""
+    SELECT
+        ARRAY(
+            SELECT DISTINCT {partition_expr} AS partition_key
+            FROM (
+        {_changed_dates_sql(documents)}
+            )
+            WHERE transaction_date IS NOT NULL
+            ORDER BY partition_key
+        ) AS partitions,
+        EXISTS(SELECT 1 FROM {_qbo_table("account")} WHERE _fivetran_synced > @since) AS accounts_changed,
+        CURRENT_TIMESTAMP() AS checked_at
+    """
+
+
+def _next_month(month: date) -> date:
+    return date(month.year + month.month // 12, month.month % 12 + 1, 1)
+
+
+def _ledger_source_params(months: List[date]) -> bq.QueryParams:
+    return bq.period_params(min(months), _next_month(max(months)))
+
+
+def _payout_source_params(years: List[int]) -> bq.QueryParams:
+    return bq.period_params(bq.fiscal_year_bounds(min(years))[0])
+
+
+def _payout_extra_partitions() -> List[int]:
+    """Years always recomputed for supplier payouts.
+
+    Remittances can link an older bill to its supplier org after the bill
+    itself last synced, so the current and prior year are always refreshed.
+    """
+    this_year = date.today().year
+    return [this_year - 1, this_year]
+
+
+# Table name -> spec. source_sql builds the rows (in table column order,
+# minus refreshed_at) for [@period_start, @period_end); source_params
+# bounds it to the partitions being rewritten.
+AGGREGATES: Dict[str, Dict[str, Any]] = {
+    bq.AGG_QBO_LEDGER_MONTHLY: {
+        "ddl": "create_agg_qbo_ledger_monthly.sql",
+        "partition_column": "month",
+        "partition_type": "DATE",
+        "documents": LEDGER_DOCUMENTS,
+        "changed_sql": _changed_partitions_sql("DATE_TRUNC(transaction_date, MONTH)", LEDGER_DOCUMENTS),
+        "extra_partitions": lambda: [],
+        "source_sql": bq.qbo_ledger_monthly_sql,
+        "source_params": _ledger_source_params,
+    },
+    bq.AGG_SUPPLIER_YEAR_PAYOUTS: {
+        "ddl": "create_agg_supplier_year_payouts.sql",
+        "partition_column": "txn_year",
+        "partition_type": "INT64",
+        "documents": PAYOUT_DOCUMENTS,
+        "changed_sql": _changed_partitions_sql("EXTRACT(YEAR FROM transaction_date)", PAYOUT_DOCUMENTS),
+        "extra_partitions": _payout_extra_partitions,
+        "source_sql": bq.supply_payout_staging_sql,
+        "source_params": _payout_source_params,
+    },
+}
+
+
+def _run(sql: str, params: Optional[bq.QueryParams] = None) -> Any:
+    """Run a maintenance statement and wait for it."""
+    job = bq.get_client().query(sql, job_config=bigquery.QueryJobConfig(query_parameters=params or []))
+    job.result()
+    return job
+
+
+def _aggregate_param(table: str) -> bigquery.ScalarQueryParameter:
+    return bigquery.ScalarQueryParameter("aggregate", "STRING", table)
+
+
+def _last_refreshed_at(table: str) -> Optional[datetime]:
+    """When table was last refreshed, or None if it never was (or has no document dates yet)."""
+    rows = list(_run(
+        f"SELECT MAX(refreshed_at) AS since FROM {_table_ref(table)} "
+        f"WHERE EXISTS(SELECT 1 FROM {_table_ref(DOCUMENT_DATES)} WHERE aggregate = @aggregate)",
+        [_aggregate_param(table)],
+    ).result())
+    return rows[0].since if rows else None
+
+
+def merge_sql(table: str, full: bool = False) -> str:
+    """Build the MERGE that replaces the @partitions of an aggregate table.
+
+    Rows in the rewritten partitions are deleted and re-inserted from the
+    source query (ON FALSE never matches). The constant IN UNNEST(@partitions)
+    filter on the partition column lets BigQuery prune the rest of the
+    table. A full rebuild also deletes partitions that no longer have rows.
+    """
+    spec = AGGREGATES[table]
+    column = spec["partition_column"]
+    delete_condition = "" if full else f" AND T.{column} IN UNNEST(@partitions)"
+    return f"""
+    MERGE {_table_ref(table)} T
+    USING (
+        SELECT *, @refreshed_at AS refreshed_at
+        FROM ({spec["source_sql"]()})
+        WHERE {column} IN UNNEST(@partitions)
+    ) S
+    ON FALSE
+    WHEN NOT MATCHED THEN INSERT ROW
+    WHEN NOT MATCHED BY SOURCE{delete_condition} THEN DELETE
+    """
+
+
+def refresh_table(table: str, full: bool = False) -> Dict[str, Any]:
+    """Rewrite the partitions of one aggregate table whose sources changed.
+
+    Args:
+        table: Aggregate table name (a key of AGGREGATES)
+        full: Rebuild every partition regardless of what changed
+
+    Returns:
+        Dict with table, full, partitions (list rewritten) and rows_affected
+
+    Raises:
+        GoogleCloudError: If a statement fails
+    """
+    spec = AGGREGATES[table]
+    since = None if full else _last_refreshed_at(table)
+    if since is None:
+        full = True
+
+    window = [
+        _aggregate_param(table),
+        bigquery.ScalarQueryParameter("since", "TIMESTAMP", since or FULL_REBUILD_SINCE),
+    ]
+    changed = list(_run(spec["changed_sql"], window).result())[0]
+    if changed.accounts_changed and not full:
+        logger.info("%s: chart of accounts changed, rebuilding every partition", table)
+        return refresh_table(table, full=True)
+
+    partitions = sorted(set(changed.partitions or []) | set(spec["extra_partitions"]()))
+    summary = {"table": table, "full": full, "partitions": partitions, "rows_affected": 0}
+    if not partitions:
+        logger.info("%s: no source changes since %s", table, since)
+        return summary
+
+    params = spec["source_params"](partitions) + [
+        bigquery.ArrayQueryParameter("partitions", spec["partition_type"], partitions),
+        bigquery.ScalarQueryParameter("refreshed_at", "TIMESTAMP", changed.checked_at),
+    ]
+    job = _run(merge_sql(table, full), params)
+    summary["rows_affected"] = job.num_dml_affected_rows or 0
+    _run(_document_dates_sql(spec["documents"]), window + [
+        bigquery.ScalarQueryParameter("refreshed_at", "TIMESTAMP", changed.checked_at),
+    ])
+    logger.info("%s: rewrote %d partition(s), %d row(s)", table, len(partitions), summary["rows_affected"])
+    return summary
+
+
+def deploy() -> None:
+    """Create every aggregate table (and the document dates table) that does not exist yet.
+
+    Raises:
+        GoogleCloudError: If a DDL statement fails
+        FileNotFoundError: If a DDL file is missing
+    """
+    tables = [(DOCUMENT_DATES, DOCUMENT_DATES_DDL)] + [(table, spec["ddl"]) for table, spec in AGGREGATES.items()]
+    for table, filename in tables:
+        ddl = bq.load_query_file(filename)
+        if ddl is None:
+            raise FileNotFoundError(filename)
+        _run(ddl)
+        logger.info("Deployed %s", table)
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Deploy and refresh the dashboard aggregate tables.")
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("deploy", help="Create the aggregate tables")
+    refresh = commands.add_parser("refresh", help="MERGE changed partitions into the aggregate tables")
+    refresh.add_argument("--table", choices=sorted(AGGREGATES), action="append",
+                         help="Table to refresh (repeatable; default all)")
+    refresh.add_argument("--full", action="store_true", help="Rebuild every partition")
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.INFO)
+    try:
+        if args.command == "deploy":
+            deploy()
+        else:
+            for table in args.table or list(AGGREGATES):
+                summary = refresh_table(table, full=args.full)
+                print(f"{table}: {len(summary['partitions'])} partition(s), "
+                      f"{summary['rows_affected']} row(s){' (full rebuild)' if summary['full'] else ''}")
+    except (GoogleCloudError, FileNotFoundError) as e:
+        logger.error("%s failed: %s", args.command, e)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
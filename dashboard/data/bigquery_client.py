@@ -9,15 +9,42 @@ Set this to your service account key path before running:
     export GOOGLE_APPLICATION_CREDENTIALS="/path/to/bigquery-mcp-key.json"
 """
 
+import contextvars
+import functools
+import hashlib
+import inspect
 import logging
 import os
-from datetime import datetime
+import re
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from datetime import date, datetime, timezone
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import TYPE_CHECKING, Any, Callable, Dict, Iterator, List, Optional, Tuple, TypeVar
 
-from google.cloud import bigquery
 from google.cloud.exceptions import GoogleCloudError
 
+from .fetch_planner import Fetch, plan
+from .fiscal import FISCAL_YEAR
+from .lazy_import import LazyModule
+from .metric_registry import METRICS, PARAM_AS_OF, PARAM_FISCAL_YEAR_DATES, PARAM_FISCAL_YEAR_TIMESTAMPS
+from .offline_replica import OfflineClient, replica_dir
+from .query_loader import QueryLoader, SqlTemplate, hot_reload_enabled
+from .result_cache import MISS, CachedRow, get_result_cache, make_key, to_cached_rows
+from .retry import RetryPolicy, call_with_retry
+from .row_decoder import decode_result, select_columns
+from .telemetry import SOURCE_RESULT_CACHE, latency_percentile, record_query
+
+if TYPE_CHECKING:
+    import pandas as pd
+    from google.cloud import bigquery
+else:
+    # Imported on first query: it pulls in pandas and dominates boot time
+    bigquery = LazyModule("google.cloud.bigquery")
+
 # Configure logging
 logger = logging.getLogger(__name__)
 
@@ -27,45 +54,131 @@ logger = logging.getLogger(__name__)
 
 PROJECT_ID = "stitchdata-384118"
 DATASET = "App_KPI_Dashboard"
-FISCAL_YEAR = 2026
 
-# Path to SQL query files
+# Path to SQL query files: the dashboard's own queries, plus the analyst
+# reports at the repo root (compiled and validated with them, see
+# data/query_loader.py)
 QUERIES_DIR = Path(__file__).parent / "queries"
+ANALYST_QUERIES_DIR = Path(__file__).resolve().parents[2] / "queries"
+
+# Read ledger and supplier payout metrics from the aggregate tables kept up to
+# date by data/aggregates.py instead of the raw Fivetran tables
+USE_AGGREGATES_ENV = "KPI_USE_AGGREGATES"
+AGG_QBO_LEDGER_MONTHLY = "agg_qbo_ledger_monthly"
+AGG_SUPPLIER_YEAR_PAYOUTS = "agg_supplier_year_payouts"
+
+# Upper bound on BigQuery jobs a single fan-out keeps in flight at once
+MAX_CONCURRENT_QUERIES = 8
+
+# On-disk result cache TTLs in seconds, by metric (see data/result_cache.py).
+# Balance-sheet and ledger metrics move slowly; pipeline metrics change as
+# reps update deals. Metrics not listed use RESULT_CACHE_DEFAULT_TTL;
+# registered metrics declare theirs in data/metric_registry.py.
+RESULT_CACHE_DEFAULT_TTL = 15 * 60
+RESULT_CACHE_TTLS: Dict[str, int] = {
+    "qbo_ledger": 60 * 60,
+    "nrr": 6 * 60 * 60,
+    "demand_nrr_details": 6 * 60 * 60,
+    "customer_count": 6 * 60 * 60,
+    "churned_customers": 6 * 60 * 60,
+    "customer_concentration": 6 * 60 * 60,
+    "logo_retention": 6 * 60 * 60,
+    "supply_payout_staging": 60 * 60,
+    "cohort_matrix": 6 * 60 * 60,
+    "supplier_cohort_matrix": 6 * 60 * 60,
+    "pipeline_details": 5 * 60,
+    "pipeline_coverage_by_owner": 5 * 60,
+    "pipeline_coverage_by_company": 5 * 60,
+}
+
+# How long table last-modified lookups are reused before asking again
+WATERMARK_CHECK_INTERVAL = 60
+
+# Bytes-billed cap attached to every metric job: BigQuery fails the job
+# (400 bytesBilledLimitExceeded) instead of billing past it. The default is
+# the 10 GB per-query ceiling; queries that only read HubSpot deals get a
+# tighter cap (registered metrics declare theirs in data/metric_registry.py).
+# Check estimates with `python -m data.cost_report`.
+MAX_BYTES_BILLED_DEFAULT = 10 * 1024 ** 3
+MAX_BYTES_BILLED: Dict[str, int] = {
+    "pipeline_details": 1024 ** 3,
+    "pipeline_coverage_by_owner": 1024 ** 3,
+    "pipeline_coverage_by_company": 1024 ** 3,
+}
+
+# Default rows per page for iter_query() (each page is one API round trip)
+ITER_QUERY_PAGE_SIZE = 10_000
+
+# Circuit breaker: consecutive BigQuery failures before failing fast, and
+# seconds to wait before letting a single probe call through
+CIRCUIT_FAILURE_THRESHOLD = 5
+CIRCUIT_RESET_TIMEOUT = 30
+
+# Retries of transient failures (429, 5xx, dropped connections; see
+# data/retry.py): attempts per query, backoff ceiling before the first
+# retry and between any two, and seconds after which no retry is started
+QUERY_MAX_ATTEMPTS = 3
+QUERY_RETRY_BASE_DELAY = 0.5
+QUERY_RETRY_MAX_DELAY = 8.0
+QUERY_RETRY_DEADLINE = 30.0
+
+# Hedged queries: when set, a metric job still running after that metric's
+# p95 latency gets a duplicate job, and whichever finishes first is used.
+# Off by default: a hedge is billed like any other job.
+HEDGE_QUERIES_ENV = "KPI_HEDGE_QUERIES"
+HEDGE_MIN_SAMPLES = 20
+HEDGE_MIN_DELAY = 1.0
 
 # =============================================================================
 # CLIENT MANAGEMENT
 # =============================================================================
 
-_client: Optional[bigquery.Client] = None
+_client: Optional["bigquery.Client"] = None
+_client_lock = threading.Lock()
 
 
-def get_client() -> bigquery.Client:
+def get_client() -> "bigquery.Client":
     """Get or create BigQuery client.
 
+    Safe to call from fan-out worker threads; the client is created once
+    and shared (google-cloud-bigquery clients are thread-safe).
+
+    When KPI_OFFLINE_REPLICA is set, returns an OfflineClient that runs
+    every query against local Parquet snapshots instead (see offline_replica).
+
     Returns:
-        Authenticated BigQuery client
+        Authenticated BigQuery client, or the offline replica
 
     Raises:
         GoogleCloudError: If authentication fails
+        FileNotFoundError: If the offline replica directory does not exist
     """
     global _client
     if _client is None:
-        _client = bigquery.Client(project=PROJECT_ID)
-        logger.info("BigQuery client initialized for project: %s", PROJECT_ID)
+        with _client_lock:
+            if _client is None:
+                offline = replica_dir()
+                if offline is not None:
+                    _client = OfflineClient(offline)
+                    logger.info("Using offline replica at %s (no BigQuery access)", offline)
+                else:
+                    _client = bigquery.Client(project=PROJECT_ID)
+                    logger.info("BigQuery client initialized for project: %s", PROJECT_ID)
     return _client
 
 
 def is_bigquery_available() -> bool:
     """Check if BigQuery connection is available.
 
+    Runs a SELECT 1 probe through the circuit breaker, so while the circuit
+    is open this answers False immediately instead of waiting on a timeout.
+    Not used on the refresh path; metric queries report outages themselves.
+
     Returns:
         True if we can connect to BigQuery, False otherwise
     """
     try:
-        client = get_client()
-        # Simple query to test connection
-        query = f"SELECT 1 as test"
-        list(client.query(query).result())
+        bigquery_breaker.call(lambda: list(get_client().query("SELECT 1 as test").result()))
         return True
     except Exception as e:
         logger.warning("BigQuery not available: %s", e)
@@ -73,90 +186,1078 @@ def is_bigquery_available() -> bool:
 
 
 # =============================================================================
-# COMPANY METRICS (Overview Page)
+# CIRCUIT BREAKER
 # =============================================================================
 
-def get_revenue_ytd(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
-    """Fetch YTD Net Revenue (Take) from QuickBooks.
+T = TypeVar("T")
 
-    Net Revenue = What Recess keeps after paying organizers.
+# HTTP status codes that mean BigQuery answered but rejected the query (bad
+# SQL, missing table). These say nothing about availability.
+_QUERY_ERROR_CODES = frozenset({400, 404})
 
-    Formula:
-        GMV (invoices 4110-4169)
-        - Credit Memos (same accounts)
-        + Discounts (4190, typically negative)
-        - Payouts to organizers (bills 4200-4299)
-        + Vendor Credits (same 4200-4299 accounts)
 
-    2025 Reference: $3,890,004 (Take Rate: 49.1%)
+class CircuitOpenError(GoogleCloudError):
+    """Raised instead of calling BigQuery while the circuit breaker is open.
+
+    Subclasses GoogleCloudError so the metric functions' existing error
+    handling treats it like any other BigQuery failure.
+    """
+
+
+class CircuitBreaker:
+    """Fail fast once BigQuery looks down instead of waiting out timeouts.
+
+    closed: calls go through; consecutive outage failures are counted.
+    open: calls raise CircuitOpenError immediately.
+    half-open: after reset_timeout, one probe call goes through. Success
+        closes the circuit, failure re-opens it. Other calls keep failing
+        fast while the probe is in flight.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half-open"
+
+    def __init__(
+        self,
+        failure_threshold: int = CIRCUIT_FAILURE_THRESHOLD,
+        reset_timeout: float = CIRCUIT_RESET_TIMEOUT
+    ):
+        """Create a closed breaker.
+
+        Args:
+            failure_threshold: Consecutive failures that open the circuit
+            reset_timeout: Seconds the circuit stays open before a probe
+        """
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        """Close the circuit and forget past failures."""
+        with self._lock:
+            self._state = self.CLOSED
+            self._failures = 0
+            self._opened_at = 0.0
+            self._last_error: Optional[str] = None
+
+    @property
+    def state(self) -> str:
+        """Current state: CLOSED, OPEN or HALF_OPEN (probe in flight)."""
+        return self._state
+
+    @property
+    def last_error(self) -> Optional[str]:
+        """The failure that last opened the circuit."""
+        return self._last_error
+
+    def call(self, fn: Callable[[], T]) -> T:
+        """Run a BigQuery call through the breaker.
+
+        Args:
+            fn: Zero-argument callable that talks to BigQuery
+
+        Returns:
+            Whatever fn returns
+
+        Raises:
+            CircuitOpenError: If the circuit is open (fn is not called)
+            Exception: Whatever fn raised
+        """
+        self._before_call()
+        try:
+            result = fn()
+        except Exception as e:
+            self._record_failure(e)
+            raise
+        except BaseException:
+            self._abandon_probe()
+            raise
+        self._record_success()
+        return result
+
+    def _before_call(self) -> None:
+        with self._lock:
+            if self._state == self.CLOSED:
+                return
+            if self._state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self._state = self.HALF_OPEN  # this caller is the probe
+                logger.info("BigQuery circuit half-open, probing")
+                return
+            raise CircuitOpenError(f"BigQuery circuit open: {self._last_error}")
+
+    def _record_success(self) -> None:
+        with self._lock:
+            if self._state != self.CLOSED:
+                logger.info("BigQuery circuit closed")
+            self._state = self.CLOSED
+            self._failures = 0
+
+    def _record_failure(self, error: Exception) -> None:
+        if getattr(error, "code", None) in _QUERY_ERROR_CODES:
+            self._record_success()
+            return
+        with self._lock:
+            self._failures += 1
+            if self._state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                if self._state != self.OPEN:
+                    logger.warning("BigQuery circuit open after %d failure(s): %s", self._failures, error)
+                self._state = self.OPEN
+                self._opened_at = time.monotonic()
+                self._last_error = str(error)
+
+    def _abandon_probe(self) -> None:
+        """Let the next caller probe again if this one was interrupted."""
+        with self._lock:
+            if self._state == self.HALF_OPEN:
+                self._state = self.OPEN
+
+
+# Shared by every query the dashboard runs
+bigquery_breaker = CircuitBreaker()
+
+query_retry_policy = RetryPolicy(
+    max_attempts=QUERY_MAX_ATTEMPTS,
+    base_delay=QUERY_RETRY_BASE_DELAY,
+    max_delay=QUERY_RETRY_MAX_DELAY,
+    deadline=QUERY_RETRY_DEADLINE,
+)
+
+
+def call_bigquery(fn: Callable[[], T], label: Optional[str] = None) -> T:
+    """Run a BigQuery call through the circuit breaker, retrying transient failures.
+
+    The breaker wraps the whole retried call, so one logical call counts
+    as one failure however many attempts it took: a single flaky request
+    cannot open the circuit for every page. An open circuit fails the call
+    before any attempt is made.
+
+    Args:
+        fn: Zero-argument callable that talks to BigQuery
+        label: Name used in retry log messages (e.g. the metric)
 
     Returns:
-        Net revenue YTD or None if query fails
+        Whatever fn returns
+
+    Raises:
+        CircuitOpenError: If the circuit is open
+        Exception: The last failure once retries are exhausted or it is fatal
     """
-    query = f"""
-    WITH gmv_invoices AS (
-        -- GMV from invoices (4110-4169)
-        SELECT COALESCE(SUM(il.amount), 0) as amount
+    return bigquery_breaker.call(lambda: call_with_retry(fn, query_retry_policy, label=label))
+
+
+# =============================================================================
+# REQUEST-SCOPED MEMOIZATION
+# =============================================================================
+
+# Active refresh memo: (function, bound arguments) -> Future holding the result.
+# None outside of refresh_scope(), in which case memoized functions run as-is.
+_refresh_memo: contextvars.ContextVar[Optional[Dict[Tuple[str, Tuple], Future]]] = (
+    contextvars.ContextVar("bq_refresh_memo", default=None)
+)
+_refresh_memo_lock = threading.Lock()
+
+
+@contextmanager
+def refresh_scope() -> Iterator[None]:
+    """Deduplicate identical metric calls for the duration of one refresh.
+
+    Inside the scope, every function decorated with @refresh_memoized runs
+    its query at most once per unique set of arguments. Concurrent callers
+    asking for the same result wait on the one in-flight call instead of
+    issuing a duplicate BigQuery job. Nested scopes share the outer memo.
+
+    Usage:
+        with refresh_scope():
+            coverage = get_pipeline_coverage()
+            details = get_pipeline_details()  # served from the memo
+    """
+    if _refresh_memo.get() is not None:
+        yield
+        return
+
+    token = _refresh_memo.set({})
+    try:
+        yield
+    finally:
+        _refresh_memo.reset(token)
+
+
+def refresh_memoized(fn: Callable) -> Callable:
+    """Memoize a metric function within the active refresh_scope().
+
+    The memo key is the function name plus its fully bound arguments
+    (defaults applied), so get_nrr() and get_nrr(fiscal_year=2026) share an
+    entry. Exceptions are memoized too, so a failing query is not retried
+    by every caller within the same refresh.
+
+    Results are shared between callers and must be treated as read-only.
+    """
+    signature = inspect.signature(fn)
+
+    @functools.wraps(fn)
+    def wrapper(*args, **kwargs):
+        memo = _refresh_memo.get()
+        if memo is None:
+            return fn(*args, **kwargs)
+
+        bound = signature.bind(*args, **kwargs)
+        bound.apply_defaults()
+        key = (fn.__qualname__, tuple(bound.arguments.items()))
+
+        with _refresh_memo_lock:
+            future = memo.get(key)
+            is_owner = future is None
+            if is_owner:
+                future = Future()
+                memo[key] = future
+
+        if not is_owner:
+            return future.result()
+
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        future.set_result(result)
+        return result
+
+    return wrapper
+
+
+# =============================================================================
+# QUERY PERIOD HELPERS
+# =============================================================================
+
+def fiscal_year_bounds(first_year: int, last_year: Optional[int] = None) -> Tuple[date, date]:
+    """Return half-open [start, end) dates covering whole fiscal years.
+
+    Args:
+        first_year: First fiscal year in the period
+        last_year: Last fiscal year in the period (default: first_year)
+
+    Returns:
+        Tuple of (Jan 1 of first_year, Jan 1 of the year after last_year)
+    """
+    last_year = first_year if last_year is None else last_year
+    return date(first_year, 1, 1), date(last_year + 1, 1, 1)
+
+
+def quarter_bounds(fiscal_year: int, quarter: int) -> Tuple[date, date]:
+    """Return half-open [start, end) dates for a calendar quarter (1-4)."""
+    start = date(fiscal_year, (quarter - 1) * 3 + 1, 1)
+    if quarter == 4:
+        return start, date(fiscal_year + 1, 1, 1)
+    return start, date(fiscal_year, quarter * 3 + 1, 1)
+
+
+def period_params(
+    start: date,
+    end: Optional[date] = None,
+    column_type: str = "DATE",
+    name: str = "period"
+) -> List["bigquery.ScalarQueryParameter"]:
+    """Build @<name>_start / @<name>_end parameters for a half-open range.
+
+    Filtering with `col >= @period_start AND col < @period_end` keeps the
+    predicate on the raw column, so BigQuery can prune partitions and
+    clustered blocks. `EXTRACT(YEAR FROM col) = year` wraps the column in a
+    function and forces a scan of the table's full history.
+
+    Args:
+        start: Inclusive lower bound
+        end: Exclusive upper bound (omitted for open-ended ranges)
+        column_type: "DATE" for QBO dates, "TIMESTAMP" for HubSpot dates
+        name: Parameter name prefix
+
+    Returns:
+        List of ScalarQueryParameter for use in QueryJobConfig
+    """
+    def to_param_value(value: date):
+        if column_type == "TIMESTAMP":
+            return datetime(value.year, value.month, value.day, tzinfo=timezone.utc)
+        return value
+
+    params = [bigquery.ScalarQueryParameter(f"{name}_start", column_type, to_param_value(start))]
+    if end is not None:
+        params.append(bigquery.ScalarQueryParameter(f"{name}_end", column_type, to_param_value(end)))
+    return params
+
+
+def dry_run_bytes(
+    query: str,
+    query_parameters: Optional[List["bigquery.ScalarQueryParameter"]] = None
+) -> Optional[int]:
+    """Estimate the bytes a query would scan, without running it.
+
+    Args:
+        query: SQL query string
+        query_parameters: Optional query parameters referenced by the SQL
+
+    Returns:
+        total_bytes_processed reported by a dry run, or None if it fails
+    """
+    try:
+        job_config = bigquery.QueryJobConfig(
+            dry_run=True,
+            use_query_cache=False,
+            query_parameters=query_parameters or [],
+        )
+        job = get_client().query(query, job_config=job_config)
+        return int(job.total_bytes_processed or 0)
+    except GoogleCloudError as e:
+        logger.error("Dry run failed: %s", e)
+        return None
+
+
+# =============================================================================
+# QUERY EXECUTION
+# =============================================================================
+
+# Every metric query is a stable template: runtime values travel as typed
+# query parameters, never as SQL text. Identical refreshes then produce
+# byte-identical jobs, which BigQuery serves from its 24-hour result cache
+# (billed at 0 bytes). CURRENT_DATE() would disable that cache, so "today"
+# is passed in as @as_of_date instead.
+
+QueryParams = List[Any]
+
+
+def int_params(**values: int) -> QueryParams:
+    """Build INT64 query parameters from keyword arguments.
+
+    Usage:
+        int_params(fiscal_year=2026, prior_year=2025)  # @fiscal_year, @prior_year
+    """
+    return [bigquery.ScalarQueryParameter(name, "INT64", int(value)) for name, value in values.items()]
+
+
+def as_of_params(as_of: Optional[date] = None) -> QueryParams:
+    """Build the @as_of_date parameter (defaults to today)."""
+    return [bigquery.ScalarQueryParameter("as_of_date", "DATE", as_of or date.today())]
+
+
+def column_year(year: int) -> int:
+    """Validate a year used to build a year-suffixed column name.
+
+    Column identifiers (e.g. Net_Revenue_2025, y2026) cannot be query
+    parameters, so they are the one place a runtime value reaches SQL text.
+    Only accept real integers in a sane range.
+
+    Raises:
+        ValueError: If year is not an int between 2000 and 2100
+    """
+    if isinstance(year, bool) or not isinstance(year, int) or not 2000 <= year <= 2100:
+        raise ValueError(f"Invalid fiscal year for column name: {year!r}")
+    return year
+
+
+def max_bytes_billed(metric: Optional[str]) -> int:
+    """Return the bytes-billed cap for a metric's queries."""
+    spec = METRICS.get(metric)
+    if spec is not None and spec.max_bytes_billed is not None:
+        return spec.max_bytes_billed
+    return MAX_BYTES_BILLED.get(metric, MAX_BYTES_BILLED_DEFAULT)
+
+
+# Batched job name -> registered metrics it runs (filled in by run_metric_batch)
+_metric_batches: Dict[str, Tuple[str, ...]] = {}
+
+
+def result_cache_ttl(metric: Optional[str]) -> int:
+    """Return the result cache TTL for a metric's queries.
+
+    A batched job (run_metric_batch) gets the smallest TTL among its
+    metrics, so batching never refreshes a metric more or less often than
+    running it on its own.
+    """
+    if metric in _metric_batches:
+        return min(result_cache_ttl(name) for name in _metric_batches[metric])
+    spec = METRICS.get(metric)
+    if spec is not None and spec.ttl is not None:
+        return spec.ttl
+    return RESULT_CACHE_TTLS.get(metric, RESULT_CACHE_DEFAULT_TTL)
+
+
+def _job_config(params: Optional[QueryParams] = None, metric: Optional[str] = None) -> "bigquery.QueryJobConfig":
+    """Build the QueryJobConfig for a parameterized metric query."""
+    return bigquery.QueryJobConfig(
+        query_parameters=list(params or []),
+        maximum_bytes_billed=max_bytes_billed(metric),
+    )
+
+
+# =============================================================================
+# DRY-RUN MODE
+# =============================================================================
+
+# Active dry-run estimates: (metric, cache key) -> estimated bytes (None if
+# the dry run failed). None outside of dry_run_scope().
+_dry_run_estimates: contextvars.ContextVar[Optional[Dict[Tuple[str, str], Optional[int]]]] = (
+    contextvars.ContextVar("bq_dry_run_estimates", default=None)
+)
+
+
+@contextmanager
+def dry_run_scope() -> Iterator[Dict[Tuple[str, str], Optional[int]]]:
+    """Dry-run every metric query issued in this context instead of running it.
+
+    Queries are estimated with a dry run (nothing is scanned or billed) and
+    return no rows, so metric functions fall through to their empty-result
+    defaults. Fan-outs copy the context, so their worker threads record into
+    the same estimates. The result cache is bypassed.
+
+    Yields:
+        Dict mapping (metric, query key) to estimated bytes processed, or
+        None for queries whose dry run failed. Filled as queries are issued.
+    """
+    estimates: Dict[Tuple[str, str], Optional[int]] = {}
+    token = _dry_run_estimates.set(estimates)
+    try:
+        yield estimates
+    finally:
+        _dry_run_estimates.reset(token)
+
+
+def _record_dry_run(query: str, params: Optional[QueryParams], metric: Optional[str]) -> bool:
+    """Record a dry-run estimate if dry-run mode is active.
+
+    Returns:
+        True if the query was dry-run and must not be executed
+    """
+    estimates = _dry_run_estimates.get()
+    if estimates is None:
+        return False
+    estimates[(metric or "adhoc", make_key(query, params))] = dry_run_bytes(query, params)
+    return True
+
+
+# =============================================================================
+# SOURCE WATERMARKS
+# =============================================================================
+
+# The warehouse only changes when Fivetran syncs. Each cached result records
+# the last-modified time of every table it reads, and is reused until one of
+# them changes. Views (App_KPI_Dashboard.*) report when their definition
+# changed, not their data, so results that read a view fall back to TTLs.
+
+_TABLE_REF_PATTERN = re.compile(r"`[\w-]+\.(\w+)\.(\w+)`")
+
+# BigQuery __TABLES__.type value for regular tables
+_TABLE_TYPE_TABLE = 1
+
+# dataset -> (checked_at, {table_id: (last_modified_time, type)})
+_table_watermarks: Dict[str, Tuple[float, Dict[str, Tuple[int, int]]]] = {}
+_table_watermarks_lock = threading.Lock()
+
+
+def source_tables(query: str) -> Tuple[str, ...]:
+    """Return the sorted "dataset.table" references in a query."""
+    return tuple(sorted({f"{dataset}.{table}" for dataset, table in _TABLE_REF_PATTERN.findall(query)}))
+
+
+def get_table_watermarks(datasets: Tuple[str, ...]) -> Dict[str, Tuple[int, int]]:
+    """Fetch last-modified times for every table in the given datasets.
+
+    Uses the __TABLES__ metadata view (no table data is scanned). Lookups
+    are reused for WATERMARK_CHECK_INTERVAL seconds, so one refresh issues
+    at most one metadata query.
+
+    Args:
+        datasets: Dataset names to inspect
+
+    Returns:
+        Dict mapping "dataset.table" to (last_modified_time ms, table type)
+
+    Raises:
+        GoogleCloudError: If the metadata query fails
+    """
+    now = time.monotonic()
+    with _table_watermarks_lock:
+        stale = [
+            d for d in datasets
+            if d not in _table_watermarks or now - _table_watermarks[d][0] > WATERMARK_CHECK_INTERVAL
+        ]
+
+    if stale:
+        query = "\nUNION ALL\n".join(
+            f"SELECT '{dataset}' AS dataset_id, table_id, last_modified_time, type "
+            f"FROM `{PROJECT_ID}.{dataset}.__TABLES__`"
+            for dataset in stale
+        )
+        fetched: Dict[str, Dict[str, Tuple[int, int]]] = {d: {} for d in stale}
+        for row in bigquery_breaker.call(lambda: list(get_client().query(query).result())):
+            fetched[row.dataset_id][row.table_id] = (int(row.last_modified_time), int(row.type))
+        with _table_watermarks_lock:
+            for dataset, tables in fetched.items():
+                _table_watermarks[dataset] = (now, tables)
+
+    with _table_watermarks_lock:
+        return {
+            f"{dataset}.{table}": info
+            for dataset in datasets
+            for table, info in _table_watermarks[dataset][1].items()
+        }
+
+
+def source_watermark(query: str) -> Optional[str]:
+    """Fingerprint the current state of every table a query reads.
+
+    Returns:
+        Hex digest of the source tables' last-modified times, or None if the
+        query reads a view or unknown table, or the lookup fails (callers
+        then fall back to TTL-based freshness)
+    """
+    tables = source_tables(query)
+    if not tables:
+        return None
+    try:
+        watermarks = get_table_watermarks(tuple(sorted({t.split(".", 1)[0] for t in tables})))
+    except GoogleCloudError as e:
+        logger.warning("Source watermark lookup failed: %s", e)
+        return None
+
+    parts = []
+    for table in tables:
+        info = watermarks.get(table)
+        if info is None or info[1] != _TABLE_TYPE_TABLE:
+            return None
+        parts.append(f"{table}@{info[0]}")
+    return hashlib.sha256("|".join(parts).encode("utf-8")).hexdigest()
+
+
+def reset_source_watermarks() -> None:
+    """Forget cached table last-modified lookups."""
+    with _table_watermarks_lock:
+        _table_watermarks.clear()
+
+
+def _through_result_cache(
+    query: str,
+    params: Optional[QueryParams],
+    metric: Optional[str],
+    fetch: Callable[[], Any],
+    to_cacheable: Callable[[Any], Any] = lambda value: value
+) -> Any:
+    """Serve a query from the on-disk result cache, running fetch() on a miss.
+
+    A cached result is reused while its source tables are unchanged (see
+    source_watermark()); otherwise its metric TTL applies. Failed queries
+    raise before anything is stored, so errors are never cached.
+    """
+    cache = get_result_cache()
+    if cache is None:
+        return fetch()
+
+    started = time.perf_counter()
+    key = make_key(query, params)
+    # Read before fetching: a sync that lands mid-query leaves an older
+    # watermark on the entry, so the next refresh re-runs it
+    watermark = source_watermark(query)
+    cached = cache.get(key, watermark=watermark)
+    if cached is not MISS:
+        logger.debug("Result cache hit: %s", metric or key[:12])
+        record_query(
+            metric, time.perf_counter() - started,
+            rows=len(cached) if hasattr(cached, "__len__") else None,
+            cache_hit=True, source=SOURCE_RESULT_CACHE,
+        )
+        return cached
+
+    value = to_cacheable(fetch())
+    cache.set(
+        key, value,
+        ttl=result_cache_ttl(metric),
+        metric=metric,
+        watermark=watermark,
+    )
+    return value
+
+
+def _run_job(query: str, params: Optional[QueryParams], metric: Optional[str], consume: Callable[[Any], T]) -> T:
+    """Submit one metric job, consume its result and record its telemetry.
+
+    Args:
+        query: SQL template
+        params: Query parameters
+        metric: Metric name (telemetry key and bytes-billed cap)
+        consume: Turns the QueryJob into the result (rows or DataFrame)
+
+    Raises:
+        GoogleCloudError: If the query fails
+    """
+    started = time.perf_counter()
+    try:
+        job = get_client().query(query, job_config=_job_config(params, metric))
+        result = consume(job)
+    except Exception as e:
+        record_query(metric, time.perf_counter() - started, error=str(e))
+        raise
+    record_query(
+        metric, time.perf_counter() - started,
+        rows=len(result),
+        bytes_processed=getattr(job, "total_bytes_processed", None),
+        slot_millis=getattr(job, "slot_millis", None),
+        cache_hit=getattr(job, "cache_hit", None),
+    )
+    return result
+
+
+def hedging_enabled() -> bool:
+    """True when slow metric jobs should be hedged with a duplicate job."""
+    return os.environ.get(HEDGE_QUERIES_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def _hedge_delay(metric: Optional[str]) -> Optional[float]:
+    """Seconds to wait before hedging a metric's job (None = do not hedge)."""
+    if metric is None or not hedging_enabled():
+        return None
+    p95 = latency_percentile(metric, 95, min_samples=HEDGE_MIN_SAMPLES)
+    return None if p95 is None else max(p95, HEDGE_MIN_DELAY)
+
+
+def _run_hedged(query: str, params: Optional[QueryParams], metric: Optional[str], consume: Callable[[Any], T]) -> T:
+    """Run a metric job, hedging it with a duplicate once it outlives its p95.
+
+    Without hedging (disabled, or too few recorded jobs for a p95) this is
+    just _run_job(). Otherwise a job still running at the metric's p95 gets
+    a duplicate, and the first one to succeed wins. The slower job is left
+    to finish in the background: cancelling would not refund the work it
+    already did, and its latency still feeds the p95.
+
+    Raises:
+        GoogleCloudError: If every job fails (the first job's error)
+    """
+    delay = _hedge_delay(metric)
+    if delay is None:
+        return _run_job(query, params, metric, consume)
+
+    pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix="bq-hedge")
+    try:
+        primary = pool.submit(_run_job, query, params, metric, consume)
+        done, _ = wait([primary], timeout=delay)
+        if done:
+            return primary.result()
+
+        logger.info("Hedging %s: no result after %.1fs (p95), issuing a duplicate job", metric, delay)
+        pending = {primary, pool.submit(_run_job, query, params, metric, consume)}
+        while pending:
+            done, pending = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                if future.exception() is None:
+                    return future.result()
+        return primary.result()
+    finally:
+        pool.shutdown(wait=False)
+
+
+def _execute(query: str, params: Optional[QueryParams] = None, metric: Optional[str] = None) -> List[Any]:
+    """Run a parameterized query and return all result rows.
+
+    Args:
+        query: Stable SQL template referencing @parameters
+        params: Query parameters for the template
+        metric: Metric name, selects the result cache TTL
+
+    Returns:
+        List of result rows (empty in dry-run mode)
+
+    Raises:
+        GoogleCloudError: If the query fails
+    """
+    if _record_dry_run(query, params, metric):
+        return []
+    return _through_result_cache(
+        query, params, metric,
+        lambda: call_bigquery(
+            lambda: _run_hedged(query, params, metric, lambda job: list(job.result())), metric
+        ),
+        to_cached_rows,
+    )
+
+
+def _execute_records(
+    query: str,
+    params: Optional[QueryParams] = None,
+    metric: Optional[str] = None,
+    columns: Optional[Dict[str, Any]] = None
+) -> List[Dict[str, Any]]:
+    """Run a parameterized query and return its rows as typed dicts.
+
+    Rows are decoded column-wise from the job's result schema (see
+    data/row_decoder.py), so NUMERIC values arrive as floats and the
+    fetcher does no per-field coercion.
+
+    Args:
+        query: Stable SQL template referencing @parameters
+        params: Query parameters for the template
+        metric: Metric name, selects the result cache TTL
+        columns: Column name -> value used where the column is NULL. When
+            given, each dict holds exactly these columns.
+
+    Returns:
+        List of row dicts (empty in dry-run mode)
+
+    Raises:
+        GoogleCloudError: If the query fails
+    """
+    if _record_dry_run(query, params, metric):
+        return []
+    rows = _through_result_cache(
+        query, params, metric,
+        lambda: call_bigquery(
+            lambda: _run_hedged(query, params, metric, lambda job: decode_result(job.result())), metric
+        ),
+    )
+    return rows if columns is None else select_columns(rows, columns)
+
+
+# Drill-down views are wide SELECT * results. The BigQuery Storage Read API
+# streams them as Arrow record batches straight into a DataFrame, which is
+# much faster than paging JSON rows over REST. Falls back to REST when the
+# google-cloud-bigquery-storage package is missing or the service account
+# lacks bigquery.readsessions.create.
+_bqstorage_disabled = False
+
+
+def _download_frame(job: Any) -> "pd.DataFrame":
+    """Download a finished query's rows as a DataFrame, via Arrow when possible."""
+    global _bqstorage_disabled
+    if not _bqstorage_disabled:
+        try:
+            return job.to_dataframe(create_bqstorage_client=True)
+        except (ImportError, GoogleCloudError) as e:
+            if isinstance(e, GoogleCloudError) and getattr(e, "code", None) != 403:
+                raise
+            logger.warning("BigQuery Storage Read API unavailable, using REST downloads: %s", e)
+            _bqstorage_disabled = True
+    return job.to_dataframe(create_bqstorage_client=False)
+
+
+def _frame_records(df: Optional["pd.DataFrame"]) -> List[Dict[str, Any]]:
+    """Convert a fetcher's DataFrame (None on failure) to a list of row dicts."""
+    return [] if df is None else df.to_dict('records')
+
+
+def _execute_dataframe(query: str, params: Optional[QueryParams] = None, metric: Optional[str] = None):
+    """Run a parameterized query and return the result as a DataFrame.
+
+    Raises:
+        GoogleCloudError: If the query fails
+    """
+    if _record_dry_run(query, params, metric):
+        import pandas as pd  # the real path gets pandas through to_dataframe()
+        return pd.DataFrame()
+    return _through_result_cache(
+        query, params, metric,
+        lambda: call_bigquery(
+            lambda: _run_hedged(query, params, metric, _download_frame), metric
+        ),
+    )
+
+
+# =============================================================================
+# METRIC REGISTRY ENGINE
+# =============================================================================
+
+def metric_sql(name: str) -> str:
+    """Return the SQL template of a registered metric.
+
+    {PROJECT_ID} and {DATASET} placeholders in the file are filled in;
+    runtime values stay @parameters.
+
+    Raises:
+        KeyError: If the metric is not registered
+        FileNotFoundError: If its SQL file is missing
+    """
+    return _metric_template(name).sql
+
+
+def _metric_template(name: str) -> SqlTemplate:
+    spec = METRICS[name]
+    template = get_query_loader().get(spec.sql_file)
+    if template is None:
+        raise FileNotFoundError(QUERIES_DIR / spec.sql_file)
+    return template
+
+
+def metric_params(name: str, fiscal_year: int = FISCAL_YEAR) -> QueryParams:
+    """Build the query parameters a registered metric declares.
+
+    Raises:
+        QueryTemplateError: If the declared parameters are not exactly the
+            @parameters its SQL file uses
+    """
+    builders: Dict[str, Callable[[], QueryParams]] = {
+        PARAM_AS_OF: as_of_params,
+        PARAM_FISCAL_YEAR_DATES: lambda: period_params(*fiscal_year_bounds(fiscal_year)),
+        PARAM_FISCAL_YEAR_TIMESTAMPS: lambda: period_params(
+            *fiscal_year_bounds(fiscal_year), column_type="TIMESTAMP"
+        ),
+    }
+    params: QueryParams = []
+    for param_set in METRICS[name].params:
+        params += builders[param_set]()
+    return _metric_template(name).bind(params)
+
+
+@refresh_memoized
+def run_metric(name: str, fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
+    """Execute a registered metric and decode its result row.
+
+    Args:
+        name: Registered metric name
+        fiscal_year: Fiscal year, for metrics that bind one
+
+    Returns:
+        The metric's decoded dict, or empty dict if the query fails or
+        returns no row
+    """
+    try:
+        result = _execute(metric_sql(name), metric_params(name, fiscal_year), metric=name)
+    except GoogleCloudError as e:
+        logger.error("Failed to fetch %s: %s", name, e)
+        return {}
+    return METRICS[name].decode(result[0]) if result else {}
+
+
+@refresh_memoized
+def run_metric_batch(
+    names: Tuple[str, ...],
+    fiscal_year: int = FISCAL_YEAR,
+    metric: str = "metric_batch"
+) -> Dict[str, Dict[str, Any]]:
+    """Execute several registered metrics as one BigQuery job.
+
+    Each metric's query becomes a STRUCT column of a single SELECT, so a
+    page pays for one round trip instead of one per metric. A metric whose
+    query returns no row decodes to an empty dict, as it would on its own.
+
+    Args:
+        names: Registered metric names (tuple so it can be memoized)
+        fiscal_year: Fiscal year, for metrics that bind one
+        metric: Telemetry and result cache name for the combined job
+
+    Returns:
+        Dict mapping each name to its decoded dict, or empty dict on error
+
+    Raises:
+        ValueError: If two metrics bind the same @parameter to different values
+    """
+    params: Dict[str, Any] = {}
+    for name in names:
+        for param in metric_params(name, fiscal_year):
+            bound = params.setdefault(param.name, param)
+            if (bound.type_, bound.value) != (param.type_, param.value):
+                raise ValueError(f"{name} binds @{param.name} differently from the rest of the batch")
+
+    _metric_batches[metric] = names
+    columns = ",\n".join(f"(SELECT AS STRUCT * FROM (\n{metric_sql(name)})) AS {name}" for name in names)
+    try:
+        result = _execute(f"SELECT\n{columns}", list(params.values()), metric=metric)
+    except GoogleCloudError as e:
+        logger.error("Failed to fetch %s: %s", metric, e)
+        return {}
+    if not result:
+        return {}
+
+    row = result[0]
+    batch = {}
+    for name in names:
+        value = getattr(row, name)
+        batch[name] = METRICS[name].decode(CachedRow(value)) if value is not None else {}
+    return batch
+
+
+# =============================================================================
+# COMPANY METRICS (Overview Page)
+# =============================================================================
+
+# Minimum current-year GMV before take rate is trusted over the prior year
+_TAKE_RATE_MIN_GMV = 100_000
+
+
+def _ledger_years(fiscal_year: int) -> Tuple[int, ...]:
+    """Return the fiscal years covered by one ledger scan.
+
+    The window always spans FISCAL_YEAR - 2 through FISCAL_YEAR (widened if
+    an older year is requested), so the current year, its take-rate fallback
+    year and the YoY prior year all resolve to the same scan and the same
+    refresh_scope() memo entry.
+    """
+    first_year = min(fiscal_year - 1, FISCAL_YEAR - 2)
+    last_year = max(fiscal_year, FISCAL_YEAR)
+    return tuple(range(first_year, last_year + 1))
+
+
+def aggregates_enabled() -> bool:
+    """Return True if metrics should read the pre-built aggregate tables."""
+    return os.environ.get(USE_AGGREGATES_ENV, "").strip().lower() in ("1", "true", "yes")
+
+
+def qbo_ledger_monthly_sql() -> str:
+    """Ledger amounts by month, source document and 4110-4299 account.
+
+    Covers transactions in [@period_start, @period_end). Also the source
+    query of the agg_qbo_ledger_monthly table.
+    """
+    return f"""
+    WITH ledger_lines AS (
+        SELECT DATE_TRUNC(i.transaction_date, MONTH) as month, 'invoice' as source,
+            SAFE_CAST(a.account_number AS INT64) as acct_num, il.amount
         FROM `{PROJECT_ID}.src_fivetran_qbo.invoice_line` il
         JOIN `{PROJECT_ID}.src_fivetran_qbo.invoice` i ON il.invoice_id = i.id
         JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON il.sales_item_account_id = a.id
-        WHERE EXTRACT(YEAR FROM i.transaction_date) = {fiscal_year}
-          AND SAFE_CAST(a.account_number AS INT64) BETWEEN 4110 AND 4169
-          AND i._fivetran_deleted = FALSE
-    ),
-    credit_memos AS (
-        -- Credit memos reduce GMV
-        SELECT COALESCE(SUM(cl.amount), 0) as amount
+        WHERE i.transaction_date >= @period_start AND i.transaction_date < @period_end
+            AND i._fivetran_deleted = FALSE
+        UNION ALL
+        SELECT DATE_TRUNC(cm.transaction_date, MONTH), 'credit_memo',
+            SAFE_CAST(a.account_number AS INT64), cl.amount
         FROM `{PROJECT_ID}.src_fivetran_qbo.credit_memo_line` cl
         JOIN `{PROJECT_ID}.src_fivetran_qbo.credit_memo` cm ON cl.credit_memo_id = cm.id
         JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON cl.sales_item_account_id = a.id
-        WHERE EXTRACT(YEAR FROM cm.transaction_date) = {fiscal_year}
-          AND SAFE_CAST(a.account_number AS INT64) BETWEEN 4110 AND 4169
-          AND cm._fivetran_deleted = FALSE
-    ),
-    discounts AS (
-        -- Discounts (4190) - typically negative amounts
-        SELECT COALESCE(SUM(il.amount), 0) as amount
-        FROM `{PROJECT_ID}.src_fivetran_qbo.invoice_line` il
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.invoice` i ON il.invoice_id = i.id
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON il.sales_item_account_id = a.id
-        WHERE EXTRACT(YEAR FROM i.transaction_date) = {fiscal_year}
-          AND a.account_number = '4190'
-          AND i._fivetran_deleted = FALSE
-    ),
-    payouts AS (
-        -- Payouts to organizers (bills 4200-4299)
-        SELECT COALESCE(SUM(bl.amount), 0) as amount
+        WHERE cm.transaction_date >= @period_start AND cm.transaction_date < @period_end
+            AND cm._fivetran_deleted = FALSE
+        UNION ALL
+        SELECT DATE_TRUNC(b.transaction_date, MONTH), 'bill',
+            SAFE_CAST(a.account_number AS INT64), bl.amount
         FROM `{PROJECT_ID}.src_fivetran_qbo.bill_line` bl
         JOIN `{PROJECT_ID}.src_fivetran_qbo.bill` b ON bl.bill_id = b.id
         JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON bl.account_expense_account_id = a.id
-        WHERE EXTRACT(YEAR FROM b.transaction_date) = {fiscal_year}
-          AND SAFE_CAST(a.account_number AS INT64) BETWEEN 4200 AND 4299
-          AND b._fivetran_deleted = FALSE
-    ),
-    vendor_credits AS (
-        -- Vendor credits reduce payouts
-        SELECT COALESCE(SUM(vcl.amount), 0) as amount
+        WHERE b.transaction_date >= @period_start AND b.transaction_date < @period_end
+            AND b._fivetran_deleted = FALSE
+            AND SAFE_CAST(a.account_number AS INT64) BETWEEN 4200 AND 4299
+        UNION ALL
+        SELECT DATE_TRUNC(vc.transaction_date, MONTH), 'vendor_credit',
+            SAFE_CAST(a.account_number AS INT64), vcl.amount
         FROM `{PROJECT_ID}.src_fivetran_qbo.vendor_credit_line` vcl
         JOIN `{PROJECT_ID}.src_fivetran_qbo.vendor_credit` vc ON vcl.vendor_credit_id = vc.id
         JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON vcl.account_expense_account_id = a.id
-        WHERE EXTRACT(YEAR FROM vc.transaction_date) = {fiscal_year}
-          AND SAFE_CAST(a.account_number AS INT64) BETWEEN 4200 AND 4299
-          AND vc._fivetran_deleted = FALSE
+        WHERE vc.transaction_date >= @period_start AND vc.transaction_date < @period_end
+            AND vc._fivetran_deleted = FALSE
+            AND SAFE_CAST(a.account_number AS INT64) BETWEEN 4200 AND 4299
     )
+    SELECT month, source, acct_num, SUM(amount) as amount
+    FROM ledger_lines
+    WHERE acct_num BETWEEN 4110 AND 4299
+    GROUP BY 1, 2, 3
+    """
+
+
+@refresh_memoized
+def get_qbo_ledger(years: Tuple[int, ...]) -> Optional[Dict[int, Dict[str, float]]]:
+    """Fetch QuickBooks revenue ledger totals for several fiscal years in one scan.
+
+    Joins invoice, credit memo, bill and vendor credit lines to the chart of
+    accounts once, grouped by fiscal year, source document and account bucket:
+
+    - gmv: 4110-4169 (Sampling, Sponsorship, Activation GMV)
+    - discount: 4190 (typically negative)
+    - payout: 4200-4299 (Organizer fees / payouts)
+    - other: remaining 4110-4299 accounts (count toward take rate only)
+
+    Bills and vendor credits are limited to payout accounts. With
+    KPI_USE_AGGREGATES set, reads the monthly totals from the
+    agg_qbo_ledger_monthly table instead of the raw lines.
+
+    Args:
+        years: Fiscal years to include (tuple so it can be memoized)
+
+    Returns:
+        Dict keyed by fiscal year, each mapping "<source>_<bucket>" (e.g.
+        "invoice_gmv", "bill_payout") to its summed amount. Years with no
+        activity map to an empty dict. None if the query fails.
+    """
+    if aggregates_enabled():
+        monthly = f"`{PROJECT_ID}.{DATASET}.{AGG_QBO_LEDGER_MONTHLY}`"
+    else:
+        monthly = f"({qbo_ledger_monthly_sql()})"
+    query = f"""
     SELECT
-        g.amount - c.amount + d.amount - p.amount + v.amount as net_revenue
-    FROM gmv_invoices g, credit_memos c, discounts d, payouts p, vendor_credits v
+        EXTRACT(YEAR FROM month) as fiscal_year,
+        source,
+        CASE
+            WHEN acct_num BETWEEN 4110 AND 4169 THEN 'gmv'
+            WHEN acct_num = 4190 THEN 'discount'
+            WHEN acct_num BETWEEN 4200 AND 4299 THEN 'payout'
+            ELSE 'other'
+        END as bucket,
+        SUM(amount) as amount
+    FROM {monthly}
+    WHERE month >= @period_start AND month < @period_end
+    GROUP BY 1, 2, 3
+    """
+    try:
+        result = _execute(
+            query,
+            period_params(*fiscal_year_bounds(min(years), max(years))),
+            metric="qbo_ledger",
+        )
+
+        ledger: Dict[int, Dict[str, float]] = {year: {} for year in years}
+        for row in result:
+            year = int(row.fiscal_year)
+            if year in ledger:
+                ledger[year][f"{row.source}_{row.bucket}"] = float(row.amount or 0)
+        return ledger
+    except GoogleCloudError as e:
+        logger.error("Failed to fetch QBO ledger: %s", e)
+        return None
+
+
+def _summarize_ledger_year(buckets: Dict[str, float]) -> Dict[str, Any]:
+    """Derive GMV, net revenue and take rate from one year's ledger buckets."""
+    def total(source: str) -> float:
+        return sum(v for k, v in buckets.items() if k.startswith(f"{source}_"))
+
+    gmv = buckets.get("invoice_gmv", 0.0) - buckets.get("credit_memo_gmv", 0.0)
+    payouts = buckets.get("bill_payout", 0.0) - buckets.get("vendor_credit_payout", 0.0)
+    net_revenue = gmv + buckets.get("invoice_discount", 0.0) - payouts
+    marketplace_revenue = total("invoice") - total("credit_memo") - payouts
+
+    return {
+        "gmv": gmv,
+        "net_revenue": net_revenue,
+        "take_rate": marketplace_revenue / gmv if gmv else None,
+    }
+
+
+def get_ledger_summary(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
+    """Fetch GMV, net revenue and take rate for a fiscal year.
+
+    Served from the shared multi-year ledger scan (get_qbo_ledger), so
+    revenue, take rate, the low-GMV fallback and prior-year comparisons
+    requested within one refresh_scope() cost a single BigQuery job.
+
+    Returns:
+        Dict with gmv, net_revenue, take_rate, or empty dict if query fails
+    """
+    ledger = get_qbo_ledger(_ledger_years(fiscal_year))
+    if ledger is None:
+        return {}
+    return _summarize_ledger_year(ledger.get(fiscal_year, {}))
+
+
+def get_revenue_ytd(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
+    """Fetch YTD Net Revenue (Take) from QuickBooks.
+
+    Net Revenue = What Recess keeps after paying organizers.
+
+    Formula:
+        GMV (invoices 4110-4169)
+        - Credit Memos (same accounts)
+        + Discounts (4190, typically negative)
+        - Payouts to organizers (bills 4200-4299)
+        + Vendor Credits (same 4200-4299 accounts)
+
+    2025 Reference: $3,890,004 (Take Rate: 49.1%)
+
+    Returns:
+        Net revenue YTD or None if query fails
     """
-    try:
-        client = get_client()
-        result = list(client.query(query).result())
-        if result and result[0].net_revenue is not None:
-            return float(result[0].net_revenue)
-        return None
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch revenue YTD: %s", e)
-        return None
+    return get_ledger_summary(fiscal_year).get("net_revenue")
 
 
 def get_take_rate(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
@@ -175,88 +1276,33 @@ def get_take_rate(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
     - Vendor Credits: Reduce Organizer Fees
 
     For current fiscal year with limited data, falls back to prior complete year.
+    Both years come from the same ledger scan, so the fallback costs no extra job.
 
     2025 Reference: 49.3% (GMV: $7.92M, Revenue: $3.90M)
 
     Returns:
         Take rate as decimal (e.g., 0.49 for 49%) or None if query fails
     """
-    prior_year = fiscal_year - 1
-
-    query = f"""
-    WITH invoice_revenue AS (
-        SELECT SAFE_CAST(a.account_number AS INT64) as acct_num, SUM(il.amount) as amount
-        FROM `{PROJECT_ID}.src_fivetran_qbo.invoice_line` il
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.invoice` i ON il.invoice_id = i.id
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON il.sales_item_account_id = a.id
-        WHERE EXTRACT(YEAR FROM i.transaction_date) = @year AND i._fivetran_deleted = FALSE
-        GROUP BY 1
-    ),
-    credit_memos AS (
-        SELECT SAFE_CAST(a.account_number AS INT64) as acct_num, -SUM(cl.amount) as amount
-        FROM `{PROJECT_ID}.src_fivetran_qbo.credit_memo_line` cl
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.credit_memo` cm ON cl.credit_memo_id = cm.id
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON cl.sales_item_account_id = a.id
-        WHERE EXTRACT(YEAR FROM cm.transaction_date) = @year AND cm._fivetran_deleted = FALSE
-        GROUP BY 1
-    ),
-    bills AS (
-        SELECT SAFE_CAST(a.account_number AS INT64) as acct_num, -SUM(bl.amount) as amount
-        FROM `{PROJECT_ID}.src_fivetran_qbo.bill_line` bl
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.bill` b ON bl.bill_id = b.id
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON bl.account_expense_account_id = a.id
-        WHERE EXTRACT(YEAR FROM b.transaction_date) = @year AND b._fivetran_deleted = FALSE
-            AND SAFE_CAST(a.account_number AS INT64) BETWEEN 4200 AND 4299
-        GROUP BY 1
-    ),
-    vendor_credits AS (
-        SELECT SAFE_CAST(a.account_number AS INT64) as acct_num, SUM(vcl.amount) as amount
-        FROM `{PROJECT_ID}.src_fivetran_qbo.vendor_credit_line` vcl
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.vendor_credit` vc ON vcl.vendor_credit_id = vc.id
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON vcl.account_expense_account_id = a.id
-        WHERE EXTRACT(YEAR FROM vc.transaction_date) = @year AND vc._fivetran_deleted = FALSE
-            AND SAFE_CAST(a.account_number AS INT64) BETWEEN 4200 AND 4299
-        GROUP BY 1
-    ),
-    all_income AS (
-        SELECT * FROM invoice_revenue UNION ALL SELECT * FROM credit_memos
-        UNION ALL SELECT * FROM bills UNION ALL SELECT * FROM vendor_credits
-    )
-    SELECT
-        SAFE_DIVIDE(
-            SUM(CASE WHEN acct_num BETWEEN 4110 AND 4299 THEN amount ELSE 0 END),
-            SUM(CASE WHEN acct_num BETWEEN 4110 AND 4169 THEN amount ELSE 0 END)
-        ) as take_rate,
-        SUM(CASE WHEN acct_num BETWEEN 4110 AND 4169 THEN amount ELSE 0 END) as gmv
-    FROM all_income
-    """
-
-    try:
-        client = get_client()
+    ledger = get_qbo_ledger(_ledger_years(fiscal_year))
+    if ledger is None:
+        return None
 
-        # Try current fiscal year first
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[bigquery.ScalarQueryParameter("year", "INT64", fiscal_year)]
-        )
-        result = list(client.query(query, job_config=job_config).result())
+    # If GMV < $100K, fall back to prior year
+    current = _summarize_ledger_year(ledger.get(fiscal_year, {}))
+    if current["gmv"] > _TAKE_RATE_MIN_GMV and current["take_rate"] is not None:
+        return current["take_rate"]
 
-        # If GMV < $100K, fall back to prior year
-        if result and result[0].gmv and result[0].gmv > 100000:
-            if result[0].take_rate is not None:
-                return float(result[0].take_rate)
+    return _summarize_ledger_year(ledger.get(fiscal_year - 1, {}))["take_rate"]
 
-        # Fall back to prior year
-        job_config = bigquery.QueryJobConfig(
-            query_parameters=[bigquery.ScalarQueryParameter("year", "INT64", prior_year)]
-        )
-        result = list(client.query(query, job_config=job_config).result())
-        if result and result[0].take_rate is not None:
-            return float(result[0].take_rate)
 
-        return None
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch take rate: %s", e)
-        return None
+# Metric pack behind the COO/Ops and Accounting pages (see get_coo_metrics_batch)
+COO_METRICS_PACK = (
+    "invoice_collection_rate",
+    "overdue_invoices",
+    "avg_days_to_collection",
+    "working_capital",
+    "months_of_runway",
+)
 
 
 def get_invoice_collection_rate(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
@@ -265,35 +1311,12 @@ def get_invoice_collection_rate(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any
     Formula: Paid Invoices / Total Due Invoices
     Where: paid = balance = 0, due = due_date <= today
 
-    Query: queries/coo-ops/invoice-collection-rate.sql
+    Query: data/queries/metrics/invoice_collection_rate.sql
 
     Returns:
         Dict with collection_rate, paid_count, total_count, or empty dict on error
     """
-    query = f"""
-    SELECT
-        COUNTIF(balance = 0) AS paid_invoices,
-        COUNT(*) AS total_due_invoices,
-        SAFE_DIVIDE(COUNTIF(balance = 0), COUNT(*)) AS collection_rate_pct
-    FROM `{PROJECT_ID}.src_fivetran_qbo.invoice`
-    WHERE due_date <= CURRENT_DATE()
-      AND _fivetran_deleted = FALSE
-      AND EXTRACT(YEAR FROM transaction_date) = {fiscal_year}
-    """
-    try:
-        client = get_client()
-        result = list(client.query(query).result())
-        if result:
-            row = result[0]
-            return {
-                "collection_rate": float(row.collection_rate_pct) if row.collection_rate_pct else 0,
-                "paid_count": int(row.paid_invoices) if row.paid_invoices else 0,
-                "total_count": int(row.total_due_invoices) if row.total_due_invoices else 0,
-            }
-        return {}
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch invoice collection rate: %s", e)
-        return {}
+    return run_metric("invoice_collection_rate", fiscal_year)
 
 
 def get_overdue_invoices() -> Dict[str, Any]:
@@ -302,82 +1325,23 @@ def get_overdue_invoices() -> Dict[str, Any]:
     Formula: Invoices where balance > 0 AND due_date < today
     Target: 0
 
-    Query: queries/coo-ops/overdue-invoices.sql
+    Query: data/queries/metrics/overdue_invoices.sql
 
     Returns:
         Dict with count, amount, or empty dict on error
     """
-    query = f"""
-    SELECT
-        COUNT(*) AS overdue_count,
-        COALESCE(SUM(balance), 0) AS overdue_amount
-    FROM `{PROJECT_ID}.src_fivetran_qbo.invoice`
-    WHERE balance > 0
-      AND due_date < CURRENT_DATE()
-      AND _fivetran_deleted = FALSE
-    """
-    try:
-        client = get_client()
-        result = list(client.query(query).result())
-        if result:
-            row = result[0]
-            return {
-                "count": int(row.overdue_count) if row.overdue_count else 0,
-                "amount": float(row.overdue_amount) if row.overdue_amount else 0,
-            }
-        return {}
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch overdue invoices: %s", e)
-        return {}
+    return run_metric("overdue_invoices")
 
 
 def get_avg_days_to_collection(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
     """Fetch average invoice collection time (days to collect).
 
-    Query: queries/coo-ops/avg-invoice-collection-time.sql
+    Query: data/queries/metrics/avg_days_to_collection.sql
 
     Returns:
         Dict with avg_days_to_collect, median_days_to_collect, invoice_count
     """
-    query = f"""
-    WITH paid_invoices AS (
-        SELECT
-            inv.id AS invoice_id,
-            inv.transaction_date AS invoice_created,
-            inv.due_date,
-            pmt.transaction_date AS payment_date,
-            EXTRACT(YEAR FROM inv.due_date) AS due_date_year,
-            DATE_DIFF(pmt.transaction_date, inv.transaction_date, DAY) AS days_to_collect
-        FROM `{PROJECT_ID}.src_fivetran_qbo.invoice` inv
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.payment_line` pl
-            ON inv.id = pl.invoice_id
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.payment` pmt
-            ON pl.payment_id = pmt.id
-        WHERE inv._fivetran_deleted = FALSE
-          AND pmt._fivetran_deleted = FALSE
-          AND inv.balance = 0
-          AND EXTRACT(YEAR FROM inv.due_date) = {fiscal_year}
-    )
-    SELECT
-        COUNT(*) AS invoices_paid,
-        ROUND(AVG(days_to_collect), 1) AS avg_days_to_collect,
-        ROUND(APPROX_QUANTILES(days_to_collect, 100)[OFFSET(50)], 1) AS median_days_to_collect
-    FROM paid_invoices
-    """
-    try:
-        client = get_client()
-        result = list(client.query(query).result())
-        if result:
-            row = result[0]
-            return {
-                "avg_days_to_collect": float(row.avg_days_to_collect) if row.avg_days_to_collect else None,
-                "median_days_to_collect": float(row.median_days_to_collect) if row.median_days_to_collect else None,
-                "invoice_count": int(row.invoices_paid) if row.invoices_paid else 0,
-            }
-        return {}
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch avg days to collect: %s", e)
-        return {}
+    return run_metric("avg_days_to_collection", fiscal_year)
 
 
 def get_working_capital() -> Dict[str, Any]:
@@ -387,49 +1351,12 @@ def get_working_capital() -> Dict[str, Any]:
     Target: >$1M
     Shared: COO/Ops + CEO/Biz Dev dashboards
 
-    Query: queries/coo-ops/working-capital.sql
+    Query: data/queries/metrics/working_capital.sql
 
     Returns:
         Dict with working_capital, current_assets, current_liabilities
     """
-    query = f"""
-    WITH balance_sheet AS (
-        SELECT
-            a.classification,
-            a.account_sub_type,
-            COALESCE(SUM(jel.amount), 0) as balance
-        FROM `{PROJECT_ID}.src_fivetran_qbo.journal_entry_line` jel
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.journal_entry` je ON jel.journal_entry_id = je.id
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON jel.account_id = a.id
-        WHERE je._fivetran_deleted = FALSE
-          AND a.classification IN ('Asset', 'Liability')
-          AND a.account_sub_type IN (
-            'Bank', 'AccountsReceivable', 'OtherCurrentAsset',
-            'AccountsPayable', 'OtherCurrentLiability', 'CreditCard'
-          )
-        GROUP BY 1, 2
-    )
-    SELECT
-        SUM(CASE WHEN classification = 'Asset' THEN balance ELSE 0 END) as current_assets,
-        SUM(CASE WHEN classification = 'Liability' THEN ABS(balance) ELSE 0 END) as current_liabilities,
-        SUM(CASE WHEN classification = 'Asset' THEN balance ELSE 0 END)
-        - SUM(CASE WHEN classification = 'Liability' THEN ABS(balance) ELSE 0 END) as working_capital
-    FROM balance_sheet
-    """
-    try:
-        client = get_client()
-        result = list(client.query(query).result())
-        if result:
-            row = result[0]
-            return {
-                "working_capital": float(row.working_capital) if row.working_capital else 0,
-                "current_assets": float(row.current_assets) if row.current_assets else 0,
-                "current_liabilities": float(row.current_liabilities) if row.current_liabilities else 0,
-            }
-        return {}
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch working capital: %s", e)
-        return {}
+    return run_metric("working_capital")
 
 
 def get_months_of_runway() -> Dict[str, Any]:
@@ -439,54 +1366,28 @@ def get_months_of_runway() -> Dict[str, Any]:
     Target: >12 months
     Shared: COO/Ops + CEO/Biz Dev dashboards
 
-    Query: queries/coo-ops/months-of-runway.sql
+    Query: data/queries/metrics/months_of_runway.sql
 
     Returns:
         Dict with months, cash_balance, avg_monthly_burn
     """
-    query = f"""
-    WITH monthly_expenses AS (
-        SELECT
-            DATE_TRUNC(je.transaction_date, MONTH) as month,
-            SUM(CASE WHEN a.classification = 'Expense' THEN jel.amount ELSE 0 END) as expenses
-        FROM `{PROJECT_ID}.src_fivetran_qbo.journal_entry_line` jel
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.journal_entry` je ON jel.journal_entry_id = je.id
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON jel.account_id = a.id
-        WHERE je._fivetran_deleted = FALSE
-          AND je.transaction_date >= DATE_SUB(CURRENT_DATE(), INTERVAL 3 MONTH)
-        GROUP BY 1
-    ),
-    cash AS (
-        SELECT COALESCE(SUM(jel.amount), 0) as cash_balance
-        FROM `{PROJECT_ID}.src_fivetran_qbo.journal_entry_line` jel
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.journal_entry` je ON jel.journal_entry_id = je.id
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON jel.account_id = a.id
-        WHERE je._fivetran_deleted = FALSE
-          AND a.account_sub_type = 'Bank'
-    )
-    SELECT
-        c.cash_balance,
-        AVG(e.expenses) as avg_monthly_burn,
-        SAFE_DIVIDE(c.cash_balance, AVG(e.expenses)) as months_of_runway
-    FROM cash c, monthly_expenses e
-    GROUP BY c.cash_balance
+    return run_metric("months_of_runway")
+
+
+def get_coo_metrics_batch(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Dict[str, Any]]:
+    """Fetch the whole COO/Accounting metrics pack in one BigQuery job.
+
+    Args:
+        fiscal_year: Fiscal year for the collection rate and days to collect
+
+    Returns:
+        Dict keyed by the COO_METRICS_PACK metric names, each holding the
+        same dict its standalone function returns, or empty dict on error
     """
-    try:
-        client = get_client()
-        result = list(client.query(query).result())
-        if result:
-            row = result[0]
-            return {
-                "months": float(row.months_of_runway) if row.months_of_runway else None,
-                "cash_balance": float(row.cash_balance) if row.cash_balance else 0,
-                "avg_monthly_burn": float(row.avg_monthly_burn) if row.avg_monthly_burn else 0,
-            }
-        return {}
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch months of runway: %s", e)
-        return {}
+    return run_metric_batch(COO_METRICS_PACK, fiscal_year, metric="coo_metrics_batch")
 
 
+@refresh_memoized
 def get_nrr(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
     """Fetch Net Revenue Retention using cohort-based calculation.
 
@@ -503,6 +1404,7 @@ def get_nrr(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
     Returns:
         NRR as decimal (e.g., 1.07 for 107%) or None if query fails
     """
+    fiscal_year = column_year(fiscal_year)
     prior_year = fiscal_year - 1
 
     query = f"""
@@ -512,11 +1414,10 @@ def get_nrr(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
             SUM(CAST(y{prior_year} AS FLOAT64))
         ) as nrr
     FROM `{PROJECT_ID}.{DATASET}.cohort_retention_matrix_by_customer`
-    WHERE first_year = {prior_year}
+    WHERE first_year = @prior_year
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
+        result = _execute(query, int_params(prior_year=prior_year), metric="nrr")
         if result and result[0].nrr is not None:
             return float(result[0].nrr)
         return None
@@ -525,6 +1426,7 @@ def get_nrr(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
         return None
 
 
+@refresh_memoized
 def get_demand_nrr_details(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
     """Fetch detailed Demand NRR with both current year and prior year comparison.
 
@@ -537,6 +1439,7 @@ def get_demand_nrr_details(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
     Returns:
         Dictionary with NRR details for both periods
     """
+    fiscal_year = column_year(fiscal_year)
     prior_year = fiscal_year - 1
     prior_prior_year = fiscal_year - 2
 
@@ -547,13 +1450,16 @@ def get_demand_nrr_details(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
         SUM(CAST(y{prior_year} AS FLOAT64)) as rev_prior,
         SUM(CAST(y{fiscal_year} AS FLOAT64)) as rev_current
     FROM `{PROJECT_ID}.{DATASET}.cohort_retention_matrix_by_customer`
-    WHERE first_year IN ({prior_prior_year}, {prior_year})
+    WHERE first_year IN (@prior_prior_year, @prior_year)
     GROUP BY first_year
     ORDER BY first_year
     """
     try:
-        client = get_client()
-        results = list(client.query(query).result())
+        results = _execute(
+            query,
+            int_params(prior_prior_year=prior_prior_year, prior_year=prior_year),
+            metric="demand_nrr_details",
+        )
 
         response = {
             "current_year": {
@@ -595,32 +1501,30 @@ def get_demand_nrr_details(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
         return {}
 
 
-def get_supply_npr(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
-    """Fetch Supply Net Payout Retention (NPR) using financial-based calculation.
+# Supply NPR, its details, the supplier core action states and the yearly
+# payout summary all derive from the same QBO bills / vendor credits linked
+# to MongoDB remittances. That chain is staged once per refresh as a small
+# supplier x year table; the four metrics are computed from it in Python.
 
-    NOTE: Renamed from get_supply_nrr to get_supply_npr to clarify terminology:
-    - NPR (Net Payout Retention) = Suppliers - did they get paid more?
-    - NRR (Net Revenue Retention) = Customers - did they spend more?
+# First staged year: the yearly summary reports from 2022 and needs 2021 as
+# the baseline for its first year-over-year ratio
+SUPPLY_STAGING_START_YEAR = 2021
 
-    Uses QBO bill transaction dates (when money moved) instead of offer acceptance dates.
-    This is more accurate because:
-    - Uses actual financial transaction dates
-    - Includes vendor credits (refunds, adjustments)
-    - Handles split bills (_2, _3 suffixes) properly
-    - Links QBO bills to MongoDB remittances for supplier org attribution
+# Supplier label for payouts whose bill has no MongoDB remittance
+_UNLINKED_SUPPLIER = "Unlinked"
 
-    Formula: (Current Year Net Payouts to Prior Year Suppliers) / (Prior Year Net Payouts)
-    Net Payouts = Bills - Vendor Credits
 
-    Target: 110%
+def _supply_staging_start(fiscal_year: int) -> int:
+    """Staging start year covering a metric's two-years-back cohort."""
+    return min(SUPPLY_STAGING_START_YEAR, fiscal_year - 2)
 
-    Returns:
-        Supply NPR as decimal (e.g., 0.87 for 87%) or None if query fails
-    """
-    prior_year = fiscal_year - 1
 
-    query = f"""
-    -- Financial-based Supply NRR using QBO bills linked to MongoDB remittances
+def supply_payout_staging_sql() -> str:
+    """Supplier-year net payouts and yearly ledger totals from @period_start.
+
+    Also the source query of the agg_supplier_year_payouts table.
+    """
+    return f"""
     WITH payout_accounts AS (
         SELECT id as account_id
         FROM `{PROJECT_ID}.src_fivetran_qbo.account`
@@ -637,7 +1541,6 @@ def get_supply_npr(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
     ),
     qbo_payout_bills AS (
         SELECT
-            b.doc_number as bill_number,
             REGEXP_REPLACE(b.doc_number, r'_\\d+$', '') as base_bill_number,
             EXTRACT(YEAR FROM b.transaction_date) as txn_year,
             SUM(CAST(bl.amount AS FLOAT64)) as bill_amount
@@ -645,78 +1548,182 @@ def get_supply_npr(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
         JOIN `{PROJECT_ID}.src_fivetran_qbo.bill_line` bl ON b.id = bl.bill_id
         JOIN payout_accounts pa ON bl.account_expense_account_id = pa.account_id
         WHERE b._fivetran_deleted = FALSE
-          AND EXTRACT(YEAR FROM b.transaction_date) >= {prior_year}
-        GROUP BY b.doc_number, b.transaction_date
+          AND b.transaction_date >= @period_start
+        GROUP BY 1, 2
     ),
     qbo_payout_credits AS (
         SELECT
+            REGEXP_CONTAINS(vc.doc_number, r'(_credit|c\\d+)$') as is_bill_credit,
             REGEXP_REPLACE(vc.doc_number, r'(_credit|c\\d+)$', '') as bill_number,
-            EXTRACT(YEAR FROM vc.transaction_date) as credit_year,
+            EXTRACT(YEAR FROM vc.transaction_date) as txn_year,
             SUM(CAST(vcl.amount AS FLOAT64)) as credit_amount
         FROM `{PROJECT_ID}.src_fivetran_qbo.vendor_credit` vc
         JOIN `{PROJECT_ID}.src_fivetran_qbo.vendor_credit_line` vcl ON vc.id = vcl.vendor_credit_id
         JOIN payout_accounts pa ON vcl.account_expense_account_id = pa.account_id
         WHERE vc._fivetran_deleted = FALSE
-          AND REGEXP_CONTAINS(vc.doc_number, r'(_credit|c\\d+)$')
-          AND EXTRACT(YEAR FROM vc.transaction_date) >= {prior_year}
-        GROUP BY vc.doc_number, vc.transaction_date
+          AND vc.transaction_date >= @period_start
+        GROUP BY 1, 2, 3
     ),
-    bills_with_supplier AS (
-        SELECT
-            COALESCE(rsm.supplier_org_name, 'UNLINKED') as supplier_org_name,
-            b.txn_year,
-            b.bill_amount,
-            0.0 as credit_amount
+    supplier_transactions AS (
+        SELECT rsm.supplier_org_name, b.txn_year, b.bill_amount, 0.0 as credit_amount
         FROM qbo_payout_bills b
         LEFT JOIN remittance_supplier_map rsm ON b.base_bill_number = rsm.bill_number
-    ),
-    credits_with_supplier AS (
-        SELECT
-            COALESCE(rsm.supplier_org_name, 'UNLINKED') as supplier_org_name,
-            c.credit_year as txn_year,
-            0.0 as bill_amount,
-            c.credit_amount
+        UNION ALL
+        SELECT rsm.supplier_org_name, c.txn_year, 0.0 as bill_amount, c.credit_amount
         FROM qbo_payout_credits c
         LEFT JOIN remittance_supplier_map rsm ON c.bill_number = rsm.bill_number
+        WHERE c.is_bill_credit
     ),
-    all_transactions AS (
-        SELECT * FROM bills_with_supplier
+    ledger_transactions AS (
+        SELECT txn_year, bill_amount, 0.0 as credit_amount FROM qbo_payout_bills
         UNION ALL
-        SELECT * FROM credits_with_supplier
-    ),
-    supplier_yearly_revenue AS (
-        SELECT
-            supplier_org_name,
-            txn_year,
-            SUM(bill_amount) - SUM(credit_amount) as net_revenue
-        FROM all_transactions
-        WHERE supplier_org_name != 'UNLINKED'
-        GROUP BY supplier_org_name, txn_year
-    ),
-    supplier_pivot AS (
-        SELECT
-            supplier_org_name,
-            SUM(CASE WHEN txn_year = {prior_year} THEN net_revenue ELSE 0 END) as rev_prior,
-            SUM(CASE WHEN txn_year = {fiscal_year} THEN net_revenue ELSE 0 END) as rev_current
-        FROM supplier_yearly_revenue
-        GROUP BY supplier_org_name
+        SELECT txn_year, 0.0 as bill_amount, credit_amount FROM qbo_payout_credits
     )
     SELECT
-        SAFE_DIVIDE(
-            SUM(CASE WHEN rev_prior > 0 THEN rev_current END),
-            SUM(CASE WHEN rev_prior > 0 THEN rev_prior END)
-        ) as supply_nrr
-    FROM supplier_pivot
+        'supplier' as grain,
+        supplier_org_name,
+        txn_year,
+        SUM(bill_amount) - SUM(credit_amount) as net_payouts,
+        CAST(NULL AS FLOAT64) as gross_bills,
+        CAST(NULL AS FLOAT64) as vendor_credits
+    FROM supplier_transactions
+    GROUP BY supplier_org_name, txn_year
+    UNION ALL
+    SELECT
+        'ledger' as grain,
+        CAST(NULL AS STRING) as supplier_org_name,
+        txn_year,
+        CAST(NULL AS FLOAT64) as net_payouts,
+        SUM(bill_amount) as gross_bills,
+        SUM(credit_amount) as vendor_credits
+    FROM ledger_transactions
+    GROUP BY txn_year
+    """
+
+
+@refresh_memoized
+def get_supply_payout_staging(start_year: int = SUPPLY_STAGING_START_YEAR) -> Optional[Dict[str, Any]]:
+    """Fetch net supplier payouts by supplier org and year, plus yearly ledger totals.
+
+    Bills are attributed to a supplier org through MongoDB remittances
+    (split bills "_2", "_3" map to their base bill). Vendor credits named
+    after a bill ("_credit" / "cN" suffix) are attributed the same way.
+    Both count in the year of their QBO transaction date. With
+    KPI_USE_AGGREGATES set, reads the agg_supplier_year_payouts table
+    instead of recomputing the join.
+
+    Args:
+        start_year: First year to stage
+
+    Returns:
+        Dict with:
+        - net_payouts: {(supplier_org_name, year): bills - credits}, where
+          supplier_org_name is None for bills with no remittance
+        - ledger: {year: (gross_bills, vendor_credits)} over every payout
+          bill and vendor credit, linked or not
+        or None if the query fails
+    """
+    if aggregates_enabled():
+        staged = f"`{PROJECT_ID}.{DATASET}.{AGG_SUPPLIER_YEAR_PAYOUTS}`"
+    else:
+        staged = f"({supply_payout_staging_sql()})"
+    query = f"""
+    SELECT grain, supplier_org_name, txn_year, net_payouts, gross_bills, vendor_credits
+    FROM {staged}
+    WHERE txn_year >= EXTRACT(YEAR FROM @period_start)
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
-        if result and result[0].supply_nrr is not None:
-            return float(result[0].supply_nrr)
-        return None
+        result = _execute(query, period_params(fiscal_year_bounds(start_year)[0]), metric="supply_payout_staging")
     except GoogleCloudError as e:
-        logger.error("Failed to fetch supply NPR: %s", e)
+        logger.error("Failed to stage supply payouts: %s", e)
+        return None
+
+    net_payouts: Dict[Tuple[Optional[str], int], float] = {}
+    ledger: Dict[int, Tuple[float, float]] = {}
+    for row in result:
+        year = int(row.txn_year)
+        if row.grain == "ledger":
+            ledger[year] = (float(row.gross_bills or 0), float(row.vendor_credits or 0))
+        else:
+            net_payouts[(row.supplier_org_name, year)] = float(row.net_payouts or 0)
+    return {"net_payouts": net_payouts, "ledger": ledger}
+
+
+def _supplier_year_pivot(
+    staging: Dict[str, Any],
+    years: Tuple[int, ...],
+    unlinked_label: Optional[str] = None
+) -> Dict[str, Dict[int, float]]:
+    """Pivot staged net payouts to {supplier: {year: net payouts}}.
+
+    Every supplier with staged payouts in any year is included, with 0.0 for
+    years it has none. Unlinked payouts are dropped unless unlinked_label
+    is given, in which case they are grouped under that label.
+    """
+    pivot: Dict[str, Dict[int, float]] = {}
+    for (supplier, year), amount in staging["net_payouts"].items():
+        if supplier is None:
+            if unlinked_label is None:
+                continue
+            supplier = unlinked_label
+        by_year = pivot.setdefault(supplier, dict.fromkeys(years, 0.0))
+        if year in by_year:
+            by_year[year] += amount
+    return pivot
+
+
+def _cohort_payouts(pivot: Dict[str, Dict[int, float]], cohort_year: int, next_year: int) -> Tuple[float, float, int]:
+    """Sum a supplier cohort's payouts in its base year and the year after.
+
+    The cohort is every supplier with positive net payouts in cohort_year.
+
+    Returns:
+        Tuple of (cohort_year payouts, next_year payouts, supplier count)
+    """
+    cohort = [by_year for by_year in pivot.values() if by_year[cohort_year] > 0]
+    return (
+        sum(by_year[cohort_year] for by_year in cohort),
+        sum(by_year[next_year] for by_year in cohort),
+        len(cohort),
+    )
+
+
+@refresh_memoized
+def get_supply_npr(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
+    """Fetch Supply Net Payout Retention (NPR) using financial-based calculation.
+
+    NOTE: Renamed from get_supply_nrr to get_supply_npr to clarify terminology:
+    - NPR (Net Payout Retention) = Suppliers - did they get paid more?
+    - NRR (Net Revenue Retention) = Customers - did they spend more?
+
+    Uses QBO bill transaction dates (when money moved) instead of offer acceptance dates.
+    This is more accurate because:
+    - Uses actual financial transaction dates
+    - Includes vendor credits (refunds, adjustments)
+    - Handles split bills (_2, _3 suffixes) properly
+    - Links QBO bills to MongoDB remittances for supplier org attribution
+
+    Formula: (Current Year Net Payouts to Prior Year Suppliers) / (Prior Year Net Payouts)
+    Net Payouts = Bills - Vendor Credits
+
+    Computed from get_supply_payout_staging(), shared with the other
+    supply metrics.
+
+    Target: 110%
+
+    Returns:
+        Supply NPR as decimal (e.g., 0.87 for 87%) or None if query fails
+    """
+    prior_year = fiscal_year - 1
+    staging = get_supply_payout_staging(_supply_staging_start(fiscal_year))
+    if staging is None:
+        return None
+
+    pivot = _supplier_year_pivot(staging, (prior_year, fiscal_year))
+    original, next_year, count = _cohort_payouts(pivot, prior_year, fiscal_year)
+    if count == 0:
         return None
+    return next_year / original
 
 
 # Alias for backward compatibility
@@ -725,6 +1732,7 @@ def get_supply_nrr(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
     return get_supply_npr(fiscal_year)
 
 
+@refresh_memoized
 def get_supply_npr_details(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
     """Fetch detailed Supply NPR using financial-based calculation.
 
@@ -733,146 +1741,43 @@ def get_supply_npr_details(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
 
     Returns dict with:
     - current_year: 2026 YTD data (2025 suppliers' 2026 net payouts vs their 2025 net payouts)
-    - prior_year: 2025 Actuals (2024 suppliers' 2025 net payouts vs their 2024 net payouts)
-
-    Net Payouts = Bills - Vendor Credits (both attributed by transaction_date)
-
-    Returns:
-        Dictionary with Supply NPR details for both periods
-    """
-    prior_year = fiscal_year - 1
-    prior_prior_year = fiscal_year - 2
-
-    query = f"""
-    -- Financial-based Supply NRR details using QBO bills linked to MongoDB remittances
-    WITH payout_accounts AS (
-        SELECT id as account_id
-        FROM `{PROJECT_ID}.src_fivetran_qbo.account`
-        WHERE _fivetran_deleted = FALSE
-          AND account_number IN ('4200', '4210', '4220', '4230')
-    ),
-    remittance_supplier_map AS (
-        SELECT DISTINCT
-            rli.bill_number,
-            rli.ctx.supplier.org.name as supplier_org_name
-        FROM `{PROJECT_ID}.mongodb.remittance_line_items` rli
-        WHERE rli.bill_number IS NOT NULL
-          AND rli.ctx.supplier.org.name IS NOT NULL
-    ),
-    qbo_payout_bills AS (
-        SELECT
-            b.doc_number as bill_number,
-            REGEXP_REPLACE(b.doc_number, r'_\\d+$', '') as base_bill_number,
-            EXTRACT(YEAR FROM b.transaction_date) as txn_year,
-            SUM(CAST(bl.amount AS FLOAT64)) as bill_amount
-        FROM `{PROJECT_ID}.src_fivetran_qbo.bill` b
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.bill_line` bl ON b.id = bl.bill_id
-        JOIN payout_accounts pa ON bl.account_expense_account_id = pa.account_id
-        WHERE b._fivetran_deleted = FALSE
-          AND EXTRACT(YEAR FROM b.transaction_date) >= {prior_prior_year}
-        GROUP BY b.doc_number, b.transaction_date
-    ),
-    qbo_payout_credits AS (
-        SELECT
-            REGEXP_REPLACE(vc.doc_number, r'(_credit|c\\d+)$', '') as bill_number,
-            EXTRACT(YEAR FROM vc.transaction_date) as credit_year,
-            SUM(CAST(vcl.amount AS FLOAT64)) as credit_amount
-        FROM `{PROJECT_ID}.src_fivetran_qbo.vendor_credit` vc
-        JOIN `{PROJECT_ID}.src_fivetran_qbo.vendor_credit_line` vcl ON vc.id = vcl.vendor_credit_id
-        JOIN payout_accounts pa ON vcl.account_expense_account_id = pa.account_id
-        WHERE vc._fivetran_deleted = FALSE
-          AND REGEXP_CONTAINS(vc.doc_number, r'(_credit|c\\d+)$')
-          AND EXTRACT(YEAR FROM vc.transaction_date) >= {prior_prior_year}
-        GROUP BY vc.doc_number, vc.transaction_date
-    ),
-    bills_with_supplier AS (
-        SELECT
-            COALESCE(rsm.supplier_org_name, 'UNLINKED') as supplier_org_name,
-            b.txn_year,
-            b.bill_amount,
-            0.0 as credit_amount
-        FROM qbo_payout_bills b
-        LEFT JOIN remittance_supplier_map rsm ON b.base_bill_number = rsm.bill_number
-    ),
-    credits_with_supplier AS (
-        SELECT
-            COALESCE(rsm.supplier_org_name, 'UNLINKED') as supplier_org_name,
-            c.credit_year as txn_year,
-            0.0 as bill_amount,
-            c.credit_amount
-        FROM qbo_payout_credits c
-        LEFT JOIN remittance_supplier_map rsm ON c.bill_number = rsm.bill_number
-    ),
-    all_transactions AS (
-        SELECT * FROM bills_with_supplier
-        UNION ALL
-        SELECT * FROM credits_with_supplier
-    ),
-    supplier_yearly_revenue AS (
-        SELECT
-            supplier_org_name,
-            txn_year,
-            SUM(bill_amount) - SUM(credit_amount) as net_revenue
-        FROM all_transactions
-        WHERE supplier_org_name != 'UNLINKED'
-        GROUP BY supplier_org_name, txn_year
-    ),
-    supplier_pivot AS (
-        SELECT
-            supplier_org_name,
-            SUM(CASE WHEN txn_year = {prior_prior_year} THEN net_revenue ELSE 0 END) as rev_prior_prior,
-            SUM(CASE WHEN txn_year = {prior_year} THEN net_revenue ELSE 0 END) as rev_prior,
-            SUM(CASE WHEN txn_year = {fiscal_year} THEN net_revenue ELSE 0 END) as rev_current
-        FROM supplier_yearly_revenue
-        GROUP BY supplier_org_name
-    )
-    SELECT
-        -- 2024 cohort in 2025 (prior complete year comparison)
-        SUM(CASE WHEN rev_prior_prior > 0 THEN rev_prior_prior END) as prior_cohort_original,
-        SUM(CASE WHEN rev_prior_prior > 0 THEN rev_prior END) as prior_cohort_next_year,
-        COUNT(CASE WHEN rev_prior_prior > 0 THEN 1 END) as prior_cohort_count,
-        -- 2025 cohort in 2026 (current year)
-        SUM(CASE WHEN rev_prior > 0 THEN rev_prior END) as current_cohort_original,
-        SUM(CASE WHEN rev_prior > 0 THEN rev_current END) as current_cohort_next_year,
-        COUNT(CASE WHEN rev_prior > 0 THEN 1 END) as current_cohort_count
-    FROM supplier_pivot
-    """
-    try:
-        client = get_client()
-        result = list(client.query(query).result())
-
-        if not result:
-            return {}
+    - prior_year: 2025 Actuals (2024 suppliers' 2025 net payouts vs their 2024 net payouts)
 
-        row = result[0]
-        prior_orig = float(row.prior_cohort_original or 0)
-        prior_next = float(row.prior_cohort_next_year or 0)
-        curr_orig = float(row.current_cohort_original or 0)
-        curr_next = float(row.current_cohort_next_year or 0)
+    Net Payouts = Bills - Vendor Credits (both attributed by transaction_date)
 
-        return {
-            "current_year": {
-                "cohort": prior_year,
-                "cohort_original_payouts": curr_orig,
-                "cohort_next_year_payouts": curr_next,
-                "supplier_count": int(row.current_cohort_count or 0),
-                "npr_pct": (curr_next / curr_orig * 100) if curr_orig > 0 else 0,
-                "label": f"{fiscal_year} YTD"
-            },
-            "prior_year": {
-                "cohort": prior_prior_year,
-                "cohort_original_payouts": prior_orig,
-                "cohort_next_year_payouts": prior_next,
-                "supplier_count": int(row.prior_cohort_count or 0),
-                "npr_pct": (prior_next / prior_orig * 100) if prior_orig > 0 else 0,
-                "label": f"{prior_year} Actuals"
-            },
-            "methodology": "financial"  # Indicates this uses QBO transaction dates
-        }
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch supply NPR details: %s", e)
+    Returns:
+        Dictionary with Supply NPR details for both periods
+    """
+    prior_year = fiscal_year - 1
+    prior_prior_year = fiscal_year - 2
+    staging = get_supply_payout_staging(_supply_staging_start(fiscal_year))
+    if staging is None:
         return {}
 
+    pivot = _supplier_year_pivot(staging, (prior_prior_year, prior_year, fiscal_year))
+    prior_orig, prior_next, prior_count = _cohort_payouts(pivot, prior_prior_year, prior_year)
+    curr_orig, curr_next, curr_count = _cohort_payouts(pivot, prior_year, fiscal_year)
+
+    return {
+        "current_year": {
+            "cohort": prior_year,
+            "cohort_original_payouts": curr_orig,
+            "cohort_next_year_payouts": curr_next,
+            "supplier_count": curr_count,
+            "npr_pct": (curr_next / curr_orig * 100) if curr_orig > 0 else 0,
+            "label": f"{fiscal_year} YTD"
+        },
+        "prior_year": {
+            "cohort": prior_prior_year,
+            "cohort_original_payouts": prior_orig,
+            "cohort_next_year_payouts": prior_next,
+            "supplier_count": prior_count,
+            "npr_pct": (prior_next / prior_orig * 100) if prior_orig > 0 else 0,
+            "label": f"{prior_year} Actuals"
+        },
+        "methodology": "financial"  # Indicates this uses QBO transaction dates
+    }
+
 
 # Alias for backward compatibility
 def get_supply_nrr_details(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
@@ -880,6 +1785,7 @@ def get_supply_nrr_details(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
     return get_supply_npr_details(fiscal_year)
 
 
+@refresh_memoized
 def get_customer_count(fiscal_year: int = FISCAL_YEAR) -> Optional[int]:
     """Fetch active customer count from customer_development view.
 
@@ -896,8 +1802,7 @@ def get_customer_count(fiscal_year: int = FISCAL_YEAR) -> Optional[int]:
     WHERE Net_Revenue_2025 > 0
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
+        result = _execute(query, metric="customer_count")
         if result:
             return int(result[0].customer_count)
         return None
@@ -906,6 +1811,7 @@ def get_customer_count(fiscal_year: int = FISCAL_YEAR) -> Optional[int]:
         return None
 
 
+@refresh_memoized
 def get_churned_customers(fiscal_year: int = FISCAL_YEAR) -> Optional[int]:
     """Fetch count of churned customers from customer_development view.
 
@@ -914,6 +1820,7 @@ def get_churned_customers(fiscal_year: int = FISCAL_YEAR) -> Optional[int]:
     Returns:
         Number of churned customers or None if query fails
     """
+    fiscal_year = column_year(fiscal_year)
     prior_year = fiscal_year - 1
 
     query = f"""
@@ -923,8 +1830,7 @@ def get_churned_customers(fiscal_year: int = FISCAL_YEAR) -> Optional[int]:
       AND COALESCE(Net_Revenue_{fiscal_year}, 0) = 0
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
+        result = _execute(query, metric="churned_customers")
         if result:
             return int(result[0].churned_count)
         return None
@@ -933,6 +1839,7 @@ def get_churned_customers(fiscal_year: int = FISCAL_YEAR) -> Optional[int]:
         return None
 
 
+@refresh_memoized
 def get_customer_concentration(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
     """Fetch customer concentration metrics.
 
@@ -941,7 +1848,7 @@ def get_customer_concentration(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]
     Returns:
         Dictionary with top_customer_pct, top_customer_name, and top_customers list
     """
-    prior_year = fiscal_year - 1  # Use prior complete year for meaningful data
+    prior_year = column_year(fiscal_year) - 1  # Use prior complete year for meaningful data
 
     query = f"""
     WITH customer_revenue AS (
@@ -965,19 +1872,17 @@ def get_customer_concentration(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]
     LIMIT 5
     """
     try:
-        client = get_client()
-        results = list(client.query(query).result())
+        results = _execute_records(query, metric="customer_concentration", columns={
+            "company_name": None, "revenue": 0.0, "pct_of_total": 0.0,
+        })
 
         if not results:
             return {}
 
-        top_customers = []
-        for row in results:
-            top_customers.append({
-                "name": row.company_name,
-                "revenue": float(row.revenue),
-                "pct": float(row.pct_of_total)
-            })
+        top_customers = [
+            {"name": row["company_name"], "revenue": row["revenue"], "pct": row["pct_of_total"]}
+            for row in results
+        ]
 
         return {
             "top_customer_name": top_customers[0]["name"] if top_customers else None,
@@ -991,6 +1896,7 @@ def get_customer_concentration(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]
         return {}
 
 
+@refresh_memoized
 def get_logo_retention(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
     """Fetch logo retention rate.
 
@@ -1002,6 +1908,7 @@ def get_logo_retention(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
     Returns:
         Logo retention as decimal (e.g., 0.26 for 26%) or None if query fails
     """
+    fiscal_year = column_year(fiscal_year)
     prior_year = fiscal_year - 1
     prior_prior_year = fiscal_year - 2  # For comparison when current year has limited data
 
@@ -1021,8 +1928,7 @@ def get_logo_retention(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
     FROM `{PROJECT_ID}.{DATASET}.customer_development`
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
+        result = _execute(query, metric="logo_retention")
         if result and result[0].logo_retention is not None:
             return float(result[0].logo_retention)
         return None
@@ -1031,6 +1937,7 @@ def get_logo_retention(fiscal_year: int = FISCAL_YEAR) -> Optional[float]:
         return None
 
 
+@refresh_memoized
 def get_quota_from_company_properties(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
     """Fetch quota totals from HubSpot company properties.
 
@@ -1040,6 +1947,7 @@ def get_quota_from_company_properties(fiscal_year: int = FISCAL_YEAR) -> Dict[st
     Returns:
         Dictionary with quota breakdown and total
     """
+    fiscal_year = column_year(fiscal_year)
     query = f"""
     SELECT
         ROUND(COALESCE(SUM(SAFE_CAST(property_x_{fiscal_year}_land_expand_quota AS FLOAT64)), 0), 2) as land_expand_quota,
@@ -1052,17 +1960,19 @@ def get_quota_from_company_properties(fiscal_year: int = FISCAL_YEAR) -> Dict[st
     WHERE property_name IS NOT NULL
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
+        result = _execute_records(query, metric="quota_from_company_properties", columns={
+            "land_expand_quota": 0.0, "new_customer_quota": 0.0, "renewal_quota": 0.0,
+            "dg_quota": 0.0, "walmart_quota": 0.0,
+        })
         if not result:
             return {"total": 0, "breakdown": {}}
 
         row = result[0]
-        land_expand = float(row.land_expand_quota) if row.land_expand_quota else 0
-        new_customer = float(row.new_customer_quota) if row.new_customer_quota else 0
-        renewal = float(row.renewal_quota) if row.renewal_quota else 0
-        dg = float(row.dg_quota) if row.dg_quota else 0
-        walmart = float(row.walmart_quota) if row.walmart_quota else 0
+        land_expand = row["land_expand_quota"]
+        new_customer = row["new_customer_quota"]
+        renewal = row["renewal_quota"]
+        dg = row["dg_quota"]
+        walmart = row["walmart_quota"]
 
         # Main total excludes DG and Walmart
         total = land_expand + new_customer + renewal
@@ -1113,6 +2023,7 @@ def get_pipeline_coverage(
     return result.get("coverage") if result else None
 
 
+@refresh_memoized
 def get_pipeline_details(
     fiscal_year: int = FISCAL_YEAR,
     annual_goal_override: Optional[float] = None,
@@ -1172,17 +2083,11 @@ def get_pipeline_details(
 
     # Calculate quarter boundaries
     # Q1: Jan-Mar, Q2: Apr-Jun, Q3: Jul-Sep, Q4: Oct-Dec
-    from datetime import datetime
     current_month = datetime.now().month
     current_quarter = (current_month - 1) // 3 + 1
-    quarter_start_month = (current_quarter - 1) * 3 + 1
-    quarter_end_month = quarter_start_month + 3
-
-    quarter_start = f"{fiscal_year}-{quarter_start_month:02d}-01"
-    if quarter_end_month <= 12:
-        quarter_end = f"{fiscal_year}-{quarter_end_month:02d}-01"
-    else:
-        quarter_end = f"{fiscal_year + 1}-01-01"
+    quarter_start_date, quarter_end_date = quarter_bounds(fiscal_year, current_quarter)
+    quarter_start = quarter_start_date.isoformat()
+    quarter_end = quarter_end_date.isoformat()
 
     query = f"""
     WITH closed_this_quarter AS (
@@ -1191,8 +2096,8 @@ def get_pipeline_details(
         WHERE deal_pipeline_id = 'default'
           AND is_deleted = false
           AND property_hs_is_closed_won = true
-          AND property_closedate >= '{quarter_start}'
-          AND property_closedate < '{quarter_end}'
+          AND property_closedate >= @quarter_start
+          AND property_closedate < @quarter_end
     ),
     weighted_pipeline AS (
         SELECT
@@ -1203,8 +2108,8 @@ def get_pipeline_details(
         WHERE deal_pipeline_id = 'default'
           AND is_deleted = false
           AND property_hs_is_closed = false
-          AND property_closedate >= '{quarter_start}'
-          AND property_closedate < '{quarter_end}'
+          AND property_closedate >= @quarter_start
+          AND property_closedate < @quarter_end
     )
     SELECT
         c.closed_won,
@@ -1214,15 +2119,18 @@ def get_pipeline_details(
     FROM closed_this_quarter c, weighted_pipeline p
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
+        result = _execute_records(query, period_params(
+            quarter_start_date, quarter_end_date, column_type="TIMESTAMP", name="quarter"
+        ), metric="pipeline_details", columns={
+            "closed_won": 0.0, "deal_count": 0, "total_pipeline": 0.0, "hs_weighted_pipeline": 0.0,
+        })
 
         if not result:
             return {}
 
         row = result[0]
-        closed_won = float(row.closed_won) if row.closed_won else 0
-        weighted_pipeline = float(row.hs_weighted_pipeline) if row.hs_weighted_pipeline else 0
+        closed_won = row["closed_won"]
+        weighted_pipeline = row["hs_weighted_pipeline"]
         remaining_to_goal = max(quarterly_goal - closed_won, 0)
 
         # Coverage = weighted pipeline / remaining goal
@@ -1243,8 +2151,8 @@ def get_pipeline_details(
             "quarter_end": quarter_end,
             "closed_won": closed_won,
             "remaining_to_goal": remaining_to_goal,
-            "open_deals": int(row.deal_count) if row.deal_count else 0,
-            "total_pipeline": float(row.total_pipeline) if row.total_pipeline else 0,
+            "open_deals": row["deal_count"],
+            "total_pipeline": row["total_pipeline"],
             "weighted_pipeline": weighted_pipeline,
             "coverage": round(coverage, 2),
             "pipeline_gap": pipeline_gap,
@@ -1255,6 +2163,7 @@ def get_pipeline_details(
         return {}
 
 
+@refresh_memoized
 def get_pipeline_coverage_by_owner(
     fiscal_year: int = FISCAL_YEAR,
     quarter: Optional[str] = None
@@ -1277,6 +2186,12 @@ def get_pipeline_coverage_by_owner(
         current_quarter = (current_month - 1) // 3 + 1
         quarter = f"Q{current_quarter}"
 
+    valid_quarters = {"Q1", "Q2", "Q3", "Q4"}
+    if quarter not in valid_quarters:
+        logger.error("Invalid quarter: %s", quarter)
+        return []
+    fiscal_year = column_year(fiscal_year)
+
     query = f"""
     WITH company_quotas AS (
         SELECT
@@ -1320,8 +2235,8 @@ def get_pipeline_coverage_by_owner(
         JOIN `{PROJECT_ID}.src_fivetran_hubspot.deal_company` dc ON d.deal_id = dc.deal_id
         JOIN company_quotas cq ON dc.company_id = cq.company_id
         WHERE d.deal_pipeline_id = 'default' AND d.is_deleted = false AND d.property_hs_is_closed = false
-          AND EXTRACT(YEAR FROM d.property_closedate) = {fiscal_year}
-          AND CONCAT('Q', CAST(EXTRACT(QUARTER FROM d.property_closedate) AS STRING)) = '{quarter}'
+          AND d.property_closedate >= @quarter_start
+          AND d.property_closedate < @quarter_end
     ),
     owner_pipeline AS (
         SELECT owner_name,
@@ -1351,7 +2266,8 @@ def get_pipeline_coverage_by_owner(
         JOIN `{PROJECT_ID}.src_fivetran_hubspot.deal_company` dc ON d.deal_id = dc.deal_id
         JOIN company_quotas cq ON dc.company_id = cq.company_id
         WHERE d.deal_pipeline_id = 'default' AND d.is_deleted = false AND d.property_hs_is_closed = true
-          AND EXTRACT(YEAR FROM d.property_closedate) = {fiscal_year - 1}
+          AND d.property_closedate >= @prior_year_start
+          AND d.property_closedate < @prior_year_end
     ),
     owner_2025_stats AS (
         SELECT owner_name,
@@ -1368,7 +2284,7 @@ def get_pipeline_coverage_by_owner(
     )
     SELECT
         q.owner_name,
-        '{quarter}' as quarter,
+        @quarter as quarter,
         ROUND(q.new_customer_annual_quota, 0) as new_cust_annual_quota,
         ROUND(q.renewal_annual_quota, 0) as renewal_annual_quota,
         ROUND(q.land_expand_annual_quota, 0) as land_exp_annual_quota,
@@ -1402,14 +2318,24 @@ def get_pipeline_coverage_by_owner(
     ORDER BY (q.new_customer_annual_quota + q.renewal_annual_quota + q.land_expand_annual_quota) DESC
     """
     try:
-        client = get_client()
-        results = list(client.query(query).result())
-        return [dict(row) for row in results]
+        params = (
+            [bigquery.ScalarQueryParameter("quarter", "STRING", quarter)]
+            + period_params(
+                *quarter_bounds(fiscal_year, int(quarter[1])),
+                column_type="TIMESTAMP", name="quarter"
+            )
+            + period_params(
+                *fiscal_year_bounds(fiscal_year - 1),
+                column_type="TIMESTAMP", name="prior_year"
+            )
+        )
+        return _execute_records(query, params, metric="pipeline_coverage_by_owner")
     except GoogleCloudError as e:
         logger.error("Failed to fetch pipeline coverage by owner: %s", e)
         return []
 
 
+@refresh_memoized
 def get_pipeline_coverage_by_company(
     quarter: Optional[str] = None
 ) -> List[Dict[str, Any]]:
@@ -1447,54 +2373,108 @@ def get_pipeline_coverage_by_company(
             (new_cust_quarterly_quota + renewal_quarterly_quota + land_exp_quarterly_quota)
         ) as coverage_ratio
     FROM `{PROJECT_ID}.{DATASET}.pipeline_coverage_by_company`
-    WHERE quarter = '{quarter}'
+    WHERE quarter = @quarter
     ORDER BY coverage_gap DESC
     """
 
     try:
-        client = get_client()
-        results = list(client.query(query).result())
+        results = _execute(
+            query,
+            [bigquery.ScalarQueryParameter("quarter", "STRING", quarter)],
+            metric="pipeline_coverage_by_company",
+        )
         return [dict(row) for row in results]
     except GoogleCloudError as e:
         logger.error("Failed to fetch pipeline coverage by company: %s", e)
         return []
 
 
-def get_company_metrics(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
-    """Fetch all company-level metrics.
+# Keys get_company_metrics() returns by default (the Overview's metrics)
+COMPANY_METRIC_KEYS = (
+    "revenue_ytd", "take_rate", "demand_nrr", "supply_npr", "supply_nrr",
+    "customer_count", "logo_retention", "pipeline_coverage",
+    "demand_nrr_details", "supply_npr_details", "supply_nrr_details",
+)
 
-    This is the main entry point for the Overview page.
+
+def company_metric_fetches(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Fetch]:
+    """Every fetch get_company_metrics() can plan, by name.
+
+    Besides COMPANY_METRIC_KEYS this includes the pipeline details, time to
+    fulfill, customer concentration and the HubSpot quotas the pipeline
+    metrics are measured against.
 
     Note: Supply-side uses NPR (Net Payout Retention) terminology,
     Demand-side uses NRR (Net Revenue Retention) terminology.
+    """
+    return {fetch.name: fetch for fetch in (
+        Fetch("revenue_ytd", partial(get_revenue_ytd, fiscal_year)),
+        Fetch("take_rate", partial(get_take_rate, fiscal_year)),
+        Fetch("demand_nrr", partial(get_nrr, fiscal_year)),
+        Fetch("supply_npr", partial(get_supply_npr, fiscal_year)),  # NPR for suppliers
+        Fetch("supply_nrr", partial(get_supply_npr, fiscal_year)),  # Alias for backward compatibility
+        Fetch("customer_count", partial(get_customer_count, fiscal_year)),
+        Fetch("logo_retention", partial(get_logo_retention, fiscal_year)),
+        Fetch("pipeline_quota", partial(get_quota_from_company_properties, fiscal_year)),
+        Fetch("pipeline", partial(get_pipeline_details, fiscal_year), depends_on=("pipeline_quota",)),
+        Fetch("pipeline_coverage", partial(get_pipeline_coverage, fiscal_year), depends_on=("pipeline",)),
+        Fetch("ttf", get_time_to_fulfill),
+        Fetch("customer_concentration", partial(get_customer_concentration, fiscal_year)),
+        Fetch("demand_nrr_details", partial(get_demand_nrr_details, fiscal_year)),
+        Fetch("supply_npr_details", partial(get_supply_npr_details, fiscal_year)),  # NPR for suppliers
+        Fetch("supply_nrr_details", partial(get_supply_npr_details, fiscal_year)),  # Alias for backward compatibility
+    )}
+
+
+def get_company_metrics(
+    fiscal_year: int = FISCAL_YEAR,
+    timeout: Optional[float] = None,
+    metrics: Optional[Tuple[str, ...]] = None
+) -> Dict[str, Any]:
+    """Fetch company-level metrics.
+
+    This is the main entry point for the Overview page. The requested
+    metrics are planned with their dependencies (data/fetch_planner.py) and
+    fanned out concurrently via run_plan(), each starting as soon as its
+    dependencies are done, rather than executed one after another. The
+    fan-out runs inside refresh_scope(), so the backward-compatible aliases
+    reuse the supply NPR results instead of querying a second time.
+
+    Args:
+        fiscal_year: Fiscal year to report on
+        timeout: Optional budget in seconds. Metrics that have not finished
+            (or that raised) by then are left out of the result instead of
+            holding up or failing the whole refresh.
+        metrics: Names from company_metric_fetches() to fetch (default
+            COMPANY_METRIC_KEYS). Only these and what they depend on run.
 
     Returns:
-        Dictionary with all company metrics, or empty dict if BigQuery unavailable
+        Dictionary with the requested metrics, or empty dict if BigQuery unavailable
     """
-    if not is_bigquery_available():
+    # No health probe on the hot path: the circuit breaker already knows
+    # whether BigQuery is failing, and only probes once it is due to retry
+    if bigquery_breaker.state != CircuitBreaker.CLOSED and not is_bigquery_available():
         logger.warning("BigQuery unavailable, returning empty metrics")
         return {}
 
-    return {
-        "revenue_ytd": get_revenue_ytd(fiscal_year),
-        "take_rate": get_take_rate(fiscal_year),
-        "demand_nrr": get_nrr(fiscal_year),
-        "supply_npr": get_supply_npr(fiscal_year),  # NPR for suppliers
-        "supply_nrr": get_supply_npr(fiscal_year),  # Alias for backward compatibility
-        "customer_count": get_customer_count(fiscal_year),
-        "logo_retention": get_logo_retention(fiscal_year),
-        "pipeline_coverage": get_pipeline_coverage(),
-        "demand_nrr_details": get_demand_nrr_details(fiscal_year),
-        "supply_npr_details": get_supply_npr_details(fiscal_year),  # NPR for suppliers
-        "supply_nrr_details": get_supply_npr_details(fiscal_year),  # Alias for backward compatibility
-        "updated_at": datetime.now().isoformat(),
-    }
+    wanted = COMPANY_METRIC_KEYS if metrics is None else tuple(metrics)
+    fetches = company_metric_fetches(fiscal_year)
+    with refresh_scope():
+        results = run_plan(plan(wanted, fetches), fetches, timeout=timeout)
+    if bigquery_breaker.state == CircuitBreaker.OPEN:
+        # BigQuery went down mid-refresh; don't publish a snapshot of defaults
+        logger.warning("BigQuery circuit opened during refresh, returning empty metrics")
+        return {}
+    company = {name: results[name] for name in wanted if name in results}
+    company["updated_at"] = datetime.now().isoformat()
+    return company
 
 
 # =============================================================================
 # PERSON METRICS (Team Scorecard)
 # =============================================================================
 
+@refresh_memoized
 def get_contract_spend_pct() -> Optional[float]:
     """Fetch contract spend percentage from Upfront_Contract_Spend_Query.
 
@@ -1505,11 +2485,10 @@ def get_contract_spend_pct() -> Optional[float]:
     SELECT
         SAFE_DIVIDE(SUM(actual_spend), SUM(contract_value)) as spend_pct
     FROM `{PROJECT_ID}.{DATASET}.Upfront_Contract_Spend_Query`
-    WHERE fiscal_year = {FISCAL_YEAR}
+    WHERE fiscal_year = @fiscal_year
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
+        result = _execute(query, int_params(fiscal_year=FISCAL_YEAR), metric="contract_spend_pct")
         if result and result[0].spend_pct is not None:
             return float(result[0].spend_pct)
         return None
@@ -1518,6 +2497,7 @@ def get_contract_spend_pct() -> Optional[float]:
         return None
 
 
+@refresh_memoized
 def get_offer_acceptance_rate() -> Optional[float]:
     """Fetch company-wide offer acceptance rate.
 
@@ -1543,11 +2523,10 @@ def get_offer_acceptance_rate() -> Optional[float]:
         COUNT(*)
       ) AS acceptance_rate
     FROM offer_outcomes
-    WHERE offer_year = EXTRACT(YEAR FROM CURRENT_DATE())
+    WHERE offer_year = EXTRACT(YEAR FROM @as_of_date)
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
+        result = _execute(query, as_of_params(), metric="offer_acceptance_rate")
         if result and result[0].acceptance_rate is not None:
             return float(result[0].acceptance_rate)
         return None
@@ -1556,6 +2535,7 @@ def get_offer_acceptance_rate() -> Optional[float]:
         return None
 
 
+@refresh_memoized
 def get_avg_ticket_response_time() -> Optional[float]:
     """Fetch average ticket response time in hours.
 
@@ -1569,8 +2549,7 @@ def get_avg_ticket_response_time() -> Optional[float]:
       NULL AS avg_response_hours
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
+        result = _execute(query, metric="avg_ticket_response_time")
         if result and result[0].avg_response_hours is not None:
             return float(result[0].avg_response_hours)
         return None
@@ -1579,6 +2558,18 @@ def get_avg_ticket_response_time() -> Optional[float]:
         return None
 
 
+# Columns of both time-to-fulfill views; medians and averages stay None
+# when nothing has been fulfilled yet
+_TIME_TO_FULFILL_COLUMNS = {
+    "median_days": None,
+    "avg_days": None,
+    "contract_count": 0,
+    "fulfilled_count": 0,
+    "in_progress_count": 0,
+}
+
+
+@refresh_memoized
 def get_time_to_fulfill() -> Dict[str, Any]:
     """Fetch time to fulfill contract spend metrics.
 
@@ -1597,7 +2588,7 @@ def get_time_to_fulfill() -> Dict[str, Any]:
         fulfilled_count, in_progress_count
     """
     # Try new view first (measures contract close → 100% invoiced)
-    # Filter to 2026 deals only for current year performance
+    # Filter to current fiscal year deals only for current year performance
     query_new = f"""
     SELECT
         APPROX_QUANTILES(
@@ -1609,7 +2600,7 @@ def get_time_to_fulfill() -> Dict[str, Any]:
         COUNTIF(fulfillment_status = 'Fulfilled') as fulfilled_count,
         COUNTIF(fulfillment_status = 'In Progress') as in_progress_count
     FROM `{PROJECT_ID}.{DATASET}.Days_to_Fulfill_Contract_Spend_From_Close_Date`
-    WHERE contract_close_date >= '2026-01-01'
+    WHERE contract_close_date >= @period_start
     """
 
     # Fallback to legacy view if new view doesn't exist
@@ -1625,37 +2616,26 @@ def get_time_to_fulfill() -> Dict[str, Any]:
     """
 
     try:
-        client = get_client()
-
-        # Use new view with 2026 filter - return data even if median is None
-        # (None means no 2026 contracts fulfilled yet, which is valid data)
+        # Use new view with fiscal year filter - return data even if median is None
+        # (None means no contracts fulfilled yet this year, which is valid data)
         try:
-            result = list(client.query(query_new).result())
+            result = _execute_records(
+                query_new,
+                period_params(fiscal_year_bounds(FISCAL_YEAR)[0]),
+                metric="time_to_fulfill",
+                columns=_TIME_TO_FULFILL_COLUMNS,
+            )
             if result:
-                row = result[0]
                 logger.info("Using new Days_to_Fulfill_Contract_Spend_From_Close_Date view (2026 only)")
-                return {
-                    "median_days": int(row.median_days) if row.median_days else None,
-                    "avg_days": float(row.avg_days) if row.avg_days else None,
-                    "contract_count": int(row.contract_count) if row.contract_count else 0,
-                    "fulfilled_count": int(row.fulfilled_count) if row.fulfilled_count else 0,
-                    "in_progress_count": int(row.in_progress_count) if row.in_progress_count else 0,
-                }
+                return result[0]
         except Exception as e:
             logger.warning("New Time to Fulfill view not available, using legacy: %s", e)
 
             # Only fallback to legacy if new view query fails (not if it returns null)
-            result = list(client.query(query_legacy).result())
+            result = _execute_records(query_legacy, metric="time_to_fulfill", columns=_TIME_TO_FULFILL_COLUMNS)
             if result:
-                row = result[0]
                 logger.info("Using legacy Days_to_Fulfill_Contract_Program view")
-                return {
-                    "median_days": int(row.median_days) if row.median_days else None,
-                    "avg_days": float(row.avg_days) if row.avg_days else None,
-                    "contract_count": int(row.contract_count) if row.contract_count else 0,
-                    "fulfilled_count": int(row.fulfilled_count) if row.fulfilled_count else 0,
-                    "in_progress_count": 0,
-                }
+                return result[0]
         return {}
     except GoogleCloudError as e:
         logger.error("Failed to fetch time to fulfill: %s", e)
@@ -1674,6 +2654,7 @@ def get_avg_days_to_fulfill() -> Optional[float]:
     return result.get("avg_days")
 
 
+@refresh_memoized
 def get_nps_score() -> Optional[float]:
     """Fetch NPS score from organizer_recap_NPS_score.
 
@@ -1685,8 +2666,7 @@ def get_nps_score() -> Optional[float]:
     FROM `{PROJECT_ID}.{DATASET}.organizer_recap_NPS_score`
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
+        result = _execute(query, metric="nps_score")
         if result and result[0].nps is not None:
             return float(result[0].nps)
         return None
@@ -1699,32 +2679,44 @@ def get_nps_score() -> Optional[float]:
 # DETAIL VIEWS (Drill-down pages - Tier 2)
 # =============================================================================
 
-def get_nrr_by_customer(fiscal_year: int = FISCAL_YEAR) -> List[Dict[str, Any]]:
+@refresh_memoized
+def get_nrr_by_customer_frame(fiscal_year: int = FISCAL_YEAR) -> Optional["pd.DataFrame"]:
     """Fetch detailed NRR by customer for drill-down view.
 
     Returns:
-        List of customer NRR records or empty list if query fails
+        DataFrame of customer NRR records or None if query fails. Shared within
+        a refresh, so treat it as read-only
     """
     query = f"""
     SELECT *
     FROM `{PROJECT_ID}.{DATASET}.net_revenue_retention_all_customers`
     WHERE qbo_customer_id != 'UNKNOWN'
-    ORDER BY net_revenue_{fiscal_year} DESC
+    ORDER BY net_revenue_{column_year(fiscal_year)} DESC
     """
     try:
-        client = get_client()
-        df = client.query(query).to_dataframe()
-        return df.to_dict('records')
+        df = _execute_dataframe(query, metric="nrr_by_customer")
+        return df
     except GoogleCloudError as e:
         logger.error("Failed to fetch NRR detail: %s", e)
-        return []
+        return None
 
 
-def get_cohort_matrix(fiscal_year: int = FISCAL_YEAR) -> List[Dict[str, Any]]:
+def get_nrr_by_customer(fiscal_year: int = FISCAL_YEAR) -> List[Dict[str, Any]]:
+    """Fetch customer NRR detail as a list of row dicts.
+
+    Materializes one dict per row; display code should use
+    get_nrr_by_customer_frame() instead.
+    """
+    return _frame_records(get_nrr_by_customer_frame(fiscal_year))
+
+
+@refresh_memoized
+def get_cohort_matrix_frame(fiscal_year: int = FISCAL_YEAR) -> Optional["pd.DataFrame"]:
     """Fetch cohort retention matrix for drill-down view.
 
     Returns:
-        List of cohort records or empty list if query fails
+        DataFrame of cohort records or None if query fails. Shared within
+        a refresh, so treat it as read-only
     """
     query = f"""
     SELECT *
@@ -1732,49 +2724,346 @@ def get_cohort_matrix(fiscal_year: int = FISCAL_YEAR) -> List[Dict[str, Any]]:
     ORDER BY cohort_year, customer_name
     """
     try:
-        client = get_client()
-        df = client.query(query).to_dataframe()
-        return df.to_dict('records')
+        df = _execute_dataframe(query, metric="cohort_matrix")
+        return df
     except GoogleCloudError as e:
         logger.error("Failed to fetch cohort matrix: %s", e)
-        return []
+        return None
+
+
+def get_cohort_matrix(fiscal_year: int = FISCAL_YEAR) -> List[Dict[str, Any]]:
+    """Fetch the cohort retention matrix as a list of row dicts.
+
+    Materializes one dict per row; display code should use
+    get_cohort_matrix_frame() instead.
+    """
+    return _frame_records(get_cohort_matrix_frame(fiscal_year))
 
 
 # =============================================================================
 # UTILITY FUNCTIONS
 # =============================================================================
 
-def run_query(query: str) -> List[Dict[str, Any]]:
-    """Run an arbitrary query and return results as list of dicts.
+def run_concurrently(
+    tasks: Dict[str, Callable[[], Any]],
+    max_workers: int = MAX_CONCURRENT_QUERIES
+) -> Dict[str, Any]:
+    """Run independent fetchers concurrently and gather their results.
+
+    Every fetcher is submitted up front; each one issues its
+    `client.query(...)` and blocks on `.result()` in its own worker thread,
+    so the BigQuery jobs run side by side and total wall time tracks the
+    slowest query instead of the sum of all of them.
 
     Args:
-        query: SQL query string
+        tasks: Mapping of result key to zero-argument callable
+        max_workers: Maximum number of jobs kept in flight at once
 
     Returns:
-        List of row dictionaries or empty list if query fails
+        Dictionary mapping each key to its fetcher's return value, in the
+        same key order as `tasks`. Exceptions raised by a fetcher propagate
+        to the caller, exactly as they would when called sequentially.
+    """
+    if not tasks:
+        return {}
+
+    workers = max(1, min(max_workers, len(tasks)))
+    with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bq-fanout") as executor:
+        # Each task runs in a copy of the caller's context so an active
+        # refresh_scope() memo is shared with the worker threads
+        futures = {
+            key: executor.submit(contextvars.copy_context().run, fn)
+            for key, fn in tasks.items()
+        }
+        return {key: future.result() for key, future in futures.items()}
+
+
+def run_within_deadline(
+    tasks: Dict[str, Callable[[], Any]],
+    timeout: float,
+    max_workers: int = MAX_CONCURRENT_QUERIES,
+    errors: Optional[Dict[str, BaseException]] = None
+) -> Dict[str, Any]:
+    """Run independent fetchers concurrently and return what finishes in time.
+
+    Like run_concurrently(), but one slow or failing fetcher cannot hold up
+    or throw away the others: after `timeout` seconds the results gathered
+    so far are returned. Fetchers that raised are logged and left out.
+    Fetchers still running are left to finish in the background (their
+    results still land in the result cache) and are left out too.
+
+    Args:
+        tasks: Mapping of result key to zero-argument callable
+        timeout: Budget in seconds for the whole fan-out
+        max_workers: Maximum number of jobs kept in flight at once
+        errors: Optional dict that receives the exception of every fetcher
+            left out (TimeoutError for the ones that missed the budget)
+
+    Returns:
+        Dictionary mapping each finished key to its fetcher's return value,
+        in the same key order as `tasks`
+    """
+    if not tasks:
+        return {}
+
+    workers = max(1, min(max_workers, len(tasks)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bq-deadline")
+    try:
+        futures = {
+            key: executor.submit(contextvars.copy_context().run, fn)
+            for key, fn in tasks.items()
+        }
+        wait(futures.values(), timeout=max(0.0, timeout))
+    finally:
+        # Don't block on stragglers; queued work that never started is dropped
+        executor.shutdown(wait=False, cancel_futures=True)
+
+    results = {}
+    for key, future in futures.items():
+        if not future.done() or future.cancelled():
+            error: Optional[BaseException] = TimeoutError(f"{key} missed the {timeout:.0f}s refresh budget")
+        else:
+            error = future.exception()
+        if error is None:
+            results[key] = future.result()
+            continue
+        logger.warning("Left %s out of the refresh: %s", key, error)
+        if errors is not None:
+            errors[key] = error
+    return results
+
+
+def run_plan(
+    stages: List[Tuple[str, ...]],
+    fetches: Dict[str, Fetch],
+    timeout: Optional[float] = None,
+    errors: Optional[Dict[str, BaseException]] = None,
+    max_workers: int = MAX_CONCURRENT_QUERIES
+) -> Dict[str, Any]:
+    """Run a fetch plan from fetch_planner.plan().
+
+    Each fetch starts as soon as the fetches it depends on have finished,
+    not when its whole stage comes up, so a dependency chain runs alongside
+    the slow independent queries instead of after them. Without a timeout
+    this behaves like run_concurrently() (a fetcher's exception propagates);
+    with one, every fetch shares the one overall deadline, as in
+    run_within_deadline(). A fetch whose dependency failed still runs: the
+    dependency only orders the reads so the shared result is memoized.
+
+    Args:
+        stages: Stages of fetch names, dependencies first
+        fetches: Fetches by name
+        timeout: Optional budget in seconds for the whole plan
+        errors: Optional dict that receives the exception of every fetch
+            left out (only used with a timeout)
+        max_workers: Maximum number of jobs kept in flight at once
+
+    Returns:
+        Dictionary mapping each finished fetch name to its result, in plan order
+    """
+    names = [name for stage in stages for name in stage]
+    if not names:
+        return {}
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    planned = set(names)
+    pending = list(names)
+    futures: Dict[str, Future] = {}
+    workers = max(1, min(max_workers, len(names)))
+    executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bq-plan")
+    try:
+        while True:
+            finished = {name for name, future in futures.items() if future.done()}
+            if deadline is None:
+                failed = [futures[name] for name in names if name in finished and futures[name].exception()]
+                if failed:
+                    failed[0].result()
+            for name in [n for n in pending if finished.issuperset(planned.intersection(fetches[n].depends_on))]:
+                # Each fetch runs in a copy of the caller's context so an
+                # active refresh_scope() memo is shared with the workers
+                futures[name] = executor.submit(contextvars.copy_context().run, fetches[name].fn)
+                pending.remove(name)
+            # Includes fetches that finished since `finished` was taken, so
+            # wait() returns at once and their dependents start right away
+            unfinished = [future for name, future in futures.items() if name not in finished]
+            if not unfinished:
+                break
+            remaining = None if deadline is None else deadline - time.monotonic()
+            if remaining is not None and remaining <= 0:
+                break
+            wait(unfinished, timeout=remaining, return_when=FIRST_COMPLETED)
+    finally:
+        # With a deadline, don't block on stragglers (their results still
+        # land in the result cache); queued work that never started is dropped
+        executor.shutdown(wait=deadline is None, cancel_futures=True)
+
+    results: Dict[str, Any] = {}
+    for name in names:
+        future = futures.get(name)
+        if future is None or not future.done() or future.cancelled():
+            error: Optional[BaseException] = TimeoutError(f"{name} missed the {timeout:.0f}s refresh budget")
+        else:
+            error = future.exception()
+        if error is None:
+            results[name] = future.result()
+            continue
+        if deadline is None:
+            raise error
+        logger.warning("Left %s out of the refresh: %s", name, error)
+        if errors is not None:
+            errors[name] = error
+    return results
+
+
+def run_query_frame(query: str, params: Optional[QueryParams] = None) -> Optional["pd.DataFrame"]:
+    """Run an arbitrary query and return the result as a DataFrame.
+
+    Args:
+        query: SQL query string (pass runtime values as @parameters)
+        params: Optional query parameters referenced by the SQL
+
+    Returns:
+        DataFrame of the result rows or None if query fails
     """
     try:
-        client = get_client()
-        df = client.query(query).to_dataframe()
-        return df.to_dict('records')
+        return _execute_dataframe(query, params)
     except GoogleCloudError as e:
         logger.error("Query failed: %s", e)
-        return []
+        return None
+
+
+def run_query(query: str, params: Optional[QueryParams] = None) -> List[Dict[str, Any]]:
+    """Run an arbitrary query and return results as list of dicts.
+
+    Loads the whole result into memory; use iter_query() for queries whose
+    result size is not known to be small (e.g. ad-hoc agent queries).
+
+    Args:
+        query: SQL query string (pass runtime values as @parameters)
+        params: Optional query parameters referenced by the SQL
+
+    Returns:
+        List of row dictionaries or empty list if query fails
+    """
+    return _frame_records(run_query_frame(query, params))
+
+
+def iter_query(
+    query: str,
+    params: Optional[QueryParams] = None,
+    page_size: int = ITER_QUERY_PAGE_SIZE,
+    max_rows: Optional[int] = None
+) -> Iterator[List[Dict[str, Any]]]:
+    """Stream a query's results one page at a time.
+
+    Unlike run_query(), the result is never loaded in full: each page is
+    fetched only when the caller asks for it, so memory stays bounded by
+    page_size no matter how large the result is. Stopping early (break, or
+    closing the generator) stops fetching pages. Results bypass the result
+    cache.
+
+    Args:
+        query: SQL query string (pass runtime values as @parameters)
+        params: Optional query parameters referenced by the SQL
+        page_size: Maximum rows per yielded batch (and per API request)
+        max_rows: Stop after this many rows in total (None = no limit)
+
+    Yields:
+        Lists of row dictionaries, at most page_size rows each
+
+    Raises:
+        ValueError: If page_size or max_rows is out of range
+        GoogleCloudError: If the query or a page fetch fails
+    """
+    if page_size < 1 or (max_rows is not None and max_rows < 0):
+        raise ValueError("page_size must be positive and max_rows non-negative")
+    if _record_dry_run(query, params, None) or max_rows == 0:
+        return
+
+    def submit() -> Tuple[Any, Any]:
+        job = get_client().query(query, job_config=_job_config(params))
+        return job, job.result(page_size=page_size, max_results=max_rows)
+
+    started = time.perf_counter()
+    try:
+        job, rows = call_bigquery(submit)
+    except Exception as e:
+        record_query(None, time.perf_counter() - started, error=str(e))
+        raise
+
+    returned = 0
+    error: Optional[str] = None
+    try:
+        for page in rows.pages:
+            batch = [dict(row.items()) for row in page]
+            if max_rows is not None:
+                batch = batch[:max_rows - returned]
+            returned += len(batch)
+            if batch:
+                yield batch
+            if max_rows is not None and returned >= max_rows:
+                return
+    except Exception as e:
+        error = str(e)
+        raise
+    finally:
+        record_query(
+            None, time.perf_counter() - started,
+            rows=returned,
+            bytes_processed=getattr(job, "total_bytes_processed", None),
+            slot_millis=getattr(job, "slot_millis", None),
+            cache_hit=getattr(job, "cache_hit", None),
+            error=error,
+        )
+
+
+_query_loader: Optional[QueryLoader] = None
+_query_loader_lock = threading.Lock()
+
+
+def get_query_loader() -> QueryLoader:
+    """Get the process-wide SQL template loader.
+
+    The first call reads and validates every SQL file; later calls reuse
+    the compiled templates (re-checking mtimes when KPI_SQL_HOT_RELOAD is set).
+
+    Raises:
+        QueryTemplateError: If any SQL file fails validation
+    """
+    global _query_loader
+    if _query_loader is not None:
+        return _query_loader
+    with _query_loader_lock:
+        if _query_loader is None:
+            _query_loader = QueryLoader(
+                (QUERIES_DIR, ANALYST_QUERIES_DIR),
+                {"PROJECT_ID": PROJECT_ID, "DATASET": DATASET},
+                hot_reload=hot_reload_enabled(),
+            )
+    return _query_loader
+
+
+def reset_query_loader() -> None:
+    """Forget the compiled templates (re-read from disk on next use)."""
+    global _query_loader
+    with _query_loader_lock:
+        _query_loader = None
 
 
 def load_query_file(filename: str) -> Optional[str]:
-    """Load SQL query from file in queries directory.
+    """Load a SQL query from the compiled template cache.
 
     Args:
-        filename: Name of SQL file (e.g., 'company_metrics.sql')
+        filename: Path relative to a queries directory (e.g., 'company_metrics.sql')
 
     Returns:
-        Query string or None if file not found
+        Query string with {PROJECT_ID} / {DATASET} filled in, or None if
+        file not found
     """
-    query_path = QUERIES_DIR / filename
-    if query_path.exists():
-        return query_path.read_text()
-    logger.warning("Query file not found: %s", query_path)
+    template = get_query_loader().get(filename)
+    if template is not None:
+        return template.sql
+    logger.warning("Query file not found: %s", QUERIES_DIR / filename)
     return None
 
 
@@ -1789,42 +3078,12 @@ def get_win_rate_90d() -> Dict[str, Any]:
     Target: 30%
     Pipeline: Default (Purchase Manual)
 
-    Query: queries/demand-sales/win-rate-90-days.sql
+    Query: data/queries/metrics/win_rate_90d.sql
 
     Returns:
         Dict with win_rate, won_count, lost_count, total_decided
     """
-    query = f"""
-    SELECT
-        COUNTIF(property_hs_is_closed_won = true) AS won_count,
-        COUNTIF(property_hs_is_closed_won = false) AS lost_count,
-        SAFE_DIVIDE(
-            COUNTIF(property_hs_is_closed_won = true),
-            COUNT(*)
-        ) AS win_rate
-    FROM `{PROJECT_ID}.src_fivetran_hubspot.deal`
-    WHERE deal_pipeline_id = 'default'
-      AND is_deleted = false
-      AND property_hs_is_closed = true
-      AND DATE(property_closedate) >= DATE_SUB(CURRENT_DATE(), INTERVAL 90 DAY)
-    """
-    try:
-        client = get_client()
-        result = list(client.query(query).result())
-        if result:
-            row = result[0]
-            won = int(row.won_count) if row.won_count else 0
-            lost = int(row.lost_count) if row.lost_count else 0
-            return {
-                "win_rate": float(row.win_rate) if row.win_rate else 0,
-                "won_count": won,
-                "lost_count": lost,
-                "total_decided": won + lost,
-            }
-        return {}
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch win rate: %s", e)
-        return {}
+    return run_metric("win_rate_90d")
 
 
 def get_avg_deal_size_ytd(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
@@ -1833,36 +3092,12 @@ def get_avg_deal_size_ytd(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
     Formula: Total Closed Won $ / Closed Won Count
     Target: $150K
 
-    Query: queries/demand-sales/avg-deal-size-ytd.sql
+    Query: data/queries/metrics/avg_deal_size_ytd.sql
 
     Returns:
         Dict with avg_deal_size, deal_count, total_revenue
     """
-    query = f"""
-    SELECT
-        AVG(SAFE_CAST(property_amount AS FLOAT64)) AS avg_deal_size,
-        COUNT(*) AS deal_count,
-        SUM(SAFE_CAST(property_amount AS FLOAT64)) AS total_revenue
-    FROM `{PROJECT_ID}.src_fivetran_hubspot.deal`
-    WHERE deal_pipeline_id = 'default'
-      AND is_deleted = false
-      AND property_hs_is_closed_won = true
-      AND EXTRACT(YEAR FROM property_closedate) = {fiscal_year}
-    """
-    try:
-        client = get_client()
-        result = list(client.query(query).result())
-        if result:
-            row = result[0]
-            return {
-                "avg_deal_size": float(row.avg_deal_size) if row.avg_deal_size else 0,
-                "deal_count": int(row.deal_count) if row.deal_count else 0,
-                "total_revenue": float(row.total_revenue) if row.total_revenue else 0,
-            }
-        return {}
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch avg deal size: %s", e)
-        return {}
+    return run_metric("avg_deal_size_ytd", fiscal_year)
 
 
 def get_sales_cycle_length(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
@@ -1871,44 +3106,19 @@ def get_sales_cycle_length(fiscal_year: int = FISCAL_YEAR) -> Dict[str, Any]:
     Formula: AVG(closedate - createdate) for closed-won deals
     Target: <=60 days
 
-    Query: queries/demand-sales/sales-cycle-length.sql
+    Query: data/queries/metrics/sales_cycle_length.sql
 
     Returns:
         Dict with avg_days, median_days, deal_count
     """
-    query = f"""
-    SELECT
-        AVG(DATE_DIFF(property_closedate, property_createdate, DAY)) AS avg_days,
-        APPROX_QUANTILES(
-            DATE_DIFF(property_closedate, property_createdate, DAY), 100
-        )[OFFSET(50)] AS median_days,
-        COUNT(*) AS deal_count
-    FROM `{PROJECT_ID}.src_fivetran_hubspot.deal`
-    WHERE deal_pipeline_id = 'default'
-      AND is_deleted = false
-      AND property_hs_is_closed_won = true
-      AND EXTRACT(YEAR FROM property_closedate) = {fiscal_year}
-    """
-    try:
-        client = get_client()
-        result = list(client.query(query).result())
-        if result:
-            row = result[0]
-            return {
-                "avg_days": float(row.avg_days) if row.avg_days else 0,
-                "median_days": int(row.median_days) if row.median_days else 0,
-                "deal_count": int(row.deal_count) if row.deal_count else 0,
-            }
-        return {}
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch sales cycle length: %s", e)
-        return {}
+    return run_metric("sales_cycle_length", fiscal_year)
 
 
 # =============================================================================
 # MARKETING METRICS
 # =============================================================================
 
+@refresh_memoized
 def get_marketing_influenced_pipeline() -> Dict[str, Any]:
     """Fetch marketing-influenced pipeline using 50/50 FT+LT attribution.
 
@@ -1950,22 +3160,16 @@ def get_marketing_influenced_pipeline() -> Dict[str, Any]:
     FROM deal_attribution da
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
-        if result:
-            row = result[0]
-            return {
-                "influenced_pipeline": float(row.influenced_pipeline) if row.influenced_pipeline else 0,
-                "ft_attribution": float(row.ft_attribution) if row.ft_attribution else 0,
-                "lt_attribution": float(row.lt_attribution) if row.lt_attribution else 0,
-                "deal_count": int(row.deal_count) if row.deal_count else 0,
-            }
-        return {}
+        result = _execute_records(query, metric="marketing_influenced_pipeline", columns={
+            "influenced_pipeline": 0.0, "ft_attribution": 0.0, "lt_attribution": 0.0, "deal_count": 0,
+        })
+        return result[0] if result else {}
     except GoogleCloudError as e:
         logger.error("Failed to fetch marketing influenced pipeline: %s", e)
         return {}
 
 
+@refresh_memoized
 def get_mql_to_sql_conversion() -> Dict[str, Any]:
     """Fetch MQL to SQL conversion rate.
 
@@ -1987,24 +3191,23 @@ def get_mql_to_sql_conversion() -> Dict[str, Any]:
         ) AS conversion_rate
     FROM `{PROJECT_ID}.src_fivetran_hubspot.contact`
     WHERE property_hs_lifecyclestage_marketingqualifiedlead_date IS NOT NULL
-      AND EXTRACT(YEAR FROM property_hs_lifecyclestage_marketingqualifiedlead_date) = {FISCAL_YEAR}
+      AND property_hs_lifecyclestage_marketingqualifiedlead_date >= @period_start
+      AND property_hs_lifecyclestage_marketingqualifiedlead_date < @period_end
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
-        if result:
-            row = result[0]
-            return {
-                "conversion_rate": float(row.conversion_rate) if row.conversion_rate else 0,
-                "mql_count": int(row.mql_count) if row.mql_count else 0,
-                "sql_count": int(row.sql_count) if row.sql_count else 0,
-            }
-        return {}
+        result = _execute_records(
+            query,
+            period_params(*fiscal_year_bounds(FISCAL_YEAR), column_type="TIMESTAMP"),
+            metric="mql_to_sql_conversion",
+            columns={"conversion_rate": 0.0, "mql_count": 0, "sql_count": 0},
+        )
+        return result[0] if result else {}
     except GoogleCloudError as e:
         logger.error("Failed to fetch MQL to SQL conversion: %s", e)
         return {}
 
 
+@refresh_memoized
 def get_marketing_leads_funnel() -> List[Dict[str, Any]]:
     """Fetch marketing leads funnel stages (ML → MQL → SQL).
 
@@ -2033,7 +3236,8 @@ def get_marketing_leads_funnel() -> List[Dict[str, Any]]:
                 ELSE 'Non-Marketing'
             END AS funnel_stage
         FROM `{PROJECT_ID}.src_fivetran_hubspot.contact` c
-        WHERE EXTRACT(YEAR FROM c.property_createdate) = EXTRACT(YEAR FROM CURRENT_DATE())
+        WHERE c.property_createdate >= @period_start
+          AND c.property_createdate < @period_end
     )
     SELECT
         funnel_stage,
@@ -2065,22 +3269,17 @@ def get_marketing_leads_funnel() -> List[Dict[str, Any]]:
         END
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
-        return [
-            {
-                "funnel_stage": row.funnel_stage,
-                "contact_count": int(row.contact_count) if row.contact_count else 0,
-                "pct_of_top_funnel": float(row.pct_of_top_funnel) if row.pct_of_top_funnel else 0,
-                "stage_conversion_rate": float(row.stage_conversion_rate) if row.stage_conversion_rate else None,
-            }
-            for row in result
-        ]
+        return _execute_records(query, period_params(
+            *fiscal_year_bounds(datetime.now().year), column_type="TIMESTAMP"
+        ), metric="marketing_leads_funnel", columns={
+            "funnel_stage": None, "contact_count": 0, "pct_of_top_funnel": 0.0, "stage_conversion_rate": None,
+        })
     except GoogleCloudError as e:
         logger.error("Failed to fetch marketing leads funnel: %s", e)
         return []
 
 
+@refresh_memoized
 def get_attribution_by_channel() -> List[Dict[str, Any]]:
     """Fetch marketing attribution by channel for closed-won deals.
 
@@ -2116,7 +3315,8 @@ def get_attribution_by_channel() -> List[Dict[str, Any]]:
         LEFT JOIN `{PROJECT_ID}.src_fivetran_hubspot.deal_contact` dc
             ON d.deal_id = dc.deal_id
         WHERE d.property_hs_is_closed_won = TRUE
-          AND EXTRACT(YEAR FROM d.property_closedate) = EXTRACT(YEAR FROM CURRENT_DATE())
+          AND d.property_closedate >= @period_start
+          AND d.property_closedate < @period_end
     ),
     deal_attribution AS (
         SELECT
@@ -2156,20 +3356,17 @@ def get_attribution_by_channel() -> List[Dict[str, Any]]:
     ORDER BY total_attributed_revenue DESC
     """
     try:
-        client = get_client()
-        result = list(client.query(query).result())
-        return [
-            {
-                "channel": row.channel,
-                "channel_group": row.channel_group,
-                "deal_count": int(row.deal_count) if row.deal_count else 0,
-                "first_touch_revenue": float(row.first_touch_revenue) if row.first_touch_revenue else 0,
-                "last_touch_revenue": float(row.last_touch_revenue) if row.last_touch_revenue else 0,
-                "total_attributed_revenue": float(row.total_attributed_revenue) if row.total_attributed_revenue else 0,
-                "pct_of_total": float(row.pct_of_total) if row.pct_of_total else 0,
-            }
-            for row in result
-        ]
+        return _execute_records(query, period_params(
+            *fiscal_year_bounds(datetime.now().year), column_type="TIMESTAMP"
+        ), metric="attribution_by_channel", columns={
+            "channel": None,
+            "channel_group": None,
+            "deal_count": 0,
+            "first_touch_revenue": 0.0,
+            "last_touch_revenue": 0.0,
+            "total_attributed_revenue": 0.0,
+            "pct_of_total": 0.0,
+        })
     except GoogleCloudError as e:
         logger.error("Failed to fetch attribution by channel: %s", e)
         return []
@@ -2179,7 +3376,8 @@ def get_attribution_by_channel() -> List[Dict[str, Any]]:
 # SUPPLY NPR (NET PAYOUT RETENTION) METRICS
 # =============================================================================
 
-def get_supplier_development() -> List[Dict[str, Any]]:
+@refresh_memoized
+def get_supplier_development_frame() -> Optional["pd.DataFrame"]:
     """Fetch Supplier_Development view data.
 
     Returns supplier-level data including:
@@ -2190,7 +3388,8 @@ def get_supplier_development() -> List[Dict[str, Any]]:
     - npr_YYYY: Net Payout Retention by year
 
     Returns:
-        List of supplier records or empty list if query fails
+        DataFrame of supplier records or None if query fails. Shared within
+        a refresh, so treat it as read-only
     """
     query = f"""
     SELECT *
@@ -2198,15 +3397,24 @@ def get_supplier_development() -> List[Dict[str, Any]]:
     ORDER BY total_payout DESC
     """
     try:
-        client = get_client()
-        df = client.query(query).to_dataframe()
-        return df.to_dict('records')
+        df = _execute_dataframe(query, metric="supplier_development")
+        return df
     except GoogleCloudError as e:
         logger.error("Failed to fetch Supplier Development: %s", e)
-        return []
+        return None
 
 
-def get_supplier_cohort_matrix() -> List[Dict[str, Any]]:
+def get_supplier_development() -> List[Dict[str, Any]]:
+    """Fetch Supplier_Development rows as a list of row dicts.
+
+    Materializes one dict per row; display code should use
+    get_supplier_development_frame() instead.
+    """
+    return _frame_records(get_supplier_development_frame())
+
+
+@refresh_memoized
+def get_supplier_cohort_matrix_frame() -> Optional["pd.DataFrame"]:
     """Fetch cohort_payout_retention_matrix_by_supplier data.
 
     Returns cohort retention matrix with 3 charts:
@@ -2215,7 +3423,8 @@ def get_supplier_cohort_matrix() -> List[Dict[str, Any]]:
     - NPR_PERCENT: Net Payout Retention % (base year = 100%)
 
     Returns:
-        List of cohort records or empty list if query fails
+        DataFrame of cohort records or None if query fails. Shared within
+        a refresh, so treat it as read-only
     """
     query = f"""
     SELECT *
@@ -2225,14 +3434,58 @@ def get_supplier_cohort_matrix() -> List[Dict[str, Any]]:
         first_year NULLS LAST
     """
     try:
-        client = get_client()
-        df = client.query(query).to_dataframe()
-        return df.to_dict('records')
+        df = _execute_dataframe(query, metric="supplier_cohort_matrix")
+        return df
     except GoogleCloudError as e:
         logger.error("Failed to fetch supplier cohort matrix: %s", e)
-        return []
+        return None
+
+
+def get_supplier_cohort_matrix() -> List[Dict[str, Any]]:
+    """Fetch the supplier cohort matrix as a list of row dicts.
+
+    Materializes one dict per row; display code should use
+    get_supplier_cohort_matrix_frame() instead.
+    """
+    return _frame_records(get_supplier_cohort_matrix_frame())
+
+
+def _supplier_core_action_rows(staging: Dict[str, Any]) -> List[CachedRow]:
+    """Classify staged suppliers by 2024 vs 2025 payouts, one row per state.
+
+    Unlinked payouts count as a single "Unlinked" supplier. A supplier is
+    'loosing' when its 2025 payouts dropped more than 50% from 2024.
+    """
+    states: Dict[str, Dict[str, float]] = {}
+    pivot = _supplier_year_pivot(staging, (2024, 2025), unlinked_label=_UNLINKED_SUPPLIER)
+    for by_year in pivot.values():
+        payout_2024, payout_2025 = by_year[2024], by_year[2025]
+        if payout_2025 > 0 and payout_2024 > 0:
+            state = 'loosing' if (payout_2024 - payout_2025) / payout_2024 > 0.50 else 'active'
+        elif payout_2025 > 0:
+            state = 'active'
+        elif payout_2024 > 0:
+            state = 'lost'
+        else:
+            continue
+        totals = states.setdefault(state, {"count": 0, "total_2024": 0.0, "total_2025": 0.0})
+        totals["count"] += 1
+        totals["total_2024"] += payout_2024
+        totals["total_2025"] += payout_2025
+
+    return [
+        CachedRow(
+            core_action_state=state,
+            count=totals["count"],
+            total_2024=round(totals["total_2024"], 2),
+            total_2025=round(totals["total_2025"], 2),
+            total_ltv=round(totals["total_2024"] + totals["total_2025"], 2),
+        )
+        for state, totals in states.items()
+    ]
 
 
+@refresh_memoized
 def get_core_action_state_counts(entity: str = 'supplier') -> Dict[str, Any]:
     """Fetch Active/Loosing/Lost counts for dashboard.
 
@@ -2247,82 +3500,10 @@ def get_core_action_state_counts(entity: str = 'supplier') -> Dict[str, Any]:
         - total: aggregate counts
     """
     if entity == 'supplier':
-        query = f"""
-        WITH payout_accounts AS (
-          SELECT id as account_id
-          FROM `{PROJECT_ID}.src_fivetran_qbo.account`
-          WHERE _fivetran_deleted = FALSE
-            AND account_number IN ('4200', '4210', '4220', '4230')
-        ),
-        remittance_supplier_map AS (
-          SELECT DISTINCT rli.bill_number, rli.ctx.supplier.org.name as supplier_org_name
-          FROM `{PROJECT_ID}.mongodb.remittance_line_items` rli
-          WHERE rli.bill_number IS NOT NULL AND rli.ctx.supplier.org.name IS NOT NULL
-        ),
-        qbo_payout_bills AS (
-          SELECT REGEXP_REPLACE(b.doc_number, r'_\\d+$', '') as base_bill_number,
-            EXTRACT(YEAR FROM b.transaction_date) as txn_year,
-            SUM(CAST(bl.amount AS FLOAT64)) as bill_amount
-          FROM `{PROJECT_ID}.src_fivetran_qbo.bill` b
-          JOIN `{PROJECT_ID}.src_fivetran_qbo.bill_line` bl ON b.id = bl.bill_id
-          JOIN payout_accounts pa ON bl.account_expense_account_id = pa.account_id
-          WHERE b._fivetran_deleted = FALSE AND EXTRACT(YEAR FROM b.transaction_date) IN (2024, 2025)
-          GROUP BY 1, 2
-        ),
-        qbo_payout_credits AS (
-          SELECT REGEXP_REPLACE(vc.doc_number, r'(_credit|c\\d+)$', '') as bill_number,
-            EXTRACT(YEAR FROM vc.transaction_date) as credit_year,
-            SUM(CAST(vcl.amount AS FLOAT64)) as credit_amount
-          FROM `{PROJECT_ID}.src_fivetran_qbo.vendor_credit` vc
-          JOIN `{PROJECT_ID}.src_fivetran_qbo.vendor_credit_line` vcl ON vc.id = vcl.vendor_credit_id
-          JOIN payout_accounts pa ON vcl.account_expense_account_id = pa.account_id
-          WHERE vc._fivetran_deleted = FALSE
-            AND REGEXP_CONTAINS(vc.doc_number, r'(_credit|c\\d+)$')
-            AND EXTRACT(YEAR FROM vc.transaction_date) IN (2024, 2025)
-          GROUP BY 1, 2
-        ),
-        bills_with_supplier AS (
-          SELECT COALESCE(rsm.supplier_org_name, 'Unlinked') as supplier_org_name, b.txn_year,
-            b.bill_amount, 0.0 as credit_amount
-          FROM qbo_payout_bills b
-          LEFT JOIN remittance_supplier_map rsm ON b.base_bill_number = rsm.bill_number
-        ),
-        credits_with_supplier AS (
-          SELECT COALESCE(rsm.supplier_org_name, 'Unlinked') as supplier_org_name, c.credit_year as txn_year,
-            0.0 as bill_amount, c.credit_amount
-          FROM qbo_payout_credits c
-          LEFT JOIN remittance_supplier_map rsm ON c.bill_number = rsm.bill_number
-        ),
-        all_transactions AS (
-          SELECT * FROM bills_with_supplier UNION ALL SELECT * FROM credits_with_supplier
-        ),
-        supplier_yearly_payouts AS (
-          SELECT supplier_org_name, txn_year, SUM(bill_amount) - SUM(credit_amount) as net_payouts
-          FROM all_transactions GROUP BY supplier_org_name, txn_year
-        ),
-        supplier_pivot AS (
-          SELECT supplier_org_name,
-            SUM(CASE WHEN txn_year = 2024 THEN net_payouts ELSE 0 END) as payout_2024,
-            SUM(CASE WHEN txn_year = 2025 THEN net_payouts ELSE 0 END) as payout_2025,
-            SUM(net_payouts) as total_ltv
-          FROM supplier_yearly_payouts GROUP BY supplier_org_name
-        ),
-        supplier_states AS (
-          SELECT supplier_org_name, payout_2024, payout_2025, total_ltv,
-            CASE
-              WHEN payout_2025 > 0 AND payout_2024 > 0 THEN
-                CASE WHEN (payout_2024 - payout_2025) / NULLIF(payout_2024, 0) > 0.50 THEN 'loosing' ELSE 'active' END
-              WHEN payout_2025 > 0 THEN 'active'
-              WHEN payout_2024 > 0 THEN 'lost'
-              ELSE 'inactive'
-            END as core_action_state
-          FROM supplier_pivot WHERE payout_2024 > 0 OR payout_2025 > 0
-        )
-        SELECT core_action_state, COUNT(*) as count,
-          ROUND(SUM(payout_2024), 2) as total_2024, ROUND(SUM(payout_2025), 2) as total_2025,
-          ROUND(SUM(total_ltv), 2) as total_ltv
-        FROM supplier_states GROUP BY core_action_state
-        """
+        staging = get_supply_payout_staging()
+        if staging is None:
+            return {}
+        results = _supplier_core_action_rows(staging)
     else:
         # Customer entity
         query = f"""
@@ -2347,87 +3528,81 @@ def get_core_action_state_counts(entity: str = 'supplier') -> Dict[str, Any]:
           ROUND(SUM(revenue_2024), 2) as total_2024, ROUND(SUM(revenue_2025), 2) as total_2025
         FROM customer_states GROUP BY core_action_state
         """
+        try:
+            results = _execute(query, [], metric="core_action_state_counts")
+        except GoogleCloudError as e:
+            logger.error("Failed to fetch core action state counts for %s: %s", entity, e)
+            return {}
 
-    try:
-        client = get_client()
-        results = list(client.query(query).result())
-
-        response = {
-            "active": {"count": 0, "total_2024": 0, "total_2025": 0, "total_ltv": 0},
-            "loosing": {"count": 0, "total_2024": 0, "total_2025": 0, "total_ltv": 0},
-            "lost": {"count": 0, "total_2024": 0, "total_2025": 0, "total_ltv": 0},
-            "inactive": {"count": 0, "total_2024": 0, "total_2025": 0, "total_ltv": 0},
-            "entity": entity,
-        }
+    response = {
+        "active": {"count": 0, "total_2024": 0, "total_2025": 0, "total_ltv": 0},
+        "loosing": {"count": 0, "total_2024": 0, "total_2025": 0, "total_ltv": 0},
+        "lost": {"count": 0, "total_2024": 0, "total_2025": 0, "total_ltv": 0},
+        "inactive": {"count": 0, "total_2024": 0, "total_2025": 0, "total_ltv": 0},
+        "entity": entity,
+    }
 
-        for row in results:
-            state = row.core_action_state
-            if state in response:
-                response[state]["count"] = int(row.count or 0)
-                response[state]["total_2024"] = float(row.total_2024 or 0)
-                response[state]["total_2025"] = float(row.total_2025 or 0)
-                # total_ltv only available for supplier entity
-                response[state]["total_ltv"] = float(getattr(row, 'total_ltv', 0) or 0)
-
-        # Calculate totals
-        response["total"] = {
-            "count": sum(response[s]["count"] for s in ["active", "loosing", "lost", "inactive"]),
-            "total_2024": sum(response[s]["total_2024"] for s in ["active", "loosing", "lost", "inactive"]),
-            "total_2025": sum(response[s]["total_2025"] for s in ["active", "loosing", "lost", "inactive"]),
-            "total_ltv": sum(response[s]["total_ltv"] for s in ["active", "loosing", "lost", "inactive"]),
-        }
+    for row in results:
+        state = row.core_action_state
+        if state in response:
+            response[state]["count"] = int(row.count or 0)
+            response[state]["total_2024"] = float(row.total_2024 or 0)
+            response[state]["total_2025"] = float(row.total_2025 or 0)
+            # total_ltv only available for supplier entity
+            response[state]["total_ltv"] = float(getattr(row, 'total_ltv', 0) or 0)
+
+    # Calculate totals
+    response["total"] = {
+        "count": sum(response[s]["count"] for s in ["active", "loosing", "lost", "inactive"]),
+        "total_2024": sum(response[s]["total_2024"] for s in ["active", "loosing", "lost", "inactive"]),
+        "total_2025": sum(response[s]["total_2025"] for s in ["active", "loosing", "lost", "inactive"]),
+        "total_ltv": sum(response[s]["total_ltv"] for s in ["active", "loosing", "lost", "inactive"]),
+    }
 
-        return response
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch core action state counts for %s: %s", entity, e)
-        return {}
+    return response
 
 
-def get_supply_npr_summary_by_year() -> List[Dict[str, Any]]:
+@refresh_memoized
+def get_supply_npr_summary_by_year_frame() -> Optional["pd.DataFrame"]:
     """Fetch Supply NPR summary by year for P&L validation.
 
-    Returns aggregate supplier payouts by year that should match QBO P&L exactly.
+    Returns aggregate supplier payouts by year that should match QBO P&L exactly
+    (every payout bill and vendor credit, linked to a supplier or not).
 
     Returns:
-        List of yearly summary records with gross_bills, vendor_credits, net_payouts, npr_vs_prior_year
+        DataFrame of yearly summary records (gross_bills, vendor_credits,
+        net_payouts, npr_vs_prior_year) or None if query fails
     """
-    query = f"""
-    WITH payout_accounts AS (
-      SELECT id as account_id
-      FROM `{PROJECT_ID}.src_fivetran_qbo.account`
-      WHERE _fivetran_deleted = FALSE AND account_number IN ('4200', '4210', '4220', '4230')
-    ),
-    all_bills AS (
-      SELECT EXTRACT(YEAR FROM b.transaction_date) as txn_year, SUM(CAST(bl.amount AS FLOAT64)) as gross_bills
-      FROM `{PROJECT_ID}.src_fivetran_qbo.bill` b
-      JOIN `{PROJECT_ID}.src_fivetran_qbo.bill_line` bl ON b.id = bl.bill_id
-      JOIN payout_accounts pa ON bl.account_expense_account_id = pa.account_id
-      WHERE b._fivetran_deleted = FALSE
-      GROUP BY 1
-    ),
-    all_credits AS (
-      SELECT EXTRACT(YEAR FROM vc.transaction_date) as txn_year, SUM(CAST(vcl.amount AS FLOAT64)) as vendor_credits
-      FROM `{PROJECT_ID}.src_fivetran_qbo.vendor_credit` vc
-      JOIN `{PROJECT_ID}.src_fivetran_qbo.vendor_credit_line` vcl ON vc.id = vcl.vendor_credit_id
-      JOIN payout_accounts pa ON vcl.account_expense_account_id = pa.account_id
-      WHERE vc._fivetran_deleted = FALSE
-      GROUP BY 1
-    ),
-    yearly_totals AS (
-      SELECT COALESCE(b.txn_year, c.txn_year) as year,
-        COALESCE(b.gross_bills, 0) as gross_bills, COALESCE(c.vendor_credits, 0) as vendor_credits,
-        COALESCE(b.gross_bills, 0) - COALESCE(c.vendor_credits, 0) as net_payouts
-      FROM all_bills b FULL OUTER JOIN all_credits c ON b.txn_year = c.txn_year
+    import pandas as pd
+
+    staging = get_supply_payout_staging()
+    if staging is None:
+        return None
+
+    records = []
+    prior_net = None
+    for year in sorted(staging["ledger"]):
+        gross_bills, vendor_credits = staging["ledger"][year]
+        net_payouts = gross_bills - vendor_credits
+        # Staging starts a year early only to give 2022 its prior year
+        if year >= 2022:
+            records.append({
+                "year": year,
+                "gross_bills": round(gross_bills, 2),
+                "vendor_credits": round(vendor_credits, 2),
+                "net_payouts": round(net_payouts, 2),
+                "npr_vs_prior_year": round(net_payouts / prior_net * 100, 1) if prior_net else None,
+            })
+        prior_net = net_payouts
+    return pd.DataFrame.from_records(
+        records, columns=["year", "gross_bills", "vendor_credits", "net_payouts", "npr_vs_prior_year"]
     )
-    SELECT year, ROUND(gross_bills, 2) as gross_bills, ROUND(vendor_credits, 2) as vendor_credits,
-      ROUND(net_payouts, 2) as net_payouts,
-      ROUND(net_payouts / NULLIF(LAG(net_payouts) OVER (ORDER BY year), 0) * 100, 1) as npr_vs_prior_year
-    FROM yearly_totals WHERE year >= 2022 ORDER BY year
+
+
+def get_supply_npr_summary_by_year() -> List[Dict[str, Any]]:
+    """Fetch the supply NPR summary by year as a list of row dicts.
+
+    Materializes one dict per row; display code should use
+    get_supply_npr_summary_by_year_frame() instead.
     """
-    try:
-        client = get_client()
-        df = client.query(query).to_dataframe()
-        return df.to_dict('records')
-    except GoogleCloudError as e:
-        logger.error("Failed to fetch supply NPR summary: %s", e)
-        return []
+    return _frame_records(get_supply_npr_summary_by_year_frame())
@@ -0,0 +1,130 @@
+"""
+Cost Report - Dry-run every metric query and print the estimated bytes scanned.
+
+Every get_* metric in bigquery_client is called inside dry_run_scope(), so
+each query it would issue is dry-run instead (nothing is scanned or billed).
+The report lists each metric's estimate next to its maximum_bytes_billed cap,
+so a query that regresses into a full-table scan is caught before it ships.
+
+Usage (from the dashboard/ directory):
+    python -m data.cost_report
+    python -m data.cost_report --fiscal-year 2025 --quarter Q3
+
+Exits with status 1 if any estimate exceeds its cap or any dry run fails.
+"""
+
+import argparse
+import inspect
+import logging
+import sys
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from . import bigquery_client as bq
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# get_* functions in bigquery_client that are not metric queries
+NOT_METRICS = {"get_client", "get_table_watermarks"}
+
+# Extra calls for metrics whose query depends on an argument with no useful default
+EXTRA_CALLS: List[Tuple[str, Dict[str, Any]]] = [
+    ("get_core_action_state_counts", {"entity": "customer"}),
+]
+
+
+def metric_functions() -> Dict[str, Callable[..., Any]]:
+    """Return every get_* metric function defined in bigquery_client."""
+    return {
+        name: fn
+        for name, fn in inspect.getmembers(bq, inspect.isfunction)
+        if name.startswith("get_") and name not in NOT_METRICS and fn.__module__ == bq.__name__
+    }
+
+
+def estimate_metric_bytes(fiscal_year: int = bq.FISCAL_YEAR, quarter: Optional[str] = None) -> Dict[str, Optional[int]]:
+    """Dry-run every metric query and total the estimates per metric.
+
+    Args:
+        fiscal_year: Fiscal year passed to metrics that take one
+        quarter: Quarter ("Q1".."Q4") passed to metrics that take one
+
+    Returns:
+        Dict mapping metric name to estimated bytes processed, or None if any
+        of its dry runs failed
+    """
+    arguments = {
+        "fiscal_year": fiscal_year,
+        "quarter": quarter,
+        "years": (fiscal_year - 2, fiscal_year - 1, fiscal_year),
+    }
+    calls = [
+        (fn, {k: v for k, v in arguments.items() if k in inspect.signature(fn).parameters})
+        for fn in metric_functions().values()
+    ]
+    calls += [(getattr(bq, name), kwargs) for name, kwargs in EXTRA_CALLS]
+
+    with bq.dry_run_scope() as estimates:
+        for fn, kwargs in calls:
+            try:
+                fn(**kwargs)
+            except Exception as e:
+                logger.warning("%s raised during dry run: %s", fn.__name__, e)
+
+    totals: Dict[str, Optional[int]] = {}
+    for (metric, _key), estimate in estimates.items():
+        if estimate is None or totals.get(metric, 0) is None:
+            totals[metric] = None
+        else:
+            totals[metric] = totals.get(metric, 0) + estimate
+    return dict(sorted(totals.items()))
+
+
+def _format_bytes(value: Optional[int]) -> str:
+    if value is None:
+        return "FAILED"
+    size = float(value)
+    for unit in ("B", "KB", "MB"):
+        if size < 1024:
+            return f"{size:.0f} B" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def format_report(totals: Dict[str, Optional[int]]) -> Tuple[str, bool]:
+    """Render the estimates as a text table.
+
+    Returns:
+        Tuple of (report text, True if every estimate is within its cap)
+    """
+    lines = [f"{'metric':<32} {'estimate':>12} {'cap':>12} {'% of cap':>9}"]
+    ok = True
+    for metric, estimate in totals.items():
+        cap = bq.max_bytes_billed(metric)
+        if estimate is None:
+            share, flag, ok = "", "  <-- dry run failed", False
+        else:
+            share = f"{estimate / cap:.0%}"
+            flag = "  <-- OVER CAP" if estimate > cap else ""
+            ok = ok and estimate <= cap
+        lines.append(f"{metric:<32} {_format_bytes(estimate):>12} {_format_bytes(cap):>12} {share:>9}{flag}")
+    known = [e for e in totals.values() if e is not None]
+    lines.append(f"{'total':<32} {_format_bytes(sum(known)):>12}")
+    return "\n".join(lines), ok
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Dry-run every metric query and report estimated bytes.")
+    parser.add_argument("--fiscal-year", type=int, default=bq.FISCAL_YEAR)
+    parser.add_argument("--quarter", choices=["Q1", "Q2", "Q3", "Q4"], default=None)
+    args = parser.parse_args(argv)
+
+    logging.basicConfig(level=logging.WARNING)
+    report, ok = format_report(estimate_metric_bytes(args.fiscal_year, args.quarter))
+    print(report)
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
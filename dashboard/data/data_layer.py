@@ -9,12 +9,16 @@ Data source priority:
 Targets are loaded from targets.json with time-based caching.
 """
 
+import contextlib
+import contextvars
 import json
 import logging
+import threading
 import time
 from datetime import datetime
+from functools import partial
 from pathlib import Path
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, Iterator, List, Optional, Tuple
 
 # Configure logging
 logger = logging.getLogger(__name__)
@@ -26,16 +30,58 @@ logger = logging.getLogger(__name__)
 # Flag to enable/disable BigQuery (set to False to force mock data)
 USE_BIGQUERY = True
 
-# Try to import BigQuery client
-_bigquery_available = False
-try:
-    from . import bigquery_client as bq
-    _bigquery_available = True
-    logger.info("BigQuery client loaded successfully")
-except ImportError as e:
-    logger.warning("BigQuery client not available: %s", e)
-except Exception as e:
-    logger.warning("Error loading BigQuery client: %s", e)
+from .fetch_planner import plan
+from .fiscal import FISCAL_YEAR, PRIOR_FISCAL_YEAR
+from .lazy_import import LazyModule, module_available
+from .offline_replica import replica_dir
+from .shared_cache import get_shared_store
+from .telemetry import metric_stats
+
+# The BigQuery client is imported on first use, not at startup: with its
+# dependencies it is most of the server's boot time, and pages that only
+# show targets or mock data never need it
+_bigquery_available = module_available("google.cloud.bigquery")
+bq = LazyModule(f"{__package__}.bigquery_client")
+if not _bigquery_available:
+    logger.warning("BigQuery client not available: google-cloud-bigquery is not installed")
+
+
+def refresh_scope():
+    """Context manager that deduplicates BigQuery calls for one page refresh.
+
+    Wraps bigquery_client.refresh_scope() so repeated calls such as
+    get_pipeline_details() (used by the Overview, Demand Sales and the
+    pipeline coverage metric) run their query once per refresh. Falls back
+    to a no-op context when BigQuery is disabled or unavailable.
+    """
+    if USE_BIGQUERY and _bigquery_available:
+        return bq.refresh_scope()
+    return contextlib.nullcontext()
+
+
+@contextlib.contextmanager
+def page_scope(page: str) -> Iterator[None]:
+    """Declare which page is rendering, so only its snapshot parts are fetched.
+
+    Args:
+        page: Page key (see PAGE_SNAPSHOT_PARTS)
+    """
+    token = _current_page.set(page)
+    try:
+        yield
+    finally:
+        _current_page.reset(token)
+
+
+def plan_page_fetches(page: str) -> List[Tuple[str, ...]]:
+    """Return the staged fetch plan for a page (empty if it renders no snapshot part).
+
+    Raises:
+        RuntimeError: If BigQuery is unavailable
+    """
+    if not _bigquery_available:
+        raise RuntimeError("BigQuery client not available")
+    return plan(PAGE_SNAPSHOT_PARTS.get(page, ()), bq.company_metric_fetches(FISCAL_YEAR))
 
 # =============================================================================
 # DATA SOURCE STATUS TRACKING
@@ -44,7 +90,9 @@ except Exception as e:
 # Track whether last data fetch used live BigQuery data
 _data_source_status = {
     "is_live": False,
-    "source": "mock",  # "bigquery" or "mock"
+    # "bigquery", "bigquery (cached)", "bigquery (stale)" or "mock"; "offline
+    # replica" in place of "bigquery" when KPI_OFFLINE_REPLICA is set
+    "source": "mock",
     "last_updated": None,
     "error": None,
 }
@@ -54,9 +102,33 @@ def get_data_source_status() -> Dict[str, Any]:
     """Get the current data source status.
 
     Returns:
-        Dictionary with is_live, source, last_updated, and error fields
+        Dictionary with is_live, source, last_updated, and error fields, plus
+        snapshot_at / snapshot_age_seconds for the BigQuery snapshot being
+        served (None before the first successful fetch) and stale_metrics,
+        the snapshot parts that missed the last refresh budget
+    """
+    status = _data_source_status.copy()
+    freshness = (_bq_cache["data"] or {}).get("freshness", {})
+    status["stale_metrics"] = sorted(key for key, tag in freshness.items() if tag == "stale")
+    snapshot_time = _bq_cache["timestamp"] if _bq_cache["data"] is not None else 0
+    if snapshot_time:
+        status["snapshot_at"] = datetime.fromtimestamp(snapshot_time).isoformat()
+        status["snapshot_age_seconds"] = int(time.time() - snapshot_time)
+    else:
+        status["snapshot_at"] = None
+        status["snapshot_age_seconds"] = None
+    return status
+
+
+def get_query_telemetry() -> Dict[str, Dict[str, Any]]:
+    """Get per-metric query latency stats for this server process.
+
+    Returns:
+        Dict mapping metric name to count, p50_ms, p95_ms, errors,
+        cache_hits, bytes_processed and slot_millis, slowest p95 first
+        (see data/telemetry.py)
     """
-    return _data_source_status.copy()
+    return metric_stats()
 
 
 # Metric verification status based on METRIC-IMPLEMENTATION-TRACKER.md
@@ -95,6 +167,11 @@ def _set_data_source(is_live: bool, source: str, error: Optional[str] = None):
     _data_source_status["last_updated"] = datetime.now().isoformat()
     _data_source_status["error"] = error
 
+
+def _live_source() -> str:
+    """Name of the source live queries run against."""
+    return "offline replica" if replica_dir() is not None else "bigquery"
+
 # =============================================================================
 # CACHING CONFIGURATION
 # =============================================================================
@@ -106,6 +183,84 @@ _cache: Dict[str, Any] = {"data": None, "timestamp": 0}
 _BQ_CACHE_TTL = 60  # seconds - cache BigQuery results for 1 minute
 _bq_cache: Dict[str, Any] = {"data": None, "timestamp": 0}
 
+# Stale-while-revalidate: after the first successful fetch, a background
+# thread re-fetches shortly before the snapshot expires. Viewers always get
+# the last good snapshot immediately and never wait on BigQuery.
+_BQ_REFRESH_AHEAD = 10  # seconds before expiry to start the background refresh
+_BQ_RETRY_DELAY = 30  # seconds between retries after a failed background refresh
+_bq_refresh_lock = threading.Lock()  # held while a fetch is running
+_bq_refresher_lock = threading.Lock()  # guards starting the refresher thread
+_bq_refresher: Optional[threading.Thread] = None
+_bq_refresher_stop = threading.Event()
+_bq_last_error: Optional[str] = None
+
+# Multiple replicas share the snapshot through data/shared_cache.py (when
+# KPI_CACHE_DIR is set); a file lock lets one replica refresh at a time
+_BQ_SNAPSHOT_NAME = "company_metrics"
+_BQ_LOCK_WAIT = 120  # cold start: seconds to wait on another replica's refresh
+
+# Deadline budget for one refresh. Metrics that miss it (or fail) keep their
+# previous value, tagged "stale" in the snapshot's "freshness" map, so one
+# slow view query can't block the page or reset it to mock data.
+_BQ_REFRESH_BUDGET = 20  # seconds
+_BQ_BUDGET_GRACE = 1  # extra seconds to collect get_company_metrics' partial result
+
+# Snapshot part (bigquery_client.company_metric_fetches() name) each
+# COMPANY_METRICS key is read from. Keys not listed are targets.
+_SNAPSHOT_DETAILS = ("pipeline", "ttf", "customer_concentration")  # stored beside "metrics", not in it
+_METRIC_PARTS: Dict[str, str] = {
+    "revenue_actual": "revenue_ytd",
+    "take_rate_actual": "take_rate",
+    "gross_margin_actual": "take_rate",
+    "nrr": "demand_nrr",
+    "supply_nrr": "supply_nrr",
+    "customer_count": "customer_count",
+    "logo_retention": "logo_retention",
+    "pipeline_coverage": "pipeline_coverage",
+    "concentration_top1": "customer_concentration",
+    "concentration_top1_name": "customer_concentration",
+    **{key: "pipeline" for key in (
+        "pipeline_quarterly_goal", "pipeline_closed_won", "pipeline_remaining",
+        "pipeline_weighted", "pipeline_gap", "pipeline_weighted_coverage_gap",
+    )},
+    **{key: "ttf" for key in (
+        "time_to_fulfill_median", "time_to_fulfill_avg", "time_to_fulfill_count",
+        "time_to_fulfill_fulfilled", "time_to_fulfill_in_progress",
+    )},
+}
+_FULL_SNAPSHOT = tuple(dict.fromkeys(_METRIC_PARTS.values()))
+
+# COMPANY_METRICS keys each page's renderers in app.py read (the revenue
+# cards read revenue_actual through get_revenue_time_horizons()). Pages not
+# listed read none.
+_PAGE_METRIC_KEYS: Dict[str, Tuple[str, ...]] = {
+    "overview": (
+        "revenue_actual", "take_rate_actual", "nrr", "supply_nrr", "pipeline_coverage",
+        "time_to_fulfill_median", "logo_retention", "customer_count",
+        "concentration_top1", "concentration_top1_name",
+    ),
+    "ceo": ("revenue_actual", "pipeline_coverage", "concentration_top1", "concentration_top1_name"),
+    "coo": ("take_rate_actual", "concentration_top1", "concentration_top1_name"),
+    "demand_sales": ("pipeline_coverage",),
+}
+
+# Snapshot parts each page renders. A refresh fetches only the parts pages
+# have asked for, planned with their dependencies, so a department page does
+# not pay for the Overview's queries.
+PAGE_SNAPSHOT_PARTS: Dict[str, Tuple[str, ...]] = {
+    page: tuple(dict.fromkeys(_METRIC_PARTS[key] for key in keys))
+    for page, keys in _PAGE_METRIC_KEYS.items()
+}
+
+# Page being rendered (set by page_scope(); None = unknown, fetch everything)
+_current_page: contextvars.ContextVar[Optional[str]] = contextvars.ContextVar("kpi_current_page", default=None)
+
+# Parts any page has asked for in this process; the background refresher
+# keeps exactly these current
+_bq_demand: Dict[str, None] = {}
+_bq_demand_lock = threading.Lock()
+_bq_fill_failed_at = 0.0  # last failed fetch of parts missing from the snapshot
+
 TARGETS_FILE = Path(__file__).parent / "targets.json"
 
 
@@ -185,61 +340,276 @@ def _get_mock_company_metrics() -> Dict[str, Any]:
     }
 
 
-def _fetch_bigquery_metrics() -> Optional[Dict[str, Any]]:
-    """Fetch all BigQuery metrics with caching.
+def _demanded_parts() -> Tuple[str, ...]:
+    """Snapshot parts pages have asked for so far (all of them before any page has)."""
+    with _bq_demand_lock:
+        return tuple(_bq_demand) or _FULL_SNAPSHOT
+
+
+def _note_demand(parts: Tuple[str, ...]) -> None:
+    with _bq_demand_lock:
+        for part in parts:
+            _bq_demand.setdefault(part, None)
+
 
-    Returns cached data if still fresh, otherwise fetches from BigQuery.
-    Returns None if BigQuery is unavailable or query fails.
+def _missing_parts(data: Optional[Dict[str, Any]], parts: Tuple[str, ...]) -> Tuple[str, ...]:
+    """Parts no refresh has attempted yet (a stale part counts as present).
+
+    A snapshot without a freshness map predates page-scoped refreshes and
+    holds every part.
     """
-    global _bq_cache
-    current_time = time.time()
+    if data is not None and "freshness" not in data:
+        return ()
+    attempted = (data or {}).get("freshness", {})
+    return tuple(part for part in parts if part not in attempted)
 
-    # Return cached result if still fresh (includes cached failures)
-    if _bq_cache["timestamp"] > 0 and (current_time - _bq_cache["timestamp"]) < _BQ_CACHE_TTL:
-        cache_age = int(current_time - _bq_cache["timestamp"])
-        if _bq_cache["data"] is not None:
-            logger.debug("Using cached BigQuery data (%ds old)", cache_age)
-            _set_data_source(True, "bigquery (cached)")
-        else:
-            logger.debug("Using cached BQ failure (%ds old)", cache_age)
-        return _bq_cache["data"]
 
-    # Not cached or expired - fetch fresh data
-    if not USE_BIGQUERY or not _bigquery_available:
+def _refresh_bigquery_snapshot(parts: Optional[Tuple[str, ...]] = None) -> Optional[Dict[str, Any]]:
+    """Fetch BigQuery metrics and publish them as the current snapshot.
+
+    The previous snapshot stays in place unless the fetch succeeds. Parts
+    not being refreshed keep their previous value and freshness tag.
+
+    The fetch must finish within _BQ_REFRESH_BUDGET. Requested parts that
+    miss it, or whose query failed (the fetcher returned None), keep their
+    value from the previous snapshot and are tagged "stale" in the
+    "freshness" map; the rest are tagged "fresh".
+
+    Args:
+        parts: Snapshot parts to fetch (default: every part pages have asked for)
+
+    Returns:
+        The new snapshot, or None if nothing new could be fetched
+
+    Raises:
+        Exception: Whatever the BigQuery client raised
+    """
+    global _bq_last_error
+    parts = _demanded_parts() if parts is None else parts
+    logger.info("🔄 Fetching fresh data from BigQuery: %s", ", ".join(parts))
+
+    # One planned fetch: dependencies run first, shared queries run once
+    errors: Dict[str, BaseException] = {}
+    with refresh_scope():
+        fetched = bq.run_within_deadline({
+            "metrics": partial(bq.get_company_metrics, timeout=_BQ_REFRESH_BUDGET, metrics=parts),
+        }, timeout=_BQ_REFRESH_BUDGET + _BQ_BUDGET_GRACE, errors=errors).get("metrics") or {}
+
+    # Fetchers return None (empty details) when their query failed: a miss,
+    # not a fresh value, so the previous value is kept and tagged stale
+    previous = _bq_cache["data"] or {}
+    fresh = {
+        name: value for name, value in fetched.items()
+        if name in parts and value is not None and (value or name not in _SNAPSHOT_DETAILS)
+    }
+    wants_metrics = any(name not in _SNAPSHOT_DETAILS for name in parts)
+    fresh_metrics = [name for name in fresh if name not in _SNAPSHOT_DETAILS]
+
+    if not fresh or (not previous and wants_metrics and not fresh_metrics):
+        breaker = bq.bigquery_breaker
+        if breaker.state != bq.CircuitBreaker.CLOSED:
+            # Outage: the circuit breaker failed the refresh fast
+            _bq_last_error = f"BigQuery circuit {breaker.state}: {breaker.last_error}"
+        elif "metrics" in errors:
+            raise errors["metrics"]
         return None
 
-    try:
-        logger.info("🔄 Fetching fresh data from BigQuery...")
-
-        # Fetch all metrics
-        bq_metrics = bq.get_company_metrics()
-        pipeline_details = bq.get_pipeline_details()
-        time_to_fulfill = bq.get_time_to_fulfill()
-
-        if bq_metrics:
-            # Combine all data into cache
-            _bq_cache["data"] = {
-                "metrics": bq_metrics,
-                "pipeline": pipeline_details or {},
-                "ttf": time_to_fulfill or {},
-            }
-            _bq_cache["timestamp"] = current_time
-            logger.info("✅ BigQuery data cached successfully")
-            _set_data_source(True, "bigquery")
+    # Keep the previous value of anything that missed the budget or was not requested
+    metrics = dict(previous.get("metrics", {}))
+    freshness = dict(previous.get("freshness", {}))
+    snapshot = {name: previous[name] for name in _SNAPSHOT_DETAILS if name in previous}
+    for name in parts:
+        if name in _SNAPSHOT_DETAILS:
+            snapshot[name] = fresh.get(name, previous.get(name, {}))
+        elif name in fresh:
+            metrics[name] = fresh[name]
+        freshness[name] = "fresh" if name in fresh else "stale"
+    if "updated_at" in fetched:
+        metrics["updated_at"] = fetched["updated_at"]
+    snapshot["metrics"] = metrics
+    snapshot["freshness"] = freshness
+
+    stale = sorted(name for name in parts if freshness[name] == "stale")
+    if stale:
+        logger.warning("Partial BigQuery refresh, serving previous values for: %s", ", ".join(stale))
+
+    # Build the snapshot first so readers never see a partial one
+    _bq_cache["data"] = snapshot
+    _bq_cache["timestamp"] = time.time()
+    _bq_last_error = None
+    logger.info("✅ BigQuery data cached successfully")
+    _set_data_source(True, _live_source())
+
+    store = get_shared_store()
+    if store is not None:
+        store.save(_BQ_SNAPSHOT_NAME, _bq_cache["data"], updated_at=_bq_cache["timestamp"])
+    return _bq_cache["data"]
+
+
+def _adopt_shared_snapshot() -> bool:
+    """Adopt a newer snapshot published by another replica.
+
+    Returns:
+        True if the local snapshot was replaced
+    """
+    store = get_shared_store()
+    if store is None:
+        return False
+    local_time = _bq_cache["timestamp"] if _bq_cache["data"] is not None else 0
+    shared = store.load(_BQ_SNAPSHOT_NAME, newer_than=local_time)
+    if shared is None:
+        return False
+    _bq_cache["data"], _bq_cache["timestamp"] = shared
+    logger.debug("Adopted shared BigQuery snapshot from another replica")
+    return True
+
+
+def _refresh_coordinated(
+    lock_timeout: Optional[float],
+    parts: Optional[Tuple[str, ...]] = None
+) -> Optional[Dict[str, Any]]:
+    """Refresh the snapshot unless another replica has just done so.
+
+    Args:
+        lock_timeout: Seconds to wait on a replica that is already
+            refreshing (0 = don't wait)
+        parts: Snapshot parts to fetch (default: every part pages have asked for)
+
+    Returns:
+        The current snapshot, or None if nothing new is available yet
+    """
+    store = get_shared_store()
+    if store is None:
+        return _refresh_bigquery_snapshot(parts)
+
+    with store.refresh_lock(_BQ_SNAPSHOT_NAME, timeout=lock_timeout) as acquired:
+        # Another replica may have published while we waited for the lock
+        if (
+            _adopt_shared_snapshot()
+            and time.time() - _bq_cache["timestamp"] < _BQ_CACHE_TTL - _BQ_REFRESH_AHEAD
+            and not _missing_parts(_bq_cache["data"], parts or _demanded_parts())
+        ):
             return _bq_cache["data"]
+        if not acquired:
+            return None
+        return _refresh_bigquery_snapshot(parts)
+
+
+def _bq_refresh_loop() -> None:
+    """Background loop: refresh the snapshot shortly before it expires."""
+    global _bq_last_error
+    while not _bq_refresher_stop.is_set():
+        age = time.time() - _bq_cache["timestamp"]
+        if _bq_refresher_stop.wait(max(0.0, _BQ_CACHE_TTL - _BQ_REFRESH_AHEAD - age)):
+            return
+
+        refreshed = None
+        if USE_BIGQUERY and _bigquery_available:
+            try:
+                with _bq_refresh_lock:
+                    refreshed = _refresh_coordinated(lock_timeout=0)
+            except Exception as e:
+                logger.warning("❌ Background BigQuery refresh failed, serving last snapshot: %s", e)
+                _bq_last_error = str(e)
+
+        if refreshed is None and _bq_refresher_stop.wait(_BQ_RETRY_DELAY):
+            return
+
+
+def _ensure_background_refresh() -> None:
+    """Start the background refresher thread if it is not running."""
+    global _bq_refresher
+    with _bq_refresher_lock:
+        if _bq_refresher is not None and _bq_refresher.is_alive():
+            return
+        _bq_refresher_stop.clear()
+        _bq_refresher = threading.Thread(target=_bq_refresh_loop, name="bq-refresher", daemon=True)
+        _bq_refresher.start()
+
+
+def stop_background_refresh(timeout: float = 5.0) -> None:
+    """Stop the background refresher thread (used by tests and shutdown)."""
+    global _bq_refresher
+    _bq_refresher_stop.set()
+    if _bq_refresher is not None:
+        _bq_refresher.join(timeout)
+        _bq_refresher = None
+
+
+def _fetch_bigquery_metrics(parts: Tuple[str, ...] = _FULL_SNAPSHOT) -> Optional[Dict[str, Any]]:
+    """Fetch BigQuery metrics with stale-while-revalidate caching.
+
+    Once a snapshot with the requested parts exists it is returned
+    immediately, however old, and the background refresher keeps it current.
+    Only the very first fetch (cold start), or the first request for parts
+    the snapshot does not have yet, runs synchronously, and then only for
+    the missing parts. Returns None if BigQuery is unavailable or the first
+    fetch fails.
+
+    Args:
+        parts: Snapshot parts the caller renders (see PAGE_SNAPSHOT_PARTS)
+    """
+    global _bq_last_error, _bq_fill_failed_at
+    if not parts:
+        return _bq_cache["data"]
 
-        # BQ returned empty results — cache as failure
-        _bq_cache["data"] = None
-        _bq_cache["timestamp"] = current_time
+    _note_demand(parts)
+    current_time = time.time()
+    _adopt_shared_snapshot()
+    bq_enabled = USE_BIGQUERY and _bigquery_available
+
+    # Serve the last good snapshot; the background thread revalidates it.
+    # Parts it lacks are fetched below, unless that failed just now.
+    data = _bq_cache["data"]
+    if data is not None and (
+        not bq_enabled
+        or not _missing_parts(data, parts)
+        or current_time - _bq_fill_failed_at < _BQ_CACHE_TTL
+    ):
+        cache_age = int(current_time - _bq_cache["timestamp"])
+        logger.debug("Using cached BigQuery data (%ds old)", cache_age)
+        state = "cached" if cache_age < _BQ_CACHE_TTL else "stale"
+        _set_data_source(True, f"{_live_source()} ({state})", _bq_last_error)
+        if bq_enabled:
+            _ensure_background_refresh()
+        return data
+
+    # Cached failure from a recent cold-start attempt
+    if data is None and _bq_cache["timestamp"] > 0 and (current_time - _bq_cache["timestamp"]) < _BQ_CACHE_TTL:
+        logger.debug("Using cached BQ failure (%ds old)", int(current_time - _bq_cache["timestamp"]))
         return None
-    except Exception as e:
-        logger.warning("❌ BigQuery query failed: %s", e)
-        _set_data_source(False, "mock", str(e))
-        # Cache the failure to avoid retrying on every access
-        _bq_cache["data"] = None
-        _bq_cache["timestamp"] = current_time
+
+    if not bq_enabled:
         return None
 
+    # Cold start (or first visit to a page needing new parts): fetch the
+    # missing parts synchronously, once, then hand over to the refresher
+    with _bq_refresh_lock:
+        data = _bq_cache["data"]
+        missing = _missing_parts(data, parts)
+        if data is not None and not missing:
+            return data
+        try:
+            fetched = _refresh_coordinated(lock_timeout=_BQ_LOCK_WAIT, parts=missing)
+        except Exception as e:
+            logger.warning("❌ BigQuery query failed: %s", e)
+            if data is None:
+                _set_data_source(False, "mock", str(e))
+            _bq_last_error = str(e)
+            fetched = None
+
+        if fetched is None:
+            if data is None:
+                # Cache the failure to avoid retrying on every access
+                _bq_cache["timestamp"] = current_time
+                return None
+            _bq_fill_failed_at = current_time
+            return data
+        data = fetched
+
+    _ensure_background_refresh()
+    return data
+
 
 def get_company_metrics() -> Dict[str, Any]:
     """Get company metrics - tries BigQuery first, falls back to mock data.
@@ -265,13 +635,15 @@ def get_company_metrics() -> Dict[str, Any]:
         "pipeline_gap": 2_500_000,
     }
 
-    # Try to get cached BigQuery data
-    bq_data = _fetch_bigquery_metrics()
+    # Try to get cached BigQuery data (only the parts the current page renders)
+    page = _current_page.get()
+    bq_data = _fetch_bigquery_metrics(_FULL_SNAPSHOT if page is None else PAGE_SNAPSHOT_PARTS.get(page, ()))
 
     if bq_data:
         bq_metrics = bq_data.get("metrics", {})
         pd = bq_data.get("pipeline", {})
         ttf = bq_data.get("ttf", {})
+        concentration = bq_data.get("customer_concentration", {})
 
         # Override actuals with BigQuery values
         if bq_metrics.get("revenue_ytd") is not None:
@@ -288,6 +660,9 @@ def get_company_metrics() -> Dict[str, Any]:
             actuals["logo_retention"] = bq_metrics["logo_retention"]
         if bq_metrics.get("pipeline_coverage") is not None:
             actuals["pipeline_coverage"] = bq_metrics["pipeline_coverage"]
+        if concentration.get("top_customer_pct") is not None:
+            actuals["concentration_top1"] = concentration["top_customer_pct"]
+            actuals["concentration_top1_name"] = concentration.get("top_customer_name")
 
         # Pipeline details
         if pd:
@@ -1179,16 +1554,18 @@ def get_coo_metrics() -> Dict[str, Any]:
     """Get COO/Ops department metrics.
 
     Aggregates: Invoice Collection, Overdue Invoices,
-    Working Capital, Months of Runway.
+    Working Capital, Months of Runway, plus Avg Days to Collection for the
+    Accounting page. All five come from one batched BigQuery job.
 
     Falls back to mock data when BigQuery is unavailable.
     """
     if USE_BIGQUERY and _bigquery_available:
         try:
-            invoice = bq.get_invoice_collection_rate()
-            overdue = bq.get_overdue_invoices()
-            capital = bq.get_working_capital()
-            runway = bq.get_months_of_runway()
+            batch = bq.get_coo_metrics_batch(FISCAL_YEAR)
+            invoice = batch.get("invoice_collection_rate", {})
+            overdue = batch.get("overdue_invoices", {})
+            capital = batch.get("working_capital", {})
+            runway = batch.get("months_of_runway", {})
 
             return {
                 "invoice_collection_rate": invoice.get("collection_rate", 0),
@@ -1202,6 +1579,7 @@ def get_coo_metrics() -> Dict[str, Any]:
                 "months_of_runway": runway.get("months"),
                 "cash_balance": runway.get("cash_balance", 0),
                 "avg_monthly_burn": runway.get("avg_monthly_burn", 0),
+                "avg_days_to_collect": batch.get("avg_days_to_collection", {}).get("avg_days_to_collect"),
                 "source": "bigquery",
             }
         except Exception as e:
@@ -1228,10 +1606,6 @@ def get_coo_metrics() -> Dict[str, Any]:
 # YEAR-OVER-YEAR COMPARISON DATA
 # =============================================================================
 
-FISCAL_YEAR = bq.FISCAL_YEAR if _bigquery_available else 2026
-PRIOR_FISCAL_YEAR = FISCAL_YEAR - 1
-
-
 def _safe_change_pct(current, prior):
     """Calculate percentage change, handling None and zero."""
     if current is None or prior is None:
@@ -1261,12 +1635,14 @@ def get_yoy_metrics() -> Dict[str, Any]:
     source = get_data_source_status()
     if source.get("is_live") and USE_BIGQUERY and _bigquery_available:
         try:
-            prior_revenue = bq.get_revenue_ytd(PRIOR_FISCAL_YEAR)
-            prior_take_rate = bq.get_take_rate(PRIOR_FISCAL_YEAR)
-            prior_nrr = bq.get_nrr(PRIOR_FISCAL_YEAR)
-            prior_supply_nrr = bq.get_supply_npr(PRIOR_FISCAL_YEAR)
-            prior_customer_count = bq.get_customer_count(PRIOR_FISCAL_YEAR)
-            prior_logo_retention = bq.get_logo_retention(PRIOR_FISCAL_YEAR)
+            # Prior revenue and take rate share one multi-year ledger scan
+            with refresh_scope():
+                prior_revenue = bq.get_revenue_ytd(PRIOR_FISCAL_YEAR)
+                prior_take_rate = bq.get_take_rate(PRIOR_FISCAL_YEAR)
+                prior_nrr = bq.get_nrr(PRIOR_FISCAL_YEAR)
+                prior_supply_nrr = bq.get_supply_npr(PRIOR_FISCAL_YEAR)
+                prior_customer_count = bq.get_customer_count(PRIOR_FISCAL_YEAR)
+                prior_logo_retention = bq.get_logo_retention(PRIOR_FISCAL_YEAR)
         except Exception as e:
             logger.warning("Failed to fetch prior year metrics: %s", e)
 
@@ -1487,11 +1863,12 @@ def get_demand_sales_metrics() -> List[Dict[str, Any]]:
 
     if USE_BIGQUERY and _bigquery_available:
         try:
-            nrr = bq.get_nrr(FISCAL_YEAR)
-            pipeline = bq.get_pipeline_details()
-            weighted_pipeline = pipeline.get("weighted_pipeline") if pipeline else None
-            win_rate = (bq.get_win_rate_90d() or {}).get("win_rate")
-            avg_deal_size = (bq.get_avg_deal_size_ytd(FISCAL_YEAR) or {}).get("avg_deal_size")
+            with refresh_scope():
+                nrr = bq.get_nrr(FISCAL_YEAR)
+                pipeline = bq.get_pipeline_details()
+                weighted_pipeline = pipeline.get("weighted_pipeline") if pipeline else None
+                win_rate = (bq.get_win_rate_90d() or {}).get("win_rate")
+                avg_deal_size = (bq.get_avg_deal_size_ytd(FISCAL_YEAR) or {}).get("avg_deal_size")
         except Exception as e:
             logger.warning("Failed to fetch Demand Sales metrics from BQ: %s", e)
 
@@ -1581,13 +1958,8 @@ def get_accounting_metrics() -> List[Dict[str, Any]]:
     invoice_collection = coo_metrics.get("invoice_collection_rate")
     overdue_count = coo_metrics.get("overdue_count")
     overdue_amount = coo_metrics.get("overdue_amount")
-    avg_days = None
-
-    if USE_BIGQUERY and _bigquery_available:
-        try:
-            avg_days = (bq.get_avg_days_to_collection(FISCAL_YEAR) or {}).get("avg_days_to_collect")
-        except Exception as e:
-            logger.warning("Failed to fetch avg days to collection: %s", e)
+    # Fetched in the same batch as the COO metrics (absent from mock data)
+    avg_days = coo_metrics.get("avg_days_to_collect")
 
     return [
         _build_metric(dept, "Invoice Collection Rate", invoice_collection),
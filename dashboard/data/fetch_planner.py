@@ -0,0 +1,74 @@
+"""
+Fetch Planner - Order the fetches a page needs by their dependencies.
+
+A page declares the snapshot parts it renders; plan() expands them with
+everything they depend on and groups the result into stages. Every fetch in
+a stage only depends on fetches in earlier stages. bigquery_client.run_plan
+fans the plan out concurrently, starting each fetch as soon as the fetches
+it depends on are done.
+Fetches no requested part needs are never planned, so a department page
+does not pay for the Overview's queries.
+"""
+
+from typing import Any, Callable, Dict, Iterable, List, Tuple
+
+
+class Fetch:
+    """One named fetch and the fetches it depends on."""
+
+    def __init__(self, name: str, fn: Callable[[], Any], depends_on: Tuple[str, ...] = ()):
+        """Declare a fetch.
+
+        Args:
+            name: Result key
+            fn: Zero-argument callable returning the result
+            depends_on: Names of fetches that must finish first (their
+                results land in the refresh memo / result cache, where fn
+                picks them up)
+        """
+        self.name = name
+        self.fn = fn
+        self.depends_on = depends_on
+
+    def __repr__(self) -> str:
+        return f"Fetch({self.name!r})"
+
+
+def plan(targets: Iterable[str], fetches: Dict[str, Fetch]) -> List[Tuple[str, ...]]:
+    """Build the minimal staged plan for a set of targets.
+
+    Args:
+        targets: Names of the fetches whose results are wanted
+        fetches: Every known fetch, by name
+
+    Returns:
+        List of stages, each a tuple of fetch names (in `fetches` order)
+        that can run concurrently once the earlier stages are done. Each
+        needed fetch appears exactly once.
+
+    Raises:
+        KeyError: If a target or dependency is not a known fetch
+        ValueError: If the dependencies form a cycle
+    """
+    needed: Dict[str, None] = {}
+    pending = list(targets)
+    while pending:
+        name = pending.pop()
+        if name in needed:
+            continue
+        if name not in fetches:
+            raise KeyError(f"Unknown fetch: {name}")
+        needed[name] = None
+        pending.extend(fetches[name].depends_on)
+
+    stages: List[Tuple[str, ...]] = []
+    done: set = set()
+    remaining = [name for name in fetches if name in needed]
+    while remaining:
+        stage = tuple(name for name in remaining if done.issuperset(fetches[name].depends_on))
+        if not stage:
+            raise ValueError(f"Fetch dependencies form a cycle: {', '.join(remaining)}")
+        stages.append(stage)
+        done.update(stage)
+        remaining = [name for name in remaining if name not in done]
+    return stages
@@ -0,0 +1,10 @@
+"""
+Fiscal - The fiscal year the dashboard reports on.
+
+Kept in its own module so the data layer and the app can read it without
+importing bigquery_client (which pulls in the BigQuery client on import).
+"""
+
+# Fiscal year the dashboard reports on (calendar-aligned)
+FISCAL_YEAR = 2026
+PRIOR_FISCAL_YEAR = FISCAL_YEAR - 1
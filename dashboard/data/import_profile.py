@@ -0,0 +1,122 @@
+"""
+Import Profile - Measure what importing the dashboard's modules costs.
+
+Each module is imported in a fresh interpreter under `python -X importtime`,
+so nothing is already cached in sys.modules. The report lists the total
+import time and the slowest imports underneath it, and fails if a module
+that should be deferred (see data/lazy_import.py) is imported eagerly, so
+a stray top-level import of google.cloud.bigquery or pandas is caught
+before it slows down every server start.
+
+Usage (from the dashboard/ directory):
+    python -m data.import_profile
+    python -m data.import_profile --module data.bigquery_client --top 25
+
+Exits with status 1 if a deferred module is imported eagerly or an import fails.
+"""
+
+import argparse
+import re
+import subprocess
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional, Sequence, Tuple
+
+DASHBOARD_DIR = Path(__file__).resolve().parent.parent
+
+# Modules imported when the Streamlit server starts (app.py itself needs a
+# running Streamlit session, so its data modules are profiled instead)
+DEFAULT_MODULES = ("data.data_layer", "data.targets_manager")
+
+# Heavy modules that must only be imported on first use
+DEFERRED_MODULES = ("google.cloud.bigquery", "pandas", "plotly.graph_objects")
+
+# "import time: self [us] | cumulative | imported package"
+_IMPORTTIME_LINE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|( *)(\S+)\s*$")
+
+
+def parse_importtime(output: str) -> List[Dict[str, object]]:
+    """Parse `-X importtime` output into entries.
+
+    Imports made by interpreter startup (everything up to and including
+    `site`) are dropped, leaving only what the profiled statement imported.
+
+    Returns:
+        List of dicts with name, depth (0 = imported by the profiled
+        statement itself), self_us and cumulative_us, in output order
+    """
+    entries: List[Dict[str, object]] = []
+    for line in output.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            entries.append({
+                "name": name,
+                "depth": (len(indent) - 1) // 2,
+                "self_us": int(self_us),
+                "cumulative_us": int(cumulative_us),
+            })
+            if name == "site" and entries[-1]["depth"] == 0:
+                entries = []
+    return entries
+
+
+def profile_import(module: str) -> Tuple[List[Dict[str, object]], Optional[str]]:
+    """Import a module in a fresh interpreter and collect its import times.
+
+    Returns:
+        Tuple of (entries from parse_importtime, error text or None)
+    """
+    result = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=DASHBOARD_DIR, capture_output=True, text=True,
+    )
+    error = None
+    if result.returncode != 0:
+        error = result.stderr.strip().splitlines()[-1] if result.stderr.strip() else "import failed"
+    return parse_importtime(result.stderr), error
+
+
+def format_report(
+    module: str,
+    entries: List[Dict[str, object]],
+    top: int = 15,
+    deferred: Sequence[str] = DEFERRED_MODULES
+) -> Tuple[str, bool]:
+    """Render one module's profile as text.
+
+    Returns:
+        Tuple of (report text, True if no deferred module was imported)
+    """
+    total = sum(e["cumulative_us"] for e in entries if e["depth"] == 0)
+    lines = [f"{module}: {total / 1000:.0f} ms"]
+    for entry in sorted(entries, key=lambda e: e["cumulative_us"], reverse=True)[:top]:
+        lines.append(f"  {entry['cumulative_us'] / 1000:>8.1f} ms  {entry['name']}")
+
+    imported = {e["name"] for e in entries}
+    eager = [name for name in deferred if name in imported]
+    for name in eager:
+        lines.append(f"  <-- {name} is imported eagerly (should be deferred)")
+    return "\n".join(lines), not eager
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Report import times of the dashboard's modules.")
+    parser.add_argument("--module", action="append", help="Module to profile (repeatable; default the server's)")
+    parser.add_argument("--top", type=int, default=15, help="Slowest imports listed per module")
+    args = parser.parse_args(argv)
+
+    ok = True
+    for module in args.module or DEFAULT_MODULES:
+        entries, error = profile_import(module)
+        report, clean = format_report(module, entries, args.top)
+        print(report)
+        if error:
+            print(f"  <-- import failed: {error}")
+        ok = ok and clean and error is None
+    return 0 if ok else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,98 @@
+"""
+Lazy Import - Defer heavy modules until they are first used.
+
+google.cloud.bigquery pulls in pandas through the Storage Read API client
+and accounts for most of the dashboard's boot time. A LazyModule stands in
+for such a module: it imports the real one on first attribute access, so
+server start and the first paint of pages that never query BigQuery skip it
+entirely.
+
+Every deferred import is timed; import_timings() lists them, and
+`python -m data.import_profile` reports what is still imported eagerly.
+"""
+
+import importlib
+import importlib.util
+import logging
+import threading
+import time
+from types import ModuleType
+from typing import Dict
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Module name -> seconds its deferred import took
+_timings: Dict[str, float] = {}
+
+
+class LazyModule:
+    """Proxy for a module, imported on first attribute access.
+
+    Attribute writes and deletes go to the real module, so tests can patch
+    through the proxy (patch("data.data_layer.bq.get_nrr")) or replace the
+    proxy itself (monkeypatch.setattr(data_layer, "bq", mock)).
+    """
+
+    def __init__(self, name: str):
+        """Create the proxy without importing anything.
+
+        Args:
+            name: Absolute module name (e.g. 'google.cloud.bigquery')
+        """
+        object.__setattr__(self, "_lazy_name", name)
+        object.__setattr__(self, "_lazy_module", None)
+        object.__setattr__(self, "_lazy_lock", threading.Lock())
+
+    def _lazy_load(self) -> ModuleType:
+        module = self._lazy_module
+        if module is None:
+            with self._lazy_lock:
+                module = self._lazy_module
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self._lazy_name)
+                    _timings[self._lazy_name] = time.perf_counter() - started
+                    logger.debug("Imported %s on first use (%.0f ms)", self._lazy_name,
+                                 _timings[self._lazy_name] * 1000)
+                    object.__setattr__(self, "_lazy_module", module)
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._lazy_load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self._lazy_load(), attr, value)
+
+    def __delattr__(self, attr: str) -> None:
+        delattr(self._lazy_load(), attr)
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self._lazy_module is not None else "not loaded"
+        return f"<lazy module {self._lazy_name!r} ({state})>"
+
+
+def is_loaded(module: object) -> bool:
+    """True if a LazyModule has imported its module (always True for a real module)."""
+    return not isinstance(module, LazyModule) or module._lazy_module is not None
+
+
+def module_available(name: str) -> bool:
+    """Check that a module can be imported, without importing it.
+
+    Only the parent packages are imported (for 'google.cloud.bigquery',
+    the 'google.cloud' namespace package).
+    """
+    try:
+        return importlib.util.find_spec(name) is not None
+    except (ImportError, ValueError):
+        return False
+
+
+def import_timings() -> Dict[str, float]:
+    """Return seconds taken by each deferred import so far, slowest first."""
+    return dict(sorted(_timings.items(), key=lambda item: item[1], reverse=True))
+
@@ -0,0 +1,176 @@
+"""
+Metric Registry - Declarative definitions of single-row BigQuery metrics.
+
+Each MetricSpec names its SQL file (under data/queries/metrics/), the
+parameter sets the query binds, how its one result row decodes into the
+dict the dashboard uses, and its result cache TTL and bytes-billed cap.
+bigquery_client's engine (run_metric / run_metric_batch) executes, caches
+and batches them, so adding a metric is a SQL file plus one entry here.
+
+Source tables are not declared by hand: bigquery_client.source_tables()
+parses them from the SQL file, so they cannot drift from the query.
+"""
+
+from typing import Any, Callable, Dict, Optional, Tuple
+
+# Parameter sets a metric can bind
+PARAM_AS_OF = "as_of"  # @as_of_date (today)
+PARAM_FISCAL_YEAR_DATES = "fiscal_year_dates"  # @period_start / @period_end as DATE (QBO)
+PARAM_FISCAL_YEAR_TIMESTAMPS = "fiscal_year_timestamps"  # @period_start / @period_end as TIMESTAMP (HubSpot)
+
+
+class MetricSpec:
+    """Declaration of one single-row metric query."""
+
+    def __init__(
+        self,
+        name: str,
+        decode: Callable[[Any], Dict[str, Any]],
+        params: Tuple[str, ...] = (),
+        ttl: Optional[int] = None,
+        max_bytes_billed: Optional[int] = None,
+        sql_file: Optional[str] = None
+    ):
+        """Declare a metric.
+
+        Args:
+            name: Metric name (telemetry, cache and cost report key)
+            decode: Turns the result row into the metric dict
+            params: Parameter sets the SQL binds (PARAM_* constants)
+            ttl: Result cache TTL in seconds (None = the default TTL)
+            max_bytes_billed: Bytes-billed cap (None = the default cap)
+            sql_file: SQL file under data/queries/ (default metrics/<name>.sql)
+        """
+        self.name = name
+        self.decode = decode
+        self.params = params
+        self.ttl = ttl
+        self.max_bytes_billed = max_bytes_billed
+        self.sql_file = sql_file or f"metrics/{name}.sql"
+
+    def __repr__(self) -> str:
+        return f"MetricSpec({self.name!r})"
+
+
+METRICS: Dict[str, MetricSpec] = {}
+
+
+def register(spec: MetricSpec) -> MetricSpec:
+    """Add a metric to the registry.
+
+    Raises:
+        ValueError: If a metric with the same name is already registered
+    """
+    if spec.name in METRICS:
+        raise ValueError(f"Metric already registered: {spec.name}")
+    METRICS[spec.name] = spec
+    return spec
+
+
+def _number(value: Any, cast: Callable[[Any], Any] = float, empty: Any = 0) -> Any:
+    """Cast a nullable numeric column, mapping NULL (but not a real 0) to `empty`."""
+    return empty if value is None else cast(value)
+
+
+# =============================================================================
+# COO / ACCOUNTING
+# =============================================================================
+
+register(MetricSpec(
+    "invoice_collection_rate",
+    params=(PARAM_FISCAL_YEAR_DATES, PARAM_AS_OF),
+    decode=lambda row: {
+        "collection_rate": _number(row.collection_rate_pct),
+        "paid_count": _number(row.paid_invoices, int),
+        "total_count": _number(row.total_due_invoices, int),
+    },
+))
+
+register(MetricSpec(
+    "overdue_invoices",
+    params=(PARAM_AS_OF,),
+    decode=lambda row: {
+        "count": _number(row.overdue_count, int),
+        "amount": _number(row.overdue_amount),
+    },
+))
+
+register(MetricSpec(
+    "avg_days_to_collection",
+    params=(PARAM_FISCAL_YEAR_DATES,),
+    decode=lambda row: {
+        "avg_days_to_collect": _number(row.avg_days_to_collect, empty=None),
+        "median_days_to_collect": _number(row.median_days_to_collect, empty=None),
+        "invoice_count": _number(row.invoices_paid, int),
+    },
+))
+
+register(MetricSpec(
+    "working_capital",
+    ttl=60 * 60,
+    decode=lambda row: {
+        "working_capital": _number(row.working_capital),
+        "current_assets": _number(row.current_assets),
+        "current_liabilities": _number(row.current_liabilities),
+    },
+))
+
+register(MetricSpec(
+    "months_of_runway",
+    params=(PARAM_AS_OF,),
+    ttl=60 * 60,
+    decode=lambda row: {
+        "months": _number(row.months_of_runway, empty=None),
+        "cash_balance": _number(row.cash_balance),
+        "avg_monthly_burn": _number(row.avg_monthly_burn),
+    },
+))
+
+# =============================================================================
+# DEMAND SALES
+# =============================================================================
+
+# Queries that only read HubSpot deals get a tighter bytes-billed cap
+_DEAL_SCAN_CAP = 1024 ** 3
+
+
+def _decode_win_rate(row: Any) -> Dict[str, Any]:
+    won = _number(row.won_count, int)
+    lost = _number(row.lost_count, int)
+    return {
+        "win_rate": _number(row.win_rate),
+        "won_count": won,
+        "lost_count": lost,
+        "total_decided": won + lost,
+    }
+
+
+register(MetricSpec(
+    "win_rate_90d",
+    params=(PARAM_AS_OF,),
+    ttl=5 * 60,
+    max_bytes_billed=_DEAL_SCAN_CAP,
+    decode=_decode_win_rate,
+))
+
+register(MetricSpec(
+    "avg_deal_size_ytd",
+    params=(PARAM_FISCAL_YEAR_TIMESTAMPS,),
+    max_bytes_billed=_DEAL_SCAN_CAP,
+    decode=lambda row: {
+        "avg_deal_size": _number(row.avg_deal_size),
+        "deal_count": _number(row.deal_count, int),
+        "total_revenue": _number(row.total_revenue),
+    },
+))
+
+register(MetricSpec(
+    "sales_cycle_length",
+    params=(PARAM_FISCAL_YEAR_TIMESTAMPS,),
+    max_bytes_billed=_DEAL_SCAN_CAP,
+    decode=lambda row: {
+        "avg_days": _number(row.avg_days),
+        "median_days": _number(row.median_days, int),
+        "deal_count": _number(row.deal_count, int),
+    },
+))
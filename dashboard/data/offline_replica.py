@@ -0,0 +1,378 @@
+"""
+Offline Replica - Run the dashboard's real SQL against local Parquet snapshots.
+
+Point KPI_OFFLINE_REPLICA at a snapshot directory and get_client() returns
+an OfflineClient instead of a BigQuery client. Every query bigquery_client
+issues is transpiled to DuckDB (data/sql_transpiler.py) and run in-process
+against the snapshot, so development, tests and demos exercise the real
+metric SQL in milliseconds with no network and no credentials, instead of
+falling back to hardcoded mock values.
+
+Snapshot layout: one Parquet file per table, by dataset:
+
+    <dir>/src_fivetran_qbo/invoice.parquet
+    <dir>/src_fivetran_hubspot/deal.parquet
+    <dir>/mongodb/...
+    <dir>/App_KPI_Dashboard/customer_development.parquet   (views too)
+
+Tables are loaded into memory when the client is created. Each dataset
+also gets a __TABLES__ table built from the file modification times, so
+source watermarks work as they do against BigQuery. The result cache and
+the shared snapshot store are disabled while the replica is in use, so
+offline results can never be served to a process reading BigQuery.
+
+Usage (from the dashboard/ directory):
+    python -m data.offline_replica export --dir ~/kpi-snapshot     # needs BigQuery access
+    KPI_OFFLINE_REPLICA=~/kpi-snapshot python -m data.offline_replica check
+    KPI_OFFLINE_REPLICA=~/kpi-snapshot streamlit run app.py
+
+`check` runs every metric against the replica and exits with status 1 if
+any of them fails.
+"""
+
+import argparse
+import inspect
+import logging
+import os
+import re
+import sys
+import time
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from .lazy_import import LazyModule
+from .sql_transpiler import TranspileError, transpile
+
+if TYPE_CHECKING:
+    import duckdb
+    from google.api_core import exceptions
+    from google.cloud import bigquery
+else:
+    # Imported when a replica is opened: only replica_dir() runs at boot
+    duckdb = LazyModule("duckdb")
+    bigquery = LazyModule("google.cloud.bigquery")
+    exceptions = LazyModule("google.api_core.exceptions")
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+OFFLINE_REPLICA_ENV = "KPI_OFFLINE_REPLICA"
+
+# __TABLES__ type code for a table (see bigquery_client source watermarks)
+_TABLE_TYPE_TABLE = 1
+
+# DuckDB column type prefix -> BigQuery field type reported in the schema
+_FIELD_TYPES: Tuple[Tuple[str, str], ...] = (
+    ("DECIMAL", "NUMERIC"),
+    ("DOUBLE", "FLOAT"),
+    ("FLOAT", "FLOAT"),
+    ("REAL", "FLOAT"),
+    ("BOOLEAN", "BOOLEAN"),
+    ("VARCHAR", "STRING"),
+    ("BLOB", "BYTES"),
+    ("DATE", "DATE"),
+    ("TIMESTAMP WITH TIME ZONE", "TIMESTAMP"),
+    ("TIMESTAMP", "DATETIME"),
+    ("TIME", "TIME"),
+    ("STRUCT", "RECORD"),
+)
+_INTEGER_TYPE = re.compile(r"^U?(TINY|SMALL|BIG|HUGE)?INT(EGER)?$")
+
+
+def replica_dir() -> Optional[Path]:
+    """Return the snapshot directory from KPI_OFFLINE_REPLICA (None = use BigQuery)."""
+    value = os.environ.get(OFFLINE_REPLICA_ENV, "").strip()
+    return Path(value).expanduser() if value else None
+
+
+def _field_type(duckdb_type: str) -> str:
+    duckdb_type = duckdb_type.upper()
+    if _INTEGER_TYPE.match(duckdb_type):
+        return "INTEGER"
+    for prefix, field_type in _FIELD_TYPES:
+        if duckdb_type.startswith(prefix):
+            return field_type
+    return duckdb_type
+
+
+# =============================================================================
+# QUERY JOBS
+# =============================================================================
+
+class OfflineRowIterator(list):
+    """Rows of a finished offline query, shaped like a BigQuery RowIterator."""
+
+    def __init__(self, rows: Sequence[Any], schema: List["bigquery.SchemaField"], page_size: Optional[int] = None):
+        super().__init__(rows)
+        self.schema = schema
+        self.total_rows = len(rows)
+        self._page_size = page_size
+
+    @property
+    def pages(self) -> Iterator[List[Any]]:
+        """Rows in chunks of page_size (one chunk if no page size was given)."""
+        size = self._page_size or max(len(self), 1)
+        for start in range(0, len(self), size):
+            yield self[start:start + size]
+
+
+class OfflineQueryJob:
+    """A finished offline query, shaped like a BigQuery QueryJob."""
+
+    def __init__(self, query: str, names: List[str], types: List[str], rows: List[Tuple], dry_run: bool = False):
+        self.query = query
+        self.job_id = f"offline-{id(self):x}"
+        self.state = "DONE"
+        self.dry_run = dry_run
+        # Nothing is scanned or billed
+        self.total_bytes_processed = 0
+        self.total_bytes_billed = 0
+        self.slot_millis = 0
+        self.cache_hit = False
+        self._names = names
+        self._rows = rows
+        self.schema = [bigquery.SchemaField(name, _field_type(t)) for name, t in zip(names, types)]
+
+    def result(
+        self,
+        page_size: Optional[int] = None,
+        max_results: Optional[int] = None,
+        timeout: Optional[float] = None,
+        **_: Any
+    ) -> OfflineRowIterator:
+        """Return the rows as BigQuery Row objects."""
+        index = {name: i for i, name in enumerate(self._names)}
+        rows = self._rows if max_results is None else self._rows[:max_results]
+        return OfflineRowIterator([bigquery.Row(values, index) for values in rows], self.schema, page_size)
+
+    def to_dataframe(self, create_bqstorage_client: bool = False, **_: Any):
+        """Return the rows as a pandas DataFrame."""
+        import pandas as pd  # only drill-down views need pandas
+        return pd.DataFrame.from_records(self._rows, columns=self._names)
+
+    def done(self, *_: Any, **__: Any) -> bool:
+        return True
+
+    def cancel(self, *_: Any, **__: Any) -> bool:
+        return False
+
+
+# =============================================================================
+# CLIENT
+# =============================================================================
+
+class OfflineClient:
+    """Drop-in for bigquery.Client.query() backed by an in-memory DuckDB."""
+
+    def __init__(self, directory: Path):
+        """Load every Parquet snapshot under a directory.
+
+        Args:
+            directory: Snapshot directory (<dataset>/<table>.parquet)
+
+        Raises:
+            FileNotFoundError: If the directory does not exist
+        """
+        directory = Path(directory)
+        if not directory.is_dir():
+            raise FileNotFoundError(f"Offline replica directory not found: {directory}")
+        self.directory = directory
+        self.project = "offline"
+        self._conn = duckdb.connect(":memory:")
+        try:
+            self._conn.execute("SET TimeZone = 'UTC'")
+        except duckdb.Error:
+            logger.debug("DuckDB ICU extension unavailable; using the local time zone")
+
+        started = time.perf_counter()
+        self.tables: Dict[str, int] = {}
+        for dataset_dir in sorted(p for p in directory.iterdir() if p.is_dir()):
+            dataset = dataset_dir.name
+            self._conn.execute(f'CREATE SCHEMA IF NOT EXISTS "{dataset}"')
+            watermarks = []
+            for path in sorted(dataset_dir.glob("*.parquet")):
+                table = path.stem
+                self._conn.execute(
+                    f'CREATE TABLE "{dataset}"."{table}" AS SELECT * FROM read_parquet(?)', [str(path)]
+                )
+                self.tables[f"{dataset}.{table}"] = self._conn.execute(
+                    f'SELECT COUNT(*) FROM "{dataset}"."{table}"'
+                ).fetchone()[0]
+                watermarks.append((table, int(path.stat().st_mtime * 1000), _TABLE_TYPE_TABLE))
+            self._conn.execute(
+                f'CREATE TABLE "{dataset}"."__TABLES__" '
+                "(table_id VARCHAR, last_modified_time BIGINT, type BIGINT)"
+            )
+            if watermarks:
+                self._conn.executemany(f'INSERT INTO "{dataset}"."__TABLES__" VALUES (?, ?, ?)', watermarks)
+        logger.info("Offline replica loaded %d tables from %s in %.0f ms",
+                    len(self.tables), directory, (time.perf_counter() - started) * 1000)
+
+    def query(self, query: str, job_config: Optional["bigquery.QueryJobConfig"] = None, **_: Any) -> OfflineQueryJob:
+        """Run a BigQuery SQL query against the replica.
+
+        Args:
+            query: BigQuery Standard SQL
+            job_config: Query parameters and dry_run are honoured; byte
+                caps are ignored (nothing is billed)
+
+        Returns:
+            A finished OfflineQueryJob
+
+        Raises:
+            BadRequest: If the SQL cannot be transpiled or fails in DuckDB
+            NotFound: If the SQL reads a table missing from the snapshot
+        """
+        try:
+            sql, used = transpile(query)
+        except TranspileError as e:
+            raise exceptions.BadRequest(f"Offline replica cannot run this query: {e}") from e
+
+        params = {}
+        for param in getattr(job_config, "query_parameters", None) or []:
+            if param.name in used:
+                params[param.name] = param.values if hasattr(param, "values") else param.value
+        dry_run = bool(getattr(job_config, "dry_run", False))
+
+        cursor = self._conn.cursor()
+        try:
+            if dry_run:
+                cursor.execute(f"EXPLAIN {sql}", params)
+                return OfflineQueryJob(query, [], [], [], dry_run=True)
+            cursor.execute(sql, params)
+            rows = cursor.fetchall()
+            names = [column[0] for column in cursor.description or []]
+            types = [str(column[1]) for column in cursor.description or []]
+        except duckdb.CatalogException as e:
+            raise exceptions.NotFound(f"Offline replica: {e}") from e
+        except duckdb.Error as e:
+            raise exceptions.BadRequest(f"Offline replica: {e}") from e
+        finally:
+            cursor.close()
+        return OfflineQueryJob(query, names, types, rows)
+
+
+# =============================================================================
+# SNAPSHOT EXPORT AND CHECK
+# =============================================================================
+
+def referenced_tables() -> List[Tuple[str, str]]:
+    """Return every (dataset, table) the dashboard's SQL reads.
+
+    Collected from the table references in bigquery_client and in every
+    SQL file the query loader compiles.
+    """
+    from . import bigquery_client as bq
+
+    source = Path(bq.__file__).read_text()
+    for name in ("PROJECT_ID", "DATASET", "AGG_QBO_LEDGER_MONTHLY", "AGG_SUPPLIER_YEAR_PAYOUTS"):
+        source = source.replace(f"{{{name}}}", getattr(bq, name))
+    loader = bq.get_query_loader()
+    texts = [source] + [loader.get(name).sql for name in loader.names()]
+
+    tables = set()
+    for text in texts:
+        for reference in bq.source_tables(text):
+            dataset, table = reference.split(".", 1)
+            if not table.startswith("__"):
+                tables.add((dataset, table))
+    return sorted(tables)
+
+
+def export_snapshot(directory: Path, tables: Optional[List[Tuple[str, str]]] = None) -> Dict[str, int]:
+    """Copy tables from BigQuery into a snapshot directory as Parquet.
+
+    Scans each table in full (SELECT *), so check the bytes with
+    `python -m data.cost_report` before exporting large datasets.
+
+    Args:
+        directory: Snapshot directory to write
+        tables: (dataset, table) pairs (default: referenced_tables())
+
+    Returns:
+        Dict mapping "dataset.table" to rows written
+
+    Raises:
+        GoogleCloudError: If a table cannot be read
+    """
+    import pyarrow.parquet as pq
+
+    from . import bigquery_client as bq
+
+    if replica_dir() is not None:
+        raise RuntimeError(f"Unset {OFFLINE_REPLICA_ENV} to export from BigQuery")
+    written = {}
+    for dataset, table in tables or referenced_tables():
+        path = Path(directory) / dataset / f"{table}.parquet"
+        path.parent.mkdir(parents=True, exist_ok=True)
+        job = bq.get_client().query(f"SELECT * FROM `{bq.PROJECT_ID}.{dataset}.{table}`")
+        frame = job.to_arrow(create_bqstorage_client=True)
+        pq.write_table(frame, path)
+        written[f"{dataset}.{table}"] = frame.num_rows
+        logger.info("Exported %s.%s (%d rows)", dataset, table, frame.num_rows)
+    return written
+
+
+def check_metrics(fiscal_year: int) -> Dict[str, Tuple[float, Optional[str]]]:
+    """Run every metric function against the replica.
+
+    Returns:
+        Dict mapping metric function name to (milliseconds, error or None)
+    """
+    from . import bigquery_client as bq
+    from .cost_report import EXTRA_CALLS, metric_functions
+    from .telemetry import recent_queries
+
+    arguments = {"fiscal_year": fiscal_year, "years": (fiscal_year - 2, fiscal_year - 1, fiscal_year)}
+    calls = [
+        (name, fn, {k: v for k, v in arguments.items() if k in inspect.signature(fn).parameters})
+        for name, fn in metric_functions().items()
+    ]
+    calls += [(name, getattr(bq, name), kwargs) for name, kwargs in EXTRA_CALLS]
+
+    results = {}
+    for name, fn, kwargs in calls:
+        recorded = len(recent_queries())
+        started = time.perf_counter()
+        try:
+            fn(**kwargs)
+            errors = [e["error"] for e in recent_queries()[recorded:] if e["error"]]
+            error = errors[0] if errors else None
+        except Exception as e:
+            error = str(e)
+        results[name] = ((time.perf_counter() - started) * 1000, error)
+    return results
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    """Command-line entry point."""
+    parser = argparse.ArgumentParser(description="Export or check the offline DuckDB replica.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    export = subcommands.add_parser("export", help="Snapshot BigQuery tables to Parquet")
+    export.add_argument("--dir", required=True, type=Path, help="Snapshot directory to write")
+    export.add_argument("--table", action="append", help="dataset.table to export (repeatable; default all)")
+    check = subcommands.add_parser("check", help=f"Run every metric against ${OFFLINE_REPLICA_ENV}")
+    check.add_argument("--fiscal-year", type=int, default=None, help="Fiscal year passed to metrics")
+    args = parser.parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.command == "export":
+        tables = [tuple(t.split(".", 1)) for t in args.table] if args.table else None
+        written = export_snapshot(args.dir, tables)
+        print(f"Exported {len(written)} tables, {sum(written.values())} rows to {args.dir}")
+        return 0
+
+    if replica_dir() is None:
+        parser.error(f"Set {OFFLINE_REPLICA_ENV} to the snapshot directory")
+    from . import bigquery_client as bq
+    results = check_metrics(args.fiscal_year or bq.FISCAL_YEAR)
+    failed = 0
+    for name, (ms, error) in results.items():
+        print(f"{ms:>8.1f} ms  {name}" + (f"  <-- {error.splitlines()[0]}" if error else ""))
+        failed += error is not None
+    print(f"{len(results) - failed}/{len(results)} metrics ran offline")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,23 @@
+-- =============================================================================
+-- CREATE TABLE: Aggregate Document Dates
+-- =============================================================================
+-- Deploy with: python -m data.aggregates deploy
+-- Refresh with: python -m data.aggregates refresh
+-- Dataset: App_KPI_Dashboard
+--
+-- The transaction date each QBO document (invoice, credit_memo, bill,
+-- vendor_credit) had when an aggregate table was last refreshed. When a
+-- document is re-dated, the refresh rewrites its previous partition as well
+-- as its new one, so its amount is not left behind in the old month / year.
+-- Kept per aggregate, because each aggregate refreshes on its own schedule.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS `stitchdata-384118.App_KPI_Dashboard.agg_document_dates` (
+    aggregate STRING NOT NULL,
+    source STRING NOT NULL,
+    document_id STRING NOT NULL,
+    transaction_date DATE,
+    refreshed_at TIMESTAMP NOT NULL
+)
+CLUSTER BY aggregate, source, document_id
+OPTIONS (description = 'Last refreshed QBO document dates per aggregate, maintained by data/aggregates.py');
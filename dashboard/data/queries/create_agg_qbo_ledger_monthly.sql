@@ -0,0 +1,23 @@
+-- =============================================================================
+-- CREATE TABLE: QBO Ledger Monthly Aggregate
+-- =============================================================================
+-- Deploy with: python -m data.aggregates deploy
+-- Refresh with: python -m data.aggregates refresh
+-- Dataset: App_KPI_Dashboard
+--
+-- Revenue ledger amounts (accounts 4110-4299) summed by month, source
+-- document (invoice, credit_memo, bill, vendor_credit) and account number.
+-- get_qbo_ledger() reads this table when KPI_USE_AGGREGATES is set.
+-- Partitioned by month so a refresh only rewrites the months that changed.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS `stitchdata-384118.App_KPI_Dashboard.agg_qbo_ledger_monthly` (
+    month DATE NOT NULL,
+    source STRING NOT NULL,
+    acct_num INT64,
+    amount FLOAT64,
+    refreshed_at TIMESTAMP NOT NULL
+)
+PARTITION BY DATE_TRUNC(month, MONTH)
+CLUSTER BY source, acct_num
+OPTIONS (description = 'Monthly QBO revenue ledger totals, maintained by data/aggregates.py');
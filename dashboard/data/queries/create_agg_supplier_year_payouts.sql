@@ -0,0 +1,26 @@
+-- =============================================================================
+-- CREATE TABLE: Supplier Year Payouts Aggregate
+-- =============================================================================
+-- Deploy with: python -m data.aggregates deploy
+-- Refresh with: python -m data.aggregates refresh
+-- Dataset: App_KPI_Dashboard
+--
+-- Net supplier payouts by supplier org and year (grain = 'supplier'), plus
+-- yearly gross bills and vendor credits (grain = 'ledger'). Supply NPR, its
+-- details, the supplier core action states and the yearly payout summary
+-- read this table when KPI_USE_AGGREGATES is set.
+-- Partitioned by year so a refresh only rewrites the years that changed.
+-- =============================================================================
+
+CREATE TABLE IF NOT EXISTS `stitchdata-384118.App_KPI_Dashboard.agg_supplier_year_payouts` (
+    grain STRING NOT NULL,
+    supplier_org_name STRING,
+    txn_year INT64 NOT NULL,
+    net_payouts FLOAT64,
+    gross_bills FLOAT64,
+    vendor_credits FLOAT64,
+    refreshed_at TIMESTAMP NOT NULL
+)
+PARTITION BY RANGE_BUCKET(txn_year, GENERATE_ARRAY(2015, 2051, 1))
+CLUSTER BY grain, supplier_org_name
+OPTIONS (description = 'Supplier-year net payouts, maintained by data/aggregates.py');
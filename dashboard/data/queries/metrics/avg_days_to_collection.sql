@@ -0,0 +1,31 @@
+-- =============================================================================
+-- METRIC: Avg Days to Collection
+-- =============================================================================
+-- Registered in data/metric_registry.py, run by bigquery_client.run_metric()
+-- Parameters: @period_start, @period_end (DATE, on due_date)
+-- =============================================================================
+
+WITH paid_invoices AS (
+    SELECT
+        inv.id AS invoice_id,
+        inv.transaction_date AS invoice_created,
+        inv.due_date,
+        pmt.transaction_date AS payment_date,
+        EXTRACT(YEAR FROM inv.due_date) AS due_date_year,
+        DATE_DIFF(pmt.transaction_date, inv.transaction_date, DAY) AS days_to_collect
+    FROM `{PROJECT_ID}.src_fivetran_qbo.invoice` inv
+    JOIN `{PROJECT_ID}.src_fivetran_qbo.payment_line` pl
+        ON inv.id = pl.invoice_id
+    JOIN `{PROJECT_ID}.src_fivetran_qbo.payment` pmt
+        ON pl.payment_id = pmt.id
+    WHERE inv._fivetran_deleted = FALSE
+      AND pmt._fivetran_deleted = FALSE
+      AND inv.balance = 0
+      AND inv.due_date >= @period_start
+      AND inv.due_date < @period_end
+)
+SELECT
+    COUNT(*) AS invoices_paid,
+    ROUND(AVG(days_to_collect), 1) AS avg_days_to_collect,
+    ROUND(APPROX_QUANTILES(days_to_collect, 100)[OFFSET(50)], 1) AS median_days_to_collect
+FROM paid_invoices
@@ -0,0 +1,17 @@
+-- =============================================================================
+-- METRIC: Avg Deal Size YTD
+-- =============================================================================
+-- Registered in data/metric_registry.py, run by bigquery_client.run_metric()
+-- Parameters: @period_start, @period_end (TIMESTAMP)
+-- =============================================================================
+
+SELECT
+    AVG(SAFE_CAST(property_amount AS FLOAT64)) AS avg_deal_size,
+    COUNT(*) AS deal_count,
+    SUM(SAFE_CAST(property_amount AS FLOAT64)) AS total_revenue
+FROM `{PROJECT_ID}.src_fivetran_hubspot.deal`
+WHERE deal_pipeline_id = 'default'
+  AND is_deleted = false
+  AND property_hs_is_closed_won = true
+  AND property_closedate >= @period_start
+  AND property_closedate < @period_end
@@ -0,0 +1,16 @@
+-- =============================================================================
+-- METRIC: Invoice Collection Rate
+-- =============================================================================
+-- Registered in data/metric_registry.py, run by bigquery_client.run_metric()
+-- Parameters: @as_of_date, @period_start, @period_end (DATE)
+-- =============================================================================
+
+SELECT
+    COUNTIF(balance = 0) AS paid_invoices,
+    COUNT(*) AS total_due_invoices,
+    SAFE_DIVIDE(COUNTIF(balance = 0), COUNT(*)) AS collection_rate_pct
+FROM `{PROJECT_ID}.src_fivetran_qbo.invoice`
+WHERE due_date <= @as_of_date
+  AND _fivetran_deleted = FALSE
+  AND transaction_date >= @period_start
+  AND transaction_date < @period_end
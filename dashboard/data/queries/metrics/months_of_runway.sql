@@ -0,0 +1,32 @@
+-- =============================================================================
+-- METRIC: Months of Runway
+-- =============================================================================
+-- Registered in data/metric_registry.py, run by bigquery_client.run_metric()
+-- Parameters: @as_of_date
+-- =============================================================================
+
+WITH monthly_expenses AS (
+    SELECT
+        DATE_TRUNC(je.transaction_date, MONTH) as month,
+        SUM(CASE WHEN a.classification = 'Expense' THEN jel.amount ELSE 0 END) as expenses
+    FROM `{PROJECT_ID}.src_fivetran_qbo.journal_entry_line` jel
+    JOIN `{PROJECT_ID}.src_fivetran_qbo.journal_entry` je ON jel.journal_entry_id = je.id
+    JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON jel.account_id = a.id
+    WHERE je._fivetran_deleted = FALSE
+      AND je.transaction_date >= DATE_SUB(@as_of_date, INTERVAL 3 MONTH)
+    GROUP BY 1
+),
+cash AS (
+    SELECT COALESCE(SUM(jel.amount), 0) as cash_balance
+    FROM `{PROJECT_ID}.src_fivetran_qbo.journal_entry_line` jel
+    JOIN `{PROJECT_ID}.src_fivetran_qbo.journal_entry` je ON jel.journal_entry_id = je.id
+    JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON jel.account_id = a.id
+    WHERE je._fivetran_deleted = FALSE
+      AND a.account_sub_type = 'Bank'
+)
+SELECT
+    c.cash_balance,
+    AVG(e.expenses) as avg_monthly_burn,
+    SAFE_DIVIDE(c.cash_balance, AVG(e.expenses)) as months_of_runway
+FROM cash c, monthly_expenses e
+GROUP BY c.cash_balance
@@ -0,0 +1,14 @@
+-- =============================================================================
+-- METRIC: Overdue Invoices
+-- =============================================================================
+-- Registered in data/metric_registry.py, run by bigquery_client.run_metric()
+-- Parameters: @as_of_date
+-- =============================================================================
+
+SELECT
+    COUNT(*) AS overdue_count,
+    COALESCE(SUM(balance), 0) AS overdue_amount
+FROM `{PROJECT_ID}.src_fivetran_qbo.invoice`
+WHERE balance > 0
+  AND due_date < @as_of_date
+  AND _fivetran_deleted = FALSE
@@ -0,0 +1,19 @@
+-- =============================================================================
+-- METRIC: Sales Cycle Length
+-- =============================================================================
+-- Registered in data/metric_registry.py, run by bigquery_client.run_metric()
+-- Parameters: @period_start, @period_end (TIMESTAMP)
+-- =============================================================================
+
+SELECT
+    AVG(DATE_DIFF(property_closedate, property_createdate, DAY)) AS avg_days,
+    APPROX_QUANTILES(
+        DATE_DIFF(property_closedate, property_createdate, DAY), 100
+    )[OFFSET(50)] AS median_days,
+    COUNT(*) AS deal_count
+FROM `{PROJECT_ID}.src_fivetran_hubspot.deal`
+WHERE deal_pipeline_id = 'default'
+  AND is_deleted = false
+  AND property_hs_is_closed_won = true
+  AND property_closedate >= @period_start
+  AND property_closedate < @period_end
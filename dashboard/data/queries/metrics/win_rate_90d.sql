@@ -0,0 +1,19 @@
+-- =============================================================================
+-- METRIC: Win Rate (90 Days)
+-- =============================================================================
+-- Registered in data/metric_registry.py, run by bigquery_client.run_metric()
+-- Parameters: @as_of_date
+-- =============================================================================
+
+SELECT
+    COUNTIF(property_hs_is_closed_won = true) AS won_count,
+    COUNTIF(property_hs_is_closed_won = false) AS lost_count,
+    SAFE_DIVIDE(
+        COUNTIF(property_hs_is_closed_won = true),
+        COUNT(*)
+    ) AS win_rate
+FROM `{PROJECT_ID}.src_fivetran_hubspot.deal`
+WHERE deal_pipeline_id = 'default'
+  AND is_deleted = false
+  AND property_hs_is_closed = true
+  AND property_closedate >= TIMESTAMP(DATE_SUB(@as_of_date, INTERVAL 90 DAY))
@@ -0,0 +1,29 @@
+-- =============================================================================
+-- METRIC: Working Capital
+-- =============================================================================
+-- Registered in data/metric_registry.py, run by bigquery_client.run_metric()
+-- Parameters: none
+-- =============================================================================
+
+WITH balance_sheet AS (
+    SELECT
+        a.classification,
+        a.account_sub_type,
+        COALESCE(SUM(jel.amount), 0) as balance
+    FROM `{PROJECT_ID}.src_fivetran_qbo.journal_entry_line` jel
+    JOIN `{PROJECT_ID}.src_fivetran_qbo.journal_entry` je ON jel.journal_entry_id = je.id
+    JOIN `{PROJECT_ID}.src_fivetran_qbo.account` a ON jel.account_id = a.id
+    WHERE je._fivetran_deleted = FALSE
+      AND a.classification IN ('Asset', 'Liability')
+      AND a.account_sub_type IN (
+        'Bank', 'AccountsReceivable', 'OtherCurrentAsset',
+        'AccountsPayable', 'OtherCurrentLiability', 'CreditCard'
+      )
+    GROUP BY 1, 2
+)
+SELECT
+    SUM(CASE WHEN classification = 'Asset' THEN balance ELSE 0 END) as current_assets,
+    SUM(CASE WHEN classification = 'Liability' THEN ABS(balance) ELSE 0 END) as current_liabilities,
+    SUM(CASE WHEN classification = 'Asset' THEN balance ELSE 0 END)
+    - SUM(CASE WHEN classification = 'Liability' THEN ABS(balance) ELSE 0 END) as working_capital
+FROM balance_sheet
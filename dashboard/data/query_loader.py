@@ -0,0 +1,238 @@
+"""
+Query Loader - Compiled, validated SQL templates kept in memory.
+
+Every .sql file under the query directories is read once, when the loader
+is first used. Each file is compiled into a SqlTemplate:
+
+- {NAME} placeholders (PROJECT_ID, DATASET) are filled in from the
+  loader's constants; an unknown placeholder fails the load, so a typo
+  surfaces at startup instead of as a BigQuery syntax error.
+- @parameters are collected so bind() can check that a query gets exactly
+  the parameters it uses, with typed BigQuery parameters for plain values.
+
+Comments and string literals are ignored when looking for placeholders and
+parameters ('rep@recess.is' is not a parameter, "{bill_number}" in a
+comment is not a placeholder).
+
+Set KPI_SQL_HOT_RELOAD=1 while editing SQL: each lookup then checks the
+file's mtime and recompiles it if it changed.
+"""
+
+import logging
+import os
+import re
+import threading
+from datetime import date, datetime
+from decimal import Decimal
+from pathlib import Path
+from typing import TYPE_CHECKING, Any, Dict, FrozenSet, Iterable, List, Optional, Tuple, Union
+
+from .lazy_import import LazyModule
+
+if TYPE_CHECKING:
+    from google.cloud import bigquery
+else:
+    bigquery = LazyModule("google.cloud.bigquery")
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+HOT_RELOAD_ENV = "KPI_SQL_HOT_RELOAD"
+
+QueryParameter = Union["bigquery.ScalarQueryParameter", "bigquery.ArrayQueryParameter"]
+
+# Comments and string literals, skipped when scanning for placeholders and
+# parameters. Backtick identifiers are kept: `{PROJECT_ID}.dataset.table`.
+_IGNORED = re.compile(
+    r"--[^\n]*"
+    r"|/\*.*?\*/"
+    r"|'(?:[^'\\]|\\.)*'"
+    r'|"(?:[^"\\]|\\.)*"',
+    re.DOTALL,
+)
+_PLACEHOLDER = re.compile(r"\{([A-Za-z_][A-Za-z0-9_]*)\}")
+_PARAMETER = re.compile(r"(?<![@\w])@([A-Za-z_][A-Za-z0-9_]*)")
+
+# Python type -> BigQuery parameter type (bool before int: bool is an int)
+_PARAM_TYPES: Tuple[Tuple[type, str], ...] = (
+    (bool, "BOOL"),
+    (int, "INT64"),
+    (float, "FLOAT64"),
+    (Decimal, "NUMERIC"),
+    (datetime, "TIMESTAMP"),
+    (date, "DATE"),
+    (str, "STRING"),
+    (bytes, "BYTES"),
+)
+
+
+class QueryTemplateError(ValueError):
+    """A SQL file failed validation, or a query was bound incorrectly."""
+
+
+def _param_type(name: str, value: Any) -> str:
+    for python_type, bq_type in _PARAM_TYPES:
+        if isinstance(value, python_type):
+            return bq_type
+    raise QueryTemplateError(f"@{name}: no BigQuery type for {type(value).__name__}")
+
+
+def to_query_parameter(name: str, value: Any) -> QueryParameter:
+    """Build a typed BigQuery parameter from a plain Python value.
+
+    Lists and tuples become ARRAY parameters typed by their first element.
+
+    Raises:
+        QueryTemplateError: If the type has no BigQuery equivalent, or an
+            array is empty (its element type cannot be inferred)
+    """
+    if isinstance(value, (list, tuple)):
+        if not value:
+            raise QueryTemplateError(f"@{name}: cannot infer the type of an empty array")
+        return bigquery.ArrayQueryParameter(name, _param_type(name, value[0]), list(value))
+    return bigquery.ScalarQueryParameter(name, _param_type(name, value), value)
+
+
+class SqlTemplate:
+    """One compiled SQL file."""
+
+    def __init__(self, name: str, path: Path, source: str, constants: Dict[str, str]):
+        """Compile a SQL file.
+
+        Args:
+            name: Path relative to its query directory (the lookup key)
+            path: File path
+            source: File contents
+            constants: Placeholder values ({PROJECT_ID} etc.)
+
+        Raises:
+            QueryTemplateError: If the file uses an unknown placeholder
+        """
+        code = _IGNORED.sub(" ", source)
+        self.name = name
+        self.path = path
+        self.placeholders: FrozenSet[str] = frozenset(_PLACEHOLDER.findall(code))
+        self.parameters: FrozenSet[str] = frozenset(_PARAMETER.findall(code))
+
+        unknown = sorted(self.placeholders - set(constants))
+        if unknown:
+            raise QueryTemplateError(f"{name}: unknown placeholder(s) {', '.join(unknown)}")
+
+        self.sql = _PLACEHOLDER.sub(
+            lambda m: constants.get(m.group(1), m.group(0)), source
+        )
+
+    def bind(self, params: Optional[Iterable[QueryParameter]] = None, **values: Any) -> List[QueryParameter]:
+        """Build the query parameters for this template.
+
+        Args:
+            params: Ready-made BigQuery parameters (e.g. from period_params)
+            **values: Plain values, typed with to_query_parameter()
+
+        Returns:
+            List of BigQuery query parameters
+
+        Raises:
+            QueryTemplateError: If a parameter the SQL uses is missing, or
+                one is supplied that it does not use
+        """
+        bound = list(params or []) + [to_query_parameter(k, v) for k, v in values.items()]
+        names = {p.name for p in bound}
+        missing = sorted(self.parameters - names)
+        unused = sorted(names - self.parameters)
+        if missing or unused:
+            raise QueryTemplateError(
+                f"{self.name}: missing @{', @'.join(missing) or '-'}; unused @{', @'.join(unused) or '-'}"
+            )
+        return bound
+
+    def __repr__(self) -> str:
+        return f"SqlTemplate({self.name!r})"
+
+
+class QueryLoader:
+    """Every SQL file under a set of directories, compiled once."""
+
+    def __init__(self, roots: Iterable[Path], constants: Dict[str, str], hot_reload: bool = False):
+        """Read and compile every .sql file.
+
+        Args:
+            roots: Query directories; files are keyed by their path relative
+                to the directory (a missing directory is skipped)
+            constants: Placeholder values
+            hot_reload: Recompile a file when its mtime changes
+
+        Raises:
+            QueryTemplateError: If any file fails validation (all failures
+                are reported together) or two roots share a file name
+        """
+        self.roots = [Path(root) for root in roots]
+        self.constants = dict(constants)
+        self.hot_reload = hot_reload
+        self._templates: Dict[str, Tuple[int, SqlTemplate]] = {}
+        self._lock = threading.Lock()
+
+        errors = []
+        for root in self.roots:
+            for path in sorted(root.rglob("*.sql")):
+                name = path.relative_to(root).as_posix()
+                if name in self._templates:
+                    errors.append(f"{name}: defined in more than one query directory")
+                    continue
+                try:
+                    self._templates[name] = self._compile(name, path)
+                except (OSError, QueryTemplateError) as e:
+                    errors.append(str(e))
+        if errors:
+            raise QueryTemplateError("Invalid SQL templates:\n  " + "\n  ".join(errors))
+        logger.info("Loaded %d SQL templates", len(self._templates))
+
+    def _compile(self, name: str, path: Path) -> Tuple[int, SqlTemplate]:
+        mtime = path.stat().st_mtime_ns
+        return mtime, SqlTemplate(name, path, path.read_text(), self.constants)
+
+    def _find(self, name: str) -> Optional[Path]:
+        for root in self.roots:
+            path = root / name
+            if path.is_file():
+                return path
+        return None
+
+    def get(self, name: str) -> Optional[SqlTemplate]:
+        """Look up a compiled template.
+
+        Args:
+            name: Path relative to its query directory (e.g. 'metrics/win_rate_90d.sql')
+
+        Returns:
+            SqlTemplate, or None if no such file exists
+
+        Raises:
+            QueryTemplateError: If hot reload recompiles a file that is now invalid
+        """
+        entry = self._templates.get(name)
+        if not self.hot_reload:
+            return entry[1] if entry else None
+
+        path = entry[1].path if entry else self._find(name)
+        try:
+            mtime = path.stat().st_mtime_ns if path else None
+        except OSError:
+            mtime = None
+        with self._lock:
+            if mtime is None:
+                self._templates.pop(name, None)
+                return None
+            if entry is None or entry[0] != mtime:
+                logger.info("Reloading SQL template %s", name)
+                self._templates[name] = self._compile(name, path)
+            return self._templates[name][1]
+
+    def names(self) -> List[str]:
+        """Return every loaded template name."""
+        return sorted(self._templates)
+
+
+def hot_reload_enabled() -> bool:
+    """True when SQL files should be re-read as they change (dev mode)."""
+    return os.environ.get(HOT_RELOAD_ENV, "").strip().lower() in ("1", "true", "yes")
@@ -0,0 +1,311 @@
+"""
+Result Cache - Persistent on-disk cache for BigQuery query results.
+
+Results are stored in a SQLite file under a cache directory, keyed by a hash
+of the normalized SQL text plus its query parameters. Payloads are pickled and
+zlib-compressed; entries carry a per-metric TTL and the file is kept under a
+size budget by evicting the least recently used entries.
+
+Because the cache lives on disk, a restarted Streamlit server (start.sh kills
+and relaunches the process) serves the Overview from warm data instead of
+re-running every query.
+
+Entries may also carry a source watermark: a fingerprint of the last-modified
+times of the tables the query reads. While the watermark still matches, the
+entry stays valid past its TTL (up to WATERMARK_MAX_AGE), because the warehouse
+only changes when Fivetran syncs.
+
+Enable by pointing KPI_CACHE_DIR at a writable directory. When unset, the
+cache is disabled and every query goes to BigQuery. It is also disabled
+while KPI_OFFLINE_REPLICA is set.
+"""
+
+import contextlib
+import hashlib
+import json
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from .offline_replica import replica_dir
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+# Environment configuration
+CACHE_DIR_ENV = "KPI_CACHE_DIR"
+CACHE_MAX_MB_ENV = "KPI_CACHE_MAX_MB"
+CACHE_FILENAME = "bq_results.sqlite3"
+
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+DEFAULT_TTL_SECONDS = 15 * 60
+
+# Hard cap on how long a watermarked entry is trusted without re-running
+WATERMARK_MAX_AGE = 24 * 60 * 60
+
+# Bump when the payload format changes so old entries are never decoded
+# (2: decoded records with NUMERIC as float; 1 held CachedRows of Decimal)
+CACHE_FORMAT_VERSION = 2
+
+# Sentinel returned by ResultCache.get() on a miss (None is a valid result)
+MISS = object()
+
+
+class CachedRow(dict):
+    """Plain-data stand-in for a BigQuery Row.
+
+    Supports the access patterns used by the metric functions: attribute
+    access (row.total), item access (row["total"]), dict(row) and
+    getattr(row, "col", default).
+    """
+
+    def __getattr__(self, name: str) -> Any:
+        try:
+            return self[name]
+        except KeyError:
+            raise AttributeError(name) from None
+
+    def __reduce__(self):
+        return (CachedRow, (dict(self),))
+
+
+def to_cached_rows(rows: Iterable[Any]) -> List[CachedRow]:
+    """Convert BigQuery rows to picklable CachedRow objects."""
+    return [CachedRow(row.items()) for row in rows]
+
+
+def _param_signature(param: Any) -> Tuple[str, str, str]:
+    """Describe a Scalar/ArrayQueryParameter as (name, type, value repr)."""
+    type_ = getattr(param, "type_", None) or getattr(param, "array_type", None)
+    value = getattr(param, "value", getattr(param, "values", None))
+    return (str(param.name), str(type_), repr(value))
+
+
+def make_key(query: str, params: Optional[Iterable[Any]] = None) -> str:
+    """Build the cache key for a query and its parameters.
+
+    Whitespace in the SQL is normalized so reformatting a template does not
+    orphan its cached results.
+
+    Args:
+        query: SQL query text
+        params: Query parameters (ScalarQueryParameter / ArrayQueryParameter)
+
+    Returns:
+        Hex sha256 digest
+    """
+    normalized = " ".join(query.split())
+    signature = sorted(_param_signature(p) for p in (params or []))
+    material = json.dumps([CACHE_FORMAT_VERSION, normalized, signature])
+    return hashlib.sha256(material.encode("utf-8")).hexdigest()
+
+
+class ResultCache:
+    """SQLite-backed result cache with per-entry TTL and LRU size eviction.
+
+    Each operation opens its own short-lived connection, so the cache is safe
+    to use from the concurrent fan-out worker threads.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        max_bytes: int = DEFAULT_MAX_BYTES,
+        default_ttl: float = DEFAULT_TTL_SECONDS,
+    ):
+        """Open (and create if needed) the cache file.
+
+        Args:
+            path: Path of the SQLite cache file
+            max_bytes: Total compressed payload budget before LRU eviction
+            default_ttl: TTL in seconds for entries stored without one
+        """
+        self.path = Path(path)
+        self.max_bytes = max_bytes
+        self.default_ttl = default_ttl
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS results (
+                    key TEXT PRIMARY KEY,
+                    metric TEXT,
+                    payload BLOB NOT NULL,
+                    size INTEGER NOT NULL,
+                    created_at REAL NOT NULL,
+                    expires_at REAL NOT NULL,
+                    last_access REAL NOT NULL,
+                    ttl REAL,
+                    watermark TEXT
+                )
+                """
+            )
+            columns = {row[1] for row in conn.execute("PRAGMA table_info(results)")}
+            for column, ddl in (("ttl", "REAL"), ("watermark", "TEXT")):
+                if column not in columns:
+                    conn.execute(f"ALTER TABLE results ADD COLUMN {column} {ddl}")
+            conn.execute("CREATE INDEX IF NOT EXISTS results_last_access ON results (last_access)")
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def get(self, key: str, watermark: Optional[str] = None) -> Any:
+        """Return the cached value for key, or MISS if absent or stale.
+
+        Args:
+            key: Cache key from make_key()
+            watermark: Current source watermark, or None if unknown
+
+        An entry stored with a watermark is fresh while that watermark
+        matches the current one. If the current watermark is unknown (lookup
+        failed), it falls back to its TTL. Entries without a watermark
+        always use their TTL.
+        """
+        now = time.time()
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT payload, created_at, expires_at, ttl, watermark FROM results WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                if row is None:
+                    return MISS
+                payload, created_at, expires_at, ttl, stored_watermark = row
+                if stored_watermark is not None:
+                    if watermark is not None:
+                        fresh = watermark == stored_watermark
+                    else:
+                        fresh = ttl is not None and created_at + ttl > now
+                    if not fresh:
+                        return MISS
+                if expires_at <= now:
+                    conn.execute("DELETE FROM results WHERE key = ?", (key,))
+                    return MISS
+                conn.execute("UPDATE results SET last_access = ? WHERE key = ?", (now, key))
+            return pickle.loads(zlib.decompress(payload))
+        except (sqlite3.Error, pickle.UnpicklingError, zlib.error, EOFError) as e:
+            logger.warning("Result cache read failed for %s: %s", key[:12], e)
+            return MISS
+
+    def set(
+        self,
+        key: str,
+        value: Any,
+        ttl: Optional[float] = None,
+        metric: Optional[str] = None,
+        watermark: Optional[str] = None
+    ) -> None:
+        """Store a value under key, then enforce the size budget.
+
+        Args:
+            key: Cache key from make_key()
+            value: Picklable result
+            ttl: Freshness in seconds when no watermark applies
+            metric: Metric name (for logging and inspection)
+            watermark: Source watermark the value was computed against
+        """
+        now = time.time()
+        ttl = self.default_ttl if ttl is None else ttl
+        lifetime = max(ttl, WATERMARK_MAX_AGE) if watermark is not None else ttl
+        try:
+            payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except (pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.warning("Result for %s is not cacheable: %s", metric or key[:12], e)
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    """
+                    INSERT OR REPLACE INTO results
+                        (key, metric, payload, size, created_at, expires_at, last_access, ttl, watermark)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    """,
+                    (key, metric, payload, len(payload), now, now + lifetime, now, ttl, watermark),
+                )
+                self._evict(conn, now)
+        except sqlite3.Error as e:
+            logger.warning("Result cache write failed for %s: %s", metric or key[:12], e)
+
+    def _evict(self, conn: sqlite3.Connection, now: float) -> None:
+        """Drop expired entries, then least recently used ones until under budget."""
+        conn.execute("DELETE FROM results WHERE expires_at <= ?", (now,))
+        total = conn.execute("SELECT COALESCE(SUM(size), 0) FROM results").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+        for key, size in conn.execute("SELECT key, size FROM results ORDER BY last_access").fetchall():
+            if total <= self.max_bytes:
+                break
+            conn.execute("DELETE FROM results WHERE key = ?", (key,))
+            total -= size
+
+    def clear(self) -> None:
+        """Remove every cached entry."""
+        with self._connect() as conn:
+            conn.execute("DELETE FROM results")
+
+    def stats(self) -> Dict[str, Any]:
+        """Return entry count and total compressed size."""
+        with self._connect() as conn:
+            entries, size = conn.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0) FROM results"
+            ).fetchone()
+        return {"entries": entries, "bytes": size, "max_bytes": self.max_bytes, "path": str(self.path)}
+
+
+# =============================================================================
+# SHARED INSTANCE
+# =============================================================================
+
+_cache: Optional[ResultCache] = None
+_cache_lock = threading.Lock()
+
+
+def get_result_cache() -> Optional[ResultCache]:
+    """Get the process-wide result cache configured from the environment.
+
+    Returns:
+        ResultCache under $KPI_CACHE_DIR, or None if caching is disabled
+        or the directory cannot be used
+    """
+    global _cache
+    if _cache is not None:
+        return _cache
+
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        return None
+    if replica_dir() is not None:
+        # Offline replica results must never reach a process reading BigQuery
+        return None
+
+    with _cache_lock:
+        if _cache is None:
+            try:
+                max_mb = float(os.environ.get(CACHE_MAX_MB_ENV) or 0)
+                max_bytes = int(max_mb * 1024 * 1024) if max_mb > 0 else DEFAULT_MAX_BYTES
+                _cache = ResultCache(Path(cache_dir).expanduser() / CACHE_FILENAME, max_bytes=max_bytes)
+                logger.info("Result cache enabled at %s", _cache.path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Result cache disabled, cannot open %s: %s", cache_dir, e)
+                return None
+    return _cache
+
+
+def reset_result_cache() -> None:
+    """Forget the shared instance (re-read from the environment on next use)."""
+    global _cache
+    with _cache_lock:
+        _cache = None
@@ -0,0 +1,165 @@
+"""
+Retry - Retry transient BigQuery failures with jittered exponential backoff.
+
+A 429 (rate limited) or a 5xx from BigQuery usually succeeds a moment later,
+so failing the card right away turns a blip into "No Data". call_with_retry()
+classifies each failure:
+
+- retryable: 429/500/502/503/504, the job error reasons BigQuery documents
+  as transient (rateLimitExceeded, backendError, ...), and dropped
+  connections or socket timeouts.
+- fatal: everything else - bad SQL (400), missing tables (404), permission
+  and quota errors (403 other than rate limiting), bytes-billed caps and an
+  open circuit breaker. Retrying these only delays the error.
+
+Retries back off exponentially with full jitter (a random delay between 0
+and base * 2^attempt, capped), so fan-out workers that failed together do
+not retry together. An overall deadline bounds attempts plus sleeps: no
+retry is started if its backoff would end past the deadline.
+"""
+
+import logging
+import random
+import sys
+import time
+from typing import Callable, Optional, TypeVar
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+T = TypeVar("T")
+
+RETRYABLE_STATUS_CODES = frozenset({429, 500, 502, 503, 504})
+
+# BigQuery error reasons that are transient, whatever the status code
+# (a failed job reports rateLimitExceeded as a 403, backendError as a 400)
+RETRYABLE_REASONS = frozenset({
+    "backendError", "internalError", "badGateway", "rateLimitExceeded", "jobRateLimitExceeded",
+})
+
+
+def _reasons(error: BaseException) -> set:
+    errors = getattr(error, "errors", None) or []
+    return {e.get("reason") for e in errors if isinstance(e, dict)}
+
+
+def _is_connection_error(error: BaseException) -> bool:
+    if isinstance(error, (ConnectionError, TimeoutError)):
+        return True
+    # google-cloud-bigquery talks HTTP through requests; only check its
+    # exceptions if it has been imported (importing it here costs boot time)
+    requests = sys.modules.get("requests")
+    if requests is None:
+        return False
+    return isinstance(error, (requests.exceptions.ConnectionError, requests.exceptions.Timeout))
+
+
+def is_retryable(error: BaseException) -> bool:
+    """True if a failed BigQuery call is worth trying again.
+
+    Args:
+        error: The exception the call raised
+
+    Returns:
+        True for rate limiting, server errors, transient job error reasons
+        and connection failures; False for everything else
+    """
+    if getattr(error, "code", None) in RETRYABLE_STATUS_CODES:
+        return True
+    if _reasons(error) & RETRYABLE_REASONS:
+        return True
+    return _is_connection_error(error)
+
+
+class RetryPolicy:
+    """How many times, how far apart and for how long to retry."""
+
+    def __init__(
+        self,
+        max_attempts: int = 3,
+        base_delay: float = 0.5,
+        max_delay: float = 8.0,
+        deadline: float = 30.0
+    ):
+        """Define a policy.
+
+        Args:
+            max_attempts: Total attempts, including the first (1 = no retries)
+            base_delay: Backoff ceiling in seconds before the first retry;
+                doubles with every further retry
+            max_delay: Upper bound on any single backoff
+            deadline: Seconds from the first attempt after which no retry
+                is started
+
+        Raises:
+            ValueError: If max_attempts is below 1 or a delay is negative
+        """
+        if max_attempts < 1 or base_delay < 0 or max_delay < 0 or deadline < 0:
+            raise ValueError("max_attempts must be positive and delays non-negative")
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.deadline = deadline
+
+    def backoff(self, retry: int, rng: Callable[[float, float], float] = random.uniform) -> float:
+        """Seconds to sleep before a retry (full jitter).
+
+        Args:
+            retry: 0 for the first retry, 1 for the second, ...
+            rng: uniform(low, high) source, injectable for tests
+
+        Returns:
+            Random delay between 0 and min(max_delay, base_delay * 2^retry)
+        """
+        return rng(0.0, min(self.max_delay, self.base_delay * 2 ** retry))
+
+    def __repr__(self) -> str:
+        return (f"RetryPolicy(max_attempts={self.max_attempts}, base_delay={self.base_delay}, "
+                f"max_delay={self.max_delay}, deadline={self.deadline})")
+
+
+def call_with_retry(
+    fn: Callable[[], T],
+    policy: RetryPolicy,
+    label: Optional[str] = None,
+    retryable: Callable[[BaseException], bool] = is_retryable,
+    sleep: Callable[[float], None] = time.sleep,
+    clock: Callable[[], float] = time.monotonic
+) -> T:
+    """Call fn, retrying transient failures according to a policy.
+
+    Args:
+        fn: Zero-argument callable that talks to BigQuery
+        policy: Attempts, backoff and overall deadline
+        label: Name used in log messages (e.g. the metric)
+        retryable: Classifies a failure as retryable (default is_retryable)
+        sleep: Sleep function, injectable for tests
+        clock: Monotonic clock, injectable for tests
+
+    Returns:
+        Whatever fn returns
+
+    Raises:
+        Exception: The last failure, once it is fatal, the attempts are
+            used up, or the next backoff would cross the deadline
+    """
+    started = clock()
+    attempt = 1
+    while True:
+        try:
+            return fn()
+        except Exception as e:
+            if not retryable(e):
+                raise
+            if attempt >= policy.max_attempts:
+                logger.warning("%s failed after %d attempt(s): %s", label or "BigQuery call", attempt, e)
+                raise
+            delay = policy.backoff(attempt - 1)
+            if clock() - started + delay > policy.deadline:
+                logger.warning("%s failed, retry deadline (%.0fs) reached: %s",
+                               label or "BigQuery call", policy.deadline, e)
+                raise
+            logger.info("%s failed (attempt %d/%d), retrying in %.2fs: %s",
+                        label or "BigQuery call", attempt, policy.max_attempts, delay, e)
+        sleep(delay)
+        attempt += 1
@@ -0,0 +1,127 @@
+"""
+Row Decoder - Turn BigQuery result sets into plain dicts, column by column.
+
+The BigQuery client already returns INT64 as int, FLOAT64 as float and
+STRING as str; only NUMERIC/BIGNUMERIC (Decimal) need converting for the
+dashboard's arithmetic and JSON-friendly caches. A RowDecoder is built once
+per result schema (cached by column names and types) and converts a whole
+result set column-wise: columns that already have the right Python type
+are passed through untouched, and no per-row attribute lookups are made.
+
+NULL handling is explicit: select_columns() picks the columns a fetcher
+uses and replaces NULL with the value the fetcher declares for each one.
+A legitimate 0 stays 0 (the old `float(row.x) if row.x else 0` pattern
+could not tell 0 from NULL).
+"""
+
+import functools
+from typing import Any, Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+# (column name, BigQuery field type) for each column of a result
+SchemaKey = Tuple[Tuple[str, str], ...]
+
+ColumnConverter = Callable[[Sequence[Any]], Sequence[Any]]
+
+
+def _as_floats(values: Sequence[Any]) -> List[Optional[float]]:
+    return [None if value is None else float(value) for value in values]
+
+
+# BigQuery field type -> column converter. Types not listed are already
+# the right Python type (int, float, str, bool, date, datetime, ...).
+_CONVERTERS: Dict[str, ColumnConverter] = {
+    "NUMERIC": _as_floats,
+    "BIGNUMERIC": _as_floats,
+    "DECIMAL": _as_floats,
+    "BIGDECIMAL": _as_floats,
+}
+
+
+class RowDecoder:
+    """Decoder for one result schema."""
+
+    def __init__(self, schema: SchemaKey):
+        """Pick a converter for each column.
+
+        Args:
+            schema: (name, BigQuery field type) per column, in result order
+        """
+        self.names = tuple(name for name, _ in schema)
+        self.converters: Tuple[Optional[ColumnConverter], ...] = tuple(
+            _CONVERTERS.get(field_type.upper()) for _, field_type in schema
+        )
+
+    def decode(self, rows: Iterable[Sequence[Any]]) -> List[Dict[str, Any]]:
+        """Convert rows (sequences in schema order) to dicts.
+
+        Args:
+            rows: BigQuery Rows or tuples, one value per schema column
+
+        Returns:
+            List of dicts keyed by column name
+        """
+        columns = list(zip(*rows))
+        if not columns:
+            return []
+        columns = [
+            convert(column) if convert else column
+            for convert, column in zip(self.converters, columns)
+        ]
+        names = self.names
+        return [dict(zip(names, values)) for values in zip(*columns)]
+
+    def __repr__(self) -> str:
+        return f"RowDecoder({', '.join(self.names)})"
+
+
+@functools.lru_cache(maxsize=256)
+def decoder_for(schema: SchemaKey) -> RowDecoder:
+    """Return the (cached) decoder for a result schema."""
+    return RowDecoder(schema)
+
+
+def schema_key(schema: Iterable[Any]) -> SchemaKey:
+    """Describe a list of BigQuery SchemaFields as (name, field type) pairs."""
+    return tuple((field.name, field.field_type) for field in schema)
+
+
+def decode_result(result: Iterable[Any]) -> List[Any]:
+    """Decode a finished query's rows using its result schema.
+
+    Args:
+        result: QueryJob.result() (a RowIterator carrying the schema)
+
+    Returns:
+        List of dicts; results without a schema are returned as a list
+        of their rows unchanged
+    """
+    schema = getattr(result, "schema", None)
+    if not isinstance(schema, (list, tuple)) or not schema:
+        return list(result)
+    return decoder_for(schema_key(schema)).decode(result)
+
+
+def select_columns(rows: Sequence[Any], columns: Dict[str, Any]) -> List[Dict[str, Any]]:
+    """Pick columns from decoded rows, replacing NULLs with declared values.
+
+    Args:
+        rows: Decoded rows (dicts), or row objects with attribute access
+        columns: Column name -> value to use where the column is NULL
+            (None keeps NULL as None)
+
+    Returns:
+        List of dicts with exactly the declared columns, in declared order
+    """
+    if not rows:
+        return []
+    values_by_column = []
+    for name, null in columns.items():
+        if isinstance(rows[0], dict):
+            values = [row.get(name) for row in rows]
+        else:
+            values = [getattr(row, name, None) for row in rows]
+        if null is not None:
+            values = [null if value is None else value for value in values]
+        values_by_column.append(values)
+    names = tuple(columns)
+    return [dict(zip(names, values)) for values in zip(*values_by_column)]
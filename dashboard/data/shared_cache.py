@@ -0,0 +1,191 @@
+"""
+Shared Cache - Cross-process metric snapshots for multiple Streamlit replicas.
+
+Each Streamlit server process keeps its own in-memory BigQuery snapshot. With
+several replicas behind a load balancer, that means N times the BigQuery jobs
+and replicas that disagree with each other. This module stores the snapshot
+in a SQLite file that every replica on the host reads. A per-snapshot file
+lock makes sure only one replica refreshes a snapshot at a time; the others
+adopt the result.
+
+Uses the same KPI_CACHE_DIR as the result cache. When unset, sharing is
+disabled and each process keeps its own snapshot. Sharing is also disabled
+while KPI_OFFLINE_REPLICA is set.
+"""
+
+import contextlib
+import logging
+import os
+import pickle
+import sqlite3
+import threading
+import time
+import zlib
+from pathlib import Path
+from typing import Any, Iterator, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # pragma: no cover - Windows
+    fcntl = None
+
+from .offline_replica import replica_dir
+from .result_cache import CACHE_DIR_ENV
+
+# Configure logging
+logger = logging.getLogger(__name__)
+
+SNAPSHOT_FILENAME = "snapshots.sqlite3"
+LOCK_POLL_INTERVAL = 0.1  # seconds between attempts on a held lock
+
+
+class SharedSnapshotStore:
+    """Named snapshots shared between processes, plus a refresh lock per name."""
+
+    def __init__(self, directory: Path):
+        """Open (and create if needed) the snapshot store.
+
+        Args:
+            directory: Directory holding the SQLite file and lock files
+        """
+        self.directory = Path(directory)
+        self.directory.mkdir(parents=True, exist_ok=True)
+        self.path = self.directory / SNAPSHOT_FILENAME
+        with self._connect() as conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.execute(
+                """
+                CREATE TABLE IF NOT EXISTS snapshots (
+                    name TEXT PRIMARY KEY,
+                    payload BLOB NOT NULL,
+                    updated_at REAL NOT NULL
+                )
+                """
+            )
+
+    @contextlib.contextmanager
+    def _connect(self) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.path), timeout=30)
+        try:
+            with conn:
+                yield conn
+        finally:
+            conn.close()
+
+    def updated_at(self, name: str) -> Optional[float]:
+        """Return when a snapshot was last saved (cheap, no payload read)."""
+        try:
+            with self._connect() as conn:
+                row = conn.execute("SELECT updated_at FROM snapshots WHERE name = ?", (name,)).fetchone()
+            return row[0] if row else None
+        except sqlite3.Error as e:
+            logger.warning("Shared snapshot lookup failed for %s: %s", name, e)
+            return None
+
+    def load(self, name: str, newer_than: float = 0.0) -> Optional[Tuple[Any, float]]:
+        """Load a snapshot if one newer than `newer_than` exists.
+
+        Returns:
+            Tuple of (value, updated_at), or None
+        """
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT payload, updated_at FROM snapshots WHERE name = ? AND updated_at > ?",
+                    (name, newer_than)
+                ).fetchone()
+            if row is None:
+                return None
+            return pickle.loads(zlib.decompress(row[0])), row[1]
+        except (sqlite3.Error, pickle.UnpicklingError, zlib.error, EOFError) as e:
+            logger.warning("Shared snapshot read failed for %s: %s", name, e)
+            return None
+
+    def save(self, name: str, value: Any, updated_at: Optional[float] = None) -> None:
+        """Publish a snapshot for every replica."""
+        updated_at = time.time() if updated_at is None else updated_at
+        try:
+            payload = zlib.compress(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO snapshots (name, payload, updated_at) VALUES (?, ?, ?)",
+                    (name, payload, updated_at)
+                )
+        except (sqlite3.Error, pickle.PicklingError, TypeError, AttributeError) as e:
+            logger.warning("Shared snapshot write failed for %s: %s", name, e)
+
+    @contextlib.contextmanager
+    def refresh_lock(self, name: str, timeout: Optional[float] = None) -> Iterator[bool]:
+        """Hold the cross-process refresh lock for a snapshot.
+
+        Args:
+            name: Snapshot name
+            timeout: Seconds to wait for a replica already holding the lock
+                (0 = try once, None = wait indefinitely)
+
+        Yields:
+            True if this process holds the lock, False if the wait timed out
+        """
+        if fcntl is None:
+            yield True
+            return
+
+        with open(self.directory / f"{name}.lock", "a+") as handle:
+            deadline = None if timeout is None else time.monotonic() + timeout
+            while True:
+                try:
+                    fcntl.flock(handle.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if deadline is not None and time.monotonic() >= deadline:
+                        yield False
+                        return
+                    time.sleep(LOCK_POLL_INTERVAL)
+            try:
+                yield True
+            finally:
+                fcntl.flock(handle.fileno(), fcntl.LOCK_UN)
+
+
+# =============================================================================
+# SHARED INSTANCE
+# =============================================================================
+
+_store: Optional[SharedSnapshotStore] = None
+_store_lock = threading.Lock()
+
+
+def get_shared_store() -> Optional[SharedSnapshotStore]:
+    """Get the snapshot store configured from the environment.
+
+    Returns:
+        SharedSnapshotStore under $KPI_CACHE_DIR, or None if sharing is
+        disabled or the directory cannot be used
+    """
+    global _store
+    if _store is not None:
+        return _store
+
+    cache_dir = os.environ.get(CACHE_DIR_ENV)
+    if not cache_dir:
+        return None
+    if replica_dir() is not None:
+        # Offline replica results must never reach a process reading BigQuery
+        return None
+
+    with _store_lock:
+        if _store is None:
+            try:
+                _store = SharedSnapshotStore(Path(cache_dir).expanduser())
+                logger.info("Shared snapshot store enabled at %s", _store.path)
+            except (OSError, sqlite3.Error) as e:
+                logger.warning("Shared snapshots disabled, cannot open %s: %s", cache_dir, e)
+                return None
+    return _store
+
+
+def reset_shared_store() -> None:
+    """Forget the shared instance (re-read from the environment on next use)."""
+    global _store
+    with _store_lock:
+        _store = None
@@ -0,0 +1,429 @@
+"""
+SQL Transpiler - Rewrite the dashboard's BigQuery SQL for DuckDB.
+
+Used by the offline replica (data/offline_replica.py) to run the same SQL
+the dashboard sends to BigQuery against local Parquet snapshots. It covers
+the BigQuery dialect this repo actually uses, not all of GoogleSQL:
+
+- `project.dataset.table` identifiers become "dataset"."table" (each
+  dataset is a DuckDB schema); "double quoted" and r'raw' strings become
+  standard single-quoted literals; @parameters become $parameters.
+- SAFE_CAST, COUNTIF, SAFE_DIVIDE, IF, APPROX_QUANTILES(x, n)[OFFSET(k)],
+  REGEXP_REPLACE (all matches), REGEXP_CONTAINS, DATE/TIMESTAMP_DIFF,
+  DATE/TIMESTAMP_TRUNC (including WEEK(MONDAY)), DATE/TIMESTAMP_ADD/SUB,
+  FORMAT_DATE (including %Q), PARSE_TIMESTAMP/PARSE_DATE, DATE(...),
+  TIMESTAMP(...), CURRENT_DATE(), EXTRACT(DAYOFWEEK ...), UNNEST(...) AS x
+  and (SELECT AS STRUCT * FROM (...)) are rewritten to DuckDB equivalents.
+- BigQuery type names in casts (FLOAT64, INT64, STRING, ...) are mapped.
+
+The SQL is tokenized first, so string literals and comments are never
+rewritten, and function calls are matched with their balanced arguments.
+DATE_TRUNC always returns a DATE (BigQuery keeps the input type; the
+values are the same).
+"""
+
+import functools
+import re
+from typing import Callable, Dict, FrozenSet, List, Optional, Tuple, Union
+
+
+class TranspileError(ValueError):
+    """The SQL could not be tokenized or uses an unsupported construct."""
+
+
+# =============================================================================
+# TOKENIZER
+# =============================================================================
+
+# Kinds: ws, comment, string, ident (backtick), param, word, number, punct
+_TOKEN = re.compile(
+    r"(?P<ws>\s+)"
+    r"|(?P<comment>--[^\n]*|#[^\n]*|/\*.*?\*/)"
+    r"|(?P<string>(?:[rRbB]{1,2})?(?:'''.*?'''|\"\"\".*?\"\"\"|'(?:[^'\\\n]|\\.)*'|\"(?:[^\"\\\n]|\\.)*\"))"
+    r"|(?P<ident>`[^`]*`)"
+    r"|(?P<param>@[A-Za-z_][A-Za-z0-9_]*)"
+    r"|(?P<word>[A-Za-z_][A-Za-z0-9_]*)"
+    r"|(?P<number>(?:\d+\.?\d*|\.\d+)(?:[eE][+-]?\d+)?)"
+    r"|(?P<punct>.)",
+    re.DOTALL,
+)
+
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "0": "\0", "\\": "\\", "'": "'", '"': '"', "`": "`", "?": "?"}
+
+
+class Token:
+    """One lexical token; `text` is what gets emitted."""
+
+    __slots__ = ("kind", "text")
+
+    def __init__(self, kind: str, text: str):
+        self.kind = kind
+        self.text = text
+
+    @property
+    def upper(self) -> str:
+        return self.text.upper() if self.kind == "word" else ""
+
+    def __repr__(self) -> str:
+        return f"Token({self.kind}, {self.text!r})"
+
+
+class Group:
+    """A parenthesized or bracketed run of items."""
+
+    __slots__ = ("open", "items")
+
+    def __init__(self, open_: str, items: List["Item"]):
+        self.open = open_
+        self.items = items
+
+    @property
+    def kind(self) -> str:
+        return "group"
+
+    @property
+    def upper(self) -> str:
+        return ""
+
+    @property
+    def text(self) -> str:
+        close = ")" if self.open == "(" else "]"
+        return self.open + render(self.items) + close
+
+
+Item = Union[Token, Group]
+
+
+def _string_literal(text: str) -> str:
+    """Convert a BigQuery string literal to a DuckDB one."""
+    prefix = re.match(r"[rRbB]*", text).group(0)
+    body = text[len(prefix):]
+    quote = body[:3] if body[:3] in ("'''", '"""') else body[0]
+    value = body[len(quote):-len(quote)]
+    if "r" not in prefix.lower():
+        value = re.sub(r"\\(.)", lambda m: _ESCAPES.get(m.group(1), "\\" + m.group(1)), value, flags=re.DOTALL)
+    return "'" + value.replace("'", "''") + "'"
+
+
+def _identifier(text: str) -> str:
+    """`project.dataset.table` -> "dataset"."table" (a DuckDB schema and table)."""
+    parts = text.strip("`").split(".")
+    if len(parts) == 3:
+        parts = parts[1:]
+    return ".".join('"' + part.replace('"', '""') + '"' for part in parts)
+
+
+def tokenize(sql: str) -> List[Token]:
+    """Split BigQuery SQL into tokens, converting literals and identifiers.
+
+    Raises:
+        TranspileError: If a string literal or identifier is unterminated
+    """
+    tokens = []
+    for match in _TOKEN.finditer(sql):
+        kind = match.lastgroup
+        text = match.group(0)
+        if kind == "punct" and text in ("'", '"', "`"):
+            raise TranspileError(f"Unterminated literal at offset {match.start()}")
+        if kind == "string":
+            text = _string_literal(text)
+        elif kind == "ident":
+            text = _identifier(text)
+        elif kind == "param":
+            text = "$" + text[1:]
+        tokens.append(Token(kind, text))
+    return tokens
+
+
+def _parse(tokens: List[Token]) -> List[Item]:
+    """Nest tokens into groups by their parentheses and brackets."""
+    stack: List[Tuple[str, List[Item]]] = [("", [])]
+    for token in tokens:
+        if token.kind == "punct" and token.text in "([":
+            stack.append((token.text, []))
+        elif token.kind == "punct" and token.text in ")]":
+            open_, items = stack.pop() if len(stack) > 1 else ("", [])
+            if open_ != {")": "(", "]": "["}[token.text]:
+                raise TranspileError(f"Unbalanced {token.text!r}")
+            stack[-1][1].append(Group(open_, items))
+        else:
+            stack[-1][1].append(token)
+    if len(stack) != 1:
+        raise TranspileError(f"Unclosed {stack[-1][0]!r}")
+    return stack[0][1]
+
+
+def render(items: List[Item]) -> str:
+    """Emit items as SQL text."""
+    return "".join(item.text for item in items)
+
+
+# =============================================================================
+# REWRITES
+# =============================================================================
+
+_TYPES = {
+    "FLOAT64": "DOUBLE",
+    "INT64": "BIGINT",
+    "STRING": "VARCHAR",
+    "BOOL": "BOOLEAN",
+    "NUMERIC": "DECIMAL(38, 9)",
+    "BIGNUMERIC": "DOUBLE",
+    "BYTES": "BLOB",
+}
+
+_SIGNIFICANT = ("ws", "comment")
+
+# Words DuckDB reserves that BigQuery SQL can use as table aliases
+# (`FROM deal_owners do`, `at.target`); quoted where they name something
+_DUCKDB_RESERVED = frozenset({
+    "ANALYSE", "ANALYZE", "ASYMMETRIC", "AT", "BOTH", "DEFERRABLE", "DESCRIBE", "DO",
+    "INITIALLY", "LAMBDA", "LEADING", "ONLY", "PLACING", "RETURNING", "SHOW",
+    "SUMMARIZE", "SYMMETRIC", "TRAILING", "VARIADIC",
+})
+
+
+def _significant(items: List[Item]) -> List[Item]:
+    return [item for item in items if item.kind not in _SIGNIFICANT]
+
+
+def _args(group: Group) -> List[str]:
+    """Split a call's arguments at top-level commas, as SQL text."""
+    args: List[List[Item]] = [[]]
+    for item in group.items:
+        if item.kind == "punct" and item.text == ",":
+            args.append([])
+        else:
+            args[-1].append(item)
+    return [render(arg).strip() for arg in args if _significant(arg)]
+
+
+def _date_part(text: str) -> str:
+    part = text.strip().upper()
+    if part in ("WEEK(MONDAY)", "ISOWEEK"):
+        return "week"
+    if part.startswith("WEEK"):
+        raise TranspileError(f"Unsupported date part: {text.strip()}")
+    return part.lower()
+
+
+def _map_cast_types(group: Group) -> None:
+    """Map BigQuery type names after AS inside a CAST's arguments."""
+    items = group.items
+    for i, item in enumerate(items):
+        if item.upper == "AS":
+            following = [j for j in range(i + 1, len(items)) if items[j].kind not in _SIGNIFICANT]
+            if following and items[following[0]].upper in _TYPES:
+                j = following[0]
+                items[j] = Token("raw", _TYPES[items[j].upper])
+
+
+def _safe_divide(args: List[str]) -> str:
+    return f"(({args[0]}) / NULLIF({args[1]}, 0))"
+
+
+def _date_diff(args: List[str]) -> str:
+    return f"date_diff('{_date_part(args[2])}', {args[1]}, {args[0]})"
+
+
+def _elapsed_diff(args: List[str]) -> str:
+    # BigQuery counts whole elapsed periods for timestamps; DuckDB's
+    # date_diff counts boundaries crossed (23:00 -> 01:00 is 1 day there)
+    return f"date_sub('{_date_part(args[2])}', {args[1]}, {args[0]})"
+
+
+def _date_trunc(args: List[str]) -> str:
+    return f"CAST(date_trunc('{_date_part(args[1])}', {args[0]}) AS DATE)"
+
+
+def _timestamp_trunc(args: List[str]) -> str:
+    return f"date_trunc('{_date_part(args[1])}', {args[0]})"
+
+
+def _date_shift(operator: str, to_date: bool) -> Callable[[List[str]], str]:
+    def rewrite(args: List[str]) -> str:
+        shifted = f"(({args[0]}) {operator} {args[1]})"
+        return f"CAST({shifted} AS DATE)" if to_date else shifted
+    return rewrite
+
+
+def _format_date(args: List[str]) -> str:
+    fmt, value = args
+    if "%Q" not in fmt:
+        return f"strftime({value}, {fmt})"
+    pieces = [piece for piece in fmt[1:-1].split("%Q")]
+    quarter = f"CAST(quarter({value}) AS VARCHAR)"
+    parts = []
+    for i, piece in enumerate(pieces):
+        if piece:
+            parts.append(f"strftime({value}, '{piece}')")
+        if i < len(pieces) - 1:
+            parts.append(quarter)
+    return "(" + " || ".join(parts) + ")"
+
+
+def _date(args: List[str]) -> str:
+    if len(args) == 3:
+        return f"make_date({', '.join(args)})"
+    if len(args) == 1:
+        return f"CAST({args[0]} AS DATE)"
+    raise TranspileError("DATE() with a time zone argument is not supported")
+
+
+def _approx_quantiles(args: List[str], subscript: Optional[Group]) -> str:
+    if subscript is None:
+        raise TranspileError("APPROX_QUANTILES without [OFFSET(k)] is not supported")
+    inner = _significant(subscript.items)
+    if len(inner) != 2 or inner[0].upper not in ("OFFSET", "SAFE_OFFSET", "ORDINAL", "SAFE_ORDINAL"):
+        raise TranspileError("APPROX_QUANTILES subscript must be OFFSET(k) or ORDINAL(k)")
+    k = int(_args(inner[1])[0]) - (1 if "ORDINAL" in inner[0].upper else 0)
+    n = int(args[1])
+    return f"quantile_disc({args[0]}, {k / n!r})"
+
+
+# Function name -> rewrite of its argument list
+_FUNCTIONS: Dict[str, Callable[[List[str]], str]] = {
+    "COUNTIF": lambda args: f"count_if({', '.join(args)})",
+    "SAFE_DIVIDE": _safe_divide,
+    "REGEXP_REPLACE": lambda args: f"regexp_replace({', '.join(args)}, 'g')",
+    "REGEXP_CONTAINS": lambda args: f"regexp_matches({', '.join(args)})",
+    "DATE_DIFF": _date_diff,
+    "DATETIME_DIFF": _elapsed_diff,
+    "TIMESTAMP_DIFF": _elapsed_diff,
+    "DATE_TRUNC": _date_trunc,
+    "DATETIME_TRUNC": _timestamp_trunc,
+    "TIMESTAMP_TRUNC": _timestamp_trunc,
+    "DATE_ADD": _date_shift("+", True),
+    "DATE_SUB": _date_shift("-", True),
+    "DATETIME_ADD": _date_shift("+", False),
+    "DATETIME_SUB": _date_shift("-", False),
+    "TIMESTAMP_ADD": _date_shift("+", False),
+    "TIMESTAMP_SUB": _date_shift("-", False),
+    "FORMAT_DATE": _format_date,
+    "FORMAT_TIMESTAMP": _format_date,
+    "PARSE_TIMESTAMP": lambda args: f"strptime({args[1]}, {args[0]})",
+    "PARSE_DATE": lambda args: f"CAST(strptime({args[1]}, {args[0]}) AS DATE)",
+    "DATE": _date,
+    "TIMESTAMP": lambda args: f"CAST({args[0]} AS TIMESTAMP)",
+    "CURRENT_DATE": lambda args: "current_date",
+    "CURRENT_TIMESTAMP": lambda args: "current_timestamp",
+}
+
+
+def _next_significant(items: List[Item], start: int) -> int:
+    """Index of the first non-whitespace item at or after start (len if none)."""
+    while start < len(items) and items[start].kind in _SIGNIFICANT:
+        start += 1
+    return start
+
+
+def _quote_reserved(items: List[Item]) -> None:
+    """Quote DuckDB-reserved words used as aliases or qualifiers."""
+    positions = [i for i, item in enumerate(items) if item.kind not in _SIGNIFICANT]
+    for n, i in enumerate(positions):
+        if items[i].upper not in _DUCKDB_RESERVED:
+            continue
+        before = items[positions[n - 1]] if n > 0 else None
+        after = items[positions[n + 1]] if n + 1 < len(positions) else None
+        qualifier = after is not None and after.text == "."
+        alias = before is not None and (
+            before.upper == "AS" or before.text == "."
+            or (before.kind in ("word", "ident", "group") and not (after is not None and (
+                after.kind == "group" or after.upper == "TIME"
+            )))
+        )
+        if qualifier or alias:
+            items[i] = Token("raw", f'"{items[i].text}"')
+
+
+def _rewrite_struct_subquery(group: Group) -> Optional[str]:
+    """(SELECT AS STRUCT * FROM (...)) -> (SELECT s FROM (...) AS s)."""
+    inner = _significant(group.items)
+    words = [item.upper for item in inner[:3]]
+    if words != ["SELECT", "AS", "STRUCT"] or len(inner) != 6:
+        return None
+    if inner[3].text != "*" or inner[4].upper != "FROM" or inner[5].kind != "group":
+        return None
+    return f"(SELECT __struct FROM {inner[5].text} AS __struct)"
+
+
+def _rewrite(items: List[Item]) -> List[Item]:
+    """Rewrite one nesting level (children first)."""
+    for item in items:
+        if isinstance(item, Group):
+            item.items = _rewrite(item.items)
+            struct = _rewrite_struct_subquery(item)
+            if struct is not None:
+                item.items = [Token("raw", struct[1:-1])]
+
+    _quote_reserved(items)
+    out: List[Item] = []
+    i = 0
+    while i < len(items):
+        item = items[i]
+        call = _next_significant(items, i + 1)
+        is_call = (
+            item.kind == "word"
+            and call < len(items)
+            and isinstance(items[call], Group)
+            and items[call].open == "("
+            and not (out and out[-1].kind == "punct" and out[-1].text == ".")
+        )
+        if not is_call:
+            out.append(item)
+            i += 1
+            continue
+
+        name, group = item.upper, items[call]
+        end = call + 1
+        if name in ("SAFE_CAST", "CAST"):
+            _map_cast_types(group)
+            out.append(Token("raw", ("TRY_CAST" if name == "SAFE_CAST" else "CAST") + group.text))
+        elif name == "APPROX_QUANTILES":
+            subscript_at = _next_significant(items, end)
+            subscript = None
+            if subscript_at < len(items) and isinstance(items[subscript_at], Group) and items[subscript_at].open == "[":
+                subscript = items[subscript_at]
+                end = subscript_at + 1
+            out.append(Token("raw", _approx_quantiles(_args(group), subscript)))
+        elif name == "EXTRACT" and _significant(group.items)[:1] and _significant(group.items)[0].upper == "DAYOFWEEK":
+            out.append(Token("raw", f"(EXTRACT(dow {render(group.items).split(None, 1)[1]}) + 1)"))
+        elif name == "UNNEST":
+            out.append(Token("raw", "UNNEST" + group.text))
+            alias_at = _next_significant(items, end)
+            if alias_at < len(items) and items[alias_at].upper == "AS":
+                name_at = _next_significant(items, alias_at + 1)
+                if name_at < len(items) and items[name_at].kind in ("word", "ident"):
+                    alias = items[name_at].text
+                    out.append(Token("raw", f" AS {alias}({alias})"))
+                    end = name_at + 1
+        elif name in _FUNCTIONS:
+            out.append(Token("raw", _FUNCTIONS[name](_args(group))))
+        else:
+            out.append(item)
+            out.extend(items[i + 1:end])
+        i = end
+    return out
+
+
+@functools.lru_cache(maxsize=512)
+def transpile(sql: str) -> Tuple[str, FrozenSet[str]]:
+    """Rewrite BigQuery SQL as DuckDB SQL.
+
+    Args:
+        sql: BigQuery Standard SQL (as sent by bigquery_client)
+
+    Returns:
+        Tuple of (DuckDB SQL, names of the @parameters it references)
+
+    Raises:
+        TranspileError: If the SQL is malformed or uses an unsupported construct
+    """
+    tokens = tokenize(sql)
+    parameters = frozenset(token.text[1:] for token in tokens if token.kind == "param")
+    try:
+        return render(_rewrite(_parse(tokens))), parameters
+    except (IndexError, ValueError) as e:
+        if isinstance(e, TranspileError):
+            raise
+        raise TranspileError(f"Cannot transpile: {e}") from e
@@ -0,0 +1,137 @@
+"""
+Query Telemetry - In-process ring buffer of recent BigQuery job statistics.
+
+bigquery_client records one entry per metric query: wall latency, bytes
+processed, whether BigQuery (or the on-disk result cache) served it from
+cache, slot milliseconds and row count. The buffer keeps the most recent
+TELEMETRY_CAPACITY entries; metric_stats() summarizes them per metric
+(p50/p95 latency) for the data source indicator, so it is easy to see
+which metrics dominate refresh time.
+"""
+
+import math
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+TELEMETRY_CAPACITY = 2000
+
+# Where a result came from
+SOURCE_BIGQUERY = "bigquery"
+SOURCE_RESULT_CACHE = "result_cache"
+
+_records: Deque[Dict[str, Any]] = deque(maxlen=TELEMETRY_CAPACITY)
+_records_lock = threading.Lock()
+
+
+def _as_int(value: Any) -> Optional[int]:
+    """Coerce a job statistic to int (None if BigQuery did not report it)."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        return None
+    return int(value)
+
+
+def record_query(
+    metric: Optional[str],
+    latency_seconds: float,
+    rows: Optional[int] = None,
+    bytes_processed: Any = None,
+    slot_millis: Any = None,
+    cache_hit: Any = None,
+    source: str = SOURCE_BIGQUERY,
+    error: Optional[str] = None
+) -> None:
+    """Append one query's statistics to the ring buffer.
+
+    Args:
+        metric: Metric name of the calling function (None for ad-hoc queries)
+        latency_seconds: Wall time from submitting the job to having the rows
+        rows: Number of rows returned
+        bytes_processed: QueryJob.total_bytes_processed
+        slot_millis: QueryJob.slot_millis
+        cache_hit: QueryJob.cache_hit (always True for result cache hits)
+        source: SOURCE_BIGQUERY or SOURCE_RESULT_CACHE
+        error: Error message if the query failed
+    """
+    entry = {
+        "metric": metric or "adhoc",
+        "at": time.time(),
+        "latency_ms": latency_seconds * 1000,
+        "rows": _as_int(rows),
+        "bytes_processed": _as_int(bytes_processed),
+        "slot_millis": _as_int(slot_millis),
+        "cache_hit": cache_hit if isinstance(cache_hit, bool) else None,
+        "source": source,
+        "error": error,
+    }
+    with _records_lock:
+        _records.append(entry)
+
+
+def recent_queries(limit: Optional[int] = None) -> List[Dict[str, Any]]:
+    """Return the buffered entries, newest last."""
+    with _records_lock:
+        records = list(_records)
+    return records[-limit:] if limit else records
+
+
+def _percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list."""
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def metric_stats() -> Dict[str, Dict[str, Any]]:
+    """Summarize the buffer per metric, slowest p95 first.
+
+    Returns:
+        Dict mapping metric name to count, p50_ms, p95_ms, errors,
+        cache_hits, total bytes_processed and slot_millis
+    """
+    by_metric: Dict[str, List[Dict[str, Any]]] = {}
+    for entry in recent_queries():
+        by_metric.setdefault(entry["metric"], []).append(entry)
+
+    stats = {}
+    for metric, entries in by_metric.items():
+        latencies = sorted(e["latency_ms"] for e in entries)
+        stats[metric] = {
+            "count": len(entries),
+            "p50_ms": _percentile(latencies, 50),
+            "p95_ms": _percentile(latencies, 95),
+            "errors": sum(1 for e in entries if e["error"]),
+            "cache_hits": sum(1 for e in entries if e["cache_hit"]),
+            "bytes_processed": sum(e["bytes_processed"] or 0 for e in entries),
+            "slot_millis": sum(e["slot_millis"] or 0 for e in entries),
+        }
+    return dict(sorted(stats.items(), key=lambda item: item[1]["p95_ms"], reverse=True))
+
+
+def latency_percentile(metric: str, pct: float, min_samples: int = 1) -> Optional[float]:
+    """Latency percentile of a metric's successful BigQuery jobs.
+
+    Result cache hits and failed queries are left out: they say nothing
+    about how long the next job will take.
+
+    Args:
+        metric: Metric name
+        pct: Percentile (0-100)
+        min_samples: Answer None until this many jobs have been recorded
+
+    Returns:
+        Latency in seconds, or None if there are too few samples
+    """
+    latencies = sorted(
+        e["latency_ms"] for e in recent_queries()
+        if e["metric"] == metric and e["source"] == SOURCE_BIGQUERY and not e["error"]
+    )
+    if not latencies or len(latencies) < min_samples:
+        return None
+    return _percentile(latencies, pct) / 1000
+
+
+def reset_telemetry() -> None:
+    """Drop every buffered entry."""
+    with _records_lock:
+        _records.clear()
@@ -7,6 +7,9 @@ cd "$(dirname "$0")"
 # Set the Google Cloud credentials
 export GOOGLE_APPLICATION_CREDENTIALS="/Users/deucethevenowworkm1/.config/bigquery-mcp-key.json"
 
+# Persistent BigQuery result cache (survives restarts; unset to disable)
+export KPI_CACHE_DIR="${KPI_CACHE_DIR:-$HOME/.cache/recess-kpi-dashboard}"
+
 # Activate virtual environment
 source venv/bin/activate
 
@@ -16,4 +19,5 @@ pkill -f "streamlit run app.py" 2>/dev/null
 # Start Streamlit
 echo "🚀 Starting Recess KPI Dashboard..."
 echo "📊 BigQuery credentials: $GOOGLE_APPLICATION_CREDENTIALS"
+echo "🗄️  Result cache: $KPI_CACHE_DIR"
 streamlit run app.py --server.port 8501
@@ -26,3 +26,50 @@ def mock_bq_result():
             mock_rows.append(mock_row)
         return mock_rows
     return _make_result
+
+
+@pytest.fixture(scope="session")
+def bq_client():
+    """Live BigQuery client for integration tests (skipped without credentials)."""
+    import os
+
+    if not os.environ.get("GOOGLE_APPLICATION_CREDENTIALS"):
+        pytest.skip("GOOGLE_APPLICATION_CREDENTIALS not set")
+    from data.bigquery_client import get_client
+    return get_client()
+
+
+@pytest.fixture(autouse=True)
+def _no_result_cache(monkeypatch):
+    """Keep unit tests hermetic: never read or write the on-disk result cache."""
+    import sys
+
+    monkeypatch.delenv("KPI_CACHE_DIR", raising=False)
+    monkeypatch.delenv("KPI_OFFLINE_REPLICA", raising=False)
+    from data import result_cache, shared_cache
+    result_cache.reset_result_cache()
+    shared_cache.reset_shared_store()
+    yield
+    result_cache.reset_result_cache()
+    shared_cache.reset_shared_store()
+    bq = sys.modules.get("data.bigquery_client")
+    if bq is not None:
+        bq.reset_source_watermarks()
+
+
+@pytest.fixture(autouse=True)
+def _closed_circuit():
+    """Start every test with a closed BigQuery circuit breaker.
+
+    Many tests make the mock client fail on purpose; without a reset those
+    failures would add up across tests and open the circuit.
+    """
+    import sys
+
+    bq = sys.modules.get("data.bigquery_client")
+    if bq is not None:
+        bq.bigquery_breaker.reset()
+    yield
+    bq = sys.modules.get("data.bigquery_client")
+    if bq is not None:
+        bq.bigquery_breaker.reset()
@@ -0,0 +1,188 @@
+"""Tests for the aggregate table deploy / incremental refresh tool."""
+from datetime import date, datetime, timezone
+from unittest.mock import MagicMock, patch
+
+import pytest
+
+LAST_REFRESH = datetime(2026, 3, 1, tzinfo=timezone.utc)
+CHECKED_AT = datetime(2026, 3, 2, tzinfo=timezone.utc)
+
+
+def _maintenance_client(since=LAST_REFRESH, partitions=(), accounts_changed=False):
+    """Mock client answering the refresh watermark, changed-partition and MERGE statements."""
+    def query(sql, job_config=None):
+        job = MagicMock()
+        if "MAX(refreshed_at)" in sql:
+            job.result.return_value = [MagicMock(since=since)]
+        elif "accounts_changed" in sql:
+            job.result.return_value = [MagicMock(
+                partitions=list(partitions), accounts_changed=accounts_changed, checked_at=CHECKED_AT,
+            )]
+        else:
+            job.num_dml_affected_rows = 12
+        return job
+
+    client = MagicMock()
+    client.query.side_effect = query
+    return client
+
+
+def _merges(client, table=None):
+    """MERGE calls into table (default: any aggregate table, not the document dates)."""
+    from data.aggregates import DOCUMENT_DATES
+
+    return [
+        c for c in client.query.call_args_list
+        if "MERGE" in c[0][0] and (DOCUMENT_DATES in c[0][0]) == (table == DOCUMENT_DATES)
+    ]
+
+
+def _params(call):
+    return {p.name: p for p in call[1]["job_config"].query_parameters}
+
+
+class TestRefreshTable:
+    @patch("data.bigquery_client.get_client")
+    def test_merges_only_changed_months(self, mock_get_client):
+        from data.aggregates import refresh_table
+
+        months = [date(2026, 1, 1), date(2026, 2, 1)]
+        client = mock_get_client.return_value = _maintenance_client(partitions=months)
+
+        summary = refresh_table("agg_qbo_ledger_monthly")
+
+        assert summary == {"table": "agg_qbo_ledger_monthly", "full": False, "partitions": months, "rows_affected": 12}
+        (merge,) = _merges(client)
+        assert "NOT MATCHED BY SOURCE AND T.month IN UNNEST(@partitions) THEN DELETE" in merge[0][0]
+        params = _params(merge)
+        assert params["partitions"].values == months
+        assert params["period_start"].value == date(2026, 1, 1)
+        assert params["period_end"].value == date(2026, 3, 1)
+        assert params["refreshed_at"].value == CHECKED_AT
+        since = _params(client.query.call_args_list[1])["since"].value
+        assert since == LAST_REFRESH
+
+    @patch("data.bigquery_client.get_client")
+    def test_document_dates_are_recorded_after_the_merge(self, mock_get_client):
+        from data.aggregates import DOCUMENT_DATES, refresh_table
+
+        client = mock_get_client.return_value = _maintenance_client(partitions=[date(2026, 2, 1)])
+
+        refresh_table("agg_qbo_ledger_monthly")
+
+        (merge,) = _merges(client)
+        (dates,) = _merges(client, DOCUMENT_DATES)
+        calls = client.query.call_args_list
+        assert calls.index(merge) < calls.index(dates)
+        params = _params(dates)
+        assert params["aggregate"].value == "agg_qbo_ledger_monthly"
+        assert params["since"].value == LAST_REFRESH
+        assert params["refreshed_at"].value == CHECKED_AT
+        assert "'vendor_credit' AS source" in dates[0][0]
+
+    @patch("data.bigquery_client.get_client")
+    def test_no_changes_skips_the_merge(self, mock_get_client):
+        from data.aggregates import refresh_table
+
+        client = mock_get_client.return_value = _maintenance_client()
+
+        assert refresh_table("agg_qbo_ledger_monthly")["partitions"] == []
+        assert _merges(client) == []
+
+    @patch("data.aggregates._payout_extra_partitions", return_value=[2025, 2026])
+    @patch("data.bigquery_client.get_client")
+    def test_payouts_always_refresh_recent_years(self, mock_get_client, _extra):
+        from data.aggregates import refresh_table
+
+        client = mock_get_client.return_value = _maintenance_client(partitions=[2023])
+
+        assert refresh_table("agg_supplier_year_payouts")["partitions"] == [2023, 2025, 2026]
+        assert _params(_merges(client)[0])["period_start"].value == date(2023, 1, 1)
+
+    @pytest.mark.parametrize("since, accounts_changed", [(None, False), (LAST_REFRESH, True)])
+    @patch("data.bigquery_client.get_client")
+    def test_empty_table_or_account_change_rebuilds_everything(self, mock_get_client, since, accounts_changed):
+        from data.aggregates import FULL_REBUILD_SINCE, refresh_table
+
+        client = mock_get_client.return_value = _maintenance_client(
+            since=since, partitions=[date(2025, 12, 1)], accounts_changed=accounts_changed,
+        )
+
+        assert refresh_table("agg_qbo_ledger_monthly")["full"]
+        (merge,) = _merges(client)
+        assert "WHEN NOT MATCHED BY SOURCE THEN DELETE" in merge[0][0]
+        detections = [c for c in client.query.call_args_list if "accounts_changed" in c[0][0]]
+        assert _params(detections[-1])["since"].value == FULL_REBUILD_SINCE
+
+
+class TestRedatedDocuments:
+    def test_redated_invoice_rewrites_its_previous_month(self, tmp_path):
+        """Moving an invoice from January to February marks both months changed."""
+        pytest.importorskip("duckdb")
+        pa = pytest.importorskip("pyarrow")
+        pq = pytest.importorskip("pyarrow.parquet")
+        from google.cloud import bigquery
+
+        from data.aggregates import DOCUMENT_DATES, LEDGER_DOCUMENTS, _changed_dates_sql
+        from data.offline_replica import OfflineClient
+
+        since = datetime(2026, 2, 1)
+        qbo, dashboard = tmp_path / "src_fivetran_qbo", tmp_path / "App_KPI_Dashboard"
+        qbo.mkdir()
+        dashboard.mkdir()
+        synced = pa.timestamp("us")
+        for header, lines, foreign_key in LEDGER_DOCUMENTS:
+            # Invoice 1 was re-dated to February after the last refresh; invoice 2 is untouched
+            ids = ["1", "2"] if header == "invoice" else []
+            pq.write_table(pa.table({
+                "id": pa.array(ids, pa.string()),
+                "transaction_date": pa.array([date(2026, 2, 3), date(2025, 12, 5)][:len(ids)], pa.date32()),
+                "_fivetran_synced": pa.array([datetime(2026, 3, 1), datetime(2025, 12, 6)][:len(ids)], synced),
+            }), qbo / f"{header}.parquet")
+            pq.write_table(pa.table({
+                foreign_key: pa.array(ids, pa.string()),
+                "_fivetran_synced": pa.array([datetime(2025, 12, 6)] * len(ids), synced),
+            }), qbo / f"{lines}.parquet")
+        pq.write_table(pa.table({
+            "aggregate": ["agg_qbo_ledger_monthly", "agg_qbo_ledger_monthly", "agg_supplier_year_payouts"],
+            "source": ["invoice", "invoice", "invoice"],
+            "document_id": ["1", "2", "1"],
+            "transaction_date": pa.array([date(2026, 1, 15), date(2025, 12, 5), date(2024, 6, 1)], pa.date32()),
+        }), dashboard / f"{DOCUMENT_DATES}.parquet")
+
+        rows = OfflineClient(tmp_path).query(
+            "SELECT DISTINCT DATE_TRUNC(transaction_date, MONTH) AS month "
+            f"FROM ({_changed_dates_sql(LEDGER_DOCUMENTS)})",
+            job_config=bigquery.QueryJobConfig(query_parameters=[
+                bigquery.ScalarQueryParameter("aggregate", "STRING", "agg_qbo_ledger_monthly"),
+                bigquery.ScalarQueryParameter("since", "TIMESTAMP", since),
+            ]),
+        ).result()
+
+        assert sorted(row.month for row in rows) == [date(2026, 1, 1), date(2026, 2, 1)]
+
+
+class TestMetricsReadAggregates:
+    @patch("data.bigquery_client.get_client")
+    def test_ledger_and_payouts_read_aggregate_tables_when_enabled(self, mock_get_client, monkeypatch):
+        import data.bigquery_client as bq
+
+        monkeypatch.setenv("KPI_USE_AGGREGATES", "1")
+        mock_get_client.return_value.query.return_value.result.return_value = []
+
+        bq.get_qbo_ledger((2025, 2026))
+        bq.get_supply_payout_staging()
+
+        ledger_sql, staging_sql = (c[0][0] for c in mock_get_client.return_value.query.call_args_list)
+        assert "App_KPI_Dashboard.agg_qbo_ledger_monthly" in ledger_sql
+        assert "App_KPI_Dashboard.agg_supplier_year_payouts" in staging_sql
+        assert "src_fivetran_qbo" not in ledger_sql + staging_sql
+
+    @patch("data.bigquery_client.get_client")
+    def test_raw_tables_by_default(self, mock_get_client):
+        import data.bigquery_client as bq
+
+        mock_get_client.return_value.query.return_value.result.return_value = []
+
+        bq.get_qbo_ledger((2025, 2026))
+        assert "src_fivetran_qbo.invoice_line" in mock_get_client.return_value.query.call_args[0][0]
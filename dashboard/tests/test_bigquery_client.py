@@ -14,6 +14,15 @@ def test_fixtures_work(mock_bq_client, mock_bq_result):
     assert mock_bq_client is not None
 
 
+def _ledger_rows(mock_bq_result, year, gmv, payouts, discount=0.0):
+    """Build get_qbo_ledger rows for one fiscal year."""
+    return mock_bq_result([
+        {"fiscal_year": year, "source": "invoice", "bucket": "gmv", "amount": gmv},
+        {"fiscal_year": year, "source": "invoice", "bucket": "discount", "amount": discount},
+        {"fiscal_year": year, "source": "bill", "bucket": "payout", "amount": payouts},
+    ])
+
+
 class TestGetTakeRate:
     """Tests for get_take_rate BigQuery function."""
 
@@ -25,11 +34,11 @@ class TestGetTakeRate:
         mock_client = MagicMock()
         mock_get_client.return_value = mock_client
 
-        # Mock: GMV = $7.92M, Take Rate = 0.491
+        # Mock: GMV = $7.92M, payouts = $4.03M -> Take Rate = 0.491
         mock_query_job = MagicMock()
-        mock_query_job.result.return_value = mock_bq_result([
-            {"take_rate": 0.491, "gmv": 7_920_000}
-        ])
+        mock_query_job.result.return_value = _ledger_rows(
+            mock_bq_result, 2025, gmv=7_920_000, payouts=4_031_280
+        )
         mock_client.query.return_value = mock_query_job
 
         result = get_take_rate(fiscal_year=2025)
@@ -50,27 +59,75 @@ class TestGetTakeRate:
 
     @patch("data.bigquery_client.get_client")
     def test_falls_back_to_prior_year_when_low_gmv(self, mock_get_client, mock_bq_result):
-        """When current year GMV < $100K, should fall back to prior year."""
+        """When current year GMV < $100K, should fall back to prior year from the same scan."""
         from data.bigquery_client import get_take_rate
 
         mock_client = MagicMock()
         mock_get_client.return_value = mock_client
 
-        # First call (2026): low GMV -> triggers fallback
-        low_gmv_result = MagicMock()
-        low_gmv_result.result.return_value = mock_bq_result([
-            {"take_rate": 0.5, "gmv": 50_000}
-        ])
-        # Second call (2025 fallback): real data
-        real_result = MagicMock()
-        real_result.result.return_value = mock_bq_result([
-            {"take_rate": 0.493, "gmv": 7_920_000}
-        ])
-        mock_client.query.side_effect = [low_gmv_result, real_result]
+        # 2026: low GMV -> triggers fallback; 2025: real data
+        mock_query_job = MagicMock()
+        mock_query_job.result.return_value = (
+            _ledger_rows(mock_bq_result, 2026, gmv=50_000, payouts=25_000)
+            + _ledger_rows(mock_bq_result, 2025, gmv=7_920_000, payouts=4_015_440)
+        )
+        mock_client.query.return_value = mock_query_job
 
         result = get_take_rate(fiscal_year=2026)
         assert result == pytest.approx(0.493, abs=0.001)
-        assert mock_client.query.call_count == 2
+        assert mock_client.query.call_count == 1
+
+
+class TestGetLedgerSummary:
+    """Tests for the shared multi-year QBO ledger scan."""
+
+    @patch("data.bigquery_client.get_client")
+    def test_revenue_take_rate_and_yoy_share_one_scan(self, mock_get_client, mock_bq_result):
+        from data.bigquery_client import (
+            get_revenue_ytd, get_take_rate, refresh_scope,
+        )
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_query_job = MagicMock()
+        mock_query_job.result.return_value = (
+            _ledger_rows(mock_bq_result, 2026, gmv=1_000_000, payouts=500_000, discount=-10_000)
+            + _ledger_rows(mock_bq_result, 2025, gmv=7_920_000, payouts=4_015_440)
+        )
+        mock_client.query.return_value = mock_query_job
+
+        with refresh_scope():
+            revenue = get_revenue_ytd(2026)
+            take_rate = get_take_rate(2026)
+            prior_revenue = get_revenue_ytd(2025)
+            prior_take_rate = get_take_rate(2025)
+
+        assert revenue == pytest.approx(490_000)
+        assert take_rate == pytest.approx(0.49)
+        assert prior_revenue == pytest.approx(3_904_560)
+        assert prior_take_rate == pytest.approx(0.493, abs=0.001)
+        assert mock_client.query.call_count == 1
+
+    def test_summary_nets_credit_memos_and_vendor_credits(self):
+        from data.bigquery_client import _summarize_ledger_year
+
+        summary = _summarize_ledger_year({
+            "invoice_gmv": 1_000.0,
+            "credit_memo_gmv": 100.0,
+            "invoice_discount": -50.0,
+            "bill_payout": 500.0,
+            "vendor_credit_payout": 20.0,
+        })
+        assert summary["gmv"] == pytest.approx(900.0)
+        assert summary["net_revenue"] == pytest.approx(370.0)
+        assert summary["take_rate"] == pytest.approx(370.0 / 900.0)
+
+    def test_empty_year_has_no_take_rate(self):
+        from data.bigquery_client import _summarize_ledger_year
+
+        summary = _summarize_ledger_year({})
+        assert summary["net_revenue"] == 0
+        assert summary["take_rate"] is None
 
 
 class TestGetInvoiceCollectionRate:
@@ -238,3 +295,786 @@ class TestGetMonthsOfRunway:
 
         result = get_months_of_runway()
         assert result == {}
+
+
+class TestGetCOOMetricsBatch:
+    """Tests for the one-job COO/Accounting metrics pack."""
+
+    BATCH_ROW = {
+        "invoice_collection_rate": {"paid_invoices": 93, "total_due_invoices": 100, "collection_rate_pct": 0.93},
+        "overdue_invoices": {"overdue_count": 4, "overdue_amount": 45_000.0},
+        "avg_days_to_collection": {"invoices_paid": 80, "avg_days_to_collect": 31.5, "median_days_to_collect": 28.0},
+        "working_capital": {"current_assets": 2_000_000.0, "current_liabilities": 800_000.0, "working_capital": 1_200_000.0},
+        "months_of_runway": {"cash_balance": 600_000.0, "avg_monthly_burn": 50_000.0, "months_of_runway": 12.0},
+    }
+
+    @patch("data.bigquery_client.get_client")
+    def test_one_job_matches_standalone_results(self, mock_get_client, mock_bq_result):
+        import data.bigquery_client as bq
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.query.return_value.result.return_value = mock_bq_result([self.BATCH_ROW])
+
+        batch = bq.get_coo_metrics_batch(2026)
+
+        assert mock_client.query.call_count == 1
+        sql = mock_client.query.call_args[0][0]
+        assert sql.count("SELECT AS STRUCT") == 5
+        assert batch["avg_days_to_collection"]["avg_days_to_collect"] == 31.5
+        assert batch["working_capital"]["working_capital"] == 1_200_000.0
+        assert batch["months_of_runway"]["months"] == 12.0
+
+        mock_client.query.return_value.result.return_value = mock_bq_result([
+            self.BATCH_ROW["invoice_collection_rate"]
+        ])
+        assert batch["invoice_collection_rate"] == bq.get_invoice_collection_rate(2026)
+
+    @patch("data.bigquery_client.get_client")
+    def test_runway_without_expenses_is_empty(self, mock_get_client, mock_bq_result):
+        from data.bigquery_client import get_coo_metrics_batch
+
+        row = dict(self.BATCH_ROW, months_of_runway=None)
+        mock_get_client.return_value.query.return_value.result.return_value = mock_bq_result([row])
+
+        batch = get_coo_metrics_batch(2026)
+        assert batch["months_of_runway"] == {}
+        assert batch["overdue_invoices"]["count"] == 4
+
+    @patch("data.bigquery_client.get_client")
+    def test_returns_empty_dict_on_error(self, mock_get_client):
+        from data.bigquery_client import get_coo_metrics_batch
+        from google.cloud.exceptions import GoogleCloudError
+
+        mock_get_client.return_value.query.side_effect = GoogleCloudError("fail")
+        assert get_coo_metrics_batch(2026) == {}
+
+
+class TestRunConcurrently:
+    """Tests for the concurrent fan-out executor."""
+
+    def test_returns_results_in_task_order(self):
+        from data.bigquery_client import run_concurrently
+
+        result = run_concurrently({"b": lambda: 2, "a": lambda: 1})
+        assert list(result.items()) == [("b", 2), ("a", 1)]
+
+    def test_runs_tasks_in_parallel(self):
+        """Both tasks must be in flight together to pass the barrier."""
+        import threading
+        from data.bigquery_client import run_concurrently
+
+        barrier = threading.Barrier(2, timeout=5)
+
+        def wait_for_peer():
+            barrier.wait()
+            return True
+
+        result = run_concurrently({"first": wait_for_peer, "second": wait_for_peer})
+        assert result == {"first": True, "second": True}
+
+    def test_propagates_fetcher_exceptions(self):
+        from data.bigquery_client import run_concurrently
+
+        def boom():
+            raise ValueError("bad row")
+
+        with pytest.raises(ValueError):
+            run_concurrently({"ok": lambda: 1, "bad": boom})
+
+    def test_failing_metric_does_not_discard_the_others(self):
+        from data.bigquery_client import run_within_deadline
+
+        def boom():
+            raise RuntimeError("view timed out")
+
+        errors = {}
+        results = run_within_deadline({"ok": lambda: 1, "bad": boom}, timeout=1, errors=errors)
+
+        assert results == {"ok": 1}
+        assert str(errors["bad"]) == "view timed out"
+
+    def test_deadline_returns_without_waiting_for_stragglers(self):
+        import threading
+        import time
+        from data.bigquery_client import run_within_deadline
+
+        release = threading.Event()
+        errors = {}
+        started = time.monotonic()
+        try:
+            results = run_within_deadline(
+                {"fast": lambda: 1, "slow": lambda: release.wait(5)}, timeout=0.1, errors=errors
+            )
+        finally:
+            release.set()
+
+        assert time.monotonic() - started < 2
+        assert results == {"fast": 1}
+        assert isinstance(errors["slow"], TimeoutError)
+
+
+class TestRunPlan:
+    """Dependent fetches start when their dependencies finish, not their stage."""
+
+    def _chain_with_slow_neighbour(self, release):
+        from data.fetch_planner import Fetch, plan
+
+        fetches = {fetch.name: fetch for fetch in (
+            Fetch("slow", lambda: release.wait(5) and "slow"),
+            Fetch("quota", lambda: "quota"),
+            Fetch("pipeline", lambda: "pipeline", depends_on=("quota",)),
+            Fetch("coverage", lambda: "coverage", depends_on=("pipeline",)),
+        )}
+        return plan(["slow", "coverage"], fetches), fetches
+
+    def test_chain_finishes_while_a_slow_fetch_runs(self):
+        import threading
+        from data.bigquery_client import run_plan
+
+        release = threading.Event()
+        stages, fetches = self._chain_with_slow_neighbour(release)
+        original = fetches["coverage"].fn
+        fetches["coverage"].fn = lambda: (release.set(), original())[1]
+
+        # "slow" only returns once "coverage" (three links down the chain) has run
+        assert run_plan(stages, fetches) == {
+            "slow": "slow", "quota": "quota", "pipeline": "pipeline", "coverage": "coverage",
+        }
+
+    def test_slow_fetch_does_not_spend_the_chain_budget(self):
+        import threading
+        from data.bigquery_client import run_plan
+
+        release = threading.Event()
+        stages, fetches = self._chain_with_slow_neighbour(release)
+        errors = {}
+        try:
+            results = run_plan(stages, fetches, timeout=0.3, errors=errors)
+        finally:
+            release.set()
+
+        assert results == {"quota": "quota", "pipeline": "pipeline", "coverage": "coverage"}
+        assert isinstance(errors["slow"], TimeoutError)
+
+    def test_propagates_fetcher_exceptions_without_a_timeout(self):
+        from data.bigquery_client import run_plan
+        from data.fetch_planner import Fetch
+
+        def boom():
+            raise ValueError("bad row")
+
+        fetches = {"ok": Fetch("ok", lambda: 1), "bad": Fetch("bad", boom)}
+        with pytest.raises(ValueError):
+            run_plan([("ok", "bad")], fetches)
+
+
+class TestGetCompanyMetrics:
+    """Tests for the Overview aggregate."""
+
+    @patch("data.bigquery_client.is_bigquery_available", return_value=True)
+    @patch("data.bigquery_client.get_client")
+    def test_returns_same_keys_as_sequential_version(self, mock_get_client, _available, mock_bq_result):
+        from data.bigquery_client import get_company_metrics
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_query_job = MagicMock()
+        mock_query_job.result.return_value = []
+        mock_client.query.return_value = mock_query_job
+
+        result = get_company_metrics(fiscal_year=2026)
+        assert set(result) == {
+            "revenue_ytd", "take_rate", "demand_nrr", "supply_npr", "supply_nrr",
+            "customer_count", "logo_retention", "pipeline_coverage",
+            "demand_nrr_details", "supply_npr_details", "supply_nrr_details",
+            "updated_at",
+        }
+
+    @patch("data.bigquery_client.is_bigquery_available", return_value=False)
+    def test_returns_empty_dict_when_unavailable(self, _available):
+        from data.bigquery_client import get_company_metrics, bigquery_breaker
+
+        for _ in range(bigquery_breaker.failure_threshold):
+            bigquery_breaker._record_failure(Exception("down"))
+        assert get_company_metrics() == {}
+
+    @patch("data.bigquery_client.get_client")
+    def test_no_health_probe_while_circuit_closed(self, mock_get_client):
+        from data.bigquery_client import get_company_metrics
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.query.return_value.result.return_value = []
+
+        get_company_metrics(fiscal_year=2026)
+
+        queries = [c[0][0] for c in mock_client.query.call_args_list]
+        assert not any("SELECT 1 as test" in q for q in queries)
+
+
+class TestCircuitBreaker:
+    """Tests for fail-fast BigQuery outage handling."""
+
+    @staticmethod
+    def _fail(breaker, error=None):
+        def boom():
+            raise error or ConnectionError("timeout")
+        with pytest.raises(Exception):
+            breaker.call(boom)
+
+    def test_opens_after_consecutive_failures(self):
+        from data.bigquery_client import CircuitBreaker, CircuitOpenError
+
+        breaker = CircuitBreaker(failure_threshold=3, reset_timeout=60)
+        for _ in range(3):
+            self._fail(breaker)
+
+        called = MagicMock()
+        with pytest.raises(CircuitOpenError):
+            breaker.call(called)
+        called.assert_not_called()
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_success_resets_failure_count(self):
+        from data.bigquery_client import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=60)
+        self._fail(breaker)
+        breaker.call(lambda: 1)
+        self._fail(breaker)
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_query_errors_do_not_open_circuit(self):
+        from google.cloud.exceptions import BadRequest
+        from data.bigquery_client import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=60)
+        self._fail(breaker, BadRequest("Syntax error"))
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_lets_one_probe_through(self):
+        from data.bigquery_client import CircuitBreaker, CircuitOpenError
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        self._fail(breaker)
+
+        def probe():
+            with pytest.raises(CircuitOpenError):
+                breaker.call(lambda: "concurrent")
+            return "probe"
+
+        assert breaker.call(probe) == "probe"
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_failed_probe_reopens(self):
+        from data.bigquery_client import CircuitBreaker
+
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0)
+        self._fail(breaker)
+        self._fail(breaker)
+        assert breaker.state == CircuitBreaker.OPEN
+
+    @patch("data.bigquery_client.get_client")
+    def test_open_circuit_fails_metrics_without_querying(self, mock_get_client):
+        from data.bigquery_client import bigquery_breaker, get_working_capital
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        for _ in range(bigquery_breaker.failure_threshold):
+            self._fail(bigquery_breaker)
+
+        assert get_working_capital() == {}
+        mock_client.query.assert_not_called()
+
+
+class TestRetryAndHedging:
+    """Tests for retried and hedged metric jobs."""
+
+    @pytest.fixture(autouse=True)
+    def no_backoff(self, monkeypatch):
+        import data.bigquery_client as bq
+        from data.retry import RetryPolicy
+        from data.telemetry import reset_telemetry
+
+        monkeypatch.setattr(bq, "query_retry_policy", RetryPolicy(max_attempts=3, base_delay=0))
+        reset_telemetry()
+        yield
+        reset_telemetry()
+
+    @staticmethod
+    def _job(rows):
+        job = MagicMock()
+        job.result.return_value = rows
+        return job
+
+    @patch("data.bigquery_client.get_client")
+    def test_transient_failure_is_retried(self, mock_get_client):
+        from google.api_core.exceptions import ServiceUnavailable
+        from data.bigquery_client import _execute
+
+        mock_get_client.return_value.query.side_effect = [ServiceUnavailable("down"), self._job([1])]
+
+        assert _execute("SELECT 1", metric="working_capital") == [1]
+        assert mock_get_client.return_value.query.call_count == 2
+
+    @patch("data.bigquery_client.get_client")
+    def test_retried_call_counts_once_against_the_breaker(self, mock_get_client):
+        from google.api_core.exceptions import ServiceUnavailable
+        from data.bigquery_client import _execute, bigquery_breaker
+
+        mock_get_client.return_value.query.side_effect = ServiceUnavailable("down")
+
+        with pytest.raises(ServiceUnavailable):
+            _execute("SELECT 1", metric="working_capital")
+        assert mock_get_client.return_value.query.call_count == 3
+        assert bigquery_breaker._failures == 1
+        assert bigquery_breaker.state == bigquery_breaker.CLOSED
+
+    @patch("data.bigquery_client.get_client")
+    def test_query_errors_fail_without_retrying(self, mock_get_client):
+        from google.cloud.exceptions import BadRequest
+        from data.bigquery_client import get_working_capital
+
+        mock_get_client.return_value.query.side_effect = BadRequest("Syntax error")
+
+        assert get_working_capital() == {}
+        assert mock_get_client.return_value.query.call_count == 1
+
+    @patch("data.bigquery_client.get_client")
+    def test_slow_job_is_hedged_after_its_p95(self, mock_get_client, monkeypatch):
+        import threading
+        import data.bigquery_client as bq
+        from data.telemetry import record_query
+
+        monkeypatch.setenv(bq.HEDGE_QUERIES_ENV, "1")
+        monkeypatch.setattr(bq, "HEDGE_MIN_DELAY", 0.05)
+        for _ in range(bq.HEDGE_MIN_SAMPLES):
+            record_query("working_capital", 0.01, rows=1)
+
+        release = threading.Event()
+        stuck = MagicMock()
+        stuck.result.side_effect = lambda: release.wait(5) and ["primary"]
+        mock_get_client.return_value.query.side_effect = [stuck, self._job(["hedge"])]
+        try:
+            assert bq._execute("SELECT 1", metric="working_capital") == ["hedge"]
+            assert mock_get_client.return_value.query.call_count == 2
+        finally:
+            release.set()
+
+    @patch("data.bigquery_client.get_client")
+    def test_no_hedging_without_enough_samples(self, mock_get_client, monkeypatch):
+        import data.bigquery_client as bq
+
+        monkeypatch.setenv(bq.HEDGE_QUERIES_ENV, "1")
+        mock_get_client.return_value.query.return_value = self._job([1])
+
+        assert bq._hedge_delay("working_capital") is None
+        assert bq._execute("SELECT 1", metric="working_capital") == [1]
+        assert mock_get_client.return_value.query.call_count == 1
+
+
+class TestColumnarDownloads:
+    """Tests for the Arrow / Storage Read API drill-down path."""
+
+    @pytest.fixture(autouse=True)
+    def storage_enabled(self, monkeypatch):
+        import data.bigquery_client as bq
+        monkeypatch.setattr(bq, "_bqstorage_disabled", False)
+
+    @patch("data.bigquery_client.get_client")
+    def test_frame_fetchers_return_the_dataframe_untouched(self, mock_get_client):
+        from data.bigquery_client import get_cohort_matrix_frame
+
+        frame = MagicMock()
+        mock_get_client.return_value.query.return_value.to_dataframe.return_value = frame
+
+        assert get_cohort_matrix_frame() is frame
+        frame.to_dict.assert_not_called()
+        mock_get_client.return_value.query.return_value.to_dataframe.assert_called_once_with(
+            create_bqstorage_client=True
+        )
+
+    @patch("data.bigquery_client.get_client")
+    def test_list_fetchers_still_return_records(self, mock_get_client):
+        from google.cloud.exceptions import GoogleCloudError
+        from data.bigquery_client import get_supplier_development
+
+        frame = MagicMock()
+        frame.to_dict.return_value = [{"supplier_org_name": "Acme"}]
+        mock_get_client.return_value.query.return_value.to_dataframe.return_value = frame
+        assert get_supplier_development() == [{"supplier_org_name": "Acme"}]
+
+        mock_get_client.return_value.query.side_effect = GoogleCloudError("fail")
+        assert get_supplier_development() == []
+
+    @patch("data.bigquery_client.get_client")
+    def test_falls_back_to_rest_without_read_session_permission(self, mock_get_client):
+        from google.cloud.exceptions import Forbidden
+        import data.bigquery_client as bq
+
+        frame = MagicMock()
+        job = mock_get_client.return_value.query.return_value
+
+        def download(create_bqstorage_client):
+            if create_bqstorage_client:
+                raise Forbidden("bigquery.readsessions.create denied")
+            return frame
+
+        job.to_dataframe.side_effect = download
+
+        assert bq.run_query_frame("SELECT 1 AS x") is frame
+        assert bq.run_query_frame("SELECT 2 AS x") is frame
+        assert bq._bqstorage_disabled
+        assert job.to_dataframe.call_count == 3  # one failed Storage attempt, then REST only
+
+
+class TestRefreshScope:
+    """Tests for request-scoped single-flight memoization."""
+
+    @staticmethod
+    def _client_returning(mock_get_client, rows):
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_query_job = MagicMock()
+        mock_query_job.result.return_value = rows
+        mock_client.query.return_value = mock_query_job
+        return mock_client
+
+    @patch("data.bigquery_client.get_client")
+    def test_duplicate_calls_query_once_inside_scope(self, mock_get_client, mock_bq_result):
+        from data.bigquery_client import get_nrr, refresh_scope
+
+        mock_client = self._client_returning(mock_get_client, mock_bq_result([{"nrr": 1.12}]))
+
+        with refresh_scope():
+            first = get_nrr(2026)
+            second = get_nrr(fiscal_year=2026)
+
+        assert first == second == pytest.approx(1.12)
+        assert mock_client.query.call_count == 1
+
+    @patch("data.bigquery_client.get_client")
+    def test_calls_are_not_memoized_outside_scope(self, mock_get_client, mock_bq_result):
+        from data.bigquery_client import get_nrr
+
+        mock_client = self._client_returning(mock_get_client, mock_bq_result([{"nrr": 1.12}]))
+
+        get_nrr(2026)
+        get_nrr(2026)
+        assert mock_client.query.call_count == 2
+
+    @patch("data.bigquery_client.get_client")
+    def test_different_arguments_are_separate_entries(self, mock_get_client, mock_bq_result):
+        from data.bigquery_client import get_nrr, refresh_scope
+
+        mock_client = self._client_returning(mock_get_client, mock_bq_result([{"nrr": 1.12}]))
+
+        with refresh_scope():
+            get_nrr(2026)
+            get_nrr(2025)
+        assert mock_client.query.call_count == 2
+
+    @patch("data.bigquery_client.get_client")
+    def test_concurrent_callers_share_in_flight_query(self, mock_get_client, mock_bq_result):
+        import threading
+        from data.bigquery_client import get_nrr, refresh_scope, run_concurrently
+
+        release = threading.Event()
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+
+        def slow_result():
+            release.wait(timeout=5)
+            return mock_bq_result([{"nrr": 1.12}])
+
+        mock_client.query.return_value.result.side_effect = slow_result
+        threading.Timer(0.1, release.set).start()
+
+        with refresh_scope():
+            result = run_concurrently({
+                "demand_nrr": lambda: get_nrr(2026),
+                "nrr": lambda: get_nrr(2026),
+            })
+
+        assert result["demand_nrr"] == result["nrr"] == pytest.approx(1.12)
+        assert mock_client.query.call_count == 1
+
+
+class TestSupplyPayoutStaging:
+    """Supply metrics share one staged supplier x year payout query per refresh."""
+
+    @staticmethod
+    def _staging_rows(mock_bq_result):
+        supplier = [
+            ("Acme", 2024, 100.0), ("Acme", 2025, 120.0), ("Acme", 2026, 60.0),
+            ("Beta", 2024, 200.0), ("Beta", 2025, 50.0),
+            ("Gamma", 2025, 80.0), ("Gamma", 2026, 100.0),
+            (None, 2024, 40.0), (None, 2025, 10.0),
+        ]
+        ledger = [(2021, 400.0, 0.0), (2022, 500.0, 100.0), (2023, 600.0, 0.0), (2024, 360.0, 20.0)]
+        rows = [
+            {"grain": "supplier", "supplier_org_name": name, "txn_year": year, "net_payouts": net}
+            for name, year, net in supplier
+        ] + [
+            {"grain": "ledger", "supplier_org_name": None, "txn_year": year, "gross_bills": bills, "vendor_credits": credits}
+            for year, bills, credits in ledger
+        ]
+        return mock_bq_result(rows)
+
+    @patch("data.bigquery_client.get_client")
+    def test_supply_metrics_issue_one_query_per_refresh(self, mock_get_client, mock_bq_result):
+        import data.bigquery_client as bq
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.query.return_value.result.return_value = self._staging_rows(mock_bq_result)
+
+        with bq.refresh_scope():
+            bq.get_supply_npr(2026)
+            bq.get_supply_npr_details(2026)
+            bq.get_core_action_state_counts('supplier')
+            bq.get_supply_npr_summary_by_year_frame()
+
+        assert mock_client.query.call_count == 1
+
+    @patch("data.bigquery_client.get_client")
+    def test_metrics_are_derived_from_staged_rows(self, mock_get_client, mock_bq_result):
+        import data.bigquery_client as bq
+
+        mock_get_client.return_value.query.return_value.result.return_value = self._staging_rows(mock_bq_result)
+
+        # 2025 cohort (Acme, Beta, Gamma; unlinked excluded): 160 of 250
+        assert bq.get_supply_npr(2026) == pytest.approx(160 / 250)
+
+        details = bq.get_supply_npr_details(2026)
+        assert details["current_year"]["supplier_count"] == 3
+        assert details["prior_year"]["cohort_original_payouts"] == pytest.approx(300.0)
+        assert details["prior_year"]["cohort_next_year_payouts"] == pytest.approx(170.0)
+
+        states = bq.get_core_action_state_counts('supplier')
+        assert states["active"]["count"] == 2  # Acme, Gamma
+        assert states["loosing"]["count"] == 2  # Beta and the Unlinked bucket dropped 75%
+        assert states["total"]["total_ltv"] == pytest.approx(600.0)
+
+        summary = bq.get_supply_npr_summary_by_year_frame()
+        assert summary["year"].tolist() == [2022, 2023, 2024]
+        assert summary["npr_vs_prior_year"].tolist() == [100.0, 150.0, 56.7]
+
+    @patch("data.bigquery_client.get_client")
+    def test_failed_staging_query_fails_every_supply_metric(self, mock_get_client):
+        from google.cloud.exceptions import GoogleCloudError
+        import data.bigquery_client as bq
+
+        mock_get_client.return_value.query.side_effect = GoogleCloudError("fail")
+
+        assert bq.get_supply_npr(2026) is None
+        assert bq.get_supply_npr_details(2026) == {}
+        assert bq.get_core_action_state_counts('supplier') == {}
+        assert bq.get_supply_npr_summary_by_year_frame() is None
+
+
+class TestPeriodPredicates:
+    """Tests for partition-prunable date-range predicates."""
+
+    def test_fiscal_year_bounds_are_half_open(self):
+        from datetime import date
+        from data.bigquery_client import fiscal_year_bounds
+
+        assert fiscal_year_bounds(2026) == (date(2026, 1, 1), date(2027, 1, 1))
+        assert fiscal_year_bounds(2024, 2026) == (date(2024, 1, 1), date(2027, 1, 1))
+
+    def test_quarter_bounds_roll_over_year_end(self):
+        from datetime import date
+        from data.bigquery_client import quarter_bounds
+
+        assert quarter_bounds(2026, 1) == (date(2026, 1, 1), date(2026, 4, 1))
+        assert quarter_bounds(2026, 4) == (date(2026, 10, 1), date(2027, 1, 1))
+
+    def test_timestamp_params_are_utc_datetimes(self):
+        from datetime import date, datetime, timezone
+        from data.bigquery_client import period_params
+
+        start, end = period_params(date(2026, 1, 1), date(2027, 1, 1), column_type="TIMESTAMP", name="q")
+        assert (start.name, end.name) == ("q_start", "q_end")
+        assert start.value == datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+    @patch("data.bigquery_client.get_client")
+    def test_queries_filter_on_raw_date_column(self, mock_get_client, mock_bq_result):
+        """Year filters must not wrap the partition column in EXTRACT()."""
+        from datetime import date
+        from data.bigquery_client import get_invoice_collection_rate
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.query.return_value.result.return_value = mock_bq_result([{
+            "paid_invoices": 1, "total_due_invoices": 1, "collection_rate_pct": 1.0,
+        }])
+
+        get_invoice_collection_rate(2026)
+
+        sql = mock_client.query.call_args[0][0]
+        params = mock_client.query.call_args[1]["job_config"].query_parameters
+        assert "EXTRACT(YEAR" not in sql
+        assert "transaction_date >= @period_start" in sql
+        values = {p.name: p.value for p in params}
+        assert values["period_start"] == date(2026, 1, 1)
+        assert values["period_end"] == date(2027, 1, 1)
+
+
+class TestQueryTemplates:
+    """Metric SQL must be a stable template; runtime values travel as parameters."""
+
+    RUNTIME_YEAR = 2031
+    NOT_METRICS = {"get_client", "get_table_watermarks"}
+
+    def _collect_queries(self, mock_get_client):
+        """Call every get_* metric with runtime inputs and return all SQL issued."""
+        import inspect
+        import data.bigquery_client as bq
+
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.query.return_value.result.return_value = []
+
+        year = self.RUNTIME_YEAR
+        overrides = {"fiscal_year": year, "quarter": "Q3", "years": (year - 2, year - 1, year)}
+        for name, fn in inspect.getmembers(bq, inspect.isfunction):
+            if not name.startswith("get_") or name in self.NOT_METRICS or fn.__module__ != bq.__name__:
+                continue
+            params = inspect.signature(fn).parameters
+            fn(**{k: v for k, v in overrides.items() if k in params})
+        bq.get_core_action_state_counts(entity="customer")
+
+        return [c[0][0] for c in mock_client.query.call_args_list if "SELECT 1" not in c[0][0]]
+
+    @patch("data.bigquery_client.get_client")
+    def test_no_runtime_values_in_query_text(self, mock_get_client):
+        import re
+        from datetime import date
+
+        queries = self._collect_queries(mock_get_client)
+        assert len(queries) > 20
+
+        today = date.today().isoformat()
+        for sql in queries:
+            for year in range(self.RUNTIME_YEAR - 2, self.RUNTIME_YEAR + 1):
+                assert re.search(rf"\b{year}\b", sql) is None, sql
+            assert "'Q3'" not in sql
+            assert today not in sql
+            assert "CURRENT_DATE()" not in sql
+
+    @patch("data.bigquery_client.get_client")
+    def test_every_metric_query_is_parameterized(self, mock_get_client):
+        self._collect_queries(mock_get_client)
+        mock_client = mock_get_client.return_value
+
+        for call in mock_client.query.call_args_list:
+            if "SELECT 1" in call[0][0]:
+                continue
+            assert "job_config" in call[1], call[0][0]
+
+    def test_column_year_rejects_non_integers(self):
+        from data.bigquery_client import column_year
+
+        assert column_year(2026) == 2026
+        for bad in ("2026", "2026; DROP TABLE x", 2026.0, True, 1900):
+            with pytest.raises(ValueError):
+                column_year(bad)
+
+
+class TestIterQuery:
+    """Tests for the streaming paginated query API."""
+
+    @staticmethod
+    def _paged_client(mock_get_client, pages):
+        fetched = []
+
+        def page_source():
+            for i, page in enumerate(pages):
+                fetched.append(i)
+                rows = []
+                for data in page:
+                    row = MagicMock()
+                    row.items.return_value = list(data.items())
+                    rows.append(row)
+                yield rows
+
+        job = MagicMock()
+        job.result.return_value.pages = page_source()
+        mock_get_client.return_value.query.return_value = job
+        return job, fetched
+
+    @patch("data.bigquery_client.get_client")
+    def test_yields_one_batch_per_page(self, mock_get_client):
+        from data.bigquery_client import iter_query
+
+        job, _ = self._paged_client(mock_get_client, [[{"x": 1}, {"x": 2}], [{"x": 3}]])
+
+        batches = list(iter_query("SELECT x FROM t", page_size=2))
+
+        assert batches == [[{"x": 1}, {"x": 2}], [{"x": 3}]]
+        job.result.assert_called_once_with(page_size=2, max_results=None)
+
+    @patch("data.bigquery_client.get_client")
+    def test_early_termination_stops_fetching_pages(self, mock_get_client):
+        from data.bigquery_client import iter_query
+
+        _, fetched = self._paged_client(mock_get_client, [[{"x": 1}], [{"x": 2}], [{"x": 3}]])
+
+        for batch in iter_query("SELECT x FROM t", page_size=1):
+            break
+
+        assert fetched == [0]
+
+    @patch("data.bigquery_client.get_client")
+    def test_row_limit_stops_pulling_pages(self, mock_get_client):
+        from data.bigquery_client import iter_query
+
+        job, fetched = self._paged_client(
+            mock_get_client, [[{"x": 1}, {"x": 2}], [{"x": 3}, {"x": 4}], [{"x": 5}]]
+        )
+
+        rows = [row for batch in iter_query("SELECT x FROM t", page_size=2, max_rows=3) for row in batch]
+
+        assert rows == [{"x": 1}, {"x": 2}, {"x": 3}]
+        assert fetched == [0, 1]
+        job.result.assert_called_once_with(page_size=2, max_results=3)
+
+    @patch("data.bigquery_client.get_client")
+    def test_submission_failure_is_recorded(self, mock_get_client, monkeypatch):
+        import data.bigquery_client as bq
+        from google.cloud.exceptions import BadRequest
+        from data.retry import RetryPolicy
+        from data.telemetry import recent_queries, reset_telemetry
+
+        monkeypatch.setattr(bq, "query_retry_policy", RetryPolicy(max_attempts=1))
+        reset_telemetry()
+        mock_get_client.return_value.query.side_effect = BadRequest("Syntax error")
+
+        with pytest.raises(BadRequest):
+            next(bq.iter_query("SELECT x FROM t"))
+        assert [e["error"] for e in recent_queries()] == ["400 Syntax error"]
+
+    @patch("data.bigquery_client.get_client")
+    def test_page_fetch_failure_is_recorded(self, mock_get_client):
+        from google.api_core.exceptions import ServiceUnavailable
+        from data.bigquery_client import iter_query
+        from data.telemetry import recent_queries, reset_telemetry
+
+        def failing_pages():
+            yield []
+            raise ServiceUnavailable("page fetch failed")
+
+        reset_telemetry()
+        mock_get_client.return_value.query.return_value.result.return_value.pages = failing_pages()
+
+        with pytest.raises(ServiceUnavailable):
+            list(iter_query("SELECT x FROM t"))
+        assert [e["error"] for e in recent_queries()] == ["503 page fetch failed"]
+
+    def test_rejects_non_positive_page_size(self):
+        from data.bigquery_client import iter_query
+
+        with pytest.raises(ValueError):
+            next(iter_query("SELECT 1", page_size=0))
@@ -0,0 +1,84 @@
+"""Tests for the bytes-billed guard and the dry-run cost report."""
+from unittest.mock import patch, MagicMock
+
+
+def _dry_run_client(total_bytes):
+    client = MagicMock()
+    client.query.return_value.total_bytes_processed = total_bytes
+    client.query.return_value.result.return_value = []
+    return client
+
+
+class TestBytesBilledGuard:
+    @patch("data.bigquery_client.get_client")
+    def test_every_metric_job_carries_its_cap(self, mock_get_client, monkeypatch):
+        import data.bigquery_client as bq
+
+        monkeypatch.setitem(bq.MAX_BYTES_BILLED, "working_capital", 12345)
+        mock_get_client.return_value = _dry_run_client(0)
+
+        bq.get_working_capital()
+        bq.get_revenue_ytd()
+
+        configs = {c[0][0]: c[1]["job_config"] for c in mock_get_client.return_value.query.call_args_list}
+        caps = sorted(config.maximum_bytes_billed for config in configs.values())
+        assert caps == [12345, bq.MAX_BYTES_BILLED_DEFAULT]
+
+
+class TestDryRunScope:
+    @patch("data.bigquery_client.get_client")
+    def test_queries_are_estimated_not_run(self, mock_get_client):
+        import data.bigquery_client as bq
+
+        mock_client = _dry_run_client(5_000)
+        mock_get_client.return_value = mock_client
+
+        with bq.dry_run_scope() as estimates:
+            assert bq.get_working_capital() == {}
+
+        assert list(estimates.values()) == [5_000]
+        assert [metric for metric, _ in estimates] == ["working_capital"]
+        for call in mock_client.query.call_args_list:
+            assert call[1]["job_config"].dry_run is True
+        mock_client.query.return_value.result.assert_not_called()
+
+    @patch("data.bigquery_client.get_client")
+    def test_scope_ends_dry_run_mode(self, mock_get_client):
+        import data.bigquery_client as bq
+
+        mock_get_client.return_value = _dry_run_client(5_000)
+        with bq.dry_run_scope():
+            pass
+
+        bq.get_working_capital()
+        mock_get_client.return_value.query.return_value.result.assert_called_once()
+
+
+class TestCostReport:
+    @patch("data.bigquery_client.get_client")
+    def test_every_metric_is_estimated(self, mock_get_client):
+        from data.cost_report import estimate_metric_bytes
+
+        mock_get_client.return_value = _dry_run_client(1024)
+        totals = estimate_metric_bytes(fiscal_year=2026)
+
+        assert len(totals) > 20
+        assert totals["working_capital"] == 1024
+        assert totals["time_to_fulfill"] >= 1024
+
+    def test_over_cap_fails_the_report(self):
+        import data.bigquery_client as bq
+        from data.cost_report import format_report
+
+        report, ok = format_report({"revenue_ytd": 1024, "qbo_ledger": bq.MAX_BYTES_BILLED_DEFAULT + 1})
+
+        assert not ok
+        assert "OVER CAP" in report
+        assert format_report({"revenue_ytd": 1024})[1]
+
+    def test_failed_dry_run_fails_the_report(self):
+        from data.cost_report import format_report
+
+        report, ok = format_report({"revenue_ytd": None})
+        assert not ok
+        assert "FAILED" in report
@@ -13,18 +13,17 @@ class TestGetCOOMetrics:
     def test_aggregates_coo_metrics(self, mock_bq):
         from data.data_layer import get_coo_metrics
 
-        mock_bq.get_invoice_collection_rate.return_value = {
-            "collection_rate": 0.93, "paid_count": 93, "total_count": 100
-        }
-        mock_bq.get_overdue_invoices.return_value = {
-            "count": 4, "amount": 45_000.0
-        }
-        mock_bq.get_working_capital.return_value = {
-            "working_capital": 1_200_000.0, "current_assets": 2_000_000.0,
-            "current_liabilities": 800_000.0
-        }
-        mock_bq.get_months_of_runway.return_value = {
-            "months": 12.0, "cash_balance": 600_000.0, "avg_monthly_burn": 50_000.0
+        mock_bq.get_coo_metrics_batch.return_value = {
+            "invoice_collection_rate": {"collection_rate": 0.93, "paid_count": 93, "total_count": 100},
+            "overdue_invoices": {"count": 4, "amount": 45_000.0},
+            "avg_days_to_collection": {"avg_days_to_collect": 31.5},
+            "working_capital": {
+                "working_capital": 1_200_000.0, "current_assets": 2_000_000.0,
+                "current_liabilities": 800_000.0
+            },
+            "months_of_runway": {
+                "months": 12.0, "cash_balance": 600_000.0, "avg_monthly_burn": 50_000.0
+            },
         }
 
         result = get_coo_metrics()
@@ -32,6 +31,9 @@ class TestGetCOOMetrics:
         assert result["overdue_count"] == 4
         assert result["working_capital"] == 1_200_000.0
         assert result["months_of_runway"] == 12.0
+        assert result["avg_days_to_collect"] == 31.5
+        mock_bq.get_coo_metrics_batch.assert_called_once()
+        mock_bq.get_invoice_collection_rate.assert_not_called()
 
     @patch("data.data_layer._bigquery_available", False)
     def test_returns_mock_when_bq_unavailable(self):
@@ -41,3 +43,266 @@ class TestGetCOOMetrics:
         # Should return mock/fallback data
         assert "invoice_collection_rate" in result
         assert isinstance(result["invoice_collection_rate"], (int, float))
+
+
+class TestStaleWhileRevalidate:
+    """Tests for the background-refreshed BigQuery snapshot."""
+
+    @pytest.fixture(autouse=True)
+    def fresh_snapshot(self, monkeypatch):
+        import data.data_layer as dl
+
+        monkeypatch.setattr(dl, "_bq_cache", {"data": None, "timestamp": 0})
+        monkeypatch.setattr(dl, "_bq_last_error", None)
+        monkeypatch.setattr(dl, "_bigquery_available", True)
+        monkeypatch.setattr(dl, "USE_BIGQUERY", True)
+        yield dl
+        dl.stop_background_refresh()
+
+    def _mock_bq(self, monkeypatch, dl, revenue=1_000_000):
+        from data.bigquery_client import CircuitBreaker, run_within_deadline
+
+        mock_bq = MagicMock(CircuitBreaker=CircuitBreaker, bigquery_breaker=CircuitBreaker())
+        mock_bq.get_company_metrics.return_value = {"revenue_ytd": revenue}
+        mock_bq.get_pipeline_details.return_value = {}
+        mock_bq.get_time_to_fulfill.return_value = {}
+        mock_bq.run_within_deadline.side_effect = run_within_deadline
+        monkeypatch.setattr(dl, "bq", mock_bq)
+        return mock_bq
+
+    def test_expired_snapshot_is_served_without_blocking(self, fresh_snapshot, monkeypatch):
+        import time
+        dl = fresh_snapshot
+        monkeypatch.setattr(dl, "_ensure_background_refresh", lambda: None)
+        mock_bq = self._mock_bq(monkeypatch, dl)
+
+        dl._fetch_bigquery_metrics()  # cold start, synchronous
+        dl._bq_cache["timestamp"] = time.time() - 10 * dl._BQ_CACHE_TTL
+
+        data = dl._fetch_bigquery_metrics()
+        status = dl.get_data_source_status()
+
+        assert data["metrics"]["revenue_ytd"] == 1_000_000
+        assert mock_bq.get_company_metrics.call_count == 1
+        assert status["source"] == "bigquery (stale)"
+        assert status["snapshot_age_seconds"] >= 10 * dl._BQ_CACHE_TTL
+
+    def test_background_thread_refreshes_before_expiry(self, fresh_snapshot, monkeypatch):
+        import time
+        dl = fresh_snapshot
+        monkeypatch.setattr(dl, "_BQ_CACHE_TTL", 0.3)
+        monkeypatch.setattr(dl, "_BQ_REFRESH_AHEAD", 0.2)
+        mock_bq = self._mock_bq(monkeypatch, dl)
+
+        dl._fetch_bigquery_metrics()
+        mock_bq.get_company_metrics.return_value = {"revenue_ytd": 2_000_000}
+
+        deadline = time.time() + 5
+        while dl._bq_cache["data"]["metrics"]["revenue_ytd"] != 2_000_000 and time.time() < deadline:
+            time.sleep(0.02)
+
+        assert mock_bq.get_company_metrics.call_count >= 2
+        assert dl._fetch_bigquery_metrics()["metrics"]["revenue_ytd"] == 2_000_000
+
+    def test_failed_refresh_keeps_last_good_snapshot(self, fresh_snapshot, monkeypatch):
+        import time
+        dl = fresh_snapshot
+        monkeypatch.setattr(dl, "_BQ_CACHE_TTL", 0.3)
+        monkeypatch.setattr(dl, "_BQ_REFRESH_AHEAD", 0.2)
+        mock_bq = self._mock_bq(monkeypatch, dl)
+
+        dl._fetch_bigquery_metrics()
+        mock_bq.get_company_metrics.side_effect = RuntimeError("quota exceeded")
+
+        deadline = time.time() + 5
+        while dl._bq_last_error is None and time.time() < deadline:
+            time.sleep(0.02)
+
+        data = dl._fetch_bigquery_metrics()
+        status = dl.get_data_source_status()
+        assert data["metrics"]["revenue_ytd"] == 1_000_000
+        assert status["is_live"] is True
+        assert status["error"] == "quota exceeded"
+
+    def test_slow_metric_keeps_previous_value_tagged_stale(self, fresh_snapshot, monkeypatch):
+        dl = fresh_snapshot
+        monkeypatch.setattr(dl, "_ensure_background_refresh", lambda: None)
+        mock_bq = self._mock_bq(monkeypatch, dl)
+        mock_bq.get_company_metrics.return_value = {"revenue_ytd": 1_000_000, "ttf": {"median_days": 40}}
+
+        dl._fetch_bigquery_metrics()
+
+        # ttf missed the budget inside get_company_metrics and was left out
+        mock_bq.get_company_metrics.return_value = {"revenue_ytd": 2_000_000}
+        data = dl._refresh_bigquery_snapshot()
+
+        assert data["metrics"]["revenue_ytd"] == 2_000_000
+        assert data["ttf"] == {"median_days": 40}
+        assert data["freshness"]["revenue_ytd"] == "fresh"
+        assert data["freshness"]["ttf"] == "stale"
+        assert "ttf" in dl.get_data_source_status()["stale_metrics"]
+
+    def test_failed_metric_query_keeps_previous_value_tagged_stale(self, fresh_snapshot, monkeypatch):
+        dl = fresh_snapshot
+        monkeypatch.setattr(dl, "_ensure_background_refresh", lambda: None)
+        mock_bq = self._mock_bq(monkeypatch, dl)
+        mock_bq.get_company_metrics.return_value = {"revenue_ytd": 1_000_000, "take_rate": 0.5}
+
+        dl._fetch_bigquery_metrics()
+
+        # get_take_rate() caught a GoogleCloudError and returned None
+        mock_bq.get_company_metrics.return_value = {"revenue_ytd": 2_000_000, "take_rate": None}
+        data = dl._refresh_bigquery_snapshot()
+
+        assert data["metrics"]["take_rate"] == 0.5
+        assert data["freshness"]["take_rate"] == "stale"
+        assert data["freshness"]["revenue_ytd"] == "fresh"
+        assert "take_rate" in dl.get_data_source_status()["stale_metrics"]
+
+    def test_hung_fetch_misses_the_budget_grace(self, fresh_snapshot, monkeypatch):
+        import threading
+        dl = fresh_snapshot
+        monkeypatch.setattr(dl, "_ensure_background_refresh", lambda: None)
+        monkeypatch.setattr(dl, "_BQ_REFRESH_BUDGET", 0.2)
+        monkeypatch.setattr(dl, "_BQ_BUDGET_GRACE", 0.1)
+        mock_bq = self._mock_bq(monkeypatch, dl)
+        dl._fetch_bigquery_metrics()
+
+        release = threading.Event()
+        mock_bq.get_company_metrics.side_effect = lambda **kwargs: release.wait(5) and {}
+        try:
+            with pytest.raises(TimeoutError):
+                dl._refresh_bigquery_snapshot()
+        finally:
+            release.set()
+        assert dl._bq_cache["data"]["metrics"]["revenue_ytd"] == 1_000_000
+
+
+class TestPageScopedFetches:
+    """Each page fetches only the snapshot parts it renders."""
+
+    @pytest.fixture(autouse=True)
+    def dl(self, monkeypatch):
+        import data.data_layer as dl
+        from data.bigquery_client import CircuitBreaker, run_within_deadline
+
+        monkeypatch.setattr(dl, "_bq_cache", {"data": None, "timestamp": 0})
+        monkeypatch.setattr(dl, "_bq_demand", {})
+        monkeypatch.setattr(dl, "_bq_fill_failed_at", 0.0)
+        monkeypatch.setattr(dl, "_bigquery_available", True)
+        monkeypatch.setattr(dl, "USE_BIGQUERY", True)
+        monkeypatch.setattr(dl, "_ensure_background_refresh", lambda: None)
+
+        mock_bq = MagicMock(CircuitBreaker=CircuitBreaker, bigquery_breaker=CircuitBreaker())
+        mock_bq.get_company_metrics.side_effect = lambda metrics, **kwargs: {
+            name: {} if name in dl._SNAPSHOT_DETAILS else 0.5 for name in metrics
+        }
+        mock_bq.run_within_deadline.side_effect = run_within_deadline
+        monkeypatch.setattr(dl, "bq", mock_bq)
+        return dl
+
+    def _fetched(self, dl):
+        return [call.kwargs["metrics"] for call in dl.bq.get_company_metrics.call_args_list]
+
+    def test_department_page_without_company_metrics_fetches_nothing(self, dl):
+        with dl.page_scope("marketing"):
+            metrics = dl.get_company_metrics()
+
+        assert dl.bq.get_company_metrics.call_count == 0
+        assert metrics["revenue_actual"] == dl._get_mock_company_metrics()["revenue_actual"]
+
+    def test_page_fetches_only_its_parts(self, dl):
+        with dl.page_scope("coo"):
+            assert dl.get_company_metrics()["take_rate_actual"] == 0.5
+
+        assert self._fetched(dl) == [("take_rate", "customer_concentration")]
+
+    def test_new_page_fetches_only_the_missing_parts(self, dl):
+        with dl.page_scope("coo"):
+            dl.get_company_metrics()
+        with dl.page_scope("ceo"):
+            dl.get_company_metrics()
+        with dl.page_scope("coo"):
+            dl.get_company_metrics()
+
+        assert self._fetched(dl) == [("take_rate", "customer_concentration"), ("revenue_ytd", "pipeline_coverage")]
+        assert set(dl._bq_cache["data"]["freshness"]) == {
+            "take_rate", "customer_concentration", "revenue_ytd", "pipeline_coverage",
+        }
+
+    def test_background_refresh_covers_every_page_visited(self, dl):
+        with dl.page_scope("coo"):
+            dl.get_company_metrics()
+        with dl.page_scope("ceo"):
+            dl.get_company_metrics()
+
+        dl._refresh_bigquery_snapshot()
+
+        assert self._fetched(dl)[-1] == ("take_rate", "customer_concentration", "revenue_ytd", "pipeline_coverage")
+
+    def test_outside_a_page_scope_everything_is_fetched(self, dl):
+        dl.get_company_metrics()
+        assert self._fetched(dl) == [dl._FULL_SNAPSHOT]
+
+
+class TestPageRenders:
+    """Pages render their company metrics from the snapshot, never the mock fallbacks."""
+
+    # Snapshot detail values (the scalar parts all return 0.5), none equal to a fallback
+    _LIVE_DETAILS = {
+        "pipeline": {
+            "quarterly_goal": 1_000_000, "closed_won": 400_000, "remaining_to_goal": 600_000,
+            "weighted_pipeline": 900_000, "pipeline_gap": 0,
+        },
+        "ttf": {"median_days": 45, "avg_days": 90, "contract_count": 10, "fulfilled_count": 6, "in_progress_count": 4},
+        "customer_concentration": {"top_customer_pct": 0.25, "top_customer_name": "Acme"},
+    }
+
+    @pytest.mark.parametrize("page", ["overview", "ceo", "coo", "demand_sales"])
+    def test_cold_page_reads_no_mock_company_metric(self, page, monkeypatch):
+        app_test = pytest.importorskip("streamlit.testing.v1").AppTest
+        import data.bigquery_client as bq_client
+        import data.data_layer as dl
+
+        # Cold snapshot, filled by the page's first fetch
+        monkeypatch.setattr(dl, "_bq_cache", {"data": None, "timestamp": 0})
+        monkeypatch.setattr(dl, "_bq_demand", {})
+        monkeypatch.setattr(dl, "_bq_fill_failed_at", 0.0)
+        monkeypatch.setattr(dl, "_data_source_status", dict(dl._data_source_status))
+        monkeypatch.setattr(dl, "_bigquery_available", True)
+        monkeypatch.setattr(dl, "USE_BIGQUERY", True)
+        monkeypatch.setattr(dl, "_ensure_background_refresh", lambda: None)
+        mock_bq = MagicMock(CircuitBreaker=bq_client.CircuitBreaker, bigquery_breaker=bq_client.CircuitBreaker())
+        mock_bq.get_company_metrics.side_effect = lambda metrics, **kwargs: {
+            name: self._LIVE_DETAILS.get(name, 0.5) for name in metrics
+        }
+        mock_bq.run_within_deadline.side_effect = bq_client.run_within_deadline
+        monkeypatch.setattr(dl, "bq", mock_bq)
+        with dl.page_scope(page):
+            metrics = dl.get_company_metrics()
+
+        # Render the page (its other sections on fallback data), recording every key read
+        read = set()
+
+        class RecordingMetrics(dict):
+            def __getitem__(self, key):
+                read.add(key)
+                return super().__getitem__(key)
+
+            def get(self, key, default=None):
+                read.add(key)
+                return super().get(key, default)
+
+        recording = RecordingMetrics(metrics)
+        monkeypatch.setattr(dl, "_bigquery_available", False)
+        monkeypatch.setattr(dl, "COMPANY_METRICS", recording)
+        monkeypatch.setattr(dl, "get_company_metrics", lambda: recording)
+        monkeypatch.setattr(bq_client, "get_pipeline_coverage_by_company", lambda **kwargs: [])
+        at = app_test.from_file("../app.py", default_timeout=60)
+        at.session_state["current_page"] = page
+        at.run()
+
+        assert not at.exception
+        mock = dl._get_mock_company_metrics()
+        assert read & set(mock)
+        assert {key for key in read & set(mock) if metrics[key] == mock[key]} == set()
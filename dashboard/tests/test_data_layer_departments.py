@@ -88,6 +88,7 @@ def test_get_accounting_metrics_uses_coo_metrics(mock_get_coo):
         "invoice_collection_rate": 0.93,
         "overdue_count": 4,
         "overdue_amount": 45_000,
+        "avg_days_to_collect": 31.5,
     }
 
     metrics = get_accounting_metrics()
@@ -99,6 +100,7 @@ def test_get_accounting_metrics_uses_coo_metrics(mock_get_coo):
     assert collection["value"] == 0.93
     assert overdue["value"] == 4
     assert overdue_amount["value"] == 45_000
+    assert _metric_by_label(metrics, "Avg Days to Collection")["value"] == 31.5
 
 
 @patch("data.data_layer._bigquery_available", False)
@@ -113,3 +115,19 @@ def test_get_marketing_metrics_fallback_to_defaults():
 
     assert influenced["value"] is not None
     assert mql["value"] is not None
+
+
+@patch("data.data_layer._bigquery_available", False)
+@patch("data.data_layer.bq")
+def test_refresh_scope_is_noop_without_bigquery(mock_bq):
+    from data import bigquery_client
+    from data.data_layer import refresh_scope
+
+    with refresh_scope():
+        # No refresh memo is opened, so nothing can be left behind
+        assert bigquery_client._refresh_memo.get() is None
+
+    assert bigquery_client._refresh_memo.get() is None
+    mock_bq.refresh_scope.assert_not_called()
+    mock_bq.get_client.assert_not_called()
+    assert mock_bq.method_calls == []
@@ -0,0 +1,56 @@
+"""Tests for the page fetch planner."""
+import pytest
+
+from data.fetch_planner import Fetch, plan
+
+
+def _fetches(*specs):
+    return {name: Fetch(name, lambda: None, depends_on=deps) for name, deps in specs}
+
+
+class TestPlan:
+    def test_dependencies_run_in_earlier_stages(self):
+        fetches = _fetches(
+            ("coverage", ("pipeline",)),
+            ("pipeline", ("quota",)),
+            ("quota", ()),
+            ("revenue", ()),
+        )
+
+        assert plan(["coverage", "revenue"], fetches) == [("quota", "revenue"), ("pipeline",), ("coverage",)]
+
+    def test_only_needed_fetches_are_planned_once(self):
+        fetches = _fetches(("a", ("shared",)), ("b", ("shared",)), ("shared", ()), ("unused", ()))
+
+        assert plan(["a", "b", "a"], fetches) == [("shared",), ("a", "b")]
+
+    def test_no_targets_is_an_empty_plan(self):
+        assert plan([], _fetches(("a", ()))) == []
+
+    def test_unknown_fetch_raises(self):
+        with pytest.raises(KeyError):
+            plan(["a"], _fetches(("a", ("missing",))))
+
+    def test_cycle_raises(self):
+        with pytest.raises(ValueError, match="cycle"):
+            plan(["a"], _fetches(("a", ("b",)), ("b", ("a",))))
+
+
+class TestCompanyPlans:
+    def test_pipeline_coverage_waits_for_quotas(self):
+        from data.data_layer import plan_page_fetches
+
+        assert plan_page_fetches("demand_sales") == [("pipeline_quota",), ("pipeline",), ("pipeline_coverage",)]
+
+    def test_pages_without_company_metrics_plan_nothing(self):
+        from data.data_layer import plan_page_fetches
+
+        assert plan_page_fetches("supply_am") == []
+
+    def test_every_page_part_is_a_known_fetch(self):
+        from data.bigquery_client import company_metric_fetches
+        from data.data_layer import PAGE_SNAPSHOT_PARTS
+
+        fetches = company_metric_fetches()
+        for parts in PAGE_SNAPSHOT_PARTS.values():
+            plan(parts, fetches)
@@ -214,3 +214,31 @@ class TestMarketingIntegration:
         from data.bigquery_client import get_mql_to_sql_conversion
         result = get_mql_to_sql_conversion()
         assert isinstance(result, dict)
+
+
+# =============================================================================
+# Partition pruning
+# =============================================================================
+
+class TestPartitionPruning:
+    """Dry-run bytes: range predicates must never scan more than EXTRACT()."""
+
+    @pytest.mark.parametrize("table,column,column_type", [
+        ("src_fivetran_qbo.invoice", "transaction_date", "DATE"),
+        ("src_fivetran_qbo.bill", "transaction_date", "DATE"),
+        ("src_fivetran_hubspot.deal", "property_closedate", "TIMESTAMP"),
+    ])
+    def test_range_predicate_scans_no_more_than_extract(self, bq_client, table, column, column_type):
+        from data.bigquery_client import (
+            PROJECT_ID, FISCAL_YEAR, dry_run_bytes, fiscal_year_bounds, period_params,
+        )
+        before = dry_run_bytes(f"""
+            SELECT COUNT(*) FROM `{PROJECT_ID}.{table}`
+            WHERE EXTRACT(YEAR FROM {column}) = {FISCAL_YEAR}
+        """)
+        after = dry_run_bytes(f"""
+            SELECT COUNT(*) FROM `{PROJECT_ID}.{table}`
+            WHERE {column} >= @period_start AND {column} < @period_end
+        """, period_params(*fiscal_year_bounds(FISCAL_YEAR), column_type=column_type))
+        assert before is not None and after is not None
+        assert after <= before, f"{table}: range predicate scans {after} bytes, EXTRACT() {before} bytes"
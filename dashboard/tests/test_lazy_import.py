@@ -0,0 +1,71 @@
+"""Tests for deferred imports and the import profile report."""
+import sys
+from unittest.mock import patch
+
+from data.import_profile import format_report, parse_importtime, profile_import
+from data.lazy_import import LazyModule, import_timings, is_loaded, module_available
+
+
+class TestLazyModule:
+    def test_imports_on_first_attribute_access(self):
+        sys.modules.pop("colorsys", None)
+        lazy = LazyModule("colorsys")
+
+        assert not is_loaded(lazy)
+        assert "colorsys" not in sys.modules
+        assert lazy.rgb_to_hsv(1, 0, 0) == (0.0, 1.0, 1)
+        assert is_loaded(lazy)
+        assert "colorsys" in import_timings()
+
+    def test_patching_through_the_proxy_reaches_the_module(self):
+        import json
+        lazy = LazyModule("json")
+
+        with patch.object(lazy, "dumps", return_value="patched"):
+            assert json.dumps({}) == "patched"
+        assert json.dumps({}) == "{}"
+
+    def test_module_available_does_not_import(self):
+        sys.modules.pop("wave", None)
+        assert module_available("wave")
+        assert "wave" not in sys.modules
+        assert not module_available("no_such_module_anywhere")
+
+
+class TestImportProfile:
+    SAMPLE = "\n".join([
+        "import time: self [us] | cumulative | imported package",
+        "import time:       500 |        900 |   encodings.aliases",
+        "import time:      1000 |       1000 | site",
+        "import time:       200 |        200 |   json.decoder",
+        "import time:       300 |        500 | json",
+        "import time:       100 |        100 | data",
+    ])
+
+    def test_startup_imports_are_dropped(self):
+        entries = parse_importtime(self.SAMPLE)
+
+        assert [e["name"] for e in entries] == ["json.decoder", "json", "data"]
+        assert [e["depth"] for e in entries] == [1, 0, 0]
+
+    def test_report_flags_eager_imports(self):
+        report, ok = format_report("data", parse_importtime(self.SAMPLE), top=2, deferred=("json",))
+
+        assert not ok
+        assert report.splitlines()[0] == "data: 1 ms"
+        assert "json is imported eagerly" in report
+
+    def test_data_layer_defers_bigquery_and_pandas(self):
+        entries, error = profile_import("data.data_layer")
+        imported = {e["name"] for e in entries}
+
+        assert error is None
+        assert "data.data_layer" in imported
+        assert "google.cloud.bigquery" not in imported
+        assert "pandas" not in imported
+
+    def test_data_layer_fiscal_year_matches_the_client(self):
+        import data.bigquery_client as bq
+        import data.data_layer as dl
+
+        assert dl.FISCAL_YEAR == bq.FISCAL_YEAR
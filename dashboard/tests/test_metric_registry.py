@@ -0,0 +1,92 @@
+"""Tests for the declarative metric registry and its execution engine."""
+import re
+from unittest.mock import patch
+
+import pytest
+
+
+def _registered():
+    from data.metric_registry import METRICS
+    return sorted(METRICS)
+
+
+class TestRegisteredMetrics:
+    @pytest.mark.parametrize("name", _registered())
+    def test_sql_binds_exactly_the_declared_parameters(self, name):
+        from data.bigquery_client import metric_params, metric_sql
+
+        sql = metric_sql(name)
+        used = set(re.findall(r"@(\w+)", sql))
+        declared = {p.name for p in metric_params(name, 2026)}
+        assert used == declared
+        assert "{PROJECT_ID}" not in sql
+
+    @pytest.mark.parametrize("name", _registered())
+    def test_source_tables_come_from_the_sql_file(self, name):
+        from data.bigquery_client import metric_sql, source_tables
+
+        assert source_tables(metric_sql(name))
+
+    def test_duplicate_names_are_rejected(self):
+        from data.metric_registry import MetricSpec, register
+
+        with pytest.raises(ValueError):
+            register(MetricSpec("working_capital", decode=dict))
+
+    def test_spec_ttl_and_cap_override_the_defaults(self):
+        import data.bigquery_client as bq
+
+        assert bq.result_cache_ttl("working_capital") == 60 * 60
+        assert bq.max_bytes_billed("win_rate_90d") == 1024 ** 3
+        assert bq.result_cache_ttl("not_registered") == bq.RESULT_CACHE_DEFAULT_TTL
+
+
+class TestRunMetric:
+    @patch("data.bigquery_client.get_client")
+    def test_decodes_the_result_row(self, mock_get_client, mock_bq_result):
+        from data.bigquery_client import run_metric
+
+        mock_get_client.return_value.query.return_value.result.return_value = mock_bq_result([
+            {"won_count": 3, "lost_count": 7, "win_rate": 0.3}
+        ])
+
+        assert run_metric("win_rate_90d") == {
+            "win_rate": 0.3, "won_count": 3, "lost_count": 7, "total_decided": 10,
+        }
+
+    @patch("data.bigquery_client.get_client")
+    def test_zero_is_a_value_not_a_null(self, mock_get_client, mock_bq_result):
+        from data.bigquery_client import run_metric
+
+        mock_get_client.return_value.query.return_value.result.return_value = mock_bq_result([
+            {"avg_days_to_collect": 0, "median_days_to_collect": None, "invoices_paid": 0}
+        ])
+
+        assert run_metric("avg_days_to_collection") == {
+            "avg_days_to_collect": 0.0, "median_days_to_collect": None, "invoice_count": 0,
+        }
+
+    @patch("data.bigquery_client.get_client")
+    def test_no_row_is_an_empty_dict(self, mock_get_client):
+        from data.bigquery_client import run_metric
+
+        mock_get_client.return_value.query.return_value.result.return_value = []
+        assert run_metric("overdue_invoices") == {}
+
+    @patch("data.bigquery_client.get_client")
+    def test_batch_ttl_is_the_smallest_member_ttl(self, mock_get_client):
+        import data.bigquery_client as bq
+
+        mock_get_client.return_value.query.return_value.result.return_value = []
+        bq.run_metric_batch(("working_capital", "months_of_runway"), metric="hourly_batch")
+        bq.run_metric_batch(("working_capital", "invoice_collection_rate"), metric="mixed_batch")
+
+        assert bq.result_cache_ttl("hourly_batch") == 60 * 60
+        assert bq.result_cache_ttl("mixed_batch") == bq.RESULT_CACHE_DEFAULT_TTL
+
+    def test_batch_rejects_conflicting_parameters(self):
+        from data.bigquery_client import run_metric_batch
+
+        # @period_start is a DATE for QBO metrics but a TIMESTAMP for HubSpot ones
+        with pytest.raises(ValueError, match="period_start"):
+            run_metric_batch(("invoice_collection_rate", "avg_deal_size_ytd"))
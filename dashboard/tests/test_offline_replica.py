@@ -0,0 +1,118 @@
+"""Tests for the offline DuckDB replica of the BigQuery warehouse."""
+import os
+
+import pytest
+
+pytest.importorskip("duckdb")
+pq = pytest.importorskip("pyarrow.parquet")
+pa = pytest.importorskip("pyarrow")
+
+from google.api_core.exceptions import BadRequest, NotFound  # noqa: E402
+from google.cloud import bigquery  # noqa: E402
+
+from data.offline_replica import OfflineClient  # noqa: E402
+
+
+@pytest.fixture
+def snapshot(tmp_path):
+    """A tiny snapshot: two App_KPI_Dashboard views and one HubSpot table."""
+    dashboard = tmp_path / "App_KPI_Dashboard"
+    dashboard.mkdir()
+    pq.write_table(pa.table({
+        "company_name": ["Acme", "Globex", "Initech", "Unknown"],
+        "qbo_customer_id": ["1", "2", "3", "UNKNOWN"],
+        **{f"net_rev_{year}": ["100", "300", "n/a", "50"] for year in range(2023, 2027)},
+    }), dashboard / "net_revenue_retention_all_customers.parquet")
+    pq.write_table(pa.table({
+        "customer_id": [1, 2, 3, 3],
+        **{f"Net_Revenue_{year}": [10.0, 0.0, 5.0, 5.0] for year in range(2023, 2027)},
+    }), dashboard / "customer_development.parquet")
+    hubspot = tmp_path / "src_fivetran_hubspot"
+    hubspot.mkdir()
+    pq.write_table(pa.table({"deal_id": [1, 2], "amount": [1000.0, 250.0]}), hubspot / "deal.parquet")
+    os.utime(hubspot / "deal.parquet", (1_700_000_000, 1_700_000_000))
+    return tmp_path
+
+
+@pytest.fixture
+def offline_bq(snapshot, monkeypatch):
+    """bigquery_client pointed at the snapshot through KPI_OFFLINE_REPLICA."""
+    import data.bigquery_client as bq
+
+    monkeypatch.setenv("KPI_OFFLINE_REPLICA", str(snapshot))
+    monkeypatch.setattr(bq, "_client", None)
+    return bq
+
+
+class TestOfflineClient:
+    def test_loads_every_table(self, snapshot):
+        client = OfflineClient(snapshot)
+        assert client.tables == {
+            "App_KPI_Dashboard.customer_development": 4,
+            "App_KPI_Dashboard.net_revenue_retention_all_customers": 4,
+            "src_fivetran_hubspot.deal": 2,
+        }
+
+    def test_missing_directory_fails_fast(self, tmp_path):
+        with pytest.raises(FileNotFoundError):
+            OfflineClient(tmp_path / "nope")
+
+    def test_rows_and_schema_look_like_bigquery(self, snapshot):
+        job = OfflineClient(snapshot).query(
+            "SELECT COUNTIF(amount > @floor) AS big, SUM(amount) AS total "
+            "FROM `stitchdata-384118.src_fivetran_hubspot.deal`",
+            job_config=bigquery.QueryJobConfig(query_parameters=[
+                bigquery.ScalarQueryParameter("floor", "FLOAT64", 500.0),
+                bigquery.ScalarQueryParameter("unused", "INT64", 1),
+            ]),
+        )
+        rows = job.result()
+        assert [(f.name, f.field_type) for f in rows.schema] == [("big", "INTEGER"), ("total", "FLOAT")]
+        assert isinstance(rows[0], bigquery.Row)
+        assert (rows[0].big, rows[0]["total"]) == (1, 1250.0)
+        assert job.total_bytes_processed == 0
+
+    def test_dry_run_validates_without_running(self, snapshot):
+        client = OfflineClient(snapshot)
+        job = client.query(
+            "SELECT deal_id FROM `p.src_fivetran_hubspot.deal`",
+            job_config=bigquery.QueryJobConfig(dry_run=True),
+        )
+        assert job.total_bytes_processed == 0
+        with pytest.raises(BadRequest):
+            client.query("SELECT no_such_column FROM `p.src_fivetran_hubspot.deal`",
+                         job_config=bigquery.QueryJobConfig(dry_run=True))
+
+    def test_missing_table_is_not_found(self, snapshot):
+        with pytest.raises(NotFound):
+            OfflineClient(snapshot).query("SELECT * FROM `p.mongodb.offers`")
+
+    def test_tables_metadata_comes_from_file_times(self, snapshot):
+        rows = OfflineClient(snapshot).query(
+            "SELECT table_id, last_modified_time, type FROM `p.src_fivetran_hubspot.__TABLES__`"
+        ).result()
+        assert [tuple(row.values()) for row in rows] == [("deal", 1_700_000_000_000, 1)]
+
+
+class TestBigQueryClientOffline:
+    def test_get_client_returns_the_replica(self, offline_bq):
+        assert isinstance(offline_bq.get_client(), OfflineClient)
+
+    def test_metrics_run_against_the_snapshot(self, offline_bq):
+        concentration = offline_bq.get_customer_concentration(2026)
+        assert concentration["top_customer_name"] == "Globex"
+        assert concentration["top_customer_pct"] == pytest.approx(0.75)
+        assert offline_bq.get_customer_count() == 2
+        assert offline_bq.get_logo_retention(2026) == pytest.approx(1.0)
+
+    def test_source_watermarks_work_offline(self, offline_bq):
+        watermarks = offline_bq.get_table_watermarks(("src_fivetran_hubspot",))
+        assert watermarks == {"src_fivetran_hubspot.deal": (1_700_000_000_000, 1)}
+
+    def test_result_cache_is_disabled(self, offline_bq, tmp_path, monkeypatch):
+        from data.result_cache import get_result_cache
+        from data.shared_cache import get_shared_store
+
+        monkeypatch.setenv("KPI_CACHE_DIR", str(tmp_path / "cache"))
+        assert get_result_cache() is None
+        assert get_shared_store() is None
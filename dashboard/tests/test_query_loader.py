@@ -0,0 +1,99 @@
+"""Tests for the compiled SQL template loader."""
+import os
+from datetime import date, datetime, timezone
+
+import pytest
+
+from data.query_loader import QueryLoader, QueryTemplateError, to_query_parameter
+
+CONSTANTS = {"PROJECT_ID": "proj", "DATASET": "ds"}
+
+
+def _write(path, sql, mtime=None):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(sql)
+    if mtime is not None:
+        os.utime(path, (mtime, mtime))
+
+
+class TestCompile:
+    def test_fills_placeholders_and_collects_parameters(self, tmp_path):
+        _write(tmp_path / "m" / "q.sql",
+               "-- {bill_number}c1 is not a placeholder\n"
+               "SELECT 'a@b.is' FROM `{PROJECT_ID}.{DATASET}.t` WHERE d >= @start AND @@dataset_id IS NOT NULL")
+        template = QueryLoader([tmp_path], CONSTANTS).get("m/q.sql")
+
+        assert "`proj.ds.t`" in template.sql
+        assert "{bill_number}" in template.sql
+        assert template.parameters == {"start"}
+
+    def test_unknown_placeholders_fail_the_whole_load(self, tmp_path):
+        _write(tmp_path / "a.sql", "SELECT * FROM `{PROJECTID}.x.y`")
+        _write(tmp_path / "b.sql", "SELECT {LIMIT}")
+
+        with pytest.raises(QueryTemplateError) as exc:
+            QueryLoader([tmp_path], CONSTANTS)
+        assert "PROJECTID" in str(exc.value) and "LIMIT" in str(exc.value)
+
+    def test_missing_root_is_skipped_and_unknown_name_is_none(self, tmp_path):
+        loader = QueryLoader([tmp_path / "missing"], CONSTANTS)
+        assert loader.get("nope.sql") is None
+
+    def test_every_repo_query_compiles(self):
+        from data.bigquery_client import get_query_loader, reset_query_loader
+
+        reset_query_loader()
+        names = get_query_loader().names()
+        assert "metrics/win_rate_90d.sql" in names
+        assert "coo-ops/working-capital.sql" in names
+
+
+class TestBind:
+    def test_types_plain_values(self, tmp_path):
+        _write(tmp_path / "q.sql", "SELECT @n, @x, @d, @t, @s, @ids")
+        template = QueryLoader([tmp_path], CONSTANTS).get("q.sql")
+        ts = datetime(2026, 1, 1, tzinfo=timezone.utc)
+
+        params = {p.name: p for p in template.bind(n=1, x=1.5, d=date(2026, 1, 1), t=ts, s="a", ids=[1, 2])}
+
+        assert {k: p.type_ for k, p in params.items() if k != "ids"} == {
+            "n": "INT64", "x": "FLOAT64", "d": "DATE", "t": "TIMESTAMP", "s": "STRING",
+        }
+        assert params["ids"].array_type == "INT64"
+
+    def test_rejects_missing_and_unused_parameters(self, tmp_path):
+        _write(tmp_path / "q.sql", "SELECT @a, @b")
+        template = QueryLoader([tmp_path], CONSTANTS).get("q.sql")
+
+        with pytest.raises(QueryTemplateError, match="missing @b; unused @c"):
+            template.bind([to_query_parameter("a", 1)], c=2)
+
+    def test_empty_array_cannot_be_typed(self):
+        with pytest.raises(QueryTemplateError):
+            to_query_parameter("ids", [])
+
+
+class TestHotReload:
+    def test_recompiles_when_mtime_changes(self, tmp_path):
+        path = tmp_path / "q.sql"
+        _write(path, "SELECT 1", mtime=1_000_000)
+        loader = QueryLoader([tmp_path], CONSTANTS, hot_reload=True)
+
+        _write(path, "SELECT 2", mtime=2_000_000)
+        assert loader.get("q.sql").sql == "SELECT 2"
+
+        path.unlink()
+        assert loader.get("q.sql") is None
+
+    def test_picks_up_new_files(self, tmp_path):
+        loader = QueryLoader([tmp_path], CONSTANTS, hot_reload=True)
+        _write(tmp_path / "new.sql", "SELECT @x")
+        assert loader.get("new.sql").parameters == {"x"}
+
+    def test_without_hot_reload_the_compiled_copy_is_kept(self, tmp_path):
+        path = tmp_path / "q.sql"
+        _write(path, "SELECT 1", mtime=1_000_000)
+        loader = QueryLoader([tmp_path], CONSTANTS)
+
+        _write(path, "SELECT 2", mtime=2_000_000)
+        assert loader.get("q.sql").sql == "SELECT 1"
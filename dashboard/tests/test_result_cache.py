@@ -0,0 +1,240 @@
+"""Tests for the persistent on-disk BigQuery result cache."""
+import re
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+
+class _Param:
+    def __init__(self, name, type_, value):
+        self.name, self.type_, self.value = name, type_, value
+
+
+class TestMakeKey:
+    def test_whitespace_is_normalized(self):
+        from data.result_cache import make_key
+
+        assert make_key("SELECT  1\n  FROM t") == make_key("SELECT 1 FROM t")
+
+    def test_parameters_change_the_key(self):
+        from data.result_cache import make_key
+
+        query = "SELECT * FROM t WHERE y = @year"
+        assert make_key(query, [_Param("year", "INT64", 2025)]) != make_key(query, [_Param("year", "INT64", 2026)])
+
+    def test_format_version_changes_the_key(self, monkeypatch):
+        import data.result_cache as result_cache
+
+        key = result_cache.make_key("SELECT 1")
+        monkeypatch.setattr(result_cache, "CACHE_FORMAT_VERSION", result_cache.CACHE_FORMAT_VERSION - 1)
+        assert result_cache.make_key("SELECT 1") != key
+
+    def test_parameter_order_does_not_matter(self):
+        from data.result_cache import make_key
+
+        a, b = _Param("a", "INT64", 1), _Param("b", "INT64", 2)
+        assert make_key("SELECT 1", [a, b]) == make_key("SELECT 1", [b, a])
+
+
+class TestResultCache:
+    def test_round_trip_survives_reopen(self, tmp_path):
+        from data.result_cache import ResultCache, CachedRow
+
+        ResultCache(tmp_path / "c.sqlite3").set("k", [CachedRow(total=42)], ttl=60)
+
+        reopened = ResultCache(tmp_path / "c.sqlite3")
+        rows = reopened.get("k")
+        assert rows[0].total == 42
+        assert rows[0]["total"] == 42
+        assert dict(rows[0]) == {"total": 42}
+        assert getattr(rows[0], "missing", 0) == 0
+
+    def test_expired_entries_miss(self, tmp_path):
+        from data.result_cache import ResultCache, MISS
+
+        cache = ResultCache(tmp_path / "c.sqlite3")
+        cache.set("k", 1, ttl=-1)
+        assert cache.get("k") is MISS
+
+    def test_none_is_a_cacheable_value(self, tmp_path):
+        from data.result_cache import ResultCache
+
+        cache = ResultCache(tmp_path / "c.sqlite3")
+        cache.set("k", None, ttl=60)
+        assert cache.get("k") is None
+
+    def test_lru_eviction_keeps_size_under_budget(self, tmp_path):
+        import os
+        import time
+        from data.result_cache import ResultCache, MISS
+
+        payload = os.urandom(4000)  # incompressible
+        cache = ResultCache(tmp_path / "c.sqlite3", max_bytes=10_000)
+        cache.set("a", payload, ttl=60)
+        time.sleep(0.01)
+        cache.set("b", payload, ttl=60)
+        time.sleep(0.01)
+        cache.get("a")  # "a" is now more recently used than "b"
+        time.sleep(0.01)
+        cache.set("c", payload, ttl=60)
+
+        assert cache.get("b") is MISS
+        assert cache.get("a") == payload
+        assert cache.get("c") == payload
+        assert cache.stats()["bytes"] <= 10_000
+
+
+class TestGetResultCache:
+    def test_disabled_without_env(self):
+        from data.result_cache import get_result_cache
+
+        assert get_result_cache() is None
+
+    def test_enabled_from_env(self, tmp_path, monkeypatch):
+        from data.result_cache import get_result_cache, CACHE_FILENAME
+
+        monkeypatch.setenv("KPI_CACHE_DIR", str(tmp_path))
+        assert get_result_cache().path == tmp_path / CACHE_FILENAME
+
+
+def _warehouse_client(rows, last_modified, table_type=1):
+    """Mock client: __TABLES__ lookups report last_modified, metric queries return rows."""
+    def query(sql, job_config=None):
+        job = MagicMock()
+        if "__TABLES__" in sql:
+            datasets = re.findall(r"SELECT '(\w+)' AS dataset_id", sql)
+            job.result.return_value = [
+                MagicMock(dataset_id=d, table_id=t, last_modified_time=last_modified[0], type=table_type)
+                for d in datasets
+                for t in ("journal_entry_line", "journal_entry", "account")
+            ]
+        else:
+            job.result.return_value = rows
+        return job
+
+    client = MagicMock()
+    client.query.side_effect = query
+    return client
+
+
+def _metric_calls(client):
+    return [c for c in client.query.call_args_list if "__TABLES__" not in c[0][0]]
+
+
+@pytest.fixture
+def working_capital_row():
+    row = MagicMock()
+    row.items.return_value = [
+        ("working_capital", 1_500_000.0), ("current_assets", 2_000_000.0), ("current_liabilities", 500_000.0),
+    ]
+    return row
+
+
+class TestExecuteUsesResultCache:
+    @patch("data.bigquery_client.get_client")
+    def test_second_refresh_is_served_from_disk(self, mock_get_client, working_capital_row, tmp_path, monkeypatch):
+        from data import result_cache
+        from data.bigquery_client import get_working_capital
+
+        monkeypatch.setenv("KPI_CACHE_DIR", str(tmp_path))
+        mock_client = _warehouse_client([working_capital_row], [1000])
+        mock_get_client.return_value = mock_client
+
+        first = get_working_capital()
+        result_cache.reset_result_cache()  # simulate a server restart
+        second = get_working_capital()
+
+        assert first == second
+        assert second["working_capital"] == pytest.approx(1_500_000.0)
+        assert len(_metric_calls(mock_client)) == 1
+
+    @patch("data.bigquery_client.get_client")
+    def test_errors_are_not_cached(self, mock_get_client, tmp_path, monkeypatch):
+        from google.cloud.exceptions import GoogleCloudError
+        from data.bigquery_client import get_working_capital
+
+        monkeypatch.setenv("KPI_CACHE_DIR", str(tmp_path))
+        mock_client = MagicMock()
+        mock_get_client.return_value = mock_client
+        mock_client.query.side_effect = GoogleCloudError("fail")
+
+        assert get_working_capital() == {}
+        assert get_working_capital() == {}
+        assert len(_metric_calls(mock_client)) == 2
+
+
+class TestSourceWatermarks:
+    def test_source_tables_are_parsed_from_backtick_refs(self):
+        from data.bigquery_client import source_tables
+
+        sql = """
+        SELECT * FROM `stitchdata-384118.src_fivetran_qbo.invoice` i
+        JOIN `stitchdata-384118.src_fivetran_qbo.account` a ON TRUE
+        JOIN `stitchdata-384118.src_fivetran_qbo.invoice` i2 ON TRUE
+        """
+        assert source_tables(sql) == ("src_fivetran_qbo.account", "src_fivetran_qbo.invoice")
+
+    @patch("data.bigquery_client.get_client")
+    def test_unchanged_sources_outlive_ttl(self, mock_get_client, working_capital_row, tmp_path, monkeypatch):
+        import data.bigquery_client as bq
+
+        monkeypatch.setenv("KPI_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(bq.METRICS["working_capital"], "ttl", -1)
+        mock_client = _warehouse_client([working_capital_row], [1000])
+        mock_get_client.return_value = mock_client
+
+        bq.get_working_capital()
+        bq.reset_source_watermarks()
+        bq.get_working_capital()
+
+        assert len(_metric_calls(mock_client)) == 1
+
+    @patch("data.bigquery_client.get_client")
+    def test_fivetran_sync_invalidates(self, mock_get_client, working_capital_row, tmp_path, monkeypatch):
+        import data.bigquery_client as bq
+
+        monkeypatch.setenv("KPI_CACHE_DIR", str(tmp_path))
+        last_modified = [1000]
+        mock_client = _warehouse_client([working_capital_row], last_modified)
+        mock_get_client.return_value = mock_client
+
+        bq.get_working_capital()
+        last_modified[0] = 2000  # Fivetran sync lands
+        bq.reset_source_watermarks()
+        bq.get_working_capital()
+
+        assert len(_metric_calls(mock_client)) == 2
+
+    @patch("data.bigquery_client.get_client")
+    def test_views_fall_back_to_ttl(self, mock_get_client, working_capital_row, tmp_path, monkeypatch):
+        import data.bigquery_client as bq
+
+        monkeypatch.setenv("KPI_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(bq.METRICS["working_capital"], "ttl", -1)
+        mock_client = _warehouse_client([working_capital_row], [1000], table_type=2)
+        mock_get_client.return_value = mock_client
+
+        bq.get_working_capital()
+        bq.get_working_capital()
+
+        assert len(_metric_calls(mock_client)) == 2
+
+    @patch("data.bigquery_client.get_client")
+    def test_metadata_lookups_are_reused(self, mock_get_client, tmp_path, monkeypatch):
+        import data.bigquery_client as bq
+
+        monkeypatch.setenv("KPI_CACHE_DIR", str(tmp_path))
+        row = MagicMock()
+        row.items.return_value = [
+            ("working_capital", 1.0), ("current_assets", 1.0), ("current_liabilities", 0.0),
+            ("months_of_runway", 12.0), ("cash_balance", 1.0), ("avg_monthly_burn", 1.0),
+        ]
+        mock_client = _warehouse_client([row], [1000])
+        mock_get_client.return_value = mock_client
+
+        bq.get_working_capital()
+        bq.get_months_of_runway()
+
+        tables_calls = [c for c in mock_client.query.call_args_list if "__TABLES__" in c[0][0]]
+        assert len(tables_calls) == 1
+        assert len(_metric_calls(mock_client)) == 2
@@ -0,0 +1,110 @@
+"""Tests for retry classification, backoff and deadlines."""
+from unittest.mock import MagicMock
+
+import pytest
+from google.api_core.exceptions import BadRequest, Forbidden, NotFound, ServiceUnavailable, TooManyRequests
+
+from data.retry import RetryPolicy, call_with_retry, is_retryable
+
+
+class FakeClock:
+    """Monotonic clock advanced by the fake sleep."""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def _call(fn, policy, clock):
+    return call_with_retry(fn, policy, sleep=clock.sleep, clock=clock)
+
+
+class TestIsRetryable:
+    @pytest.mark.parametrize("error", [
+        TooManyRequests("slow down"),
+        ServiceUnavailable("backend down"),
+        Forbidden("quota", errors=[{"reason": "rateLimitExceeded"}]),
+        BadRequest("job failed", errors=[{"reason": "backendError"}]),
+        ConnectionError("reset"),
+        TimeoutError("read timed out"),
+    ])
+    def test_transient_failures(self, error):
+        assert is_retryable(error)
+
+    @pytest.mark.parametrize("error", [
+        BadRequest("Syntax error"),
+        BadRequest("too many bytes", errors=[{"reason": "bytesBilledLimitExceeded"}]),
+        NotFound("no such table"),
+        Forbidden("access denied", errors=[{"reason": "accessDenied"}]),
+        ValueError("bug"),
+    ])
+    def test_fatal_failures(self, error):
+        assert not is_retryable(error)
+
+    def test_open_circuit_is_fatal(self):
+        from data.bigquery_client import CircuitOpenError
+
+        assert not is_retryable(CircuitOpenError("circuit open"))
+
+
+class TestRetryPolicy:
+    def test_backoff_is_jittered_below_an_exponential_cap(self):
+        policy = RetryPolicy(base_delay=0.5, max_delay=3.0)
+        ceilings = []
+        for retry in range(4):
+            policy.backoff(retry, rng=lambda low, high: ceilings.append((low, high)))
+        assert ceilings == [(0.0, 0.5), (0.0, 1.0), (0.0, 2.0), (0.0, 3.0)]
+
+    def test_rejects_invalid_settings(self):
+        with pytest.raises(ValueError):
+            RetryPolicy(max_attempts=0)
+
+
+class TestCallWithRetry:
+    def test_transient_failure_is_retried(self):
+        clock = FakeClock()
+        fn = MagicMock(side_effect=[ServiceUnavailable("down"), "ok"])
+
+        assert _call(fn, RetryPolicy(max_attempts=3), clock) == "ok"
+        assert fn.call_count == 2
+        assert len(clock.sleeps) == 1
+
+    def test_fatal_failure_is_not_retried(self):
+        clock = FakeClock()
+        fn = MagicMock(side_effect=BadRequest("Syntax error"))
+
+        with pytest.raises(BadRequest):
+            _call(fn, RetryPolicy(max_attempts=3), clock)
+        assert fn.call_count == 1
+        assert clock.sleeps == []
+
+    def test_gives_up_after_max_attempts(self):
+        clock = FakeClock()
+        fn = MagicMock(side_effect=ServiceUnavailable("down"))
+
+        with pytest.raises(ServiceUnavailable):
+            _call(fn, RetryPolicy(max_attempts=3), clock)
+        assert fn.call_count == 3
+
+    def test_no_retry_starts_past_the_deadline(self):
+        clock = FakeClock()
+
+        def slow_failure():
+            clock.now += 4.0
+            raise ServiceUnavailable("down")
+
+        fn = MagicMock(side_effect=slow_failure)
+        policy = RetryPolicy(max_attempts=10, base_delay=1.0, max_delay=1.0, deadline=9.5)
+        policy.backoff = lambda retry: 1.0  # 4s + 1s + 4s, then another 1s would cross 9.5s
+        with pytest.raises(ServiceUnavailable):
+            _call(fn, policy, clock)
+
+        assert clock.now <= policy.deadline
+        assert fn.call_count == 2
@@ -0,0 +1,91 @@
+"""Tests for schema-typed row decoding."""
+from decimal import Decimal
+from unittest.mock import MagicMock, patch
+
+from google.cloud.bigquery import Row, SchemaField
+
+from data.row_decoder import decode_result, decoder_for, schema_key, select_columns
+
+
+class FakeRowIterator(list):
+    """QueryJob.result() stand-in: rows plus the result schema."""
+
+    def __init__(self, schema, values):
+        index = {field.name: i for i, field in enumerate(schema)}
+        super().__init__(Row(v, index) for v in values)
+        self.schema = schema
+
+
+SCHEMA = [
+    SchemaField("owner_name", "STRING"),
+    SchemaField("deal_count", "INTEGER"),
+    SchemaField("quota", "NUMERIC"),
+    SchemaField("coverage", "FLOAT"),
+]
+
+
+class TestDecodeResult:
+    def test_numeric_columns_become_floats(self):
+        rows = decode_result(FakeRowIterator(SCHEMA, [
+            ("Ana", 3, Decimal("1200.50"), 0.0),
+            ("Ben", 0, None, None),
+        ]))
+
+        assert rows == [
+            {"owner_name": "Ana", "deal_count": 3, "quota": 1200.5, "coverage": 0.0},
+            {"owner_name": "Ben", "deal_count": 0, "quota": None, "coverage": None},
+        ]
+        assert type(rows[0]["quota"]) is float
+
+    def test_decoder_is_built_once_per_schema(self):
+        assert decoder_for(schema_key(SCHEMA)) is decoder_for(schema_key(list(SCHEMA)))
+
+    def test_empty_result(self):
+        assert decode_result(FakeRowIterator(SCHEMA, [])) == []
+
+    def test_results_without_a_schema_pass_through(self):
+        rows = [MagicMock(), MagicMock()]
+        assert decode_result(rows) == rows
+
+
+class TestSelectColumns:
+    def test_nulls_are_replaced_but_zero_is_kept(self):
+        rows = [{"deal_count": 0, "avg_days": None, "extra": 1}, {"deal_count": None, "avg_days": 2.5}]
+
+        assert select_columns(rows, {"deal_count": 0, "avg_days": None}) == [
+            {"deal_count": 0, "avg_days": None},
+            {"deal_count": 0, "avg_days": 2.5},
+        ]
+
+    def test_reads_attribute_rows(self, mock_bq_result):
+        rows = mock_bq_result([{"pct": 0.0, "count": None}])
+
+        assert select_columns(rows, {"pct": 1.0, "count": 0}) == [{"pct": 0.0, "count": 0}]
+
+
+class TestExecuteRecords:
+    @patch("data.bigquery_client.get_client")
+    def test_fetcher_keeps_a_legitimate_zero(self, mock_get_client):
+        from data.bigquery_client import get_mql_to_sql_conversion
+
+        schema = [
+            SchemaField("mql_count", "INTEGER"),
+            SchemaField("sql_count", "INTEGER"),
+            SchemaField("conversion_rate", "FLOAT"),
+        ]
+        job = mock_get_client.return_value.query.return_value
+        job.result.return_value = FakeRowIterator(schema, [(12, 0, 0.0)])
+
+        assert get_mql_to_sql_conversion() == {"conversion_rate": 0.0, "mql_count": 12, "sql_count": 0}
+
+    @patch("data.bigquery_client.get_client")
+    def test_multi_row_fetcher_decodes_numeric(self, mock_get_client):
+        from data.bigquery_client import get_pipeline_coverage_by_owner
+
+        schema = [SchemaField("owner_name", "STRING"), SchemaField("new_cust_annual_quota", "NUMERIC")]
+        job = mock_get_client.return_value.query.return_value
+        job.result.return_value = FakeRowIterator(schema, [("Ana", Decimal("400000"))])
+
+        assert get_pipeline_coverage_by_owner(quarter="Q1") == [
+            {"owner_name": "Ana", "new_cust_annual_quota": 400000.0}
+        ]
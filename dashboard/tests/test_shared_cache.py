@@ -0,0 +1,104 @@
+"""Tests for the cross-process shared snapshot store."""
+import multiprocessing
+import sys
+from unittest.mock import MagicMock
+
+import pytest
+
+
+def _hold_lock(directory, name, ready, release):
+    from data.shared_cache import SharedSnapshotStore
+
+    with SharedSnapshotStore(directory).refresh_lock(name) as acquired:
+        assert acquired
+        ready.set()
+        release.wait(10)
+
+
+class TestSharedSnapshotStore:
+    def test_snapshot_is_visible_to_another_store(self, tmp_path):
+        from data.shared_cache import SharedSnapshotStore
+
+        SharedSnapshotStore(tmp_path).save("metrics", {"revenue_ytd": 1.0}, updated_at=100.0)
+
+        other = SharedSnapshotStore(tmp_path)
+        assert other.load("metrics") == ({"revenue_ytd": 1.0}, 100.0)
+        assert other.updated_at("metrics") == 100.0
+
+    def test_load_skips_snapshots_that_are_not_newer(self, tmp_path):
+        from data.shared_cache import SharedSnapshotStore
+
+        store = SharedSnapshotStore(tmp_path)
+        store.save("metrics", {"revenue_ytd": 1.0}, updated_at=100.0)
+
+        assert store.load("metrics", newer_than=100.0) is None
+        assert store.load("missing") is None
+
+    @pytest.mark.skipif(sys.platform == "win32", reason="fcntl locks only")
+    def test_refresh_lock_excludes_other_processes(self, tmp_path):
+        from data.shared_cache import SharedSnapshotStore
+
+        ctx = multiprocessing.get_context("fork")
+        ready, release = ctx.Event(), ctx.Event()
+        holder = ctx.Process(target=_hold_lock, args=(tmp_path, "metrics", ready, release))
+        holder.start()
+        try:
+            assert ready.wait(10)
+            with SharedSnapshotStore(tmp_path).refresh_lock("metrics", timeout=0) as acquired:
+                assert not acquired
+        finally:
+            release.set()
+            holder.join(10)
+
+        with SharedSnapshotStore(tmp_path).refresh_lock("metrics", timeout=0) as acquired:
+            assert acquired
+
+    def test_disabled_without_env(self):
+        from data.shared_cache import get_shared_store
+
+        assert get_shared_store() is None
+
+
+class TestReplicasShareSnapshot:
+    @pytest.fixture
+    def replica(self, tmp_path, monkeypatch):
+        import data.data_layer as dl
+
+        monkeypatch.setenv("KPI_CACHE_DIR", str(tmp_path))
+        monkeypatch.setattr(dl, "_bq_cache", {"data": None, "timestamp": 0})
+        monkeypatch.setattr(dl, "_bq_last_error", None)
+        monkeypatch.setattr(dl, "_bigquery_available", True)
+        monkeypatch.setattr(dl, "USE_BIGQUERY", True)
+        monkeypatch.setattr(dl, "_ensure_background_refresh", lambda: None)
+        from data.bigquery_client import CircuitBreaker, run_within_deadline
+
+        mock_bq = MagicMock(CircuitBreaker=CircuitBreaker, bigquery_breaker=CircuitBreaker())
+        mock_bq.get_company_metrics.return_value = {"revenue_ytd": 1_000_000}
+        mock_bq.get_pipeline_details.return_value = {}
+        mock_bq.get_time_to_fulfill.return_value = {}
+        mock_bq.run_within_deadline.side_effect = run_within_deadline
+        monkeypatch.setattr(dl, "bq", mock_bq)
+        return dl, mock_bq
+
+    def test_cold_start_adopts_snapshot_from_another_replica(self, replica, tmp_path):
+        import time
+        from data.shared_cache import SharedSnapshotStore
+
+        dl, mock_bq = replica
+        snapshot = {"metrics": {"revenue_ytd": 7_000_000}, "pipeline": {}, "ttf": {}}
+        SharedSnapshotStore(tmp_path).save(dl._BQ_SNAPSHOT_NAME, snapshot, updated_at=time.time())
+
+        data = dl._fetch_bigquery_metrics()
+
+        assert data["metrics"]["revenue_ytd"] == 7_000_000
+        mock_bq.get_company_metrics.assert_not_called()
+
+    def test_refresh_publishes_for_other_replicas(self, replica, tmp_path):
+        from data.shared_cache import SharedSnapshotStore
+
+        dl, mock_bq = replica
+        dl._fetch_bigquery_metrics()
+
+        shared, _ = SharedSnapshotStore(tmp_path).load(dl._BQ_SNAPSHOT_NAME)
+        assert shared["metrics"]["revenue_ytd"] == 1_000_000
+        assert mock_bq.get_company_metrics.call_count == 1
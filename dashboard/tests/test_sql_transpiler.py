@@ -0,0 +1,133 @@
+"""Tests for the BigQuery -> DuckDB SQL transpiler used by the offline replica."""
+import datetime
+import re
+
+import pytest
+
+from data.sql_transpiler import TranspileError, transpile
+
+duckdb = pytest.importorskip("duckdb")
+
+
+def _run(sql, **params):
+    """Transpile BigQuery SQL and return its single row from DuckDB."""
+    converted, used = transpile(sql)
+    conn = duckdb.connect()
+    return conn.execute(converted, {k: v for k, v in params.items() if k in used}).fetchone()
+
+
+class TestRewrites:
+    def test_table_references_become_schema_qualified(self):
+        sql, _ = transpile("SELECT * FROM `stitchdata-384118.src_fivetran_qbo.invoice` i")
+        assert '"src_fivetran_qbo"."invoice"' in sql
+
+    def test_parameters_are_renamed_and_reported(self):
+        sql, used = transpile("SELECT @fiscal_year, 'rep@recess.is' -- @not_a_param")
+        assert "$fiscal_year" in sql
+        assert "'rep@recess.is'" in sql
+        assert used == frozenset({"fiscal_year"})
+
+    def test_string_literals_are_not_rewritten(self):
+        assert _run("SELECT \"COUNTIF(x)\", r'\\d+'") == ("COUNTIF(x)", "\\d+")
+
+    def test_safe_cast_returns_null_on_bad_input(self):
+        assert _run("SELECT SAFE_CAST('12.5' AS FLOAT64), SAFE_CAST('x' AS INT64)") == (12.5, None)
+
+    def test_countif_and_if(self):
+        row = _run("SELECT COUNTIF(x > 1), SUM(IF(x > 1, x, 0)) FROM UNNEST([1, 2, 3]) AS x")
+        assert row == (2, 5)
+
+    def test_safe_divide_by_zero_is_null(self):
+        assert _run("SELECT SAFE_DIVIDE(1, 0), SAFE_DIVIDE(1, 4)") == (None, 0.25)
+
+    def test_approx_quantiles_offset(self):
+        row = _run("SELECT APPROX_QUANTILES(x, 2)[OFFSET(1)] FROM UNNEST([1, 2, 3, 4, 5]) AS x")
+        assert row == (3,)
+
+    def test_regexp_replace_replaces_every_match(self):
+        assert _run("SELECT REGEXP_REPLACE('a-b-c', r'-', '')") == ("abc",)
+
+    def test_regexp_contains(self):
+        assert _run("SELECT REGEXP_CONTAINS('Deal 42', r'\\d+')") == (True,)
+
+    def test_date_functions(self):
+        row = _run(
+            "SELECT DATE_DIFF(DATE '2026-03-01', DATE '2026-01-01', DAY), "
+            "DATE_TRUNC(DATE '2026-05-20', QUARTER), "
+            "DATE_SUB(DATE '2026-01-31', INTERVAL 1 MONTH), "
+            "FORMAT_DATE('%Y-Q%Q', DATE '2026-05-20'), "
+            "DATE(2026, 2, 1)"
+        )
+        assert row == (
+            59, datetime.date(2026, 4, 1), datetime.date(2025, 12, 31), "2026-Q2", datetime.date(2026, 2, 1),
+        )
+
+    def test_timestamp_diff_counts_whole_elapsed_periods(self):
+        row = _run(
+            "SELECT TIMESTAMP_DIFF(TIMESTAMP '2026-01-02 01:00:00', TIMESTAMP '2026-01-01 23:00:00', DAY), "
+            "DATETIME_DIFF(DATETIME '2026-01-02 01:00:00', DATETIME '2026-01-01 23:30:00', HOUR), "
+            "DATE_DIFF(DATE '2026-01-02', DATE '2026-01-01', DAY)"
+        )
+        assert row == (0, 1, 1)
+
+    def test_week_monday_truncation(self):
+        assert _run("SELECT DATE_TRUNC(DATE '2026-10-15', WEEK(MONDAY))") == (datetime.date(2026, 10, 12),)
+
+    def test_other_week_starts_are_rejected(self):
+        with pytest.raises(TranspileError):
+            transpile("SELECT DATE_TRUNC(d, WEEK(SUNDAY)) FROM t")
+
+    def test_dayofweek_counts_from_sunday(self):
+        # 2026-10-18 is a Sunday: BigQuery DAYOFWEEK 1
+        assert _run("SELECT EXTRACT(DAYOFWEEK FROM DATE '2026-10-18')") == (1,)
+
+    def test_parameters_are_bound_by_name(self):
+        row = _run("SELECT @fiscal_year - 1, @start_date", fiscal_year=2026, start_date=datetime.date(2026, 1, 1))
+        assert row == (2025, datetime.date(2026, 1, 1))
+
+    def test_struct_subquery_is_selected_as_a_struct(self):
+        assert _run("SELECT (SELECT AS STRUCT * FROM (SELECT 1 AS a, 'x' AS b)) AS m") == ({"a": 1, "b": "x"},)
+
+    def test_results_are_memoized(self):
+        sql = "SELECT COUNTIF(TRUE)"
+        assert transpile(sql) is transpile(sql)
+
+
+class TestDashboardQueries:
+    def _queries(self, monkeypatch):
+        import data.bigquery_client as bq
+        from data.cost_report import estimate_metric_bytes
+        from data.metric_registry import METRICS
+
+        queries = []
+        monkeypatch.setattr(bq, "dry_run_bytes", lambda query, params=None: queries.append(query) or 0)
+        estimate_metric_bytes()
+        queries += [bq.metric_sql(name) for name in METRICS]
+        loader = bq.get_query_loader()
+        queries += [loader.get(name).sql for name in loader.names()]
+        return queries
+
+    def test_every_dashboard_query_is_valid_duckdb(self, monkeypatch):
+        """Every SELECT the dashboard issues must transpile and parse.
+
+        The aggregate-table DDL (CREATE ... PARTITION BY, MERGE) is run by
+        the refresh job, never by the dashboard, and is not supported.
+        """
+        queries = [
+            q for q in self._queries(monkeypatch)
+            if not re.sub(r"--[^\n]*", "", q).lstrip().upper().startswith(("CREATE", "MERGE"))
+        ]
+        assert len(queries) > 50
+
+        conn = duckdb.connect()
+        failures = []
+        for query in queries:
+            try:
+                sql, _ = transpile(query)
+                conn.execute("SELECT json_serialize_sql(?::VARCHAR)", [sql])
+                parsed = conn.fetchone()[0]
+                if '"error":true' in parsed.replace(" ", ""):
+                    failures.append((query[:80], parsed[:200]))
+            except (TranspileError, duckdb.Error) as e:
+                failures.append((query[:80], str(e)))
+        assert failures == []
@@ -0,0 +1,90 @@
+"""Tests for the query telemetry ring buffer."""
+from unittest.mock import patch, MagicMock
+
+import pytest
+
+
+@pytest.fixture(autouse=True)
+def empty_buffer():
+    from data.telemetry import reset_telemetry
+
+    reset_telemetry()
+    yield
+    reset_telemetry()
+
+
+class TestRingBuffer:
+    def test_percentiles_per_metric(self):
+        from data.telemetry import record_query, metric_stats
+
+        for ms in range(1, 101):
+            record_query("revenue_ytd", ms / 1000, rows=1)
+        record_query("take_rate", 0.005, rows=1)
+
+        stats = metric_stats()
+        assert stats["revenue_ytd"]["count"] == 100
+        assert stats["revenue_ytd"]["p50_ms"] == pytest.approx(50)
+        assert stats["revenue_ytd"]["p95_ms"] == pytest.approx(95)
+        assert list(stats) == ["revenue_ytd", "take_rate"]
+
+    def test_buffer_keeps_only_the_most_recent_entries(self, monkeypatch):
+        from collections import deque
+        import data.telemetry as telemetry
+
+        monkeypatch.setattr(telemetry, "_records", deque(maxlen=3))
+        for i in range(5):
+            telemetry.record_query(f"m{i}", 0.001)
+
+        assert [e["metric"] for e in telemetry.recent_queries()] == ["m2", "m3", "m4"]
+
+    def test_unreported_job_statistics_are_none(self):
+        from data.telemetry import record_query, recent_queries
+
+        record_query("nrr", 0.1, bytes_processed=MagicMock(), cache_hit=MagicMock())
+        entry = recent_queries()[-1]
+        assert entry["bytes_processed"] is None
+        assert entry["cache_hit"] is None
+
+    def test_latency_percentile_counts_only_successful_jobs(self):
+        from data.telemetry import SOURCE_RESULT_CACHE, latency_percentile, record_query
+
+        for ms in range(1, 21):
+            record_query("nrr", ms / 1000, rows=1)
+        record_query("nrr", 9.0, error="boom")
+        record_query("nrr", 0.0001, source=SOURCE_RESULT_CACHE)
+
+        assert latency_percentile("nrr", 95) == pytest.approx(0.019)
+        assert latency_percentile("nrr", 95, min_samples=21) is None
+        assert latency_percentile("take_rate", 95) is None
+
+
+class TestQueryInstrumentation:
+    @patch("data.bigquery_client.get_client")
+    def test_jobs_are_recorded_under_their_metric(self, mock_get_client):
+        from data.bigquery_client import get_working_capital
+        from data.telemetry import recent_queries
+
+        job = MagicMock(total_bytes_processed=2048, slot_millis=30, cache_hit=False)
+        job.result.return_value = []
+        mock_get_client.return_value.query.return_value = job
+
+        get_working_capital()
+
+        entry = recent_queries()[-1]
+        assert entry["metric"] == "working_capital"
+        assert entry["bytes_processed"] == 2048
+        assert entry["slot_millis"] == 30
+        assert entry["cache_hit"] is False
+        assert entry["rows"] == 0
+
+    @patch("data.bigquery_client.get_client")
+    def test_failures_are_recorded(self, mock_get_client):
+        from google.cloud.exceptions import GoogleCloudError
+        from data.bigquery_client import get_working_capital
+        from data.telemetry import metric_stats
+
+        mock_get_client.return_value.query.side_effect = GoogleCloudError("fail")
+
+        get_working_capital()
+
+        assert metric_stats()["working_capital"]["errors"] == 1